@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+"""
+Benchmark the lock handoff latency of flock_wait
+
+Several processes are contending for the same lock file. Each process
+acquires the lock, holds it for a short time and releases it again. The
+handoff latency is the time between a release and the next acquisition of the
+lock by another process.
+
+The benchmark imports greenbone-feed-sync and therefore has to be run from
+the development environment of the repository.
+
+Example:
+
+    uv run python benchmarks/flock_handoff.py --processes 8 --mode blocking
+    uv run python benchmarks/flock_handoff.py --processes 8 --mode polling \\
+        --wait-interval 0.1
+"""
+
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from itertools import pairwise
+from pathlib import Path
+
+from greenbone.feed.sync.helper import flock_wait
+
+
+async def _contend(
+    lock_file: Path,
+    iterations: int,
+    hold: float,
+    blocking: bool,
+    wait_interval: float,
+) -> list[tuple[float, float]]:
+    timings = []
+    for _ in range(iterations):
+        async with flock_wait(
+            lock_file, blocking=blocking, wait_interval=wait_interval
+        ):
+            acquired = time.monotonic()
+            await asyncio.sleep(hold)
+            released = time.monotonic()
+        timings.append((acquired, released))
+        # give the other processes a chance to get the lock
+        await asyncio.sleep(0)
+    return timings
+
+
+def _worker(
+    lock_file: Path,
+    iterations: int,
+    hold: float,
+    blocking: bool,
+    wait_interval: float,
+    queue: "multiprocessing.Queue[list[tuple[float, float]]]",
+) -> None:
+    queue.put(
+        asyncio.run(
+            _contend(lock_file, iterations, hold, blocking, wait_interval)
+        )
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument(
+        "--hold",
+        type=float,
+        default=0.01,
+        help="Time in seconds to hold the lock. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mode", choices=["blocking", "polling"], default="blocking"
+    )
+    parser.add_argument(
+        "--wait-interval",
+        type=float,
+        default=0.5,
+        help="Wait interval in seconds for polling. (Default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_file = Path(temp_dir) / "feed-update.lock"
+        queue: multiprocessing.Queue[list[tuple[float, float]]] = (
+            multiprocessing.Queue()
+        )
+        processes = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(
+                    lock_file,
+                    args.iterations,
+                    args.hold,
+                    args.mode == "blocking",
+                    args.wait_interval,
+                    queue,
+                ),
+            )
+            for _ in range(args.processes)
+        ]
+        start = time.monotonic()
+        for process in processes:
+            process.start()
+
+        timings = sorted(timing for _ in processes for timing in queue.get())
+        for process in processes:
+            process.join()
+        duration = time.monotonic() - start
+
+    handoffs = [
+        acquired - released
+        for (_, released), (acquired, _) in pairwise(timings)
+    ]
+    if not handoffs:
+        sys.exit("Not enough lock acquisitions for measuring handoffs.")
+
+    handoffs.sort()
+    print(f"mode:           {args.mode}")
+    print(f"acquisitions:   {len(timings)}")
+    print(f"total duration: {duration:.3f}s")
+    print(f"handoff mean:   {statistics.mean(handoffs) * 1000:.3f}ms")
+    print(f"handoff median: {statistics.median(handoffs) * 1000:.3f}ms")
+    print(
+        "handoff p95:    "
+        f"{handoffs[int(len(handoffs) * 0.95) - 1] * 1000:.3f}ms"
+    )
+    print(f"handoff max:    {handoffs[-1] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
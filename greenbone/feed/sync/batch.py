@@ -0,0 +1,207 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.rsync import PathLike, Rsync
+
+BATCH_FILE_SUFFIX = ".batch"
+BATCH_INFO_FILE_SUFFIX = ".json"
+
+
+@dataclass(frozen=True)
+class BatchInfo:
+    """
+    Versions of a tree before and after applying a batch file
+
+    Args:
+        base: Fingerprint of the tree the batch has been recorded against
+        result: Fingerprint of the tree after the batch has been applied
+    """
+
+    base: str
+    result: str
+
+
+class ReplayStatus(Enum):
+    """
+    Outcome of replaying a batch file onto a destination
+    """
+
+    REPLAYED = "replayed"
+    UP_TO_DATE = "up-to-date"
+    MISMATCH = "mismatch"
+
+
+def batch_file(directory: PathLike, name: str) -> Path:
+    """
+    Get the batch file for a sync in a batch directory
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return Path(directory) / f"{slug}{BATCH_FILE_SUFFIX}"
+
+
+def batch_info_file(batch: PathLike) -> Path:
+    """
+    Get the file storing the BatchInfo of a batch file
+    """
+    batch = Path(batch)
+    return batch.with_name(f"{batch.name}{BATCH_INFO_FILE_SUFFIX}")
+
+
+def tree_fingerprint(path: PathLike, *, exclude: Iterable[str] = ()) -> str:
+    """
+    Calculate a fingerprint of a directory tree
+
+    Like the quick check of rsync it covers the paths, types, sizes and
+    modification times of the files but not their content. The modification
+    times of directories are ignored because they are not synced. Entries
+    with an excluded name are skipped on all levels. A missing directory has
+    the fingerprint of an empty one.
+    """
+    excluded = {os.fspath(name).strip("/") for name in exclude}
+    digest = hashlib.sha256()
+    root = Path(path)
+
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(name for name in dirs if name not in excluded)
+        relative = Path(directory).relative_to(root)
+        for name in [
+            *dirs,
+            *sorted(name for name in files if name not in excluded),
+        ]:
+            entry = Path(directory, name)
+            stat = entry.lstat()
+            if entry.is_symlink():
+                line = f"l {relative / name} {entry.readlink()}"
+            elif entry.is_dir():
+                line = f"d {relative / name}"
+            else:
+                line = (
+                    f"f {relative / name} {stat.st_size} {int(stat.st_mtime)}"
+                )
+            digest.update(f"{line}\n".encode("utf8", errors="surrogateescape"))
+
+    return digest.hexdigest()
+
+
+async def _fingerprint(path: PathLike, exclude: Iterable[str]) -> str:
+    # walking a large tree must not block the event loop
+    return await asyncio.to_thread(tree_fingerprint, path, exclude=exclude)
+
+
+def write_batch_info(batch: PathLike, info: BatchInfo) -> None:
+    """
+    Store the BatchInfo next to a batch file
+    """
+    info_file = batch_info_file(batch)
+    temp_file = info_file.with_name(f".{info_file.name}.tmp")
+    temp_file.write_text(json.dumps(asdict(info)), encoding="utf8")
+    temp_file.replace(info_file)
+
+
+def read_batch_info(batch: PathLike) -> BatchInfo:
+    """
+    Load the BatchInfo of a batch file
+
+    Raises:
+        GreenboneFeedSyncError: If the batch file or its info is missing or
+            invalid
+    """
+    info_file = batch_info_file(batch)
+    if not Path(batch).is_file():
+        raise GreenboneFeedSyncError(f"Batch file {batch} does not exist.")
+    try:
+        data: dict[str, Any] = json.loads(info_file.read_text(encoding="utf8"))
+        return BatchInfo(base=str(data["base"]), result=str(data["result"]))
+    except (OSError, ValueError, TypeError, KeyError):
+        raise GreenboneFeedSyncError(
+            f"Batch file {batch} has no valid info file {info_file}."
+        ) from None
+
+
+async def record_batch(
+    rsync: Rsync,
+    url: str,
+    destination: PathLike,
+    batch: PathLike,
+    *,
+    exclude: Iterable[str] = (),
+    **kwargs: Any,
+) -> BatchInfo:
+    """
+    Sync a reference destination and record the transfer into a batch file
+
+    The batch can be replayed onto all trees matching the state of the
+    reference destination before the sync without calculating the
+    differences again.
+
+    Args:
+        rsync: Rsync instance to use
+        url: URL to sync
+        destination: The reference destination
+        batch: The batch file to write
+        exclude: Names to ignore for the fingerprints
+        kwargs: Additional arguments for Rsync.sync
+    """
+    exclude = list(exclude)
+    Path(batch).parent.mkdir(parents=True, exist_ok=True)
+    base = await _fingerprint(destination, exclude)
+    await rsync.sync(url, destination, write_batch=batch, **kwargs)
+    info = BatchInfo(base=base, result=await _fingerprint(destination, exclude))
+    write_batch_info(batch, info)
+    return info
+
+
+async def replay_batch(
+    rsync: Rsync,
+    batch: PathLike,
+    destination: PathLike,
+    *,
+    exclude: Iterable[str] = (),
+    **kwargs: Any,
+) -> ReplayStatus:
+    """
+    Apply a batch file to a destination
+
+    The batch is only applied if the destination matches the base of the
+    batch. The result is verified afterwards.
+
+    Args:
+        rsync: Rsync instance to use
+        batch: The batch file to read
+        destination: The destination to update
+        exclude: Names to ignore for the fingerprints
+        kwargs: Additional arguments for Rsync.read_batch
+
+    Returns:
+        UP_TO_DATE if the destination already matches the result of the
+        batch, REPLAYED if the batch has been applied successfully and
+        MISMATCH if the destination has another version and needs a normal
+        sync.
+    """
+    exclude = list(exclude)
+    info = read_batch_info(batch)
+    fingerprint = await _fingerprint(destination, exclude)
+    if fingerprint == info.result:
+        return ReplayStatus.UP_TO_DATE
+    if fingerprint != info.base:
+        return ReplayStatus.MISMATCH
+
+    await rsync.read_batch(batch, destination, **kwargs)
+
+    if await _fingerprint(destination, exclude) != info.result:
+        return ReplayStatus.MISMATCH
+    return ReplayStatus.REPLAYED
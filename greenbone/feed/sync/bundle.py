@@ -0,0 +1,714 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import ctypes
+import errno
+import hashlib
+import io
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import tarfile
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from stat import S_ISREG
+from typing import IO, Any
+
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.fanout import rebase_path
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_INFO_NAME = "BUNDLE.json"
+BUNDLE_MANIFEST_NAME = "MANIFEST.jsonl"
+BUNDLE_DELETED_NAME = "DELETED.jsonl"
+BUNDLE_DATA_DIRECTORY = "data"
+DEFAULT_BUNDLE_COMPRESSION_LEVEL = 3
+STAGING_SUFFIX = ".import"
+
+# large blocks for sequential reading and writing
+_BUFFER_SIZE = 1024 * 1024
+
+# arguments of renameat2 for swapping two paths
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """
+    A file of a bundle
+
+    Args:
+        path: Path of the file relative to the destination prefix
+        size: Size of the file in bytes
+        mtime: Modification time of the file in seconds
+        sha256: SHA-256 checksum of the file content
+    """
+
+    path: str
+    size: int
+    mtime: int
+    sha256: str
+
+
+@dataclass(frozen=True)
+class StagedDestination:
+    """
+    A destination unpacked from a bundle and ready to be installed
+
+    Args:
+        destination: The destination to replace
+        staging: Directory containing the unpacked data
+    """
+
+    destination: Path
+    staging: Path
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    """
+    Content of a written bundle
+
+    Args:
+        manifest: The manifest of the bundle. It lists all files of the
+            destinations, also the unchanged ones of a delta bundle.
+        changed: Paths of the files added to the bundle
+        deleted: Paths of the files of the base deleted since then
+    """
+
+    manifest: list[ManifestEntry]
+    changed: list[str]
+    deleted: list[str]
+
+
+class _HashingReader:
+    def __init__(self, file: IO[bytes]) -> None:
+        self.file = file
+        self.hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.hash.update(data)
+        return data
+
+
+def _zstd(*args: str, **kwargs: Any) -> subprocess.Popen[bytes]:
+    try:
+        return subprocess.Popen(["zstd", "-q", *args], **kwargs)
+    except (PermissionError, FileNotFoundError):
+        raise GreenboneFeedSyncError(
+            "The zstd binary could not be found."
+        ) from None
+
+
+def _wait(process: subprocess.Popen[bytes], bundle: Path) -> None:
+    stderr = process.stderr.read() if process.stderr else b""
+    if process.wait():
+        raise GreenboneFeedSyncError(
+            f"zstd failed for {bundle}: "
+            f"{stderr.decode('utf8', errors='replace').strip()}"
+        )
+
+
+def _walk(path: Path, excluded: set[str]) -> Iterator[Path]:
+    for directory, dirs, files in os.walk(path):
+        dirs[:] = sorted(name for name in dirs if name not in excluded)
+        for name in [
+            *dirs,
+            *sorted(name for name in files if name not in excluded),
+        ]:
+            yield Path(directory, name)
+
+
+def _tree_files(
+    prefix: Path, relative: str, excluded: set[str]
+) -> Iterator[tuple[str, int, int]]:
+    for path in _walk(prefix / relative, excluded):
+        stat = path.lstat()
+        if S_ISREG(stat.st_mode):
+            yield (
+                path.relative_to(prefix).as_posix(),
+                stat.st_size,
+                int(stat.st_mtime),
+            )
+
+
+def _fingerprint(files: Iterable[tuple[str, int, int]]) -> str:
+    # like the quick check of rsync only the sizes and modification times
+    # of the files are compared
+    digest = hashlib.sha256()
+    for path, size, mtime in sorted(files):
+        digest.update(
+            f"{path} {size} {mtime}\n".encode("utf8", errors="surrogateescape")
+        )
+    return digest.hexdigest()
+
+
+def _in_destination(path: str, relative: str) -> bool:
+    return path.startswith(f"{relative}/")
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(
+    bundle: str | Path,
+    destinations: Iterable[str | Path],
+    *,
+    prefix: str | Path,
+    exclude: Iterable[str] = (),
+    compression_level: int = DEFAULT_BUNDLE_COMPRESSION_LEVEL,
+    base: Mapping[str, ManifestEntry] | None = None,
+) -> ExportResult:
+    """
+    Write destinations into a zstd compressed tar archive
+
+    The archive is written as a stream. Each file is read once for adding
+    it to the archive and for calculating its checksum. The manifest is
+    added as last member. The bundle is replaced only if it has been
+    written completely.
+
+    If the manifest of a base bundle is passed a delta bundle is written.
+    It only contains the files which have been added or changed since the
+    base and a list of the deleted files. Like the quick check of rsync,
+    files with the same size and modification time as in the base are
+    considered unchanged and are not read at all.
+
+    Args:
+        bundle: The file to write
+        destinations: Directories to add. They must be inside of the prefix.
+        prefix: The destination prefix. The paths in the bundle are relative
+            to the prefix.
+        exclude: Names of files and directories to skip on all levels
+        compression_level: zstd compression level
+        base: Manifest of the bundle to write a delta bundle against
+    """
+    bundle = Path(bundle)
+    prefix = Path(prefix)
+    excluded = {os.fspath(name).strip("/") for name in exclude}
+    relative_destinations = [
+        rebase_path(destination, prefix, "").as_posix()
+        for destination in destinations
+    ]
+    temp_file = bundle.with_name(f".{bundle.name}.tmp")
+    manifest: list[ManifestEntry] = []
+    changed: list[str] = []
+
+    header: dict[str, Any] = {
+        "version": BUNDLE_FORMAT_VERSION,
+        "destinations": relative_destinations,
+    }
+    if base is not None:
+        header["base"] = {
+            relative: _fingerprint(
+                (entry.path, entry.size, entry.mtime)
+                for entry in base.values()
+                if _in_destination(entry.path, relative)
+            )
+            for relative in relative_destinations
+        }
+
+    try:
+        with temp_file.open("wb") as output:
+            process = _zstd(
+                f"-{compression_level}",
+                "-T0",
+                "-c",
+                stdin=subprocess.PIPE,
+                stdout=output,
+                stderr=subprocess.PIPE,
+            )
+        with (
+            process,
+            tarfile.open(
+                fileobj=process.stdin,
+                mode="w|",
+                format=tarfile.PAX_FORMAT,
+                bufsize=_BUFFER_SIZE,
+            ) as tar,
+        ):
+            _add_bytes(tar, BUNDLE_INFO_NAME, json.dumps(header).encode())
+            for relative in relative_destinations:
+                for path in _walk(prefix / relative, excluded):
+                    name = path.relative_to(prefix).as_posix()
+                    info = tar.gettarinfo(
+                        path, f"{BUNDLE_DATA_DIRECTORY}/{name}"
+                    )
+                    info.uid = info.gid = 0
+                    info.uname = info.gname = ""
+                    if info.islnk():
+                        # store hardlinked files as regular files
+                        info.type = tarfile.REGTYPE
+                        info.linkname = ""
+                        info.size = path.stat().st_size
+                    if not info.isreg():
+                        tar.addfile(info)
+                        continue
+
+                    entry = base.get(name) if base else None
+                    if (
+                        entry
+                        and entry.size == info.size
+                        and entry.mtime == int(info.mtime)
+                    ):
+                        manifest.append(entry)
+                        continue
+
+                    with path.open("rb") as file:
+                        reader = _HashingReader(file)
+                        tar.addfile(info, reader)  # type: ignore[arg-type]
+                    manifest.append(
+                        ManifestEntry(
+                            path=name,
+                            size=info.size,
+                            mtime=int(info.mtime),
+                            sha256=reader.hash.hexdigest(),
+                        )
+                    )
+                    changed.append(name)
+
+            paths = {entry.path for entry in manifest}
+            deleted = sorted(
+                path
+                for path in (base or {})
+                if path not in paths
+                and any(
+                    _in_destination(path, relative)
+                    for relative in relative_destinations
+                )
+            )
+            if base is not None:
+                _add_bytes(
+                    tar,
+                    BUNDLE_DELETED_NAME,
+                    "".join(
+                        f"{json.dumps(path)}\n" for path in deleted
+                    ).encode(),
+                )
+            _add_bytes(
+                tar,
+                BUNDLE_MANIFEST_NAME,
+                "".join(
+                    f"{json.dumps(asdict(entry))}\n" for entry in manifest
+                ).encode(),
+            )
+            tar.close()
+            process.stdin.close()  # type: ignore[union-attr]
+            _wait(process, bundle)
+
+        temp_file.replace(bundle)
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+    return ExportResult(manifest=manifest, changed=changed, deleted=deleted)
+
+
+def read_bundle_manifest(bundle: str | Path) -> dict[str, ManifestEntry]:
+    """
+    Read the manifest of a bundle
+
+    The manifest is the last member. Therefore the whole bundle is
+    decompressed but nothing is written to disk.
+
+    Raises:
+        GreenboneFeedSyncError: If the bundle is invalid or has no manifest
+    """
+    bundle = Path(bundle)
+    if not bundle.is_file():
+        raise GreenboneFeedSyncError(f"Bundle {bundle} does not exist.")
+
+    manifest = None
+    process = _zstd(
+        "-d", "-c", str(bundle), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        with (
+            process,
+            tarfile.open(
+                fileobj=process.stdout, mode="r|", bufsize=_BUFFER_SIZE
+            ) as tar,
+        ):
+            for member in tar:
+                if member.name == BUNDLE_MANIFEST_NAME:
+                    manifest = _parse_manifest(
+                        tar.extractfile(member).read()  # type: ignore[union-attr]
+                    )
+            while process.stdout.read(_BUFFER_SIZE):  # type: ignore[union-attr]
+                pass
+            _wait(process, bundle)
+    except (tarfile.TarError, OSError) as e:
+        raise GreenboneFeedSyncError(f"Invalid bundle {bundle}. {e}") from e
+
+    if manifest is None:
+        raise GreenboneFeedSyncError(f"Bundle {bundle} has no manifest.")
+    return manifest
+
+
+def staging_directory(destination: str | Path) -> Path:
+    """
+    Get the directory for unpacking a destination before installing it
+    """
+    destination = Path(destination)
+    return destination.with_name(f".{destination.name}{STAGING_SUFFIX}")
+
+
+def _member_path(name: str) -> str:
+    path = posixpath.normpath(name)
+    if (
+        path.startswith(("/", "../"))
+        or path == ".."
+        or not path.startswith(f"{BUNDLE_DATA_DIRECTORY}/")
+    ):
+        raise GreenboneFeedSyncError(f"Invalid path {name} in bundle.")
+    return path[len(BUNDLE_DATA_DIRECTORY) + 1 :]
+
+
+def _check_link(member: tarfile.TarInfo, path: str) -> None:
+    # path is relative to the destination of the symlink
+    target = posixpath.normpath(
+        posixpath.join(posixpath.dirname(path), member.linkname)
+    )
+    if (
+        posixpath.isabs(member.linkname)
+        or target == ".."
+        or target.startswith("../")
+    ):
+        raise GreenboneFeedSyncError(
+            f"Symlink {member.name} in bundle points outside of its "
+            "destination."
+        )
+
+
+def _real_target(
+    member: tarfile.TarInfo, staging: Path, relative_path: str
+) -> Path:
+    # symlinks unpacked before may lead outside of the staging directory
+    root = staging.resolve()
+    target = root / relative_path
+    if target == root:
+        return root
+    parent = target.parent.resolve()
+    target = parent / target.name
+    if not parent.is_relative_to(root) or target.is_symlink():
+        raise GreenboneFeedSyncError(
+            f"{member.name} in bundle points outside of its destination."
+        )
+    link = (parent / member.linkname).resolve() if member.issym() else root
+    if not link.is_relative_to(root):
+        raise GreenboneFeedSyncError(
+            f"Symlink {member.name} in bundle points outside of its "
+            "destination."
+        )
+    return target
+
+
+def _parse_manifest(data: bytes) -> dict[str, ManifestEntry]:
+    try:
+        entries = [
+            ManifestEntry(**json.loads(line))
+            for line in data.decode("utf8").splitlines()
+            if line
+        ]
+    except (ValueError, TypeError):
+        raise GreenboneFeedSyncError("Invalid manifest in bundle.") from None
+    return {entry.path: entry for entry in entries}
+
+
+def discard_staged(staged: Iterable[StagedDestination]) -> None:
+    """
+    Remove unpacked but not installed data
+    """
+    for staged_destination in staged:
+        shutil.rmtree(staged_destination.staging, ignore_errors=True)
+
+
+def _link_unchanged(
+    staged_destination: StagedDestination, relative: str, entry: ManifestEntry
+) -> None:
+    # files of a delta bundle not contained in it are taken from the current
+    # destination. Hardlinks keep the current destination intact.
+    path = posixpath.relpath(entry.path, relative)
+    source = staged_destination.destination / path
+    try:
+        stat = source.lstat()
+    except FileNotFoundError:
+        stat = None
+    if (
+        stat is None
+        or not S_ISREG(stat.st_mode)
+        or stat.st_size != entry.size
+        or int(stat.st_mtime) != entry.mtime
+    ):
+        raise GreenboneFeedSyncError(
+            f"{entry.path} has been changed while importing the delta bundle."
+        )
+    target = staged_destination.staging / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.link(source, target)
+
+
+def unpack_bundle(
+    bundle: str | Path,
+    *,
+    prefix: str | Path,
+    destinations: Iterable[str | Path] | None = None,
+    exclude: Iterable[str] = (),
+) -> list[StagedDestination]:
+    """
+    Unpack a bundle into staging directories next to its destinations
+
+    The bundle is decompressed and unpacked in a single streaming pass.
+    Afterwards all files are verified against the manifest of the bundle.
+
+    For a delta bundle the destinations must match the base version of the
+    bundle. The unchanged files are hardlinked from the destinations into
+    the staging directories.
+
+    Args:
+        bundle: The bundle to unpack
+        prefix: The destination prefix to unpack the bundle into
+        destinations: If set only these destinations may be contained in the
+            bundle
+        exclude: Names of files and directories of the destinations not
+            belonging to the feed data
+
+    Raises:
+        GreenboneFeedSyncError: If the bundle is invalid or doesn't match its
+            manifest or a delta bundle doesn't match the destinations.
+            Already unpacked data is removed.
+    """
+    bundle = Path(bundle)
+    prefix = Path(prefix)
+    excluded = {os.fspath(name).strip("/") for name in exclude}
+    allowed = (
+        None
+        if destinations is None
+        else {Path(destination) for destination in destinations}
+    )
+    if not bundle.is_file():
+        raise GreenboneFeedSyncError(f"Bundle {bundle} does not exist.")
+
+    staged: dict[str, StagedDestination] = {}
+    files: dict[str, ManifestEntry] = {}
+    manifest: dict[str, ManifestEntry] | None = None
+    is_delta = False
+
+    def staging_path(path: str) -> tuple[Path, str]:
+        # returns the staging directory and the path relative to it
+        for relative in sorted(staged, key=len, reverse=True):
+            if path == relative or path.startswith(f"{relative}/"):
+                return staged[relative].staging, posixpath.relpath(
+                    path, relative
+                )
+        raise GreenboneFeedSyncError(
+            f"{path} in bundle is not part of a destination."
+        )
+
+    process = _zstd(
+        "-d", "-c", str(bundle), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        with (
+            process,
+            tarfile.open(
+                fileobj=process.stdout, mode="r|", bufsize=_BUFFER_SIZE
+            ) as tar,
+        ):
+            for member in tar:
+                if member.name == BUNDLE_INFO_NAME:
+                    info = json.load(tar.extractfile(member))  # type: ignore[arg-type]
+                    if info.get("version") != BUNDLE_FORMAT_VERSION:
+                        raise GreenboneFeedSyncError(
+                            f"Unsupported bundle version {info.get('version')}."
+                        )
+                    base = info.get("base")
+                    is_delta = base is not None
+                    for relative in info["destinations"]:
+                        destination = prefix / _member_path(
+                            f"{BUNDLE_DATA_DIRECTORY}/{relative}"
+                        )
+                        if allowed is not None and destination not in allowed:
+                            raise GreenboneFeedSyncError(
+                                f"Bundle {bundle} contains {relative} which is "
+                                "not a destination of the selected feeds."
+                            )
+                        if is_delta and base.get(relative) != _fingerprint(
+                            _tree_files(prefix, relative, excluded)
+                        ):
+                            raise GreenboneFeedSyncError(
+                                f"{destination} doesn't match the base version "
+                                f"of the delta bundle {bundle}. A full bundle "
+                                "needs to be imported."
+                            )
+                        staging = staging_directory(destination)
+                        shutil.rmtree(staging, ignore_errors=True)
+                        staging.mkdir(parents=True)
+                        staged[relative] = StagedDestination(
+                            destination, staging
+                        )
+                    continue
+
+                if member.name == BUNDLE_MANIFEST_NAME:
+                    manifest = _parse_manifest(
+                        tar.extractfile(member).read()  # type: ignore[union-attr]
+                    )
+                    continue
+
+                if member.name == BUNDLE_DELETED_NAME:
+                    # the deleted files are just not linked into the staging
+                    # directories
+                    continue
+
+                path = _member_path(member.name)
+                staging, relative_path = staging_path(path)
+                target = _real_target(member, staging, relative_path)
+                if member.isdir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    target.chmod(member.mode & 0o777)
+                elif member.issym():
+                    _check_link(member, relative_path)
+                    target.symlink_to(member.linkname)
+                elif member.isreg():
+                    source = tar.extractfile(member)
+                    reader = _HashingReader(source)  # type: ignore[arg-type]
+                    with target.open("wb") as file:
+                        shutil.copyfileobj(reader, file, _BUFFER_SIZE)  # type: ignore[misc]
+                    target.chmod(member.mode & 0o777)
+                    os.utime(target, (member.mtime, member.mtime))
+                    files[path] = ManifestEntry(
+                        path=path,
+                        size=member.size,
+                        mtime=int(member.mtime),
+                        sha256=reader.hash.hexdigest(),
+                    )
+                else:
+                    raise GreenboneFeedSyncError(
+                        f"Unsupported file type of {path} in bundle."
+                    )
+
+            # read the padding after the end of the archive
+            while process.stdout.read(_BUFFER_SIZE):  # type: ignore[union-attr]
+                pass
+            _wait(process, bundle)
+
+        if manifest is None:
+            raise GreenboneFeedSyncError(f"Bundle {bundle} has no manifest.")
+
+        expected = (
+            {path: manifest[path] for path in files if path in manifest}
+            if is_delta
+            else manifest
+        )
+        if files != expected:
+            mismatches = sorted(
+                set(files.keys() ^ expected.keys())
+                | {path for path in files if files[path] != expected.get(path)}
+            )
+            raise GreenboneFeedSyncError(
+                f"Bundle {bundle} doesn't match its manifest: "
+                f"{', '.join(mismatches[:10])}"
+            )
+
+        if is_delta:
+            for entry in manifest.values():
+                if entry.path in files:
+                    continue
+                relative = next(
+                    (
+                        relative
+                        for relative in staged
+                        if _in_destination(entry.path, relative)
+                    ),
+                    None,
+                )
+                if relative is None:
+                    raise GreenboneFeedSyncError(
+                        f"{entry.path} in bundle is not part of a destination."
+                    )
+                _link_unchanged(staged[relative], relative, entry)
+    except (tarfile.TarError, OSError, KeyError, ValueError) as e:
+        discard_staged(staged.values())
+        raise GreenboneFeedSyncError(f"Invalid bundle {bundle}. {e}") from e
+    except BaseException:
+        discard_staged(staged.values())
+        raise
+
+    return list(staged.values())
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    # renameat2 is only available on Linux and not supported by all file
+    # systems. Returns False if the paths couldn't be swapped.
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), "renameat2", None)
+    if renameat2 is None:
+        return False
+    if not renameat2(
+        _AT_FDCWD,
+        os.fsencode(first),
+        _AT_FDCWD,
+        os.fsencode(second),
+        _RENAME_EXCHANGE,
+    ):
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL):
+        return False
+    raise OSError(error, os.strerror(error), str(first), None, str(second))
+
+
+def _remove(path: Path) -> None:
+    # the destination may be a directory or a symlink, for example to a
+    # snapshot
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def install_staged(
+    staged: Iterable[StagedDestination], *, keep: Iterable[str] = ()
+) -> None:
+    """
+    Replace the destinations with the unpacked data
+
+    Where supported each destination is swapped with its unpacked data
+    atomically. Otherwise it is moved aside before the unpacked data is
+    moved into its place. In between the destination doesn't exist and only
+    consumers holding the feed lock are guaranteed to see either the old or
+    the new data. Directories not contained in a bundle, like the private
+    directory, are moved over from the old destination.
+
+    Args:
+        staged: The unpacked destinations
+        keep: Names of directories to keep from the old destinations
+    """
+    for staged_destination in staged:
+        destination = staged_destination.destination
+        staging = staged_destination.staging
+        for name in keep:
+            if (destination / name).is_dir() and not (staging / name).exists():
+                (destination / name).rename(staging / name)
+
+        if not destination.is_symlink() and not destination.exists():
+            staging.rename(destination)
+        elif _exchange(staging, destination):
+            # the staging directory contains the old destination now
+            _remove(staging)
+        else:
+            old = destination.with_name(f".{destination.name}.old")
+            _remove(old)
+            destination.rename(old)
+            staging.rename(destination)
+            _remove(old)
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from greenbone.feed.sync.progress import FileTransfer, RsyncEvent
+
+CHANGES_FILE_NAME = "last-changes.jsonl"
+
+ADDED = "added"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+@dataclass
+class ChangeSet:
+    """
+    Paths changed by a sync
+
+    All paths are relative to the destination of the sync. Changed
+    directories are not listed except for deleted ones.
+    """
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.deleted)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        for path in self.added:
+            yield ADDED, path
+        for path in self.updated:
+            yield UPDATED, path
+        for path in self.deleted:
+            yield DELETED, path
+
+    def add(self, event: RsyncEvent) -> None:
+        """
+        Add a file event of rsync to the change set
+
+        Can be subscribed to a RsyncProgress directly.
+        """
+        if not isinstance(event, FileTransfer):
+            return
+
+        if event.is_deleted:
+            self.deleted.append(event.path)
+        elif event.is_directory:
+            return
+        elif event.is_new:
+            self.added.append(event.path)
+        else:
+            self.updated.append(event.path)
+
+    def extend(self, other: "ChangeSet") -> None:
+        """
+        Add the changes of another change set
+        """
+        self.added.extend(other.added)
+        self.updated.extend(other.updated)
+        self.deleted.extend(other.deleted)
+
+    def write(self, path: Path) -> None:
+        """
+        Write the change set as JSON lines to a file
+
+        Each line contains an object with a change and a path key. The file
+        is replaced atomically.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with temp_path.open("w", encoding="utf8") as f:
+            for change, changed_path in self:
+                f.write(json.dumps({"change": change, "path": changed_path}))
+                f.write("\n")
+        temp_path.replace(path)
+
+    @classmethod
+    def read(cls, path: Path) -> "ChangeSet":
+        """
+        Read a change set from a JSON lines file
+        """
+        change_set = cls()
+        changes = {
+            ADDED: change_set.added,
+            UPDATED: change_set.updated,
+            DELETED: change_set.deleted,
+        }
+        with path.open("r", encoding="utf8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                changes[item["change"]].append(item["path"])
+        return change_set
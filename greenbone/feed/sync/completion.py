@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import os
+import shlex
+from datetime import datetime, timezone
+from pathlib import Path
+
+from greenbone.feed.sync.errors import CompletionHookError
+from greenbone.feed.sync.helper import feed_state_directory
+
+FEED_LOCK_FILE_NAME = "feed.lock"
+COMPLETION_MARKER_FILE_NAME = "completed"
+
+
+def feed_lock_file(destination: str | Path) -> Path:
+    """
+    Get the lock file of a single feed
+
+    The lock file is held while the data of the feed is changed.
+    """
+    return feed_state_directory(destination) / FEED_LOCK_FILE_NAME
+
+
+def completion_marker_file(destination: str | Path) -> Path:
+    """
+    Get the file marking the last successful sync of a feed
+    """
+    return feed_state_directory(destination) / COMPLETION_MARKER_FILE_NAME
+
+
+def write_completion_marker(
+    destination: str | Path, time: datetime | None = None
+) -> None:
+    """
+    Write the time of the completed sync of a feed as ISO 8601 timestamp
+
+    The file is replaced atomically. Therefore consumers can watch it for
+    changes to start processing the feed data.
+    """
+    time = time or datetime.now(timezone.utc)
+    path = completion_marker_file(destination)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(f"{time.isoformat()}\n", encoding="utf8")
+    temp_path.replace(path)
+
+
+async def run_completion_hook(
+    hook: str, name: str, destination: str | Path
+) -> None:
+    """
+    Run a command after the sync of a feed has completed
+
+    The command gets the destination of the feed as argument. Additionally
+    the name and destination of the feed are passed via the
+    GREENBONE_FEED_SYNC_FEED_NAME and GREENBONE_FEED_SYNC_FEED_DESTINATION
+    environment variables.
+
+    Raises:
+        CompletionHookError: If the command fails
+    """
+    cmd = [*shlex.split(hook), os.fspath(destination)]
+    env = {
+        **os.environ,
+        "GREENBONE_FEED_SYNC_FEED_NAME": name,
+        "GREENBONE_FEED_SYNC_FEED_DESTINATION": os.fspath(destination),
+    }
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
+        raise CompletionHookError(127, cmd, stderr=str(e).encode("utf8")) from e
+
+    stdout, stderr = await process.communicate()
+    if process.returncode:
+        raise CompletionHookError(
+            process.returncode, cmd, stdout=stdout, stderr=stderr
+        )
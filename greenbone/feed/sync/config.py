@@ -15,8 +15,26 @@ from typing import (
 )
 from urllib.parse import urlsplit
 
+from greenbone.feed.sync.daemon import (
+    DEFAULT_DAEMON_INTERVAL,
+    DEFAULT_DAEMON_JITTER,
+    parse_interval,
+    parse_jitter,
+)
 from greenbone.feed.sync.errors import ConfigError, ConfigFileError
 from greenbone.feed.sync.helper import DEFAULT_FLOCK_WAIT_INTERVAL
+from greenbone.feed.sync.leader import (
+    DEFAULT_LEADER_PORT,
+    DEFAULT_SERVE_ADDRESS,
+    leader_module_url,
+    leader_url,
+)
+from greenbone.feed.sync.mirror import DEFAULT_MIRROR_CACHE_TTL
+from greenbone.feed.sync.push import (
+    DEFAULT_PUSH_CONCURRENCY,
+    DEFAULT_PUSH_RETRIES,
+)
+from greenbone.feed.sync.retry import DEFAULT_RETRIES
 from greenbone.feed.sync.rsync import (
     DEFAULT_RSYNC_COMPRESSION_LEVEL,
     DEFAULT_RSYNC_URL,
@@ -40,6 +58,29 @@ def maybe_int(value: str | None) -> int | str | None:
     return value
 
 
+def url_list(value: str | Iterable[str]) -> list[str]:
+    """
+    Convert a comma or whitespace separated string into a list of URLs
+    """
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    return [str(url) for url in value]
+
+
+def host_list(value: str | Iterable[str]) -> list[str]:
+    """
+    Convert a comma or whitespace separated string into a list of hosts
+    """
+    return url_list(value)
+
+
+def path_list(value: str | Iterable[str]) -> list[Path]:
+    """
+    Convert a comma or whitespace separated string into a list of paths
+    """
+    return [Path(path) for path in url_list(value)]
+
+
 DEFAULT_FEED_RELEASE = "25.0"
 
 DEFAULT_DESTINATION_PREFIX = "/var/lib/"
@@ -62,6 +103,9 @@ DEFAULT_USER = "gvm"
 
 DEFAULT_VERBOSITY = 2
 
+DEFAULT_PARALLEL_SYNCS = 1
+DEFAULT_NASL_SHARDS = 1
+
 T = TypeVar("T")
 ValuesDict = dict[str, Any]
 DefaultValueCallable = Callable[[ValuesDict], Any]
@@ -84,6 +128,18 @@ def resolve_gvmd_data_destination(values: ValuesDict) -> str:
     )
 
 
+def _feed_data_url(module: str, path: str) -> DefaultValueCallable:
+    # the data is downloaded from the module of the leader if set and from
+    # the path relative to the feed url otherwise
+    def resolve(values: ValuesDict) -> str:
+        if values.get("leader-url"):
+            return leader_module_url(values["leader-url"], module)
+        release = values["feed-release"]
+        return f"{values['feed-url']}/{path.format(release=release)}/"
+
+    return resolve
+
+
 @dataclass
 class Setting(Generic[T]):
     config_key: str
@@ -151,7 +207,40 @@ _SETTINGS = (
         DEFAULT_DESTINATION_PREFIX,
         Path,
     ),
+    Setting("leader-url", "GREENBONE_FEED_SYNC_LEADER_URL", None, leader_url),
+    Setting("serve", "GREENBONE_FEED_SYNC_SERVE", False, bool),
+    Setting(
+        "serve-address",
+        "GREENBONE_FEED_SYNC_SERVE_ADDRESS",
+        DEFAULT_SERVE_ADDRESS,
+        str,
+    ),
+    Setting(
+        "serve-port",
+        "GREENBONE_FEED_SYNC_SERVE_PORT",
+        DEFAULT_LEADER_PORT,
+        int,
+    ),
+    Setting(
+        "serve-hosts-allow",
+        "GREENBONE_FEED_SYNC_SERVE_HOSTS_ALLOW",
+        None,
+        host_list,
+    ),
+    Setting(
+        "fan-out-prefixes",
+        "GREENBONE_FEED_SYNC_FAN_OUT_PREFIXES",
+        None,
+        path_list,
+    ),
     Setting("feed-url", "GREENBONE_FEED_SYNC_URL", DEFAULT_RSYNC_URL, str),
+    Setting("feed-mirrors", "GREENBONE_FEED_SYNC_MIRRORS", None, url_list),
+    Setting(
+        "mirror-cache-ttl",
+        "GREENBONE_FEED_SYNC_MIRROR_CACHE_TTL",
+        DEFAULT_MIRROR_CACHE_TTL,
+        int,
+    ),
     Setting(
         "wait-interval",
         "GREENBONE_FEED_SYNC_LOCK_WAIT_INTERVAL",
@@ -159,6 +248,8 @@ _SETTINGS = (
         int,
     ),
     Setting("no-wait", "GREENBONE_FEED_SYNC_NO_WAIT", False, bool),
+    Setting("blocking-lock", "GREENBONE_FEED_SYNC_BLOCKING_LOCK", False, bool),
+    Setting("lock-timeout", "GREENBONE_FEED_SYNC_LOCK_TIMEOUT", None, int),
     Setting(
         "no-permission-change",
         "GREENBONE_FEED_SYNC_NO_PERMISSION_CHANGE",
@@ -177,6 +268,65 @@ _SETTINGS = (
     Setting("verbose", "GREENBONE_FEED_SYNC_VERBOSE", None, int),
     Setting("fail-fast", "GREENBONE_FEED_SYNC_FAIL_FAST", False, bool),
     Setting("rsync-timeout", "GREENBONE_FEED_SYNC_RSYNC_TIMEOUT", None, int),
+    Setting("retries", "GREENBONE_FEED_SYNC_RETRIES", DEFAULT_RETRIES, int),
+    Setting("retry-deadline", "GREENBONE_FEED_SYNC_RETRY_DEADLINE", None, int),
+    Setting("pre-check", "GREENBONE_FEED_SYNC_PRE_CHECK", False, bool),
+    Setting(
+        "record-changes", "GREENBONE_FEED_SYNC_RECORD_CHANGES", False, bool
+    ),
+    Setting(
+        "parallel",
+        "GREENBONE_FEED_SYNC_PARALLEL",
+        DEFAULT_PARALLEL_SYNCS,
+        int,
+    ),
+    Setting("snapshots", "GREENBONE_FEED_SYNC_SNAPSHOTS", 0, int),
+    Setting("staged", "GREENBONE_FEED_SYNC_STAGED", False, bool),
+    Setting("feed-locks", "GREENBONE_FEED_SYNC_FEED_LOCKS", False, bool),
+    Setting(
+        "completion-hook", "GREENBONE_FEED_SYNC_COMPLETION_HOOK", None, str
+    ),
+    Setting(
+        "nasl-shards",
+        "GREENBONE_FEED_SYNC_NASL_SHARDS",
+        DEFAULT_NASL_SHARDS,
+        int,
+    ),
+    Setting("write-batch", "GREENBONE_FEED_SYNC_WRITE_BATCH", None, Path),
+    Setting("read-batch", "GREENBONE_FEED_SYNC_READ_BATCH", None, Path),
+    Setting("verify", "GREENBONE_FEED_SYNC_VERIFY", False, bool),
+    Setting("verify-workers", "GREENBONE_FEED_SYNC_VERIFY_WORKERS", None, int),
+    Setting("tree-manifest", "GREENBONE_FEED_SYNC_TREE_MANIFEST", False, bool),
+    Setting("incremental", "GREENBONE_FEED_SYNC_INCREMENTAL", False, bool),
+    Setting("merkle-digest", "GREENBONE_FEED_SYNC_MERKLE_DIGEST", False, bool),
+    Setting("push", "GREENBONE_FEED_SYNC_PUSH", None, Path),
+    Setting(
+        "push-concurrency",
+        "GREENBONE_FEED_SYNC_PUSH_CONCURRENCY",
+        DEFAULT_PUSH_CONCURRENCY,
+        int,
+    ),
+    Setting(
+        "push-retries",
+        "GREENBONE_FEED_SYNC_PUSH_RETRIES",
+        DEFAULT_PUSH_RETRIES,
+        int,
+    ),
+    Setting(
+        "daemon-interval",
+        "GREENBONE_FEED_SYNC_DAEMON_INTERVAL",
+        DEFAULT_DAEMON_INTERVAL,
+        parse_interval,
+    ),
+    Setting(
+        "daemon-jitter",
+        "GREENBONE_FEED_SYNC_DAEMON_JITTER",
+        DEFAULT_DAEMON_JITTER,
+        parse_jitter,
+    ),
+    Setting(
+        "daemon-schedule", "GREENBONE_FEED_SYNC_DAEMON_SCHEDULE", None, str
+    ),
     Setting("group", "GREENBONE_FEED_SYNC_GROUP", DEFAULT_GROUP, maybe_int),
     Setting("user", "GREENBONE_FEED_SYNC_USER", DEFAULT_USER, maybe_int),
     Setting(
@@ -204,9 +354,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "gvmd-data-url",
         "GREENBONE_FEED_SYNC_GVMD_DATA_URL",
-        lambda values: (
-            f"{values['feed-url']}/data-feed/{values['feed-release']}/"
-        ),
+        _feed_data_url("gvmd-data", "data-feed/{release}"),
         str,
     ),
     DependentSetting(
@@ -218,9 +366,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "notus-url",
         "GREENBONE_FEED_SYNC_NOTUS_URL",
-        lambda values: (
-            f"{values['feed-url']}/vulnerability-feed/{values['feed-release']}/vt-data/notus/"
-        ),
+        _feed_data_url("notus", "vulnerability-feed/{release}/vt-data/notus"),
         str,
     ),
     DependentSetting(
@@ -232,9 +378,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "nasl-url",
         "GREENBONE_FEED_SYNC_NASL_URL",
-        lambda values: (
-            f"{values['feed-url']}/vulnerability-feed/{values['feed-release']}/vt-data/nasl/"
-        ),
+        _feed_data_url("nasl", "vulnerability-feed/{release}/vt-data/nasl"),
         str,
     ),
     DependentSetting(
@@ -248,9 +392,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "scap-data-url",
         "GREENBONE_FEED_SYNC_SCAP_DATA_URL",
-        lambda values: (
-            f"{values['feed-url']}/vulnerability-feed/{values['feed-release']}/scap-data/"
-        ),
+        _feed_data_url("scap-data", "vulnerability-feed/{release}/scap-data"),
         str,
     ),
     DependentSetting(
@@ -264,9 +406,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "cert-data-url",
         "GREENBONE_FEED_SYNC_CERT_DATA_URL",
-        lambda values: (
-            f"{values['feed-url']}/vulnerability-feed/{values['feed-release']}/cert-data/"
-        ),
+        _feed_data_url("cert-data", "vulnerability-feed/{release}/cert-data"),
         str,
     ),
     DependentSetting(
@@ -278,9 +418,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "report-formats-url",
         "GREENBONE_FEED_SYNC_REPORT_FORMATS_URL",
-        lambda values: (
-            f"{values['feed-url']}/data-feed/{values['feed-release']}/report-formats/"
-        ),
+        _feed_data_url("report-formats", "data-feed/{release}/report-formats"),
         str,
     ),
     DependentSetting(
@@ -292,9 +430,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "scan-configs-url",
         "GREENBONE_FEED_SYNC_SCAN_CONFIGS_URL",
-        lambda values: (
-            f"{values['feed-url']}/data-feed/{values['feed-release']}/scan-configs/"
-        ),
+        _feed_data_url("scan-configs", "data-feed/{release}/scan-configs"),
         str,
     ),
     DependentSetting(
@@ -306,9 +442,7 @@ _DEPENDENT_SETTINGS = (
     DependentSetting(
         "port-lists-url",
         "GREENBONE_FEED_SYNC_PORT_LISTS_URL",
-        lambda values: (
-            f"{values['feed-url']}/data-feed/{values['feed-release']}/port-lists/"
-        ),
+        _feed_data_url("port-lists", "data-feed/{release}/port-lists"),
         str,
     ),
     DependentSetting(
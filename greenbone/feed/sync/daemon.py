@@ -0,0 +1,275 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import random
+import signal
+from argparse import Namespace
+from collections.abc import Awaitable, Callable
+
+from rich.console import Console
+
+from greenbone.feed.sync.errors import ConfigError, GreenboneFeedSyncError
+
+DEFAULT_DAEMON_INTERVAL = 24 * 60 * 60  # in seconds
+DEFAULT_DAEMON_JITTER = 60 * 60  # in seconds
+
+_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 24 * 60 * 60,
+}
+
+LoadArguments = Callable[[], Namespace]
+ScheduledSync = Callable[[Namespace, str], Awaitable[int]]
+
+
+def _parse_seconds(value: str | int) -> int:
+    if isinstance(value, int):
+        seconds = value
+    else:
+        value = value.strip()
+        unit = _UNITS.get(value[-1:].lower(), None)
+        number = value[:-1] if unit else value
+        try:
+            seconds = int(number) * (unit or 1)
+        except ValueError:
+            raise ConfigError(f"Invalid interval '{value}'.") from None
+
+    if seconds < 0:
+        raise ConfigError(f"Interval '{value}' must not be negative.")
+    return seconds
+
+
+def parse_interval(value: str | int) -> int:
+    """
+    Convert an interval like 30, 30s, 15m, 6h or 1d into seconds
+    """
+    seconds = _parse_seconds(value)
+    if seconds == 0:
+        raise ConfigError(f"Interval '{value}' must be greater than zero.")
+    return seconds
+
+
+def parse_jitter(value: str | int) -> int:
+    """
+    Convert a jitter like 0, 30s or 1h into seconds
+    """
+    return _parse_seconds(value)
+
+
+def parse_schedule(value: str) -> dict[str, int]:
+    """
+    Convert a schedule like ``nvt=6h,scap=1d`` into a dict of feed types and
+    intervals in seconds
+    """
+    schedule = {}
+    for item in value.split(","):
+        entry = item.strip()
+        if not entry:
+            continue
+
+        feed_type, sep, interval = entry.partition("=")
+        if not sep or not feed_type.strip():
+            raise ConfigError(
+                f"Invalid schedule entry '{entry}'. Expected <type>=<interval>."
+            )
+        schedule[feed_type.strip()] = parse_interval(interval)
+    return schedule
+
+
+class Daemon:
+    """
+    Run the feed sync repeatedly in a long-running process
+
+    Each feed type is synced at its interval plus a random jitter. The first
+    sync is started after a random jitter too. Therefore many hosts started
+    at the same time don't contact the feed server at the same time.
+
+    SIGHUP reloads the arguments and config after the currently running sync
+    has finished. SIGTERM and SIGINT cancel a running sync and stop the
+    daemon. Errors of a sync are reported and the daemon keeps running.
+
+    Args:
+        load_arguments: Callable to load the arguments and config. Called
+            initially and on reload.
+        run_sync: Callable to run the sync of a feed type with the current
+            arguments. Returns an exit code.
+        console: Console for status messages
+        error_console: Console for error messages
+        args: Initial arguments. If not set load_arguments is called.
+    """
+
+    def __init__(
+        self,
+        load_arguments: LoadArguments,
+        run_sync: ScheduledSync,
+        *,
+        console: Console,
+        error_console: Console,
+        args: Namespace | None = None,
+    ) -> None:
+        self._load_arguments = load_arguments
+        self._run_sync = run_sync
+        self._console = console
+        self._error_console = error_console
+        self._stop_event = asyncio.Event()
+        self._reload_event = asyncio.Event()
+        self.args = args or load_arguments()
+
+    def stop(self) -> None:
+        """
+        Stop the daemon and cancel a running sync
+        """
+        self._stop_event.set()
+
+    def reload(self) -> None:
+        """
+        Reload the arguments after the running sync has finished
+        """
+        self._reload_event.set()
+
+    def schedule(self) -> dict[str, int]:
+        """
+        Get the feed types to sync and their intervals in seconds
+        """
+        return self.args.daemon_schedule or {
+            self.args.type: self.args.daemon_interval
+        }
+
+    def _jitter(self) -> float:
+        return random.uniform(0, max(self.args.daemon_jitter, 0))
+
+    def _print(self, message: str) -> None:
+        if not self.args.quiet:
+            self._console.print(message)
+
+    async def _wait(
+        self, *aws: Awaitable[object], timeout: float | None
+    ) -> None:
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        try:
+            await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _next_run(self, feed_type: str, delay: float) -> float:
+        self._print(
+            f"Next sync of feed type {feed_type} in {delay:.0f} seconds."
+        )
+        return asyncio.get_running_loop().time() + delay
+
+    def _do_reload(self, next_runs: dict[str, float]) -> dict[str, float]:
+        self._reload_event.clear()
+        try:
+            self.args = self._load_arguments()
+        except GreenboneFeedSyncError as e:
+            self._error_console.print(
+                f"Error: {e} Keeping the previous configuration."
+            )
+            return next_runs
+
+        self._print("Configuration reloaded.")
+        return {
+            feed_type: (
+                next_runs[feed_type]
+                if feed_type in next_runs
+                else self._next_run(feed_type, self._jitter())
+            )
+            for feed_type in self.schedule()
+        }
+
+    async def _sync(self, feed_type: str) -> bool:
+        """
+        Run a sync. Returns False if the daemon got stopped meanwhile.
+        """
+        task: asyncio.Future[int] = asyncio.ensure_future(
+            self._run_sync(self.args, feed_type)
+        )
+        await self._wait(task, self._stop_event.wait(), timeout=None)
+        if task.cancelled():
+            return False
+
+        error = task.exception()
+        if error is None:
+            if task.result():
+                self._error_console.print(
+                    f"Sync of feed type {feed_type} failed."
+                )
+        elif isinstance(error, GreenboneFeedSyncError):
+            self._error_console.print(f"Error: {error}")
+        elif isinstance(error, Exception):
+            # keep the daemon running for the next syncs
+            self._error_console.print(
+                f"Unexpected error during sync of feed type {feed_type}: "
+                f"{error!r}"
+            )
+        else:
+            raise error
+        return True
+
+    def _add_signal_handlers(self) -> list[signal.Signals]:
+        loop = asyncio.get_running_loop()
+        handlers = {
+            signal.SIGHUP: self.reload,
+            signal.SIGTERM: self.stop,
+            signal.SIGINT: self.stop,
+        }
+        installed: list[signal.Signals] = []
+        for signum, handler in handlers.items():
+            try:
+                loop.add_signal_handler(signum, handler)
+                installed.append(signum)
+            except (NotImplementedError, RuntimeError):
+                # not supported on this platform or not in the main thread
+                pass
+        return installed
+
+    async def run(self) -> int:
+        """
+        Run the scheduled syncs until the daemon gets stopped
+        """
+        loop = asyncio.get_running_loop()
+        signals = self._add_signal_handlers()
+        try:
+            next_runs = {
+                feed_type: self._next_run(feed_type, self._jitter())
+                for feed_type in self.schedule()
+            }
+            while not self._stop_event.is_set():
+                if self._reload_event.is_set():
+                    next_runs = self._do_reload(next_runs)
+                    continue
+
+                feed_type, next_run = min(
+                    next_runs.items(), key=lambda item: item[1]
+                )
+                delay = next_run - loop.time()
+                if delay > 0:
+                    await self._wait(
+                        self._stop_event.wait(),
+                        self._reload_event.wait(),
+                        timeout=delay,
+                    )
+                    continue
+
+                if not await self._sync(feed_type):
+                    break
+
+                next_runs[feed_type] = self._next_run(
+                    feed_type, self.schedule()[feed_type] + self._jitter()
+                )
+        finally:
+            for signum in signals:
+                loop.remove_signal_handler(signum)
+
+        self._print("Stopped.")
+        return 0
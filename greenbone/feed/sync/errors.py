@@ -82,3 +82,15 @@ class FileLockingError(GreenboneFeedSyncError):
     """
     An error during locking a file
     """
+
+
+class FileLockedError(FileLockingError):
+    """
+    The file is already locked by another process
+    """
+
+
+class CompletionHookError(ExecProcessError):
+    """
+    Error while running the completion hook of a feed
+    """
@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+from pathlib import Path
+
+from greenbone.feed.sync.errors import ConfigError
+
+
+def rebase_path(
+    path: str | Path, prefix: str | Path, new_prefix: str | Path
+) -> Path:
+    """
+    Move a path inside of the destination prefix into another prefix
+
+    Raises:
+        ConfigError: If the path is not inside of the destination prefix
+    """
+    try:
+        relative = Path(path).relative_to(prefix)
+    except ValueError:
+        raise ConfigError(
+            f"{path} is not inside of the destination prefix {prefix} and "
+            "can't be copied to other destination prefixes."
+        ) from None
+    return Path(new_prefix) / relative
+
+
+def _existing(path: Path) -> Path:
+    path = path.absolute()
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def same_filesystem(path: str | Path, other: str | Path) -> bool:
+    """
+    Check if two paths are on the same filesystem and files can be hardlinked
+    between them
+
+    Not existing paths are checked via their nearest existing parent
+    directory.
+    """
+    return (
+        _existing(Path(path)).stat().st_dev
+        == _existing(Path(other)).stat().st_dev
+    )
@@ -8,6 +8,7 @@ import errno
 import fcntl
 import os
 import shutil
+import threading
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -17,10 +18,16 @@ from rich.console import Console
 from rich.live import Live
 from rich.spinner import Spinner as RichSpinner
 
-from greenbone.feed.sync.errors import FileLockingError, GreenboneFeedSyncError
+from greenbone.feed.sync.errors import (
+    FileLockedError,
+    FileLockingError,
+    GreenboneFeedSyncError,
+)
 
 DEFAULT_FLOCK_WAIT_INTERVAL = 5  # in seconds
 
+FEED_STATE_DIRECTORY_NAME = ".feed-sync"
+
 
 def is_root() -> bool:
     """
@@ -29,12 +36,94 @@ def is_root() -> bool:
     return os.geteuid() == 0
 
 
+def feed_state_directory(destination: str | Path) -> Path:
+    """
+    Get the directory for storing state information about a sync destination
+
+    The directory is placed next to the destination and not within it
+    because rsync would delete it otherwise.
+    """
+    destination = Path(destination)
+    return destination.parent / FEED_STATE_DIRECTORY_NAME / destination.name
+
+
+def _release_flock(fd: int) -> None:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+async def _flock_blocking(path: Path, timeout: float | None) -> int:
+    """
+    Wait for an exclusive lock on a file without polling
+
+    The blocking flock call is run in a separate daemon thread using its own
+    file descriptor. Therefore the lock is acquired as soon as the holder
+    releases it. If waiting is cancelled or the timeout is reached the thread
+    is abandoned and frees the lock directly after getting it.
+
+    Returns the file descriptor holding the lock.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[int] = loop.create_future()
+
+    def deliver(fd: int) -> None:
+        if future.done():
+            _release_flock(fd)
+        else:
+            future.set_result(fd)
+
+    def fail(exc: BaseException) -> None:
+        if not future.done():
+            future.set_exception(exc)
+
+    def acquire() -> None:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o660)
+        except OSError as e:
+            loop.call_soon_threadsafe(fail, e)
+            return
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError as e:
+            os.close(fd)
+            loop.call_soon_threadsafe(fail, e)
+            return
+
+        try:
+            loop.call_soon_threadsafe(deliver, fd)
+        except RuntimeError:
+            # the event loop has been closed in the meantime
+            _release_flock(fd)
+
+    threading.Thread(target=acquire, name=f"flock {path}", daemon=True).start()
+
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except BaseException as e:
+        if future.done() and not future.cancelled() and not future.exception():
+            _release_flock(future.result())
+        future.cancel()
+
+        if isinstance(e, asyncio.TimeoutError):
+            raise FileLockedError(
+                f"Timeout while waiting for the lock on {path.absolute()}."
+            ) from None
+        raise
+
+
 @asynccontextmanager
 async def flock_wait(
     path: str | Path,
     *,
     console: Console | None = None,
     wait_interval: int | float | None = DEFAULT_FLOCK_WAIT_INTERVAL,
+    blocking: bool = False,
+    timeout: float | None = None,
 ) -> AsyncGenerator[None, None]:
     """
     Try to lock a file and wait if it is already locked
@@ -44,8 +133,15 @@ async def flock_wait(
         console: A console to print messages to or None to keep the function
             quiet.
         wait_interval: Time to wait in seconds after failed lock attempt before
-            re-trying to lock the file. Set to None to raise a FileLockingError
+            re-trying to lock the file. Set to None to raise a FileLockedError
             instead of re-trying to acquire the lock. Default is 5 seconds.
+        blocking: Instead of re-trying to acquire the lock every wait_interval
+            seconds wait in a separate thread until the lock gets released.
+            The lock is acquired directly after the other process has freed
+            it.
+        timeout: Maximum time in seconds to wait for the lock. If the lock
+            can't be acquired in time a FileLockedError is raised. Default is
+            to wait forever.
     """
     # ensure path is a Path
     path = Path(path)
@@ -58,8 +154,12 @@ async def flock_wait(
             f"Could not create parent directories for {path}"
         ) from e
 
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
     try:
         with path.open("w", encoding="utf8") as fd0:
+            lock_fd = fd0.fileno()
             has_lock = False
             while not has_lock:
                 try:
@@ -78,17 +178,48 @@ async def flock_wait(
                 except OSError as e:
                     if e.errno in (errno.EAGAIN, errno.EACCES):
                         if wait_interval is None:
-                            raise FileLockingError(
+                            raise FileLockedError(
                                 f"{path.absolute()} is locked. Another process "
                                 "related to the feed update may already running."
                             ) from None
 
+                        remaining = (
+                            None if deadline is None else deadline - loop.time()
+                        )
+                        if remaining is not None and remaining <= 0:
+                            raise FileLockedError(
+                                "Timeout while waiting for the lock on "
+                                f"{path.absolute()}."
+                            ) from None
+
+                        if blocking:
+                            if console:
+                                console.print(
+                                    f"{path.absolute()} is locked by another "
+                                    "process. Waiting for the lock to be "
+                                    "released."
+                                )
+                            lock_fd = await _flock_blocking(path, remaining)
+                            path.chmod(mode=0o660)
+
+                            if console:
+                                console.print(
+                                    f"Acquired lock on {path.absolute()}"
+                                )
+
+                            has_lock = True
+                            continue
+
                         if console:
                             console.print(
                                 f"{path.absolute()} is locked by another process. "
                                 f"Waiting {wait_interval} seconds before next try."
                             )
-                        await asyncio.sleep(wait_interval)
+                        await asyncio.sleep(
+                            wait_interval
+                            if remaining is None
+                            else min(wait_interval, remaining)
+                        )
                     else:
                         raise
 
@@ -100,9 +231,12 @@ async def flock_wait(
                     if console:
                         console.print(f"Releasing lock on {path.absolute()}")
 
-                    fcntl.flock(fd0, fcntl.LOCK_UN)
+                    fcntl.flock(lock_fd, fcntl.LOCK_UN)
                 except OSError:
                     pass
+                finally:
+                    if lock_fd != fd0.fileno():
+                        os.close(lock_fd)
     except PermissionError as e:
         raise FileLockingError(
             "Permission error while trying to open the lock file "
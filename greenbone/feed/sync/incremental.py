@@ -0,0 +1,278 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from stat import S_ISREG
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError, RsyncError
+from greenbone.feed.sync.rsync import Rsync
+from greenbone.feed.sync.tree import TreeManifest
+from greenbone.feed.sync.verify import (
+    CHECKSUMS_FILE_NAME,
+    hash_files,
+    parse_checksums,
+    read_verify_cache,
+    stat_files,
+    stat_signature,
+)
+
+# fall back to a full sync if more than this fraction of the files changed.
+# a single rsync run transfers such amounts of files more efficiently.
+DEFAULT_INCREMENTAL_MAX_CHANGES = 0.5
+
+
+@dataclass
+class ChecksumDiff:
+    """
+    Differences between a local directory and the checksums of its source
+
+    Args:
+        added: Listed paths missing locally
+        updated: Listed paths with another local content
+        deleted: Existing paths which are not listed anymore
+    """
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> list[str]:
+        """
+        Paths which need to be downloaded
+        """
+        return [*self.added, *self.updated]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+
+def _open_manifest(manifest_file: str | Path | None) -> TreeManifest | None:
+    if not manifest_file:
+        return None
+    try:
+        return TreeManifest(manifest_file)
+    except (FileNotFoundError, GreenboneFeedSyncError):
+        return None
+
+
+def _local_digest(
+    manifest: TreeManifest | None,
+    cache: dict[str, str],
+    previous: dict[str, str],
+    path: str,
+    stat: os.stat_result,
+) -> str | None:
+    entry = manifest.get(path) if manifest is not None else None
+    if entry and S_ISREG(entry.mode):
+        # a file changed since the manifest has been written is modified
+        # locally
+        if entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return entry.digest.hex()
+        return None
+    return cache.get(stat_signature(stat), previous.get(path))
+
+
+def diff_checksums(
+    directory: str | Path,
+    previous: dict[str, str],
+    current: dict[str, str],
+    *,
+    manifest_file: str | Path | None = None,
+    cache_file: str | Path | None = None,
+) -> ChecksumDiff:
+    """
+    Compare the files of a directory with the current checksums of its source
+
+    No file is hashed. The local checksum of a file is taken from the tree
+    manifest if its size and modification time still match. Files changed
+    since the manifest has been written are considered as modified. Files
+    not in the manifest are looked up in the verify cache. Otherwise the
+    checksum from the previous checksums file is used, which the directory
+    matched after its last sync.
+
+    Args:
+        directory: The local directory
+        previous: Checksums of the last sync of the directory
+        current: Checksums of the source
+        manifest_file: Optional tree manifest of the directory
+        cache_file: Optional verify cache of the directory
+    """
+    # only stat the listed files instead of walking the whole directory tree
+    stats = stat_files(directory, current.keys() | previous.keys())
+    cache = read_verify_cache(cache_file) if cache_file else {}
+
+    diff = ChecksumDiff()
+    # look up the entries in the memory-mapped manifest via binary search
+    # instead of loading all of them
+    manifest = _open_manifest(manifest_file)
+    try:
+        for path, checksum in sorted(current.items()):
+            stat = stats.get(path)
+            if stat is None:
+                diff.added.append(path)
+            elif (
+                _local_digest(manifest, cache, previous, path, stat) != checksum
+            ):
+                diff.updated.append(path)
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+    diff.deleted = sorted(
+        path for path in previous if path not in current and path in stats
+    )
+    return diff
+
+
+def _delete_files(directory: Path, paths: Iterable[str]) -> None:
+    for path in paths:
+        file = directory / path
+        file.unlink(missing_ok=True)
+        # remove the directories getting empty like rsync --delete
+        parent = file.parent
+        while parent != directory:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+
+def _mismatched(
+    directory: Path,
+    checksums: dict[str, str],
+    paths: list[str],
+    workers: int | None,
+) -> list[str]:
+    return [
+        path
+        for path, digest in zip(
+            paths, hash_files(directory, paths, workers=workers)
+        )
+        if digest != checksums[path]
+    ]
+
+
+async def incremental_sync(
+    rsync: Rsync,
+    url: str,
+    destination: str | Path,
+    *,
+    staging_directory: str | Path,
+    manifest_file: str | Path | None = None,
+    cache_file: str | Path | None = None,
+    max_changes: float = DEFAULT_INCREMENTAL_MAX_CHANGES,
+    workers: int | None = None,
+) -> ChangeSet | None:
+    """
+    Download only the files changed according to the checksums of a feed
+
+    The changed top-level files including the checksums file of the feed are
+    downloaded first. The checksums are compared with the local files via
+    diff_checksums. Only the changed files are downloaded afterwards via
+    ``--files-from`` and verified. Files removed from the checksums are
+    deleted. Finally the new checksums file is put into place.
+
+    Files not listed in the checksums file are only updated if they are
+    located in the top-level directory.
+
+    Args:
+        rsync: Rsync instance to use
+        url: URL to sync
+        destination: Path of the local data
+        staging_directory: Directory to create the temporary directory for
+            the top-level files in. Must be on the same file system as the
+            destination.
+        manifest_file: Optional tree manifest of the destination
+        cache_file: Optional verify cache of the destination
+        max_changes: Maximum fraction of changed files
+        workers: Number of processes for verifying the downloaded files
+
+    Returns:
+        The changes or None if the destination can't be updated
+        incrementally and needs a full sync. This is the case if the
+        destination or the feed has no checksums file, if too many files have
+        changed or if the downloaded files don't match the checksums.
+    """
+    destination = Path(destination)
+    local_checksums = destination / CHECKSUMS_FILE_NAME
+    if not local_checksums.is_file():
+        return None
+
+    staging_directory = Path(staging_directory)
+    staging_directory.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=staging_directory) as temp_dir:
+        staging = Path(temp_dir)
+        try:
+            await rsync.fetch_directory_files(
+                url, staging, compare_dest=destination
+            )
+        except RsyncError:
+            # let the full sync handle and report the error
+            return None
+
+        staged = sorted(path.name for path in staging.iterdir())
+        checksums_file = (
+            staging / CHECKSUMS_FILE_NAME
+            if CHECKSUMS_FILE_NAME in staged
+            else local_checksums
+        )
+        try:
+            previous = parse_checksums(local_checksums)
+            current = parse_checksums(checksums_file)
+        except GreenboneFeedSyncError:
+            return None
+
+        diff = await asyncio.to_thread(
+            diff_checksums,
+            destination,
+            previous,
+            current,
+            manifest_file=manifest_file,
+            cache_file=cache_file,
+        )
+        changed = diff.changed
+        if len(changed) > len(current) * max_changes:
+            return None
+
+        # top-level files listed in the checksums have been downloaded already
+        fetch = []
+        for path in changed:
+            if path in staged:
+                shutil.move(staging / path, destination / path)
+                staged.remove(path)
+            else:
+                fetch.append(path)
+        if fetch:
+            await rsync.fetch_files(url, destination, fetch)
+
+        if await asyncio.to_thread(
+            _mismatched, destination, current, changed, workers
+        ):
+            # the feed has changed in between or the checksums are wrong
+            return None
+
+        await asyncio.to_thread(_delete_files, destination, diff.deleted)
+
+        changes = ChangeSet(
+            added=diff.added, updated=diff.updated, deleted=diff.deleted
+        )
+        # put the checksums file into place after the data it describes
+        for name in staged:
+            if (destination / name).exists():
+                changes.updated.append(name)
+            else:
+                changes.added.append(name)
+            shutil.move(staging / name, destination / name)
+
+    return changes
@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+from collections.abc import AsyncGenerator, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from rich.console import Console
+
+from greenbone.feed.sync.errors import ConfigError, GreenboneFeedSyncError
+from greenbone.feed.sync.helper import FEED_STATE_DIRECTORY_NAME
+
+DEFAULT_LEADER_PORT = 8873
+# only serve the feed data to other hosts if explicitly configured
+DEFAULT_SERVE_ADDRESS = "127.0.0.1"
+DEFAULT_RSYNC_DAEMON_STARTUP_TIME = 1  # in seconds
+
+RSYNCD_CONFIG_FILE_NAME = "rsyncd.conf"
+RSYNCD_LOG_FILE_NAME = "rsyncd.log"
+RSYNCD_PID_FILE_NAME = "rsyncd.pid"
+
+
+@dataclass(frozen=True)
+class Module:
+    """
+    A read-only rsync module served by the leader
+
+    Args:
+        name: Name of the module
+        path: Directory served by the module
+        comment: Description of the module
+    """
+
+    name: str
+    path: Path
+    comment: str = ""
+
+
+def leader_url(value: str) -> str:
+    """
+    Convert a host name with an optional port into an rsync URL of a leader
+    """
+    url = value if "://" in value else f"rsync://{value}"
+    splitted = urlsplit(url)
+    if splitted.scheme != "rsync" or not splitted.hostname:
+        raise ConfigError(f"Invalid leader '{value}'.")
+    if splitted.port is None:
+        url = f"rsync://{splitted.netloc}:{DEFAULT_LEADER_PORT}"
+    return url.rstrip("/")
+
+
+def leader_module_url(url: str, module: str) -> str:
+    """
+    Get the URL of a module of a leader
+    """
+    return f"{url.rstrip('/')}/{module}/"
+
+
+def rsyncd_state_directory(destination_prefix: str | Path) -> Path:
+    """
+    Get the directory for the config, log and pid file of the rsync daemon
+    """
+    return Path(destination_prefix) / FEED_STATE_DIRECTORY_NAME
+
+
+def rsyncd_config(
+    modules: Iterable[Module],
+    *,
+    state_directory: Path,
+    port: int = DEFAULT_LEADER_PORT,
+    address: str | None = None,
+    hosts_allow: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+) -> str:
+    """
+    Create the content of an rsyncd.conf file serving the modules read-only
+
+    If hosts_allow is set, all other hosts are denied. Otherwise every host
+    which can reach the address and port may download the feed data.
+    """
+    lines = [
+        "# Generated by greenbone-feed-sync. Changes get overwritten.",
+        f"pid file = {state_directory / RSYNCD_PID_FILE_NAME}",
+        f"log file = {state_directory / RSYNCD_LOG_FILE_NAME}",
+        f"port = {port}",
+        "use chroot = no",
+        "munge symlinks = no",
+        "read only = yes",
+        "list = yes",
+    ]
+    if address:
+        lines.append(f"address = {address}")
+    hosts = " ".join(hosts_allow)
+    if hosts:
+        lines.extend([f"hosts allow = {hosts}", "hosts deny = *"])
+
+    excludes = " ".join(f"/{name.strip('/')}/" for name in exclude)
+    for module in modules:
+        lines.extend(
+            [
+                "",
+                f"[{module.name}]",
+                f"    path = {Path(module.path).absolute()}",
+            ]
+        )
+        if module.comment:
+            lines.append(f"    comment = {module.comment}")
+        if excludes:
+            lines.append(f"    exclude = {excludes}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_rsyncd_config(config_file: Path, content: str) -> bool:
+    """
+    Replace the config file of the rsync daemon atomically
+
+    The rsync daemon reads the config file for each new connection.
+    Therefore changes are applied without restarting the daemon.
+
+    Returns True if the content has changed.
+    """
+    try:
+        if config_file.read_text(encoding="utf8") == content:
+            return False
+    except OSError:
+        pass
+
+    config_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = config_file.with_name(f".{config_file.name}.tmp")
+    temp_file.write_text(content, encoding="utf8")
+    temp_file.replace(config_file)
+    return True
+
+
+@asynccontextmanager
+async def rsync_daemon(
+    config_file: Path,
+    *,
+    console: Console | None = None,
+    startup_time: float = DEFAULT_RSYNC_DAEMON_STARTUP_TIME,
+) -> AsyncGenerator[asyncio.subprocess.Process, None]:
+    """
+    Run an rsync daemon serving the synced feed data to followers
+
+    The daemon is stopped when leaving the context, also on errors and
+    cancellation. Its output is written to the log file next to the config
+    file.
+
+    Raises:
+        GreenboneFeedSyncError: If the daemon exits directly after starting
+    """
+    log_file = config_file.with_name(RSYNCD_LOG_FILE_NAME)
+    with log_file.open("ab") as log:
+        process = await asyncio.create_subprocess_exec(
+            "rsync",
+            "--daemon",
+            "--no-detach",
+            f"--config={config_file}",
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+        )
+
+    try:
+        try:
+            returncode = await asyncio.wait_for(process.wait(), startup_time)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise GreenboneFeedSyncError(
+                f"The rsync daemon exited with code {returncode} directly "
+                f"after starting. See {log_file} for details."
+            )
+
+        if console:
+            console.print(
+                f"Serving the feed data via rsync daemon {process.pid}."
+            )
+
+        yield process
+    finally:
+        if process.returncode is None:
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+        # rsync doesn't remove its pid file if it gets killed
+        config_file.with_name(RSYNCD_PID_FILE_NAME).unlink(missing_ok=True)
@@ -4,24 +4,114 @@
 #
 
 import asyncio
+import os
+import shutil
 import subprocess
 import sys
-from collections.abc import Iterable
-from dataclasses import dataclass
-from typing import NoReturn
+import time
+from argparse import Namespace
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
+from contextlib import (
+    AbstractAsyncContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    nullcontext,
+)
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, NoReturn, Protocol
 
 from rich.console import Console
 
+from greenbone.feed.sync.batch import (
+    ReplayStatus,
+    batch_file,
+    record_batch,
+    replay_batch,
+)
+from greenbone.feed.sync.bundle import (
+    discard_staged,
+    export_bundle,
+    install_staged,
+    read_bundle_manifest,
+    unpack_bundle,
+)
+from greenbone.feed.sync.changes import CHANGES_FILE_NAME, ChangeSet
+from greenbone.feed.sync.completion import (
+    feed_lock_file,
+    run_completion_hook,
+    write_completion_marker,
+)
 from greenbone.feed.sync.config import DEFAULT_VERBOSITY
-from greenbone.feed.sync.errors import GreenboneFeedSyncError, RsyncError
+from greenbone.feed.sync.daemon import Daemon
+from greenbone.feed.sync.errors import (
+    ConfigError,
+    ExecProcessError,
+    FileLockedError,
+    GreenboneFeedSyncError,
+)
+from greenbone.feed.sync.fanout import rebase_path, same_filesystem
 from greenbone.feed.sync.helper import (
+    DEFAULT_FLOCK_WAIT_INTERVAL,
     Spinner,
     change_user_and_group,
+    feed_state_directory,
     flock_wait,
     is_root,
 )
+from greenbone.feed.sync.incremental import incremental_sync
+from greenbone.feed.sync.leader import (
+    RSYNCD_CONFIG_FILE_NAME,
+    Module,
+    rsync_daemon,
+    rsyncd_config,
+    rsyncd_state_directory,
+    write_rsyncd_config,
+)
+from greenbone.feed.sync.marker import (
+    NASL_MARKER,
+    TIMESTAMP_MARKER,
+    fetch_marker,
+    is_up_to_date,
+    store_marker,
+)
+from greenbone.feed.sync.merkle import (
+    MERKLE_DIGEST_FILE_NAME,
+    DifferenceKind,
+    compare_merkle_digests,
+    read_merkle_digests,
+    update_merkle_digest_file,
+)
+from greenbone.feed.sync.mirror import (
+    MirrorProbe,
+    failover,
+    invalidate_ranking,
+    mirror_cache_file,
+    rebase_url,
+    select_mirrors,
+)
 from greenbone.feed.sync.parser import CliParser
-from greenbone.feed.sync.rsync import Rsync
+from greenbone.feed.sync.progress import RsyncProgress
+from greenbone.feed.sync.push import (
+    PushResult,
+    PushTarget,
+    push,
+    read_inventory,
+)
+from greenbone.feed.sync.retry import retry
+from greenbone.feed.sync.rsync import DEFAULT_RSYNC_PARTIAL_DIR, Rsync
+from greenbone.feed.sync.snapshot import DEFAULT_KEEP_SNAPSHOTS, Snapshots
+from greenbone.feed.sync.ssh import ssh_control_master
+from greenbone.feed.sync.tree import (
+    TREE_MANIFEST_FILE_NAME,
+    has_tree_manifest,
+    update_tree_manifest,
+)
+from greenbone.feed.sync.verify import (
+    CHECKSUMS_FILE_NAME,
+    VERIFY_CACHE_FILE_NAME,
+    verify_checksums,
+)
 
 __all__ = ("main",)
 
@@ -36,6 +126,9 @@ class Sync:
     types: Iterable[str]
     url: str
     destination: str
+    marker: str | None = None
+    shards: int = 1
+    link_dest: str | Path | None = None
 
 
 @dataclass
@@ -48,6 +141,28 @@ class SyncList:
     syncs: Iterable[Sync]
 
 
+CommitLock = Callable[[], AbstractAsyncContextManager[Any]]
+
+
+class SyncFunction(Protocol):
+    def __call__(
+        self, sync: Sync, *, commit_lock: CommitLock | None = None
+    ) -> Awaitable[None]: ...
+
+
+STAGING_LOCK_FILE_SUFFIX = ".staging"
+
+
+def staging_lock_file(lock_file: str | Path) -> Path:
+    """
+    Get the lock file for serializing staged downloads
+
+    Consumers of the feed data only use the lock file itself.
+    """
+    lock_file = Path(lock_file)
+    return lock_file.with_name(f"{lock_file.name}{STAGING_LOCK_FILE_SUFFIX}")
+
+
 def filter_syncs(lock_file: str, feed_type: str, *syncs: Sync) -> SyncList:
     """
     Create a list of syncs which only match to the feed type
@@ -58,6 +173,162 @@ def filter_syncs(lock_file: str, feed_type: str, *syncs: Sync) -> SyncList:
     )
 
 
+def fan_out_sync_list(
+    sync_list: SyncList, prefix: str | Path, new_prefix: str | Path
+) -> SyncList:
+    """
+    Create a list of syncs copying the downloaded data of a sync list from
+    the destination prefix into another destination prefix
+
+    Files are hardlinked if both prefixes are on the same filesystem.
+    """
+    syncs = []
+    for sync in sync_list.syncs:
+        source = Path(sync.destination).absolute()
+        destination = rebase_path(sync.destination, prefix, new_prefix)
+        syncs.append(
+            Sync(
+                name=sync.name,
+                types=sync.types,
+                url=f"{source}/",
+                destination=os.fspath(destination),
+                marker=sync.marker,
+                link_dest=(
+                    source if same_filesystem(source, destination) else None
+                ),
+            )
+        )
+    return SyncList(
+        lock_file=os.fspath(
+            rebase_path(sync_list.lock_file, prefix, new_prefix)
+        ),
+        syncs=syncs,
+    )
+
+
+def feed_data_excludes(args: Namespace) -> list[str]:
+    """
+    Get the names within the destinations not belonging to the feed data
+    """
+    return [
+        os.fspath(path)
+        for path in (args.private_directory, DEFAULT_RSYNC_PARTIAL_DIR)
+        if path
+    ]
+
+
+def leader_modules(args: Namespace) -> list[Module]:
+    """
+    Create the rsync modules for serving the feed data to followers
+
+    The module names match the names used for deriving the URLs from the
+    leader URL in the config.
+    """
+    return [
+        Module("notus", args.notus_destination, "Notus files"),
+        Module("nasl", args.nasl_destination, "NASL files"),
+        Module("scap-data", args.scap_data_destination, "SCAP data"),
+        Module("cert-data", args.cert_data_destination, "CERT-Bund data"),
+        Module("gvmd-data", args.gvmd_data_destination, "gvmd data"),
+        Module(
+            "report-formats", args.report_formats_destination, "report formats"
+        ),
+        Module("scan-configs", args.scan_configs_destination, "scan configs"),
+        Module("port-lists", args.port_lists_destination, "port lists"),
+    ]
+
+
+def write_leader_config(args: Namespace) -> Path:
+    """
+    Write the config file of the rsync daemon serving the feed data
+
+    Returns the path of the config file.
+    """
+    state_directory = rsyncd_state_directory(args.destination_prefix)
+    config_file = state_directory / RSYNCD_CONFIG_FILE_NAME
+    write_rsyncd_config(
+        config_file,
+        rsyncd_config(
+            leader_modules(args),
+            state_directory=state_directory,
+            port=args.serve_port,
+            address=args.serve_address,
+            hosts_allow=args.serve_hosts_allow or (),
+            exclude=feed_data_excludes(args),
+        ),
+    )
+    return config_file
+
+
+async def push_feeds(
+    args: Namespace,
+    rsync: Rsync,
+    targets: Iterable[PushTarget],
+    destinations: Iterable[str | Path],
+    *,
+    console: Console,
+    error_console: Console,
+    verbose: int,
+) -> bool:
+    """
+    Push the downloaded feed data to the targets of the push inventory
+
+    Returns True if pushing to a target has failed.
+    """
+
+    def print_retry(
+        target: PushTarget, error: Exception, attempt: int, delay: float
+    ) -> None:
+        if verbose >= 1:
+            console.print(
+                f"Pushing to {target.name} failed: {error} Retrying in "
+                f"{delay:.0f} seconds (attempt {attempt + 1} of "
+                f"{args.push_retries + 1})."
+            )
+
+    def print_result(result: PushResult) -> None:
+        if result.success:
+            if verbose >= 1:
+                console.print(
+                    f"Pushed to {result.target.name} in "
+                    f"{result.duration:.1f} seconds. "
+                    f"{result.bytes_transferred} bytes transferred."
+                )
+            return
+
+        error = result.error
+        message = (
+            error.stderr
+            if isinstance(error, ExecProcessError) and error.stderr
+            else str(error)
+        )
+        error_console.print(
+            f"Pushing to {result.target.name} failed after "
+            f"{result.attempts} attempts in {result.duration:.1f} seconds. "
+            f"{message.strip()}"
+        )
+
+    results = await push(
+        rsync,
+        targets,
+        destinations,
+        prefix=args.destination_prefix,
+        concurrency=args.push_concurrency,
+        retries=args.push_retries,
+        retry_deadline=args.retry_deadline,
+        on_result=print_result,
+        on_retry=print_retry,
+    )
+
+    failed = [result for result in results if not result.success]
+    if verbose >= 1:
+        console.print(
+            f"Pushed the feed data to {len(results) - len(failed)} of "
+            f"{len(results)} hosts."
+        )
+    return bool(failed)
+
+
 def do_selftest() -> None:
     """
     Check for rsync command.
@@ -75,42 +346,663 @@ def do_selftest() -> None:
         ) from None
 
 
-async def feed_sync(console: Console, error_console: Console) -> int:
+def rsync_excludes(rsync: Rsync) -> list[str]:
     """
-    Sync the feeds
+    Get the names within a destination which are not synced by rsync
     """
-    parser = CliParser()
-    args = parser.parse_arguments()
+    return [
+        os.fspath(path)
+        for path in (rsync.private_subdir, rsync.partial_dir)
+        if path
+    ]
 
-    do_selftest()
 
-    if args.selftest:
-        return 0
+async def update_manifest(
+    sync: Sync,
+    rsync: Rsync,
+    change_set: ChangeSet,
+    *,
+    console: Console,
+    verbose: int,
+    workers: int | None = None,
+    merkle_digest: bool = False,
+) -> None:
+    """
+    Apply the changes of a sync to the tree manifest of its destination
 
-    if args.quiet:
-        verbose = 0
-    else:
-        verbose = DEFAULT_VERBOSITY if args.verbose is None else args.verbose
+    If merkle_digest is set the Merkle digests of the destination are
+    updated afterwards.
+    """
+    state_directory = feed_state_directory(sync.destination)
+    manifest_file = state_directory / TREE_MANIFEST_FILE_NAME
+    # a new manifest isn't covered by the changes
+    has_manifest = has_tree_manifest(manifest_file)
+    count = await asyncio.to_thread(
+        update_tree_manifest,
+        manifest_file,
+        sync.destination,
+        change_set,
+        exclude=rsync_excludes(rsync),
+        workers=workers,
+    )
+    if verbose >= 2:
+        console.print(
+            f"Updated the tree manifest of {sync.name} with {count} entries."
+        )
 
-    if is_root():
+    if merkle_digest:
+        digest = await asyncio.to_thread(
+            update_merkle_digest_file,
+            state_directory / MERKLE_DIGEST_FILE_NAME,
+            manifest_file,
+            change_set if has_manifest else None,
+        )
+        if verbose >= 2:
+            console.print(f"Merkle digest of {sync.name} is {digest}.")
+
+
+async def verify_download(
+    sync: Sync,
+    rsync: Rsync,
+    destination: str | Path,
+    *,
+    console: Console,
+    verbose: int,
+    workers: int | None = None,
+    cache_file: Path | None = None,
+    change_set: ChangeSet | None = None,
+) -> None:
+    """
+    Verify the downloaded data of a sync against its checksums file
+
+    Corrupted and missing files are downloaded again and verified once more.
+    Syncs without a checksums file are not verified. If a cache file is
+    passed only files changed since the last verification are hashed. The
+    downloaded files are added to the change set.
+
+    Raises:
+        GreenboneFeedSyncError: If files still don't match their checksums
+    """
+    start = time.monotonic()
+    result = await asyncio.to_thread(
+        verify_checksums, destination, workers=workers, cache_file=cache_file
+    )
+    if result is None:
+        if verbose >= 2:
+            console.print(f"{sync.name} has no {CHECKSUMS_FILE_NAME} file.")
+        return
+
+    if not result.success:
+        failed = result.failed
         if verbose >= 1:
             console.print(
-                f"Running as root. Switching to user '{args.user}' and "
-                f"group '{args.group}'."
+                f"{sync.name}: {len(result.mismatched)} files don't match "
+                f"their checksums and {len(result.missing)} files are "
+                "missing. Downloading them again."
             )
-            change_user_and_group(args.user, args.group)
+        if verbose >= 2:
+            for path in failed:
+                console.print(f"  {path}")
 
-    rsync = Rsync(
-        private_subdir=args.private_directory,
-        verbose=verbose >= 3,
-        compression_level=args.compression_level,
-        ssh_key=args.greenbone_enterprise_feed_key,
-        change_permissions=not args.no_permission_change,
-    )
+        await rsync.fetch_files(sync.url, destination, failed)
+        if change_set is not None:
+            change_set.updated.extend(failed)
+        result = await asyncio.to_thread(
+            verify_checksums,
+            destination,
+            files=failed,
+            workers=workers,
+            cache_file=cache_file,
+        )
+        if result and not result.success:
+            raise GreenboneFeedSyncError(
+                f"Verifying {sync.name} failed. {len(result.failed)} files "
+                f"don't match {CHECKSUMS_FILE_NAME}: "
+                f"{', '.join(result.failed[:10])}"
+            )
+        if verbose >= 1:
+            console.print(f"Repaired {len(failed)} files of {sync.name}.")
+    elif verbose >= 2:
+        console.print(
+            f"Verified {result.checked} files of {sync.name} in "
+            f"{time.monotonic() - start:.1f} seconds. {result.hashed} files "
+            "have been hashed."
+        )
+
+
+async def run_sync(
+    sync: Sync,
+    rsync: Rsync,
+    *,
+    console: Console,
+    verbose: int,
+    show_spinner: bool = True,
+    record_changes: bool = False,
+    pre_check: bool = False,
+    keep_snapshots: int = 0,
+    commit_lock: CommitLock | None = None,
+    retries: int = 0,
+    retry_deadline: float | None = None,
+    write_batch: Path | None = None,
+    read_batch: Path | None = None,
+    verify: bool = False,
+    verify_workers: int | None = None,
+    tree_manifest: bool = False,
+    incremental: bool = False,
+    merkle_digest: bool = False,
+) -> None:
+    """
+    Download the data of a single sync
+
+    If record_changes is set the changed paths are written as JSON lines to
+    the state directory of the destination.
+
+    If pre_check is set and the sync has a version marker, only the marker
+    is downloaded first. The full sync is skipped if the marker hasn't
+    changed since the last successful sync.
+
+    If keep_snapshots is greater than 0 the data is downloaded into a new
+    snapshot directory. Unchanged files are hardlinked from the active
+    snapshot. After a successful download the new snapshot is activated
+    atomically and only the newest keep_snapshots snapshots are kept.
+
+    If the sync has a link_dest directory, files are hardlinked from that
+    directory instead of from the active snapshot.
+
+    If commit_lock is set it is held only while the destination gets
+    changed. With snapshots this is only the switch to the new snapshot.
+    Without snapshots it is held for the whole download.
+
+    Failed downloads are retried up to retries times with an exponential
+    backoff if rsync has failed because of a transient error. No retry is
+    started after retry_deadline seconds.
+
+    If write_batch is set the download is recorded into this batch file.
+    If read_batch is set and the batch file exists it is applied instead of
+    downloading if the destination matches the version the batch has been
+    recorded against. Otherwise the data is downloaded as usual.
+
+    If verify is set the downloaded files are verified against the checksums
+    file of the sync afterwards using verify_workers processes. Corrupted
+    and missing files are downloaded again.
+
+    If tree_manifest is set the tree manifest of the destination is updated
+    with the changes reported by rsync.
+
+    If incremental is set only the files changed according to the checksums
+    file of the sync are downloaded. The data is downloaded as usual if that
+    isn't possible.
+
+    If merkle_digest is set the Merkle digests of the destination are
+    updated together with its tree manifest.
+    """
+    tree_manifest = tree_manifest or merkle_digest
+
+    if commit_lock and keep_snapshots <= 0:
+        async with commit_lock():
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=verbose,
+                show_spinner=show_spinner,
+                record_changes=record_changes,
+                pre_check=pre_check,
+                retries=retries,
+                retry_deadline=retry_deadline,
+                write_batch=write_batch,
+                read_batch=read_batch,
+                verify=verify,
+                verify_workers=verify_workers,
+                tree_manifest=tree_manifest,
+                incremental=incremental,
+                merkle_digest=merkle_digest,
+            )
+        return
+
+    marker = None
+    if pre_check and sync.marker:
+        marker = await fetch_marker(
+            rsync, sync.url, sync.destination, sync.marker
+        )
+        if marker is not None and is_up_to_date(
+            sync.destination, sync.marker, marker
+        ):
+            if verbose >= 1:
+                console.print(f"{sync.name} up to date.")
+            if tree_manifest:
+                # creates a missing manifest
+                await update_manifest(
+                    sync,
+                    rsync,
+                    ChangeSet(),
+                    console=console,
+                    verbose=verbose,
+                    workers=verify_workers,
+                    merkle_digest=merkle_digest,
+                )
+            return
+
+    kwargs: dict[str, Any] = {}
+    change_set = None
+    if record_changes or tree_manifest:
+        # collect the changes of all attempts
+        change_set = ChangeSet()
+        progress = RsyncProgress()
+        progress.subscribe(change_set.add)
+        kwargs["progress"] = progress
+    if sync.shards > 1:
+        kwargs["shards"] = sync.shards
+
+    destination: str | Path = sync.destination
+    snapshots = previous = None
+    if keep_snapshots > 0:
+        snapshots = Snapshots(sync.destination)
+        previous = snapshots.active_data()
+        if previous:
+            kwargs["link_dest"] = previous
+        destination = snapshots.create()
+    if sync.link_dest:
+        kwargs["link_dest"] = sync.link_dest
+
+    def print_retry(error: Exception, attempt: int, delay: float) -> None:
+        if verbose >= 1:
+            console.print(
+                f"Downloading {sync.name} failed: {error} Retrying in "
+                f"{delay:.0f} seconds (attempt {attempt + 1} of "
+                f"{retries + 1})."
+            )
+
+    async def transfer() -> None:
+        if read_batch and read_batch.exists():
+            # report the changes of a batch like the ones of a download
+            replay_kwargs = (
+                {"progress": kwargs["progress"]} if "progress" in kwargs else {}
+            )
+            try:
+                status = await replay_batch(
+                    rsync,
+                    read_batch,
+                    destination,
+                    exclude=rsync_excludes(rsync),
+                    **replay_kwargs,
+                )
+            except GreenboneFeedSyncError as e:
+                # a corrupt batch or info file. the download repairs a
+                # partially applied batch.
+                if verbose >= 1:
+                    console.print(
+                        f"Applying {read_batch} to {destination} failed: {e} "
+                        "Downloading instead."
+                    )
+            else:
+                if status is ReplayStatus.UP_TO_DATE:
+                    if verbose >= 1:
+                        console.print(f"{sync.name} up to date.")
+                    return
+                if status is ReplayStatus.REPLAYED:
+                    if verbose >= 2:
+                        console.print(f"Applied {read_batch} to {destination}.")
+                    return
+                if verbose >= 1:
+                    console.print(
+                        f"{destination} doesn't match the version of "
+                        f"{read_batch}. Downloading instead."
+                    )
+
+        if incremental:
+            state_directory = feed_state_directory(sync.destination)
+            changes = await incremental_sync(
+                rsync,
+                sync.url,
+                destination,
+                staging_directory=state_directory,
+                manifest_file=(
+                    state_directory / TREE_MANIFEST_FILE_NAME
+                    if tree_manifest
+                    else None
+                ),
+                cache_file=state_directory / VERIFY_CACHE_FILE_NAME,
+                workers=verify_workers,
+            )
+            if changes is not None:
+                if change_set is not None:
+                    change_set.extend(changes)
+                if verbose >= 2:
+                    changed = len(changes.added) + len(changes.updated)
+                    console.print(
+                        f"Downloaded {changed} changed files of {sync.name} "
+                        "incrementally."
+                    )
+                return
+            if verbose >= 1:
+                console.print(
+                    f"{sync.name} can't be updated incrementally. Downloading "
+                    "all files."
+                )
+
+        if write_batch:
+            await record_batch(
+                rsync,
+                sync.url,
+                destination,
+                write_batch,
+                exclude=rsync_excludes(rsync),
+                **kwargs,
+            )
+        else:
+            await rsync.sync(url=sync.url, destination=destination, **kwargs)
+
+    async def download() -> None:
+        if retries <= 0:
+            await transfer()
+        else:
+            result = await retry(
+                transfer,
+                retries=retries,
+                deadline=retry_deadline,
+                on_retry=print_retry,
+            )
+            if result.attempts > 1 and verbose >= 2:
+                console.print(
+                    f"Downloaded {sync.name} after {result.attempts} "
+                    f"attempts in {result.duration:.0f} seconds."
+                )
+
+        if verify:
+            await verify_download(
+                sync,
+                rsync,
+                destination,
+                console=console,
+                verbose=verbose,
+                workers=verify_workers,
+                cache_file=(
+                    feed_state_directory(sync.destination)
+                    / VERIFY_CACHE_FILE_NAME
+                ),
+                change_set=change_set,
+            )
+
+    message = f"Downloading {sync.name} from {sync.url} to {sync.destination}"
+    try:
+        if verbose >= 3:
+            console.print(message)
+            await download()
+            # add newline after rsync
+            console.print()
+        elif verbose >= 1 and show_spinner:
+            with Spinner(console, message):
+                await download()
+        elif verbose >= 1:
+            console.print(message)
+            await download()
+        else:
+            await download()
+    except BaseException:
+        if snapshots:
+            shutil.rmtree(destination, ignore_errors=True)
+        raise
+
+    if snapshots:
+        if previous and rsync.private_subdir:
+            snapshots.carry_over(
+                previous, Path(destination), os.fspath(rsync.private_subdir)
+            )
+        snapshot = snapshots.complete(Path(destination))
+        if change_set is not None:
+            Snapshots.fix_changes(change_set, previous, snapshot)
+
+        async with commit_lock() if commit_lock else nullcontext():
+            snapshots.link_destination()
+            snapshots.activate(snapshot)
+
+        snapshots.prune(keep_snapshots)
+
+    if marker is not None and sync.marker:
+        store_marker(sync.destination, sync.marker, marker)
+
+    if tree_manifest and change_set is not None:
+        await update_manifest(
+            sync,
+            rsync,
+            change_set,
+            console=console,
+            verbose=verbose,
+            workers=verify_workers,
+            merkle_digest=merkle_digest,
+        )
+
+    if record_changes and change_set is not None:
+        change_set.write(
+            feed_state_directory(sync.destination) / CHANGES_FILE_NAME
+        )
+        if verbose >= 2:
+            console.print(
+                f"{sync.name}: {len(change_set.added)} added, "
+                f"{len(change_set.updated)} updated, "
+                f"{len(change_set.deleted)} deleted"
+            )
+
+
+async def run_syncs(
+    syncs: Iterable[Sync],
+    sync_func: SyncFunction,
+    *,
+    error_console: Console,
+    parallel: int = 1,
+    fail_fast: bool = False,
+    semaphore: asyncio.Semaphore | None = None,
+) -> list[ExecProcessError]:
+    """
+    Run the syncs of a lock group as concurrent tasks
+
+    At most `parallel` syncs are running at the same time. A semaphore can
+    be passed instead for sharing the limit with the syncs of other lock
+    groups. All errors of rsync and of the completion hooks are collected
+    and returned. If fail_fast is set the remaining syncs are cancelled after
+    the first error.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(parallel, 1))
+    errors: list[ExecProcessError] = []
+
+    async def limited_sync(sync: Sync) -> None:
+        async with semaphore:
+            await sync_func(sync)
+
+    tasks = [asyncio.create_task(limited_sync(sync)) for sync in syncs]
+    try:
+        for task in asyncio.as_completed(tasks):
+            try:
+                await task
+            except ExecProcessError as e:
+                errors.append(e)
+                error_console.print(e.stderr or str(e))
+                if fail_fast:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return errors
+
+
+async def run_sync_lists(
+    sync_lists: Iterable[SyncList],
+    sync_func: SyncFunction,
+    *,
+    console: Console,
+    error_console: Console,
+    verbose: int,
+    parallel: int = 1,
+    fail_fast: bool = False,
+    wait_interval: float | None = DEFAULT_FLOCK_WAIT_INTERVAL,
+    blocking_lock: bool = False,
+    lock_timeout: float | None = None,
+    staged: bool = False,
+) -> bool:
+    """
+    Run the syncs of several lock groups
+
+    Instead of blocking on the lock of the first group all pending groups are
+    tried and whichever group can be locked first is started. If parallel is
+    greater than 1 independent groups are run at the same time. The limit of
+    parallel syncs applies to all groups together. Otherwise only one group
+    is run at a time.
+
+    If staged is set the lock file of a group is only taken for committing
+    the downloaded data of each sync. The group itself is run while holding
+    the staging lock file instead which isn't used by the consumers of the
+    feed data.
+
+    Returns True if an error has occurred.
+    """
+    pending = [sync_list for sync_list in sync_lists if sync_list.syncs]
+    lock_console = console if verbose else None
+    has_error = False
+    # limit the running syncs of all groups together
+    semaphore = asyncio.Semaphore(max(parallel, 1))
 
+    def lock(
+        sync_list: SyncList, wait_interval: float | None
+    ) -> AbstractAsyncContextManager[None]:
+        return flock_wait(
+            (
+                staging_lock_file(sync_list.lock_file)
+                if staged
+                else sync_list.lock_file
+            ),
+            console=lock_console,
+            wait_interval=wait_interval,
+            blocking=blocking_lock,
+            timeout=lock_timeout,
+        )
+
+    def group_sync_func(sync_list: SyncList) -> SyncFunction:
+        if not staged:
+            return sync_func
+
+        def commit_lock() -> AbstractAsyncContextManager[None]:
+            return flock_wait(
+                sync_list.lock_file,
+                console=lock_console,
+                wait_interval=wait_interval,
+                blocking=blocking_lock,
+                timeout=lock_timeout,
+            )
+
+        def staged_sync(
+            sync: Sync, *, commit_lock: CommitLock | None = commit_lock
+        ) -> Awaitable[None]:
+            return sync_func(sync, commit_lock=commit_lock)
+
+        return staged_sync
+
+    async def acquire_first() -> tuple[SyncList, AsyncExitStack]:
+        # prefer the order of the groups if their locks are free
+        for sync_list in pending:
+            stack = AsyncExitStack()
+            try:
+                await stack.enter_async_context(lock(sync_list, None))
+                return sync_list, stack
+            except FileLockedError:
+                if wait_interval is None:
+                    raise
+
+        # otherwise wait for whichever lock gets released first
+        async def acquire(sync_list: SyncList) -> AsyncExitStack:
+            stack = AsyncExitStack()
+            await stack.enter_async_context(lock(sync_list, wait_interval))
+            return stack
+
+        tasks = [asyncio.create_task(acquire(s)) for s in pending]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        acquired = [
+            (sync_list, result)
+            for sync_list, result in zip(pending, results)
+            if isinstance(result, AsyncExitStack)
+        ]
+        errors = [
+            result
+            for result in results
+            if isinstance(result, Exception)
+            and not isinstance(result, asyncio.CancelledError)
+        ]
+        if errors or not acquired:
+            for _, stack in acquired:
+                await stack.aclose()
+            raise errors[0] if errors else asyncio.CancelledError()
+
+        for _, stack in acquired[1:]:
+            await stack.aclose()
+        return acquired[0]
+
+    async def run_locked(
+        sync_list: SyncList, group_lock: AbstractAsyncContextManager[Any]
+    ) -> list[ExecProcessError]:
+        async with group_lock:
+            errors = await run_syncs(
+                sync_list.syncs,
+                group_sync_func(sync_list),
+                error_console=error_console,
+                fail_fast=fail_fast,
+                semaphore=semaphore,
+            )
+
+        if verbose >= 2 and not (errors and fail_fast):
+            # add newline for grouping lock
+            console.print()
+
+        return errors
+
+    if parallel > 1:
+        # each group waits for its own lock and starts as soon as possible
+        tasks = [
+            asyncio.create_task(
+                run_locked(sync_list, lock(sync_list, wait_interval))
+            )
+            for sync_list in pending
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                if await task:
+                    has_error = True
+                    if fail_fast:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return has_error
+
+    while pending:
+        sync_list, group_lock = await acquire_first()
+        pending.remove(sync_list)
+
+        if await run_locked(sync_list, group_lock):
+            has_error = True
+            if fail_fast:
+                break
+
+    return has_error
+
+
+def feed_sync_lists(args: Namespace, feed_type: str) -> list[SyncList]:
+    """
+    Create the lists of syncs of a feed type grouped by their lock files
+    """
     openvas_syncs = filter_syncs(
         args.openvas_lock_file,
-        args.type,
+        feed_type,
         Sync(
             name="Notus files",
             types=("notus", "nvt", "all"),
@@ -122,22 +1014,26 @@ async def feed_sync(console: Console, error_console: Console) -> int:
             types=("nasl", "nvt", "all"),
             url=args.nasl_url,
             destination=args.nasl_destination,
+            marker=NASL_MARKER,
+            shards=args.nasl_shards,
         ),
     )
     gvmd_syncs = filter_syncs(
         args.gvmd_lock_file,
-        args.type,
+        feed_type,
         Sync(
             name="SCAP data",
             types=("scap", "all"),
             url=args.scap_data_url,
             destination=args.scap_data_destination,
+            marker=TIMESTAMP_MARKER,
         ),
         Sync(
             name="CERT-Bund data",
             types=("cert", "all"),
             url=args.cert_data_url,
             destination=args.cert_data_destination,
+            marker=TIMESTAMP_MARKER,
         ),
         Sync(
             name="gvmd data",
@@ -165,53 +1061,548 @@ async def feed_sync(console: Console, error_console: Console) -> int:
         ),
     )
 
-    has_error = False
-    wait_interval = None if args.no_wait else args.wait_interval
+    return [openvas_syncs, gvmd_syncs]
 
-    for sync_list in (openvas_syncs, gvmd_syncs):
-        if not sync_list.syncs:
-            continue
 
-        async with flock_wait(
-            sync_list.lock_file,
-            console=console if verbose else None,
-            wait_interval=wait_interval,
-        ):
-            for sync in sync_list.syncs:
-                try:
-                    rsync_coro = rsync.sync(
-                        url=sync.url, destination=sync.destination
-                    )
-                    if verbose >= 3:
-                        console.print(
-                            f"Downloading {sync.name} from {sync.url} to "
-                            f"{sync.destination}"
+def verbosity(args: Namespace) -> int:
+    """
+    Get the verbosity level from the parsed arguments
+    """
+    if args.quiet:
+        return 0
+    return DEFAULT_VERBOSITY if args.verbose is None else args.verbose
+
+
+async def sync_feeds(
+    args: Namespace,
+    *,
+    console: Console,
+    error_console: Console,
+    feed_type: str | None = None,
+) -> int:
+    """
+    Sync the feeds of a feed type once
+
+    If feed_type is not set the feed type of the arguments is used.
+    """
+    feed_type = feed_type or args.type
+    verbose = verbosity(args)
+
+    openvas_syncs, gvmd_syncs = feed_sync_lists(args, feed_type)
+    sync_lists = (openvas_syncs, gvmd_syncs)
+    # read the inventory first to fail before downloading
+    push_targets = read_inventory(args.push) if args.push else []
+    # copies of the downloaded data for the other destination prefixes
+    fan_out_lists = [
+        fan_out_sync_list(sync_list, args.destination_prefix, prefix)
+        for prefix in args.fan_out_prefixes or []
+        for sync_list in sync_lists
+    ]
+
+    syncs = [*openvas_syncs.syncs, *gvmd_syncs.syncs]
+    mirrors = list(dict.fromkeys([args.feed_url, *(args.feed_mirrors or [])]))
+    async with ssh_control_master(
+        [
+            rebase_url(sync.url, args.feed_url, mirror)
+            for sync in syncs
+            for mirror in mirrors
+        ],
+        ssh_key=args.greenbone_enterprise_feed_key,
+        console=console if verbose >= 1 else None,
+    ) as ssh_control_path:
+        rsync = Rsync(
+            private_subdir=args.private_directory,
+            verbose=verbose >= 3,
+            compression_level=args.compression_level,
+            ssh_key=args.greenbone_enterprise_feed_key,
+            change_permissions=not args.no_permission_change,
+            ssh_control_path=ssh_control_path,
+            partial_dir=DEFAULT_RSYNC_PARTIAL_DIR if args.retries else None,
+        )
+        cache_file = mirror_cache_file(args.destination_prefix)
+
+        def print_probe(probe: MirrorProbe) -> None:
+            if verbose < 2:
+                return
+            if probe.latency is None:
+                console.print(f"Feed mirror {probe.url} failed: {probe.error}")
+            else:
+                console.print(
+                    f"Feed mirror {probe.url} responded in "
+                    f"{probe.latency:.2f} seconds."
+                )
+
+        def print_failover(error: Exception, url: str, next_url: str) -> None:
+            invalidate_ranking(cache_file)
+            if verbose >= 1:
+                console.print(
+                    f"Connecting to {url} failed. Trying {next_url} instead."
+                )
+
+        if len(mirrors) > 1 and syncs:
+            mirrors = await select_mirrors(
+                rsync,
+                mirrors,
+                cache_file=cache_file,
+                ttl=args.mirror_cache_ttl,
+                on_probe=print_probe,
+            )
+            if verbose >= 1:
+                console.print(f"Using feed mirror {mirrors[0]}.")
+
+        def lock_feed(sync: Sync, commit_lock: CommitLock | None) -> CommitLock:
+            @asynccontextmanager
+            async def feed_commit_lock() -> AsyncGenerator[None, None]:
+                async with AsyncExitStack() as stack:
+                    if commit_lock:
+                        await stack.enter_async_context(commit_lock())
+                    await stack.enter_async_context(
+                        flock_wait(
+                            feed_lock_file(sync.destination),
+                            console=console if verbose else None,
+                            wait_interval=(
+                                None if args.no_wait else args.wait_interval
+                            ),
+                            blocking=args.blocking_lock,
+                            timeout=args.lock_timeout,
                         )
-                        await rsync_coro
-                        # add newline after rsync
-                        console.print()
-                    elif verbose >= 1:
-                        with Spinner(
-                            console,
-                            f"Downloading {sync.name} from {sync.url} to "
-                            f"{sync.destination}",
-                        ):
-                            await rsync_coro
-                    else:
-                        await rsync_coro
-                except RsyncError as e:
-                    has_error = True
-                    error_console.print(e.stderr)
-                    if args.fail_fast:
-                        return 1
+                    )
+                    yield
 
-        if verbose >= 2:
-            # add newline for grouping lock
-            console.print()
+            return feed_commit_lock
+
+        async def sync_feed(
+            sync: Sync, *, commit_lock: CommitLock | None = None
+        ) -> None:
+            if args.feed_locks:
+                feed_state_directory(sync.destination).mkdir(
+                    parents=True, exist_ok=True
+                )
+                commit_lock = lock_feed(sync, commit_lock)
+
+            # the local copies of the fan-out don't use batch files and are
+            # not verified again
+            is_download = sync in syncs
+
+            def download(url: str) -> Awaitable[None]:
+                return run_sync(
+                    replace(sync, url=url),
+                    rsync,
+                    console=console,
+                    verbose=verbose,
+                    # a live display can only be shown for one sync at a time
+                    show_spinner=args.parallel <= 1,
+                    record_changes=args.record_changes,
+                    pre_check=args.pre_check,
+                    keep_snapshots=(
+                        args.snapshots or DEFAULT_KEEP_SNAPSHOTS
+                        if args.staged
+                        else args.snapshots
+                    ),
+                    commit_lock=commit_lock,
+                    retries=args.retries,
+                    retry_deadline=args.retry_deadline,
+                    write_batch=(
+                        batch_file(args.write_batch, sync.name)
+                        if args.write_batch and is_download
+                        else None
+                    ),
+                    read_batch=(
+                        batch_file(args.read_batch, sync.name)
+                        if args.read_batch and is_download
+                        else None
+                    ),
+                    verify=args.verify and is_download,
+                    verify_workers=args.verify_workers,
+                    tree_manifest=args.tree_manifest,
+                    incremental=args.incremental and is_download,
+                    merkle_digest=args.merkle_digest,
+                )
+
+            await failover(
+                [rebase_url(sync.url, args.feed_url, m) for m in mirrors],
+                download,
+                on_failover=print_failover,
+            )
+
+            if args.feed_locks:
+                write_completion_marker(sync.destination)
+            if args.completion_hook:
+                await run_completion_hook(
+                    args.completion_hook, sync.name, sync.destination
+                )
+
+        def run_lists(sync_lists: Iterable[SyncList]) -> Awaitable[bool]:
+            return run_sync_lists(
+                sync_lists,
+                sync_feed,
+                console=console,
+                error_console=error_console,
+                verbose=verbose,
+                parallel=args.parallel,
+                fail_fast=args.fail_fast,
+                wait_interval=None if args.no_wait else args.wait_interval,
+                blocking_lock=args.blocking_lock,
+                lock_timeout=args.lock_timeout,
+                staged=args.staged,
+            )
+
+        has_error = await run_lists(sync_lists)
+
+        # don't copy possibly incomplete data
+        if fan_out_lists and not has_error:
+            has_error = await run_lists(fan_out_lists)
+
+        if push_targets and not has_error:
+            has_error = await push_feeds(
+                args,
+                rsync,
+                push_targets,
+                [sync.destination for sync in syncs],
+                console=console,
+                error_console=error_console,
+                verbose=verbose,
+            )
 
     return 1 if has_error else 0
 
 
+@asynccontextmanager
+async def lock_sync_lists(
+    args: Namespace, sync_lists: Iterable[SyncList], *, console: Console
+) -> AsyncGenerator[None, None]:
+    """
+    Hold the lock files of all sync lists containing syncs
+    """
+    verbose = verbosity(args)
+    async with AsyncExitStack() as stack:
+        for sync_list in sync_lists:
+            if not sync_list.syncs:
+                continue
+            await stack.enter_async_context(
+                flock_wait(
+                    sync_list.lock_file,
+                    console=console if verbose else None,
+                    wait_interval=None if args.no_wait else args.wait_interval,
+                    blocking=args.blocking_lock,
+                    timeout=args.lock_timeout,
+                )
+            )
+        yield
+
+
+@asynccontextmanager
+async def lock_feeds(
+    args: Namespace, destinations: Iterable[Path], *, console: Console
+) -> AsyncGenerator[None, None]:
+    """
+    Hold the feed lock files of the destinations if feed locks are enabled
+    """
+    async with AsyncExitStack() as stack:
+        if args.feed_locks:
+            for destination in sorted(destinations):
+                feed_state_directory(destination).mkdir(
+                    parents=True, exist_ok=True
+                )
+                await stack.enter_async_context(
+                    flock_wait(
+                        feed_lock_file(destination),
+                        console=console if verbosity(args) else None,
+                        wait_interval=(
+                            None if args.no_wait else args.wait_interval
+                        ),
+                        blocking=args.blocking_lock,
+                        timeout=args.lock_timeout,
+                    )
+                )
+        yield
+
+
+async def export_feeds(args: Namespace, *, console: Console) -> int:
+    """
+    Export the synced feed data into an offline bundle
+
+    A delta bundle is written if the bundle last imported is passed as base.
+    """
+    sync_lists = feed_sync_lists(args, args.type)
+    destinations = [
+        sync.destination for sync_list in sync_lists for sync in sync_list.syncs
+    ]
+    base = (
+        await asyncio.to_thread(read_bundle_manifest, args.bundle_base)
+        if args.bundle_base
+        else None
+    )
+
+    # don't export data while it is updated
+    async with lock_sync_lists(args, sync_lists, console=console):
+        result = await asyncio.to_thread(
+            export_bundle,
+            args.export_bundle,
+            destinations,
+            prefix=args.destination_prefix,
+            exclude=feed_data_excludes(args),
+            base=base,
+        )
+
+    if verbosity(args) >= 1:
+        if base is None:
+            console.print(
+                f"Exported {len(result.manifest)} files of "
+                f"{len(destinations)} destinations to {args.export_bundle}."
+            )
+        else:
+            console.print(
+                f"Exported {len(result.changed)} changed and "
+                f"{len(result.deleted)} deleted files of {len(destinations)} "
+                f"destinations to {args.export_bundle}."
+            )
+    return 0
+
+
+async def import_feeds(args: Namespace, *, console: Console) -> int:
+    """
+    Install the feed data of an offline bundle
+    """
+    sync_lists = feed_sync_lists(args, args.type)
+    # unpacking and verifying doesn't need the locks
+    staged = await asyncio.to_thread(
+        unpack_bundle,
+        args.import_bundle,
+        prefix=args.destination_prefix,
+        destinations=[
+            sync.destination
+            for sync_list in sync_lists
+            for sync in sync_list.syncs
+        ],
+        exclude=feed_data_excludes(args),
+    )
+    imported = {staged_destination.destination for staged_destination in staged}
+
+    try:
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(
+                lock_sync_lists(
+                    args,
+                    [
+                        replace(
+                            sync_list,
+                            syncs=[
+                                sync
+                                for sync in sync_list.syncs
+                                if Path(sync.destination) in imported
+                            ],
+                        )
+                        for sync_list in sync_lists
+                    ],
+                    console=console,
+                )
+            )
+            await stack.enter_async_context(
+                lock_feeds(args, imported, console=console)
+            )
+            install_staged(
+                staged,
+                keep=[args.private_directory] if args.private_directory else [],
+            )
+    finally:
+        discard_staged(staged)
+
+    if args.feed_locks:
+        for destination in imported:
+            write_completion_marker(destination)
+
+    if verbosity(args) >= 1:
+        console.print(
+            f"Imported {len(imported)} destinations from {args.import_bundle}."
+        )
+    return 0
+
+
+async def rollback_feeds(args: Namespace, *, console: Console) -> int:
+    """
+    Activate the snapshot before the active one of each destination
+
+    Only destinations with snapshots are rolled back. The tree manifests and
+    Merkle digests describe the newer data and are removed. They are created
+    again by the next sync.
+    """
+    sync_lists = [
+        replace(
+            sync_list,
+            syncs=[
+                sync
+                for sync in sync_list.syncs
+                if Snapshots(sync.destination).current()
+            ],
+        )
+        for sync_list in feed_sync_lists(args, args.type)
+    ]
+    syncs = [sync for sync_list in sync_lists for sync in sync_list.syncs]
+    if not syncs:
+        raise GreenboneFeedSyncError("No snapshots to roll back to.")
+
+    destinations = [Path(sync.destination) for sync in syncs]
+    async with (
+        lock_sync_lists(args, sync_lists, console=console),
+        lock_feeds(args, destinations, console=console),
+    ):
+        for sync in syncs:
+            snapshot = Snapshots(sync.destination).rollback()
+            state_directory = feed_state_directory(sync.destination)
+            (state_directory / TREE_MANIFEST_FILE_NAME).unlink(missing_ok=True)
+            (state_directory / MERKLE_DIGEST_FILE_NAME).unlink(missing_ok=True)
+            if verbosity(args) >= 1:
+                console.print(f"Rolled back {sync.name} to {snapshot.name}.")
+
+    if args.feed_locks:
+        for destination in destinations:
+            write_completion_marker(destination)
+    return 0
+
+
+def compare_digests(args: Namespace, *, console: Console) -> int:
+    """
+    Print the differences of two Merkle digest files
+
+    Returns:
+        0 if the feed data is equal and 1 otherwise
+    """
+    first_file, second_file = args.compare_digests
+    differences = compare_merkle_digests(
+        read_merkle_digests(first_file), read_merkle_digests(second_file)
+    )
+    for difference in differences:
+        path = difference.path or "."
+        if difference.kind is DifferenceKind.FILES:
+            console.print(f"{path}: files differ")
+        elif difference.kind is DifferenceKind.ONLY_FIRST:
+            console.print(f"{path}: only in {first_file}")
+        else:
+            console.print(f"{path}: only in {second_file}")
+
+    if not differences and verbosity(args) >= 1:
+        console.print(f"{first_file} and {second_file} are equal.")
+    return 1 if differences else 0
+
+
+def validate_arguments(args: Namespace) -> None:
+    """
+    Check the arguments for settings that can't be combined
+
+    Raises:
+        ConfigError: If the arguments contain settings that can't be combined
+    """
+    if args.serve and not args.daemon:
+        raise ConfigError("Serving the feed data requires --daemon.")
+
+    if (args.write_batch or args.read_batch) and (
+        args.snapshots or args.staged
+    ):
+        raise ConfigError(
+            "Batch files can't be used together with snapshots or staged "
+            "downloads."
+        )
+
+    if args.incremental and (
+        args.snapshots or args.staged or args.write_batch or args.read_batch
+    ):
+        raise ConfigError(
+            "Incremental downloads can't be used together with snapshots, "
+            "staged downloads or batch files."
+        )
+
+    if args.bundle_base and not args.export_bundle:
+        raise ConfigError("A bundle base requires --export-bundle.")
+
+    if args.rollback and args.daemon:
+        raise ConfigError("A rollback can't be run in daemon mode.")
+
+    if args.import_bundle and (args.snapshots or args.staged):
+        raise ConfigError(
+            "Bundles can't be imported together with snapshots or staged "
+            "downloads."
+        )
+
+
+def load_arguments() -> Namespace:
+    """
+    Parse and validate the arguments and config
+    """
+    args = CliParser().parse_arguments()
+    validate_arguments(args)
+    return args
+
+
+async def feed_sync(console: Console, error_console: Console) -> int:
+    """
+    Sync the feeds
+    """
+    parser = CliParser()
+    args = parser.parse_arguments()
+
+    if args.compare_digests:
+        # doesn't need rsync or any feed data
+        return compare_digests(args, console=console)
+
+    do_selftest()
+
+    if args.selftest:
+        return 0
+
+    verbose = verbosity(args)
+
+    if is_root():
+        if verbose >= 1:
+            console.print(
+                f"Running as root. Switching to user '{args.user}' and "
+                f"group '{args.group}'."
+            )
+            change_user_and_group(args.user, args.group)
+
+    validate_arguments(args)
+
+    if args.export_bundle:
+        return await export_feeds(args, console=console)
+
+    if args.import_bundle:
+        return await import_feeds(args, console=console)
+
+    if args.rollback:
+        return await rollback_feeds(args, console=console)
+
+    if args.daemon:
+
+        def run_scheduled(args: Namespace, feed_type: str) -> Awaitable[int]:
+            if args.serve:
+                # the rsync daemon picks up changes for new connections
+                write_leader_config(args)
+            return sync_feeds(
+                args,
+                console=console,
+                error_console=error_console,
+                feed_type=feed_type,
+            )
+
+        daemon = Daemon(
+            load_arguments,
+            run_scheduled,
+            console=console,
+            error_console=error_console,
+            args=args,
+        )
+        if not args.serve:
+            return await daemon.run()
+
+        async with rsync_daemon(
+            write_leader_config(args),
+            console=console if verbose >= 1 else None,
+        ):
+            return await daemon.run()
+
+    return await sync_feeds(args, console=console, error_console=error_console)
+
+
 def main() -> NoReturn:
     """
     Main CLI function
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import tempfile
+from pathlib import Path
+
+from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.helper import feed_state_directory
+from greenbone.feed.sync.rsync import Rsync
+
+# files changing with every published version of a feed
+NASL_MARKER = "plugin_feed_info.inc"
+TIMESTAMP_MARKER = "timestamp"
+
+
+async def fetch_marker(
+    rsync: Rsync, url: str, destination: str | Path, marker: str
+) -> bytes | None:
+    """
+    Download the version marker file of a feed
+
+    Args:
+        rsync: Rsync instance to use for the download
+        url: URL of the feed directory
+        destination: Destination of the feed
+        marker: Name of the marker file within the feed directory
+
+    Returns:
+        The content of the marker file or None if it could not be downloaded
+    """
+    state_directory = feed_state_directory(destination)
+    state_directory.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=state_directory) as temp_dir:
+        path = Path(temp_dir) / marker
+        try:
+            await rsync.fetch_file(f"{url.rstrip('/')}/{marker}", path)
+        except RsyncError:
+            return None
+
+        return path.read_bytes()
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def is_up_to_date(destination: str | Path, marker: str, content: bytes) -> bool:
+    """
+    Check if the destination contains the feed version of a marker
+
+    The marker must match the file in the destination and the copy stored
+    after the last successful sync. The copy ensures that an interrupted sync
+    is not considered as being up to date.
+    """
+    return (
+        _read(Path(destination) / marker) == content
+        and _read(feed_state_directory(destination) / marker) == content
+    )
+
+
+def store_marker(destination: str | Path, marker: str, content: bytes) -> None:
+    """
+    Store the version marker after a successful sync
+    """
+    state_directory = feed_state_directory(destination)
+    state_directory.mkdir(parents=True, exist_ok=True)
+    path = state_directory / marker
+    temp_path = path.with_name(f".{marker}.tmp")
+    temp_path.write_bytes(content)
+    temp_path.replace(path)
@@ -0,0 +1,338 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from stat import S_ISLNK
+from typing import Any
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.tree import TreeEntry, TreeManifest
+
+MERKLE_DIGEST_FILE_NAME = "merkle-digest.json"
+MERKLE_DIGEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DirectoryDigest:
+    """
+    Merkle digest of a directory
+
+    Only the names, types and contents of the files are covered. Therefore
+    the digests of equal trees on different hosts match.
+
+    Args:
+        digest: Digest of the whole subtree of the directory
+        files: Digest of the files located directly in the directory
+        directories: Sorted names of the subdirectories
+    """
+
+    digest: str
+    files: str
+    directories: tuple[str, ...] = ()
+
+
+MerkleDigests = dict[str, DirectoryDigest]
+
+
+class DifferenceKind(Enum):
+    """
+    Kind of a difference between two trees
+    """
+
+    FILES = "files"
+    ONLY_FIRST = "only-first"
+    ONLY_SECOND = "only-second"
+
+
+@dataclass(frozen=True)
+class Difference:
+    """
+    A differing directory of two trees
+
+    Args:
+        path: Path of the directory. An empty string for the root.
+        kind: FILES if the files located directly in the directory differ.
+            ONLY_FIRST or ONLY_SECOND if the directory exists in one of the
+            trees only.
+    """
+
+    path: str
+    kind: DifferenceKind
+
+
+def _parent(path: str) -> str:
+    return path.rpartition("/")[0]
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+def _files_digest(entries: Iterable[TreeEntry]) -> str:
+    digest = hashlib.sha256()
+    for entry in sorted(entries, key=lambda entry: entry.path):
+        kind = "l" if S_ISLNK(entry.mode) else "f"
+        name = entry.path.rpartition("/")[2]
+        digest.update(
+            f"{kind} {name}\0".encode("utf8", errors="surrogateescape")
+        )
+        digest.update(entry.digest)
+    return digest.hexdigest()
+
+
+_NO_FILES_DIGEST = _files_digest([])
+
+
+def _directory_digest(
+    files: str, directories: MerkleDigests
+) -> DirectoryDigest:
+    digest = hashlib.sha256(files.encode("ascii"))
+    for name in sorted(directories):
+        digest.update(
+            f"d {name}\0{directories[name].digest}".encode(
+                "utf8", errors="surrogateescape"
+            )
+        )
+    return DirectoryDigest(
+        digest=digest.hexdigest(),
+        files=files,
+        directories=tuple(sorted(directories)),
+    )
+
+
+def _depth(path: str) -> int:
+    return path.count("/") + 1 if path else 0
+
+
+def _update_directories(
+    digests: MerkleDigests, manifest: TreeManifest, changed: set[str]
+) -> None:
+    # the parents of all changed directories need to be calculated again
+    pending = set(changed)
+    for path in changed:
+        parent = path
+        while parent:
+            parent = _parent(parent)
+            pending.add(parent)
+
+    subdirectories = {
+        directory: set(digests[directory].directories)
+        if directory in digests
+        else set()
+        for directory in pending
+    }
+    # bottom up. the subdirectories are done before their parent.
+    for directory in sorted(pending, key=_depth, reverse=True):
+        current = digests.get(directory)
+        files = (
+            _files_digest(manifest.directory_entries(directory))
+            if directory in changed or current is None
+            else current.files
+        )
+        names = [
+            name
+            for name in subdirectories[directory]
+            if _join(directory, name) in digests
+        ]
+        if directory and not names and files == _NO_FILES_DIGEST:
+            # empty directories are not covered
+            digests.pop(directory, None)
+            continue
+
+        digests[directory] = _directory_digest(
+            files, {name: digests[_join(directory, name)] for name in names}
+        )
+        if directory:
+            subdirectories[_parent(directory)].add(directory.rpartition("/")[2])
+
+
+def _remove_subtree(digests: MerkleDigests, directory: str) -> None:
+    pending = [directory]
+    while pending:
+        path = pending.pop()
+        current = digests.pop(path, None)
+        if current:
+            pending.extend(_join(path, name) for name in current.directories)
+
+
+def build_merkle_digests(manifest: TreeManifest) -> MerkleDigests:
+    """
+    Calculate the Merkle digests of all directories of a tree manifest
+
+    The root directory has the empty path and is always included.
+    """
+    digests: MerkleDigests = {}
+    _update_directories(digests, manifest, {"", *manifest.directories()})
+    return digests
+
+
+def update_merkle_digests(
+    digests: MerkleDigests, manifest: TreeManifest, changes: ChangeSet
+) -> None:
+    """
+    Apply the changes of a sync to the Merkle digests of a tree
+
+    Only the directories containing changed paths and their parents are
+    calculated again.
+
+    Args:
+        digests: The Merkle digests to update in place
+        manifest: The tree manifest already containing the changes
+        changes: The changes of the sync
+    """
+    changed = set()
+    for path in [*changes.added, *changes.updated]:
+        changed.add(_parent(path))
+    for deleted in changes.deleted:
+        path = deleted.rstrip("/")
+        if path in digests:
+            _remove_subtree(digests, path)
+        changed.add(_parent(path))
+    _update_directories(digests, manifest, changed)
+
+
+def read_merkle_digests(path: str | Path) -> MerkleDigests:
+    """
+    Load the Merkle digests of a tree
+
+    Raises:
+        GreenboneFeedSyncError: If the file doesn't exist or is invalid
+    """
+    try:
+        data: dict[str, Any] = json.loads(Path(path).read_text("utf8"))
+        if data.get("version") != MERKLE_DIGEST_VERSION:
+            raise ValueError("unknown version")
+        digests = {
+            str(directory): DirectoryDigest(
+                digest=str(item["digest"]),
+                files=str(item["files"]),
+                directories=tuple(str(name) for name in item["directories"]),
+            )
+            for directory, item in data["directories"].items()
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        raise GreenboneFeedSyncError(
+            f"Invalid Merkle digest file {path}."
+        ) from None
+    if "" not in digests or any(
+        _join(directory, name) not in digests
+        for directory, digest in digests.items()
+        for name in digest.directories
+    ):
+        raise GreenboneFeedSyncError(f"Invalid Merkle digest file {path}.")
+    return digests
+
+
+def write_merkle_digests(path: str | Path, digests: MerkleDigests) -> None:
+    """
+    Store the Merkle digests of a tree
+
+    The file is replaced atomically.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_name(f".{path.name}.tmp")
+    temp_file.write_text(
+        json.dumps(
+            {
+                "version": MERKLE_DIGEST_VERSION,
+                "directories": {
+                    directory: {
+                        "digest": digest.digest,
+                        "files": digest.files,
+                        "directories": list(digest.directories),
+                    }
+                    for directory, digest in sorted(digests.items())
+                },
+            }
+        ),
+        encoding="utf8",
+    )
+    temp_file.replace(path)
+
+
+def update_merkle_digest_file(
+    digest_file: str | Path,
+    manifest_file: str | Path,
+    changes: ChangeSet | None,
+) -> str:
+    """
+    Apply the changes of a sync to the Merkle digest file of a destination
+
+    The digests are calculated from scratch if the digest file doesn't
+    exist or is invalid or if no changes are passed.
+
+    Args:
+        digest_file: The Merkle digest file to update
+        manifest_file: The tree manifest of the destination already
+            containing the changes
+        changes: The changes of the sync
+
+    Returns:
+        The digest of the whole tree
+    """
+    with TreeManifest(manifest_file) as manifest:
+        try:
+            digests = (
+                read_merkle_digests(digest_file)
+                if changes is not None
+                else None
+            )
+        except GreenboneFeedSyncError:
+            digests = None
+
+        if digests is None:
+            digests = build_merkle_digests(manifest)
+        elif changes:
+            update_merkle_digests(digests, manifest, changes)
+        else:
+            return digests[""].digest
+
+    write_merkle_digests(digest_file, digests)
+    return digests[""].digest
+
+
+def compare_merkle_digests(
+    first: MerkleDigests, second: MerkleDigests
+) -> list[Difference]:
+    """
+    Find the differing directories of two trees
+
+    Only the subtrees with differing digests are descended into. Therefore
+    the effort depends on the number of differences and not on the size of
+    the trees.
+
+    Returns:
+        The differences sorted by path. An empty list if the trees are equal.
+    """
+    differences = []
+    pending = [""]
+    while pending:
+        directory = pending.pop()
+        first_digest, second_digest = first[directory], second[directory]
+        if first_digest.digest == second_digest.digest:
+            continue
+
+        if first_digest.files != second_digest.files:
+            differences.append(Difference(directory, DifferenceKind.FILES))
+
+        first_names = set(first_digest.directories)
+        second_names = set(second_digest.directories)
+        for name in first_names | second_names:
+            path = _join(directory, name)
+            if name not in second_names:
+                differences.append(Difference(path, DifferenceKind.ONLY_FIRST))
+            elif name not in first_names:
+                differences.append(Difference(path, DifferenceKind.ONLY_SECOND))
+            else:
+                pending.append(path)
+
+    return sorted(differences, key=lambda difference: difference.path)
@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.helper import FEED_STATE_DIRECTORY_NAME
+from greenbone.feed.sync.rsync import Rsync
+
+DEFAULT_MIRROR_CACHE_TTL = 60 * 60  # in seconds
+DEFAULT_MIRROR_PROBE_TIMEOUT = 10  # in seconds
+
+MIRROR_CACHE_FILE_NAME = "mirrors.json"
+
+# rsync exit codes caused by an unreachable server. 255 is returned by ssh.
+CONNECTION_ERROR_EXIT_CODES = frozenset(
+    {
+        5,  # error starting client-server protocol
+        10,  # error in socket I/O
+        35,  # timeout waiting for daemon connection
+        255,  # ssh connection failed
+    }
+)
+
+FailoverCallback = Callable[[Exception, str, str], None]
+
+
+@dataclass(frozen=True)
+class MirrorProbe:
+    """
+    Result of probing a feed mirror
+
+    Args:
+        url: URL of the mirror
+        latency: Time in seconds for connecting and listing the mirror. None
+            if the mirror is not reachable.
+        error: Error message if the mirror is not reachable
+    """
+
+    url: str
+    latency: float | None = None
+    error: str | None = None
+
+
+def mirror_cache_file(destination_prefix: str | Path) -> Path:
+    """
+    Get the file caching the ranking of the feed mirrors
+    """
+    return (
+        Path(destination_prefix)
+        / FEED_STATE_DIRECTORY_NAME
+        / MIRROR_CACHE_FILE_NAME
+    )
+
+
+def rebase_url(url: str, base_url: str, mirror: str) -> str:
+    """
+    Replace the base URL of the feed at the start of an URL with a mirror
+
+    URLs which don't start with the base URL are returned unchanged.
+    """
+    base_url = base_url.rstrip("/")
+    if url == base_url or url.startswith(f"{base_url}/"):
+        return f"{mirror.rstrip('/')}{url[len(base_url) :]}"
+    return url
+
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Check if an error is caused by an unreachable mirror
+    """
+    return (
+        isinstance(error, RsyncError)
+        and error.returncode in CONNECTION_ERROR_EXIT_CODES
+    )
+
+
+async def probe_mirror(
+    rsync: Rsync, url: str, *, timeout: int = DEFAULT_MIRROR_PROBE_TIMEOUT
+) -> MirrorProbe:
+    """
+    Measure the time to connect to a mirror and to list its top-level
+    directory
+    """
+    start = time.monotonic()
+    try:
+        await asyncio.wait_for(
+            rsync.list_directory(url, connect_timeout=timeout), timeout
+        )
+    except RsyncError as e:
+        return MirrorProbe(url, error=(e.stderr or str(e)).strip())
+    except asyncio.TimeoutError:
+        return MirrorProbe(url, error=f"Timeout after {timeout} seconds.")
+    return MirrorProbe(url, latency=time.monotonic() - start)
+
+
+def rank_mirrors(probes: Iterable[MirrorProbe]) -> list[str]:
+    """
+    Order the mirrors from the fastest to the slowest
+
+    Unreachable mirrors are put at the end in their original order.
+    """
+    probes = list(probes)
+    reachable = sorted(
+        (probe for probe in probes if probe.latency is not None),
+        key=lambda probe: probe.latency or 0.0,
+    )
+    unreachable = [probe for probe in probes if probe.latency is None]
+    return [probe.url for probe in [*reachable, *unreachable]]
+
+
+def load_ranking(
+    cache_file: Path, urls: Iterable[str], ttl: int
+) -> list[str] | None:
+    """
+    Load a cached ranking of the mirrors
+
+    Returns None if there is no ranking for these mirrors or if it is older
+    than ttl seconds.
+    """
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf8"))
+        cached_time = float(data["time"])
+        ranking = [str(url) for url in data["ranking"]]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+    if sorted(ranking) != sorted(urls):
+        return None
+    if not 0 <= time.time() - cached_time < ttl:
+        return None
+    return ranking
+
+
+def store_ranking(cache_file: Path, ranking: Iterable[str]) -> None:
+    """
+    Cache a ranking of the mirrors
+
+    The cache is only an optimization. Therefore errors are ignored.
+    """
+    temp_file = cache_file.with_name(f".{cache_file.name}.tmp")
+    with suppress(OSError):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file.write_text(
+            json.dumps({"time": time.time(), "ranking": list(ranking)}),
+            encoding="utf8",
+        )
+        temp_file.replace(cache_file)
+
+
+def invalidate_ranking(cache_file: Path) -> None:
+    """
+    Remove a cached ranking to probe the mirrors again on the next run
+    """
+    with suppress(OSError):
+        cache_file.unlink(missing_ok=True)
+
+
+async def select_mirrors(
+    rsync: Rsync,
+    urls: Iterable[str],
+    *,
+    cache_file: Path | None = None,
+    ttl: int = DEFAULT_MIRROR_CACHE_TTL,
+    timeout: int = DEFAULT_MIRROR_PROBE_TIMEOUT,
+    on_probe: Callable[[MirrorProbe], None] | None = None,
+) -> list[str]:
+    """
+    Probe the mirrors concurrently and rank them
+
+    A cached ranking is used if it is not older than ttl seconds. The new
+    ranking is written to the cache file.
+
+    Returns the URLs of the mirrors from the fastest to the slowest.
+    """
+    urls = list(urls)
+    if cache_file and ttl > 0:
+        ranking = load_ranking(cache_file, urls, ttl)
+        if ranking:
+            return ranking
+
+    probes = await asyncio.gather(
+        *(probe_mirror(rsync, url, timeout=timeout) for url in urls)
+    )
+    if on_probe:
+        for probe in probes:
+            on_probe(probe)
+
+    ranking = rank_mirrors(probes)
+    if cache_file and ttl > 0:
+        store_ranking(cache_file, ranking)
+    return ranking
+
+
+async def failover(
+    urls: Iterable[str],
+    func: Callable[[str], Awaitable[None]],
+    *,
+    on_failover: FailoverCallback | None = None,
+) -> None:
+    """
+    Call func with the first URL and with the next one each time it fails
+    because of a connection error
+
+    Args:
+        urls: URLs to try in order
+        func: Function returning a new awaitable for an URL
+        on_failover: Optional callback getting the error, the failed URL and
+            the next URL
+
+    Raises:
+        The error of the last URL or a non connection error
+    """
+    urls = list(dict.fromkeys(urls))
+    for url, next_url in zip(urls, [*urls[1:], None]):
+        try:
+            await func(url)
+            return
+        except Exception as e:
+            if next_url is None or not is_connection_error(e):
+                raise
+
+            if on_failover:
+                on_failover(e, url, next_url)
@@ -18,9 +18,30 @@ from greenbone.feed.sync.config import (
     Config,
     ConfigDict,
     EnterpriseSettings,
+    host_list,
     maybe_int,
+    path_list,
+)
+from greenbone.feed.sync.daemon import (
+    parse_interval,
+    parse_jitter,
+    parse_schedule,
+)
+from greenbone.feed.sync.errors import ConfigError, ConfigFileError
+from greenbone.feed.sync.leader import leader_url
+
+FEED_TYPES = (
+    "all",
+    "nvt",
+    "gvmd-data",
+    "scap",
+    "cert",
+    "notus",
+    "nasl",
+    "report-format",
+    "scan-config",
+    "port-list",
 )
-from greenbone.feed.sync.errors import ConfigFileError
 
 
 def _to_defaults(values: ConfigDict) -> dict[str, Any]:
@@ -45,6 +66,19 @@ def feed_type(value: str) -> str:
     return value
 
 
+def feed_schedule(value: str) -> dict[str, int]:
+    """
+    Converts to a dict of feed types and their sync intervals in seconds
+    """
+    schedule = {}
+    for name, interval in parse_schedule(value).items():
+        key = feed_type(name)
+        if key not in FEED_TYPES:
+            raise ConfigError(f"Invalid feed type '{key}' in schedule.")
+        schedule[key] = interval
+    return schedule
+
+
 class CliParser:
     """
     An ArgumentParser for the feed sync CLI
@@ -103,18 +137,7 @@ class CliParser:
         )
         parser.add_argument(
             "--type",
-            choices=[
-                "all",
-                "nvt",
-                "gvmd-data",
-                "scap",
-                "cert",
-                "notus",
-                "nasl",
-                "report-format",
-                "scan-config",
-                "port-list",
-            ],
+            choices=FEED_TYPES,
             default="all",
             type=feed_type,
             help="Select which feed should be synced. (Default: %(default)s)",
@@ -132,6 +155,14 @@ class CliParser:
             type=Path,
             help="Prefix for the destination directories. (Default: %(default)s)",
         )
+        parser.add_argument(
+            "--fan-out-prefixes",
+            type=path_list,
+            help="Comma separated list of additional destination prefixes. "
+            "The feed data is downloaded only once into the destination "
+            "prefix and copied into these prefixes afterwards. Files are "
+            "hardlinked if possible.",
+        )
         parser.add_argument(
             "--gvmd-data-destination",
             type=Path,
@@ -249,6 +280,249 @@ class CliParser:
             "tries to download additional data if specified.",
         )
 
+        parser.add_argument(
+            "--retries",
+            type=int,
+            help="Number of times to retry a download if rsync fails because "
+            "of a transient error like a timeout or a broken connection. "
+            "Partially downloaded files are kept and the download is resumed. "
+            "(Default: %(default)s)",
+        )
+        parser.add_argument(
+            "--retry-deadline",
+            type=int,
+            help="Don't start a retry of a download after this number of "
+            "seconds since the first attempt.",
+        )
+        parser.add_argument(
+            "--pre-check",
+            action="store_true",
+            help="Download only a small version marker file of the NASL, "
+            "SCAP and CERT-Bund data first and skip the full download if the "
+            "feed has not changed since the last successful sync.",
+        )
+        parser.add_argument(
+            "--record-changes",
+            action="store_true",
+            help="Write the added, updated and deleted files of each download "
+            "as JSON lines to .feed-sync/<destination name>/last-changes.jsonl "
+            "next to the destination directory.",
+        )
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            help="Maximum number of downloads to run at the same time, "
+            "including the downloads of independent lock files. "
+            "(Default: %(default)s)",
+        )
+        parser.add_argument(
+            "--snapshots",
+            type=int,
+            help="Number of versioned snapshots of the downloaded data to "
+            "keep. Each download creates a new snapshot and the destination "
+            "is switched to it atomically after the download has finished. "
+            "0 disables snapshots. (Default: %(default)s)",
+        )
+        parser.add_argument(
+            "--staged",
+            action="store_true",
+            help="Download into a new snapshot without holding the lock file "
+            "and take the lock file only for switching to the new snapshot. "
+            "Keeps 3 snapshots if --snapshots is not set.",
+        )
+        parser.add_argument(
+            "--feed-locks",
+            action="store_true",
+            help="Additionally lock .feed-sync/<destination name>/feed.lock "
+            "next to the destination while changing the data of a feed and "
+            "write the time of its completion to "
+            ".feed-sync/<destination name>/completed directly afterwards.",
+        )
+        parser.add_argument(
+            "--completion-hook",
+            help="Command to run as soon as the data of a feed has been "
+            "downloaded successfully. The destination of the feed is passed "
+            "as argument.",
+        )
+        parser.add_argument(
+            "--nasl-shards",
+            type=int,
+            help="Number of rsync processes to download the NASL files with. "
+            "The top-level directories of the NASL files are distributed "
+            "onto the processes. (Default: %(default)s)",
+        )
+        batch_group = parser.add_mutually_exclusive_group()
+        batch_group.add_argument(
+            "--write-batch",
+            type=Path,
+            metavar="DIRECTORY",
+            help="Record the downloads into rsync batch files in DIRECTORY. "
+            "The batch files can be applied to other hosts with the same "
+            "version of the feed data via --read-batch.",
+        )
+        batch_group.add_argument(
+            "--read-batch",
+            type=Path,
+            metavar="DIRECTORY",
+            help="Apply the rsync batch files from DIRECTORY written via "
+            "--write-batch instead of downloading. Feed data not matching "
+            "the version the batch files were recorded against is "
+            "downloaded as usual.",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Verify the downloaded files against the sha256sums file of "
+            "the feed data after each sync. Corrupted and missing files are "
+            "downloaded again.",
+        )
+        parser.add_argument(
+            "--verify-workers",
+            type=int,
+            help="Number of processes to calculate the checksums with for "
+            "--verify and --tree-manifest. Default is the number of CPUs.",
+        )
+        parser.add_argument(
+            "--tree-manifest",
+            action="store_true",
+            help="Maintain a binary manifest with the size, modification "
+            "time, mode and checksum of all files of each destination. The "
+            "manifest is updated with the changes reported by rsync.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Download only the files changed according to the sha256sums "
+            "file of the feed data instead of comparing the whole file list "
+            "via rsync. Feed data without a sha256sums file or with many "
+            "changes is downloaded as usual.",
+        )
+        parser.add_argument(
+            "--merkle-digest",
+            action="store_true",
+            help="Maintain a Merkle digest file of each destination for "
+            "comparing the feed data of several hosts via --compare-digests. "
+            "Implies --tree-manifest.",
+        )
+        parser.add_argument(
+            "--compare-digests",
+            type=Path,
+            nargs=2,
+            metavar=("FIRST", "SECOND"),
+            help="Print the directories differing between two Merkle digest "
+            "files written via --merkle-digest instead of syncing. Exits with "
+            "1 if the feed data differs.",
+        )
+        bundle_group = parser.add_mutually_exclusive_group()
+        bundle_group.add_argument(
+            "--export-bundle",
+            type=Path,
+            metavar="FILE",
+            help="Write the already synced feed data into a zstd compressed "
+            "bundle FILE for hosts without network access instead of "
+            "syncing.",
+        )
+        bundle_group.add_argument(
+            "--import-bundle",
+            type=Path,
+            metavar="FILE",
+            help="Verify and install the feed data of a bundle FILE written "
+            "via --export-bundle instead of syncing.",
+        )
+        bundle_group.add_argument(
+            "--rollback",
+            action="store_true",
+            help="Switch the destinations back to the snapshot before the "
+            "active one instead of syncing. Requires data downloaded with "
+            "--snapshots or --staged.",
+        )
+        parser.add_argument(
+            "--bundle-base",
+            type=Path,
+            metavar="FILE",
+            help="Write a delta bundle with --export-bundle which only "
+            "contains the changes since the bundle FILE. The delta bundle can "
+            "only be imported on hosts which imported the bundle FILE last.",
+        )
+        parser.add_argument(
+            "--push",
+            type=Path,
+            metavar="INVENTORY",
+            help="Push the downloaded feed data to the hosts listed in the "
+            "INVENTORY file via ssh after a successful sync. The file "
+            "contains one host per line, optionally with a user, port and "
+            "destination prefix like ssh://user@host:22/prefix.",
+        )
+        parser.add_argument(
+            "--push-concurrency",
+            type=int,
+            help="Maximum number of hosts to push the feed data to at the "
+            "same time. (Default: %(default)s)",
+        )
+        parser.add_argument(
+            "--push-retries",
+            type=int,
+            help="Number of retries for pushing to a host after a transient "
+            "rsync or connection error. (Default: %(default)s)",
+        )
+
+        daemon_group = parser.add_argument_group("daemon and leader mode")
+        daemon_group.add_argument(
+            "--daemon",
+            action="store_true",
+            help="Keep running and sync the feed repeatedly. SIGHUP reloads "
+            "the config file and SIGTERM stops the daemon.",
+        )
+        daemon_group.add_argument(
+            "--daemon-interval",
+            type=parse_interval,
+            help="Time between two syncs in daemon mode in seconds or with "
+            "a s, m, h or d suffix. (Default: %(default)s seconds)",
+        )
+        daemon_group.add_argument(
+            "--daemon-jitter",
+            type=parse_jitter,
+            help="Maximum random delay added to the interval in daemon mode "
+            "to spread the load on the feed server. (Default: %(default)s "
+            "seconds)",
+        )
+        daemon_group.add_argument(
+            "--serve",
+            action="store_true",
+            help="Serve the downloaded feed data to followers via an rsync "
+            "daemon while running with --daemon.",
+        )
+        daemon_group.add_argument(
+            "--serve-address",
+            help="Address the rsync daemon listens on. Use 0.0.0.0 or :: "
+            "for listening on all addresses. (Default: %(default)s)",
+        )
+        daemon_group.add_argument(
+            "--serve-port",
+            type=int,
+            help="Port the rsync daemon listens on. (Default: %(default)s)",
+        )
+        daemon_group.add_argument(
+            "--serve-hosts-allow",
+            type=host_list,
+            help="Comma separated list of hosts, addresses or networks like "
+            "192.168.0.0/24 allowed to download from the rsync daemon. All "
+            "other hosts are denied.",
+        )
+        daemon_group.add_argument(
+            "--daemon-schedule",
+            type=feed_schedule,
+            help="Sync intervals per feed type in daemon mode for example "
+            "nvt=6h,scap=1d. Overrides --type and --daemon-interval.",
+        )
+        daemon_group.add_argument(
+            "--leader-url",
+            type=leader_url,
+            help="Download the feed data from the rsync daemon of a leader "
+            "instead of the feed url. Either a host name with an optional "
+            "port or an rsync URL.",
+        )
+
         wait_group = parser.add_mutually_exclusive_group()
         wait_group.add_argument(
             "--no-wait",
@@ -261,6 +535,19 @@ class CliParser:
             help="Time to wait in seconds after failed lock attempt before"
             "re-trying to lock the file. (Default: %(default)s seconds)",
         )
+        wait_group.add_argument(
+            "--blocking-lock",
+            action="store_true",
+            help="Wait until the lock file is released instead of re-trying "
+            "to lock the file every wait interval. The lock is acquired "
+            "directly after the other process has released it.",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=int,
+            help="Maximum time in seconds to wait for a lock file. By default "
+            "there is no limit.",
+        )
 
         parser.add_argument(
             "--rsync-timeout",
@@ -370,6 +657,9 @@ class CliParser:
         if known_args.destination_prefix:
             config["destination-prefix"] = known_args.destination_prefix
 
+        if known_args.leader_url:
+            config["leader-url"] = known_args.leader_url
+
         if self.parser.prog == "greenbone-nvt-sync":
             config["type"] = "nvt"
         elif self.parser.prog == "greenbone-scapdata-sync":
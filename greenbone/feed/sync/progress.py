@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import re
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+
+# Output format for each transferred or deleted file. The itemized changes
+# come first because they never contain the path.
+RSYNC_OUT_FORMAT = "%i %l %n"
+
+_UNITS = {
+    "B": 1,
+    "kB": 1024,
+    "MB": 1024**2,
+    "GB": 1024**3,
+    "TB": 1024**4,
+}
+
+_PROGRESS_REGEX = re.compile(
+    r"^\s*(?P<bytes>[\d,.]+)\s+(?P<percent>\d+)%\s+"
+    r"(?P<rate>[\d,.]+)(?P<unit>[kMGT]?B)/s\s+"
+    r"(?P<time>\d+:\d{2}:\d{2})"
+    r"(?:\s+\(xfr#(?P<transferred>\d+),\s+(?:ir|to)-chk="
+    r"(?P<to_check>\d+)/(?P<total>\d+)\))?\s*$"
+)
+# rsync escapes the bytes of non-printable characters in names as \#ooo
+_ESCAPE_REGEX = re.compile(rb"\\#([0-7]{3})")
+_FILE_REGEX = re.compile(
+    r"^(?P<changes>[<>ch.][fdLDS].{9}|\*deleting\s*)\s+"
+    r"(?:(?P<size>\d+)\s+)?(?P<path>.+)$"
+)
+
+
+@dataclass(frozen=True)
+class TransferProgress:
+    """
+    Overall progress of a rsync transfer
+
+    Args:
+        bytes_transferred: Number of bytes transferred so far
+        percent: Percentage of the transfer being done
+        rate: Current transfer rate in bytes per second
+        eta: Estimated remaining time in seconds. After the transfer has
+            finished rsync reports the elapsed time instead.
+        transferred_files: Number of files transferred so far
+        files_to_check: Number of files still to be checked
+        total_files: Number of files known to rsync so far
+    """
+
+    bytes_transferred: int
+    percent: int
+    rate: float
+    eta: int
+    transferred_files: int | None = None
+    files_to_check: int | None = None
+    total_files: int | None = None
+
+
+@dataclass(frozen=True)
+class FileTransfer:
+    """
+    A file handled by rsync
+
+    Args:
+        path: Path of the file relative to the destination
+        size: Size of the file in bytes
+        changes: The itemized changes of the file, for example
+            ``>f+++++++++`` for a new file or ``*deleting`` for a deleted
+            file.
+    """
+
+    path: str
+    size: int
+    changes: str
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.changes.startswith("*deleting")
+
+    @property
+    def is_directory(self) -> bool:
+        return not self.is_deleted and self.changes[1] == "d"
+
+    @property
+    def is_new(self) -> bool:
+        return not self.is_deleted and self.changes[2:].startswith("+")
+
+
+RsyncEvent = TransferProgress | FileTransfer
+EventHandler = Callable[[RsyncEvent], None]
+
+
+def _to_int(value: str) -> int:
+    return int(value.replace(",", "").replace(".", ""))
+
+
+def _to_seconds(value: str) -> int:
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _unescape(name: str) -> str:
+    if "\\#" not in name:
+        return name
+    return _ESCAPE_REGEX.sub(
+        lambda match: bytes([int(match.group(1), 8)]),
+        name.encode("utf8", errors="surrogateescape"),
+    ).decode("utf8", errors="surrogateescape")
+
+
+def parse_rsync_output(line: str) -> RsyncEvent | None:
+    """
+    Parse a line of the rsync output
+
+    The output is expected to be created with ``--info=progress2``,
+    ``--8-bit-output`` and ``--out-format`` set to RSYNC_OUT_FORMAT. Names
+    still escaped by rsync are unescaped.
+
+    Returns a TransferProgress or FileTransfer event or None if the line is
+    not known.
+    """
+    match = _PROGRESS_REGEX.match(line)
+    if match:
+        transferred = match.group("transferred")
+        return TransferProgress(
+            bytes_transferred=_to_int(match.group("bytes")),
+            percent=int(match.group("percent")),
+            rate=float(match.group("rate").replace(",", ""))
+            * _UNITS[match.group("unit")],
+            eta=_to_seconds(match.group("time")),
+            transferred_files=None if transferred is None else int(transferred),
+            files_to_check=(
+                None if transferred is None else int(match.group("to_check"))
+            ),
+            total_files=(
+                None if transferred is None else int(match.group("total"))
+            ),
+        )
+
+    match = _FILE_REGEX.match(line)
+    if match:
+        size = match.group("size")
+        return FileTransfer(
+            path=_unescape(match.group("path")),
+            size=0 if size is None else int(size),
+            changes=match.group("changes").strip(),
+        )
+
+    return None
+
+
+async def read_lines(
+    stream: asyncio.StreamReader, chunk_size: int = 64 * 1024
+) -> AsyncIterator[str]:
+    """
+    Read lines from a stream without keeping the whole output in memory
+
+    Besides newlines carriage returns are used as line separators because
+    rsync uses them for updating its progress output.
+    """
+    buffer = b""
+    while chunk := await stream.read(chunk_size):
+        buffer += chunk
+        *lines, buffer = re.split(rb"[\r\n]", buffer)
+        for line in lines:
+            if line:
+                yield line.decode("utf8", errors="replace")
+
+    if buffer:
+        yield buffer.decode("utf8", errors="replace")
+
+
+class RsyncProgress:
+    """
+    Parse the rsync output and pass the resulting events to all subscribed
+    handlers
+
+    Example:
+
+        .. code-block:: python
+
+            progress = RsyncProgress()
+            progress.subscribe(print)
+            await rsync.sync(url, destination, progress=progress)
+    """
+
+    def __init__(self) -> None:
+        self._handlers: list[EventHandler] = []
+        self.last_progress: TransferProgress | None = None
+        self.files = 0
+
+    def subscribe(self, handler: EventHandler) -> None:
+        """
+        Call handler for each event
+        """
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: EventHandler) -> None:
+        """
+        Don't call handler for events anymore
+        """
+        self._handlers.remove(handler)
+
+    def __call__(self, line: str) -> None:
+        event = parse_rsync_output(line)
+        if event is None:
+            return
+
+        if isinstance(event, TransferProgress):
+            self.last_progress = event
+        else:
+            self.files += 1
+
+        for handler in self._handlers:
+            handler(event)
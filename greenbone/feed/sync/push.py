@@ -0,0 +1,264 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from greenbone.feed.sync.errors import ConfigError, GreenboneFeedSyncError
+from greenbone.feed.sync.fanout import rebase_path
+from greenbone.feed.sync.mirror import is_connection_error
+from greenbone.feed.sync.progress import RsyncProgress
+from greenbone.feed.sync.retry import RetryCallback, is_retryable, retry
+from greenbone.feed.sync.rsync import Rsync
+
+DEFAULT_PUSH_CONCURRENCY = 4
+DEFAULT_PUSH_RETRIES = 2
+DEFAULT_PUSH_CONNECT_TIMEOUT = 30  # in seconds
+
+
+@dataclass(frozen=True)
+class PushTarget:
+    """
+    A remote host to push the feed data to
+
+    Args:
+        name: Name of the target as written in the inventory
+        netloc: User, host and port for connecting via ssh
+        prefix: Destination prefix on the remote host. If not set the feed
+            data is stored at the same paths as locally.
+    """
+
+    name: str
+    netloc: str
+    prefix: Path | None = None
+
+    def url(self, path: str | Path) -> str:
+        """
+        Get the ssh URL of a directory on the remote host
+        """
+        return f"ssh://{self.netloc}{Path(path).absolute()}/"
+
+
+@dataclass(frozen=True)
+class PushResult:
+    """
+    Result of pushing the feed data to a target
+
+    Args:
+        target: The target the data has been pushed to
+        duration: Time spent for all attempts in seconds
+        bytes_transferred: Number of file bytes transferred by all attempts
+        attempts: Number of attempts made
+        error: The error of the last attempt if pushing has failed
+    """
+
+    target: PushTarget
+    duration: float
+    bytes_transferred: int = 0
+    attempts: int = 1
+    error: Exception | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def parse_target(value: str) -> PushTarget:
+    """
+    Parse a target of an inventory file
+
+    A target is a host with an optional user, port and destination prefix,
+    for example ``sensor1``, ``admin@sensor2:2222`` or
+    ``ssh://admin@sensor3/opt/greenbone``.
+
+    Raises:
+        ConfigError: If the target is invalid
+    """
+    url = value if "://" in value else f"ssh://{value}"
+    try:
+        splitted = urlsplit(url)
+        # accessing the port raises a ValueError if it is invalid
+        hostname, _port = splitted.hostname, splitted.port
+    except ValueError:
+        raise ConfigError(f"Invalid push target '{value}'.") from None
+
+    if splitted.scheme != "ssh" or not hostname:
+        raise ConfigError(f"Invalid push target '{value}'.")
+
+    prefix = splitted.path.rstrip("/")
+    return PushTarget(
+        name=value,
+        netloc=splitted.netloc,
+        prefix=Path(prefix) if prefix else None,
+    )
+
+
+def read_inventory(inventory: str | Path) -> list[PushTarget]:
+    """
+    Read the targets of an inventory file
+
+    The file contains one target per line. Empty lines and lines starting
+    with # are ignored.
+
+    Raises:
+        ConfigError: If the file can't be read or contains an invalid target
+    """
+    try:
+        content = Path(inventory).read_text(encoding="utf8")
+    except OSError as e:
+        raise ConfigError(
+            f"Can't read push inventory {inventory}. {e}"
+        ) from None
+
+    targets = []
+    for line in content.splitlines():
+        value = line.strip()
+        if value and not value.startswith("#"):
+            targets.append(parse_target(value))
+    return targets
+
+
+def is_retryable_push(error: Exception) -> bool:
+    """
+    Check if pushing to a target can be retried after an error
+    """
+    return is_retryable(error) or is_connection_error(error)
+
+
+async def push_target(
+    rsync: Rsync,
+    target: PushTarget,
+    directories: Iterable[str | Path],
+    *,
+    prefix: str | Path,
+    retries: int = DEFAULT_PUSH_RETRIES,
+    retry_deadline: float | None = None,
+    connect_timeout: int | None = DEFAULT_PUSH_CONNECT_TIMEOUT,
+    on_retry: RetryCallback | None = None,
+) -> PushResult:
+    """
+    Push local directories to a target
+
+    The directories are pushed one after the other. If one of them fails
+    all directories are pushed again. Because rsync only transfers the
+    differences already pushed data is not transferred again.
+
+    Returns a PushResult. Errors are not raised but returned in the result.
+    """
+    directories = list(directories)
+    start = time.monotonic()
+    attempts = 0
+    transferred = 0
+
+    async def push_directories() -> None:
+        nonlocal attempts, transferred
+        attempts += 1
+        for directory in directories:
+            remote = (
+                rebase_path(directory, prefix, target.prefix)
+                if target.prefix
+                else directory
+            )
+            progress = RsyncProgress()
+            try:
+                await rsync.push(
+                    directory,
+                    target.url(remote),
+                    progress=progress,
+                    connect_timeout=connect_timeout,
+                )
+            finally:
+                if progress.last_progress:
+                    transferred += progress.last_progress.bytes_transferred
+
+    try:
+        await retry(
+            push_directories,
+            retries=retries,
+            deadline=retry_deadline,
+            should_retry=is_retryable_push,
+            on_retry=on_retry,
+        )
+    except GreenboneFeedSyncError as e:
+        error: Exception | None = e
+    else:
+        error = None
+
+    return PushResult(
+        target=target,
+        duration=time.monotonic() - start,
+        bytes_transferred=transferred,
+        attempts=attempts,
+        error=error,
+    )
+
+
+async def push(
+    rsync: Rsync,
+    targets: Iterable[PushTarget],
+    directories: Iterable[str | Path],
+    *,
+    prefix: str | Path,
+    concurrency: int = DEFAULT_PUSH_CONCURRENCY,
+    retries: int = DEFAULT_PUSH_RETRIES,
+    retry_deadline: float | None = None,
+    on_result: Callable[[PushResult], None] | None = None,
+    on_retry: Callable[[PushTarget, Exception, int, float], None] | None = None,
+) -> list[PushResult]:
+    """
+    Push local directories to several targets concurrently
+
+    At most concurrency targets are pushed to at the same time.
+
+    Args:
+        rsync: Rsync instance providing the options for the transfer
+        targets: Remote hosts to push to
+        directories: Local directories to push
+        prefix: Local destination prefix. The directories are moved into the
+            prefix of a target if it has one.
+        concurrency: Maximum number of targets to push to at the same time
+        retries: Maximum number of retries for each target
+        retry_deadline: Optional time in seconds after which no new attempt
+            is started for a target
+        on_result: Optional callback getting each result as soon as a target
+            is done
+        on_retry: Optional callback getting the target, the error, the
+            number of the failed attempt and the delay before the next attempt
+
+    Returns:
+        The results in the order of the targets
+    """
+    directories = list(directories)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def limited_push(target: PushTarget) -> PushResult:
+        def retry_callback(
+            error: Exception, attempt: int, delay: float
+        ) -> None:
+            if on_retry:
+                on_retry(target, error, attempt, delay)
+
+        async with semaphore:
+            result = await push_target(
+                rsync,
+                target,
+                directories,
+                prefix=prefix,
+                retries=retries,
+                retry_deadline=retry_deadline,
+                on_retry=retry_callback,
+            )
+
+        if on_result:
+            on_result(result)
+        return result
+
+    return list(
+        await asyncio.gather(*(limited_push(target) for target in targets))
+    )
@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from greenbone.feed.sync.errors import RsyncError
+
+T = TypeVar("T")
+
+DEFAULT_RETRIES = 0
+DEFAULT_RETRY_BASE_DELAY = 5  # in seconds
+DEFAULT_RETRY_MAX_DELAY = 300  # in seconds
+
+# rsync exit codes caused by transient network or remote side issues. See
+# the EXIT VALUES section of the rsync man page.
+RETRYABLE_RSYNC_EXIT_CODES = frozenset(
+    {
+        5,  # error starting client-server protocol
+        10,  # error in socket I/O
+        12,  # error in rsync protocol data stream
+        23,  # partial transfer due to error
+        24,  # partial transfer due to vanished source files
+        30,  # timeout in data send/receive
+        35,  # timeout waiting for daemon connection
+    }
+)
+
+RetryCallback = Callable[[Exception, int, float], None]
+
+
+@dataclass(frozen=True)
+class RetryResult(Generic[T]):
+    """
+    Result of a retried operation
+
+    Args:
+        result: The return value of the successful attempt
+        attempts: Number of attempts made including the successful one
+        duration: Time spent for all attempts and delays in seconds
+    """
+
+    result: T
+    attempts: int
+    duration: float
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check if an error is transient and the failed operation can be retried
+    """
+    return (
+        isinstance(error, RsyncError)
+        and error.returncode in RETRYABLE_RSYNC_EXIT_CODES
+    )
+
+
+def backoff_delay(
+    attempt: int,
+    *,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+) -> float:
+    """
+    Get the delay before the next attempt after a failed attempt
+
+    The delay is doubled for each attempt up to max_delay. A random jitter of
+    up to half of the delay is applied to avoid that many clients retry at
+    the same time.
+    """
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def retry(
+    func: Callable[[], Awaitable[T]],
+    *,
+    retries: int = DEFAULT_RETRIES,
+    deadline: float | None = None,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+    should_retry: Callable[[Exception], bool] = is_retryable,
+    on_retry: RetryCallback | None = None,
+) -> RetryResult[T]:
+    """
+    Call func until it succeeds, a non retryable error occurs or the retries
+    are exhausted
+
+    Args:
+        func: Function returning a new awaitable for each attempt
+        retries: Maximum number of retries after the first attempt
+        deadline: Optional time in seconds after which no new attempt is
+            started
+        base_delay: Delay before the first retry in seconds
+        max_delay: Maximum delay between attempts in seconds
+        should_retry: Function to decide if an error is retryable
+        on_retry: Optional callback getting the error, the number of the
+            failed attempt and the delay before the next attempt
+
+    Returns:
+        A RetryResult with the return value of func
+
+    Raises:
+        The error of the last attempt
+    """
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = await func()
+            return RetryResult(
+                result=result,
+                attempts=attempt,
+                duration=time.monotonic() - start,
+            )
+        except Exception as e:
+            if attempt > retries or not should_retry(e):
+                raise
+
+            delay = backoff_delay(
+                attempt, base_delay=base_delay, max_delay=max_delay
+            )
+            if (
+                deadline is not None
+                and time.monotonic() - start + delay > deadline
+            ):
+                raise
+
+            if on_retry:
+                on_retry(e, attempt, delay)
+
+            await asyncio.sleep(delay)
@@ -4,36 +4,97 @@
 #
 
 import asyncio
+import fnmatch
 import os
-from collections.abc import Iterable
+import re
+import shlex
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import urlsplit
 
+from greenbone.feed.sync.changes import ChangeSet
 from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.progress import (
+    RSYNC_OUT_FORMAT,
+    RsyncProgress,
+    read_lines,
+)
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
 
 
-async def exec_rsync(*args: str) -> None:
+async def exec_rsync(
+    *args: str, output_handler: Callable[[str], None] | None = None
+) -> None:
     """
     Run rsync
 
+    The rsync process is killed if the calling task gets cancelled.
+
     Argument:
         args: Arguments for rsync
+        output_handler: Optional callable to pass each line of the stdout
+            output of rsync to. The output is processed while rsync is
+            running and is not kept in memory.
     """
-    process = await asyncio.create_subprocess_exec(
-        "rsync", *args, stderr=asyncio.subprocess.PIPE
-    )
-    _, stderr = await process.communicate()
+    if output_handler is None:
+        process = await asyncio.create_subprocess_exec(
+            "rsync", *args, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+    else:
+        process = await asyncio.create_subprocess_exec(
+            "rsync",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stderr_task = asyncio.create_task(process.stderr.read())  # type: ignore[union-attr]
+        try:
+            async for line in read_lines(process.stdout):  # type: ignore[arg-type]
+                output_handler(line)
+            stderr = await stderr_task
+        except BaseException:
+            stderr_task.cancel()
+            await _kill(process)
+            raise
+
     returncode = await process.wait()
     if returncode:
         raise RsyncError(returncode, args, stderr=stderr)
 
 
+async def _run_rsync(
+    args: Iterable[str], progress: RsyncProgress | None
+) -> None:
+    # only pass an output handler if the output is going to be parsed
+    if progress:
+        await exec_rsync(*args, output_handler=progress)
+    else:
+        await exec_rsync(*args)
+
+
 DEFAULT_RSYNC_URL = "rsync://feed.community.greenbone.net/community"
 DEFAULT_RSYNC_COMPRESSION_LEVEL = 9
 DEFAULT_RSYNC_TIMEOUT: int | None = (
     None  # in seconds. 0 means no timeout and None use rsync default
 )
 DEFAULT_RSYNC_SSH_PORT = 24
+DEFAULT_RSYNC_PARTIAL_DIR = ".rsync-partial"
 DEFAULT_RSYNC_SSH_OPTS = (
     "-o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no"
 )
@@ -41,6 +102,65 @@ DEFAULT_RSYNC_SSH_OPTS = (
 PathLike = os.PathLike | str
 
 
+@dataclass(frozen=True)
+class RemoteEntry:
+    """
+    An entry of a remote directory listing
+
+    Args:
+        name: Name of the file or directory
+        is_directory: True if the entry is a directory
+    """
+
+    name: str
+    is_directory: bool
+
+
+def parse_list_only_output(line: str) -> RemoteEntry | None:
+    """
+    Parse a line of the ``rsync --list-only`` output
+
+    Returns None for the listed directory itself and for unknown lines.
+    """
+    parts = line.split(None, 4)
+    if len(parts) != 5 or len(parts[0]) != 10:
+        return None
+
+    mode, name = parts[0], parts[4]
+    if mode.startswith("l"):
+        name = name.split(" -> ", 1)[0]
+    if name == ".":
+        return None
+
+    return RemoteEntry(name=name, is_directory=mode.startswith("d"))
+
+
+def split_shards(
+    entries: Iterable[RemoteEntry], shards: int
+) -> list[list[RemoteEntry]]:
+    """
+    Distribute entries round-robin onto at most shards non-empty lists
+    """
+    sorted_entries = sorted(entries, key=lambda entry: entry.name)
+    count = max(min(shards, len(sorted_entries)), 1)
+    return [sorted_entries[i::count] for i in range(count)]
+
+
+def _escape_pattern(name: str) -> str:
+    return re.sub(r"([*?\[\\])", r"\\\1", name)
+
+
+def _shard_filter_options(entries: Iterable[RemoteEntry]) -> list[str]:
+    options = []
+    for entry in entries:
+        name = _escape_pattern(entry.name)
+        options.append(f"--include=/{name}")
+        if entry.is_directory:
+            options.append(f"--include=/{name}/**")
+    options.append("--exclude=/*")
+    return options
+
+
 class Rsync:
     """
     Class to sync the feed data via rsync
@@ -59,6 +179,11 @@ class Rsync:
             to pass ``--no-perms`` instead, for storage that allows writing
             files but rejects changing their modes (for example some bind
             mounts, network filesystems or container volumes).
+        ssh_control_path: Control path of a shared ssh master connection to
+            use for the ssh transport. See ssh_control_master.
+        partial_dir: Keep partially transferred files in this directory,
+            relative to the destination, instead of next to the complete
+            files. A following run resumes the transfer of these files.
 
     """
 
@@ -72,6 +197,8 @@ class Rsync:
         ssh_key: PathLike | None = None,
         exclude: Iterable[PathLike] | None = None,
         change_permissions: bool = True,
+        ssh_control_path: PathLike | None = None,
+        partial_dir: str | None = None,
     ) -> None:
         self.verbose = verbose
         self.private_subdir = private_subdir
@@ -80,40 +207,32 @@ class Rsync:
         self.ssh_key = ssh_key
         self.exclude = exclude
         self.change_permissions = change_permissions
+        self.ssh_control_path = ssh_control_path
+        self.partial_dir = partial_dir
 
-    async def sync(self, url: str, destination: PathLike) -> None:
+    def _transport(
+        self, url: str, connect_timeout: int | None = None
+    ) -> tuple[list[str], str]:
         """
-        Sync data from a remote URL to a destination path
-
-        Args:
-            url: URL to sync
-            destination: Path to store the downloaded data
+        Get the rsync options for the transport and the URL to pass to rsync
         """
-        dest = Path(destination)
-        dest.mkdir(parents=True, exist_ok=True)
         splitted_url = urlsplit(url)
+        if "ssh" not in splitted_url.scheme:
+            if connect_timeout is not None and splitted_url.scheme == "rsync":
+                return [f"--contimeout={connect_timeout}"], url
+            return [], url
 
-        rsync_default_options = [
-            "--links",
-            "--times",
-            "--omit-dir-times",
-            "--recursive",
-            "--partial",
-            "--progress",
-        ]
-
-        if "ssh" in splitted_url.scheme:
-            port = splitted_url.port or DEFAULT_RSYNC_SSH_PORT
-            # we use ssh now
-            rsync_ssh_options = [
-                "-e",
-                f"ssh {DEFAULT_RSYNC_SSH_OPTS} -p {port} -i '{self.ssh_key}'",
-            ]
-            url = f"{splitted_url.netloc}:{splitted_url.path}"
-        else:
-            rsync_ssh_options = []
+        port = splitted_url.port or DEFAULT_RSYNC_SSH_PORT
+        ssh = f"ssh {DEFAULT_RSYNC_SSH_OPTS} -p {port} -i '{self.ssh_key}'"
+        if self.ssh_control_path:
+            ssh += f" -o ControlPath='{self.ssh_control_path}'"
+        if connect_timeout is not None:
+            ssh += f" -o ConnectTimeout={connect_timeout}"
+        # we use ssh now
+        return ["-e", ssh], f"{splitted_url.netloc}:{splitted_url.path}"
 
-        rsync_timeout = (
+    def _timeout_options(self) -> list[str]:
+        return (
             [
                 f"--timeout={self.timeout}",
             ]
@@ -121,7 +240,8 @@ class Rsync:
             else []
         )
 
-        rsync_compress = (
+    def _compress_options(self) -> list[str]:
+        return (
             [
                 f"--compress-level={self.compression_level}",
             ]
@@ -129,6 +249,161 @@ class Rsync:
             else []
         )
 
+    async def fetch_file(self, url: str, destination: PathLike) -> None:
+        """
+        Download a single file
+
+        Args:
+            url: URL of the file to download
+            destination: Path of the file to store the downloaded data
+        """
+        rsync_ssh_options, url = self._transport(url)
+        args = [
+            "--times",
+            *rsync_ssh_options,
+            *self._timeout_options(),
+            "-q",
+            *self._compress_options(),
+            url,
+            os.fspath(destination),
+        ]
+        await exec_rsync(*args)
+
+    async def list_directory(
+        self, url: str, *, connect_timeout: int | None = None
+    ) -> list[RemoteEntry]:
+        """
+        List the entries of a remote directory without recursing
+
+        Args:
+            url: URL of the directory to list
+            connect_timeout: Optional timeout in seconds for establishing
+                the connection to the server
+        """
+        entries: list[RemoteEntry] = []
+
+        def add_entry(line: str) -> None:
+            entry = parse_list_only_output(line)
+            if entry:
+                entries.append(entry)
+
+        rsync_ssh_options, url = self._transport(
+            f"{url.rstrip('/')}/", connect_timeout
+        )
+        args = [
+            "--list-only",
+            *rsync_ssh_options,
+            *self._timeout_options(),
+            url,
+        ]
+        await exec_rsync(*args, output_handler=add_entry)
+        return entries
+
+    def _is_excluded(self, name: str) -> bool:
+        excludes = list(self.exclude or [])
+        if self.private_subdir:
+            excludes.append(self.private_subdir)
+        if self.partial_dir and not Path(self.partial_dir).is_absolute():
+            # a relative partial directory is kept within the destination
+            excludes.append(Path(self.partial_dir).parts[0])
+        return any(
+            fnmatch.fnmatch(name, os.fspath(exclude).strip("/"))
+            for exclude in excludes
+        )
+
+    async def _sync_shards(
+        self,
+        url: str,
+        destination: Path,
+        args: list[str],
+        shards: int,
+        progress: RsyncProgress | None,
+        change_set: ChangeSet | None,
+    ) -> None:
+        entries = await self.list_directory(url)
+        if not entries:
+            # nothing to shard. let a single rsync handle the deletions.
+            await _run_rsync(args, progress)
+            return
+
+        *options, source, dest = args
+        tasks = [
+            asyncio.create_task(
+                _run_rsync(
+                    [*options, *_shard_filter_options(shard), source, dest],
+                    progress,
+                )
+            )
+            for shard in split_shards(entries, shards)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # top-level entries removed upstream are not part of any shard
+        remote_names = {entry.name for entry in entries}
+        for path in sorted(destination.iterdir()):
+            if path.name in remote_names or self._is_excluded(path.name):
+                continue
+
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+                deleted = f"{path.name}/"
+            else:
+                path.unlink()
+                deleted = path.name
+
+            if change_set is not None:
+                change_set.deleted.append(deleted)
+
+    def _transfer_options(
+        self,
+        transport_options: list[str],
+        *,
+        progress: RsyncProgress | None = None,
+        link_dest: PathLike | None = None,
+        compress: bool = True,
+    ) -> list[str]:
+        """
+        Get the rsync options for transferring a directory tree
+
+        The options are shared between downloading and pushing the feed data.
+        """
+        rsync_default_options = [
+            "--links",
+            "--times",
+            "--omit-dir-times",
+            "--recursive",
+            (
+                f"--partial-dir={self.partial_dir}"
+                if self.partial_dir
+                else "--partial"
+            ),
+        ]
+        if progress:
+            rsync_default_options.extend(
+                [
+                    "--info=progress2",
+                    # don't escape non-ASCII characters of the names
+                    "--8-bit-output",
+                    f"--out-format={RSYNC_OUT_FORMAT}",
+                ]
+            )
+        else:
+            rsync_default_options.append("--progress")
+
+        if link_dest:
+            rsync_default_options.append(
+                f"--link-dest={Path(link_dest).absolute()}"
+            )
+
+        rsync_timeout = self._timeout_options()
+        rsync_compress = self._compress_options() if compress else []
+
         rsync_delete = [
             "--delete",
         ]
@@ -156,18 +431,253 @@ class Rsync:
             for exclude in self.exclude:
                 rsync_delete.extend(["--exclude", os.fspath(exclude)])
 
-        rsync_verbose = ["-v"] if self.verbose else ["-q"]
+        if progress:
+            # the output is parsed and must not be changed by verbosity
+            rsync_verbose = []
+        else:
+            rsync_verbose = ["-v"] if self.verbose else ["-q"]
 
-        args = (
+        return (
             rsync_default_options
-            + rsync_ssh_options
+            + transport_options
             + rsync_timeout
             + rsync_verbose
             + rsync_compress
             + rsync_delete
             + rsync_chmod
             + rsync_links
-            + [url, str(dest.absolute())]
         )
 
-        await exec_rsync(*args)
+    async def sync(
+        self,
+        url: str,
+        destination: PathLike,
+        *,
+        progress: RsyncProgress | None = None,
+        changes: bool = False,
+        shards: int = 1,
+        link_dest: PathLike | None = None,
+        write_batch: PathLike | None = None,
+    ) -> ChangeSet | None:
+        """
+        Sync data from a remote URL to a destination path
+
+        Args:
+            url: URL to sync
+            destination: Path to store the downloaded data
+            progress: Optional RsyncProgress to stream the parsed output of
+                rsync to. If set the overall progress and each transferred
+                file are reported instead of printing the rsync output.
+            changes: Collect the itemized changes of rsync and return them.
+            shards: Number of rsync processes to run concurrently. If greater
+                than 1 the top-level entries of the remote directory are
+                listed and distributed onto the rsync processes. Top-level
+                entries removed upstream are deleted afterwards.
+            link_dest: Optional directory with a previous version of the data.
+                Unchanged files are hardlinked from this directory instead of
+                being transferred.
+            write_batch: Optional file to record the transfer into. The
+                batch file can be applied to other copies of the destination
+                via read_batch. Sharding is disabled for recording a batch.
+
+        Returns:
+            A ChangeSet with the added, updated and deleted paths if changes
+            is set. None otherwise.
+        """
+        change_set = None
+        if changes:
+            change_set = ChangeSet()
+            if not progress:
+                progress = RsyncProgress()
+            progress.subscribe(change_set.add)
+
+        dest = Path(destination)
+        dest.mkdir(parents=True, exist_ok=True)
+
+        rsync_ssh_options, source = self._transport(url)
+        if write_batch:
+            rsync_ssh_options.append(
+                f"--write-batch={Path(write_batch).absolute()}"
+            )
+            shards = 1
+        args = [
+            *self._transfer_options(
+                rsync_ssh_options, progress=progress, link_dest=link_dest
+            ),
+            source,
+            str(dest.absolute()),
+        ]
+
+        try:
+            if shards > 1:
+                await self._sync_shards(
+                    url, dest, args, shards, progress, change_set
+                )
+            else:
+                await _run_rsync(args, progress)
+        finally:
+            if change_set is not None:
+                progress.unsubscribe(change_set.add)  # type: ignore[union-attr]
+
+        return change_set
+
+    async def fetch_files(
+        self,
+        url: str,
+        destination: PathLike,
+        files: Iterable[str],
+        *,
+        progress: RsyncProgress | None = None,
+    ) -> None:
+        """
+        Download selected files of a remote directory again
+
+        The files are transferred even if their size and modification time
+        match. Therefore corrupted files are replaced too.
+
+        Args:
+            url: URL of the remote directory
+            destination: Path of the local directory
+            files: Paths of the files relative to the directory
+            progress: Optional RsyncProgress to stream the parsed output of
+                rsync to
+        """
+        dest = Path(destination)
+        rsync_ssh_options, source = self._transport(f"{url.rstrip('/')}/")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files_from = Path(temp_dir) / "files"
+            files_from.write_text(
+                "".join(f"{file}\n" for file in files),
+                encoding="utf8",
+                errors="surrogateescape",
+            )
+            args = [
+                *self._transfer_options(
+                    [
+                        *rsync_ssh_options,
+                        f"--files-from={files_from}",
+                        "--ignore-times",
+                    ],
+                    progress=progress,
+                ),
+                source,
+                str(dest.absolute()),
+            ]
+            await _run_rsync(args, progress)
+
+    async def fetch_directory_files(
+        self,
+        url: str,
+        destination: PathLike,
+        *,
+        compare_dest: PathLike | None = None,
+    ) -> None:
+        """
+        Download the files of a remote directory without its subdirectories
+
+        Args:
+            url: URL of the remote directory
+            destination: Path of the local directory
+            compare_dest: Optional directory to compare the files with. Files
+                matching the ones in this directory are not downloaded.
+        """
+        dest = Path(destination)
+        dest.mkdir(parents=True, exist_ok=True)
+        rsync_ssh_options, source = self._transport(f"{url.rstrip('/')}/")
+        args = [
+            "--links",
+            "--times",
+            "--dirs",
+            "--exclude=*/",
+            *rsync_ssh_options,
+            *self._timeout_options(),
+            "-q",
+            *self._compress_options(),
+        ]
+        if compare_dest:
+            args.append(f"--compare-dest={Path(compare_dest).absolute()}")
+        await exec_rsync(*args, source, str(dest.absolute()))
+
+    async def read_batch(
+        self,
+        batch: PathLike,
+        destination: PathLike,
+        *,
+        progress: RsyncProgress | None = None,
+    ) -> None:
+        """
+        Apply a batch file recorded via sync to a destination
+
+        The destination must have the same content as the destination of
+        the recorded sync before recording. No remote connection is required.
+
+        Args:
+            batch: Batch file written by sync
+            destination: Path of the data to update
+            progress: Optional RsyncProgress to stream the parsed output of
+                rsync to
+        """
+        dest = Path(destination)
+        dest.mkdir(parents=True, exist_ok=True)
+        args = [
+            *self._transfer_options(
+                [f"--read-batch={Path(batch).absolute()}"],
+                progress=progress,
+                # the recorded data is applied as is
+                compress=False,
+            ),
+            str(dest.absolute()),
+        ]
+        await _run_rsync(args, progress)
+
+    async def push(
+        self,
+        source: PathLike,
+        url: str,
+        *,
+        progress: RsyncProgress | None = None,
+        connect_timeout: int | None = None,
+    ) -> None:
+        """
+        Upload a local directory to a remote host via ssh
+
+        The same options as for downloading are used. Therefore the remote
+        directory gets an exact copy including permissions, hard links and
+        deletions. Missing parent directories are created on the remote host.
+
+        Args:
+            source: Local directory to upload
+            url: ssh URL of the remote directory, for example
+                ``ssh://user@host:22/var/lib/openvas/plugins``
+            progress: Optional RsyncProgress to stream the parsed output of
+                rsync to
+            connect_timeout: Optional timeout in seconds for establishing the
+                ssh connection
+        """
+        splitted_url = urlsplit(url)
+        # use the ssh config of the user for the remote hosts
+        ssh = "ssh -o BatchMode=yes"
+        if splitted_url.port:
+            ssh += f" -p {splitted_url.port}"
+        if connect_timeout is not None:
+            ssh += f" -o ConnectTimeout={connect_timeout}"
+
+        path = splitted_url.path.rstrip("/") or "/"
+        host = (
+            splitted_url.netloc.rsplit(":", 1)[0]
+            if splitted_url.port
+            else splitted_url.netloc
+        )
+        args = [
+            *self._transfer_options(
+                [
+                    "-e",
+                    ssh,
+                    f"--rsync-path=mkdir -p {shlex.quote(path)} && rsync",
+                ],
+                progress=progress,
+            ),
+            f"{Path(source).absolute()}/",
+            f"{host}:{path}/",
+        ]
+        await _run_rsync(args, progress)
@@ -0,0 +1,241 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.helper import feed_state_directory
+
+SNAPSHOTS_DIRECTORY_NAME = "snapshots"
+CURRENT_LINK_NAME = "current"
+PARTIAL_SUFFIX = ".partial"
+
+DEFAULT_KEEP_SNAPSHOTS = 3
+
+
+def _replace_symlink(link: Path, target: str) -> None:
+    # a symlink can't be overwritten directly. therefore create a new one and
+    # rename it to get an atomic replacement.
+    temp_link = link.with_name(f".{link.name}.tmp")
+    temp_link.unlink(missing_ok=True)
+    temp_link.symlink_to(target)
+    temp_link.replace(link)
+
+
+def _files(directory: Path) -> set[str]:
+    files = set()
+    for root, dirs, filenames in os.walk(directory):
+        relative = Path(root).relative_to(directory)
+        for name in filenames:
+            files.add((relative / name).as_posix())
+        # don't follow symlinks to directories
+        for name in dirs:
+            if (Path(root) / name).is_symlink():
+                files.add((relative / name).as_posix())
+    return files
+
+
+class Snapshots:
+    """
+    Versioned snapshots of a sync destination
+
+    Each snapshot is a complete directory tree in the state directory of the
+    destination. The destination itself is a symlink to the ``current``
+    symlink in the state directory which points to the active snapshot.
+    Therefore the active snapshot can be switched atomically by replacing the
+    ``current`` symlink.
+
+    Args:
+        destination: Destination of the sync
+    """
+
+    def __init__(self, destination: str | Path) -> None:
+        self.destination = Path(destination)
+        self.state_directory = feed_state_directory(self.destination)
+        self.directory = self.state_directory / SNAPSHOTS_DIRECTORY_NAME
+        self.current_link = self.state_directory / CURRENT_LINK_NAME
+
+    def snapshots(self) -> list[Path]:
+        """
+        Get all complete snapshots ordered from the oldest to the newest
+        """
+        if not self.directory.exists():
+            return []
+        return sorted(
+            path
+            for path in self.directory.iterdir()
+            if path.is_dir() and not path.name.endswith(PARTIAL_SUFFIX)
+        )
+
+    def current(self) -> Path | None:
+        """
+        Get the active snapshot
+        """
+        if not self.current_link.is_symlink():
+            return None
+        return self.directory / self.current_link.readlink().name
+
+    def active_data(self) -> Path | None:
+        """
+        Get the directory with the data currently used by the consumers
+
+        This is the active snapshot or the destination directory itself if
+        it hasn't been turned into a symlink yet.
+        """
+        if self.destination.is_dir():
+            return self.destination.resolve()
+        return None
+
+    def link_destination(self) -> None:
+        """
+        Make the destination a symlink to the active snapshot
+
+        An existing destination directory is moved into the snapshots
+        directory and becomes the first snapshot.
+        """
+        target = os.path.relpath(self.current_link, self.destination.parent)
+        if self.destination.is_symlink():
+            if str(self.destination.readlink()) != target:
+                _replace_symlink(self.destination, target)
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.destination.exists():
+            if not self.destination.is_dir():
+                raise GreenboneFeedSyncError(
+                    f"{self.destination} is not a directory."
+                )
+            # name the snapshot after the last modification to sort it
+            # before the snapshots created afterwards
+            modified = datetime.fromtimestamp(
+                self.destination.stat().st_mtime, timezone.utc
+            )
+            snapshot = self._new_path(time=modified)
+            self.destination.rename(snapshot)
+            self.activate(snapshot)
+
+        _replace_symlink(self.destination, target)
+
+    def _new_path(self, suffix: str = "", time: datetime | None = None) -> Path:
+        time = time or datetime.now(timezone.utc)
+        name = time.strftime("%Y%m%dT%H%M%S.%fZ")
+        path = self.directory / f"{name}{suffix}"
+        count = 1
+        while (
+            path.exists() or path.with_name(path.name + PARTIAL_SUFFIX).exists()
+        ):
+            path = self.directory / f"{name}-{count}{suffix}"
+            count += 1
+        return path
+
+    def create(self) -> Path:
+        """
+        Create a new incomplete snapshot directory to sync into
+
+        The snapshot has to be completed via complete afterwards.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._new_path(PARTIAL_SUFFIX)
+        path.mkdir()
+        return path
+
+    def complete(self, partial: Path) -> Path:
+        """
+        Mark an incomplete snapshot as complete
+        """
+        path = partial.with_name(partial.name.removesuffix(PARTIAL_SUFFIX))
+        partial.rename(path)
+        return path
+
+    def activate(self, snapshot: Path) -> None:
+        """
+        Switch the active snapshot atomically
+        """
+        _replace_symlink(
+            self.current_link,
+            os.path.relpath(snapshot, self.current_link.parent),
+        )
+
+    def rollback(self) -> Path:
+        """
+        Activate the snapshot before the active one
+
+        Returns the activated snapshot.
+        """
+        snapshots = self.snapshots()
+        current = self.current()
+        older = [
+            snapshot
+            for snapshot in snapshots
+            if current is None or snapshot.name < current.name
+        ]
+        if not older:
+            raise GreenboneFeedSyncError(
+                f"No snapshot of {self.destination} to roll back to."
+            )
+
+        self.activate(older[-1])
+        return older[-1]
+
+    def prune(self, keep: int = DEFAULT_KEEP_SNAPSHOTS) -> list[Path]:
+        """
+        Remove all but the newest snapshots and incomplete snapshots
+
+        The active snapshot is never removed.
+
+        Returns the removed snapshots.
+        """
+        current = self.current()
+        keep_snapshots = set(self.snapshots()[-keep:] if keep > 0 else [])
+        if current:
+            keep_snapshots.add(current)
+
+        removed = []
+        if self.directory.exists():
+            for path in sorted(self.directory.iterdir()):
+                if path in keep_snapshots:
+                    continue
+                shutil.rmtree(path)
+                removed.append(path)
+        return removed
+
+    def carry_over(self, previous: Path, snapshot: Path, name: str) -> None:
+        """
+        Hardlink a directory which is not part of the sync, like the private
+        directory, from the previous snapshot into a new one
+        """
+        source = previous / name
+        if source.is_dir() and not (snapshot / name).exists():
+            shutil.copytree(
+                source, snapshot / name, symlinks=True, copy_function=os.link
+            )
+
+    @staticmethod
+    def fix_changes(
+        change_set: ChangeSet, previous: Path | None, snapshot: Path
+    ) -> None:
+        """
+        Adjust a change set of a sync into a new snapshot
+
+        rsync reports all transferred files of a new snapshot as added and
+        doesn't report deleted files because the snapshot directory was
+        empty. Therefore compare the new snapshot with the previous one.
+        """
+        if previous is None:
+            return
+
+        previous_files = _files(previous)
+        added = []
+        for path in change_set.added:
+            if path in previous_files:
+                change_set.updated.append(path)
+            else:
+                added.append(path)
+        change_set.added = added
+        change_set.deleted.extend(sorted(previous_files - _files(snapshot)))
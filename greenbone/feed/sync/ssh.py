@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import shlex
+import shutil
+import tempfile
+from collections.abc import AsyncGenerator, Iterable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from rich.console import Console
+
+from greenbone.feed.sync.rsync import (
+    DEFAULT_RSYNC_SSH_OPTS,
+    DEFAULT_RSYNC_SSH_PORT,
+    PathLike,
+)
+
+DEFAULT_SSH_CONNECT_TIMEOUT = 30  # in seconds
+SSH_CHECK_INTERVAL = 0.1  # in seconds
+
+# %C is a hash of the local host, remote host, port and user. Therefore a
+# single control path pattern can be used for all connections.
+SSH_CONTROL_PATH_PATTERN = "%C"
+
+
+def ssh_destinations(urls: Iterable[str]) -> list[tuple[str, int]]:
+    """
+    Get the unique ssh destinations and ports of URLs using the ssh transport
+    """
+    destinations = []
+    for url in urls:
+        splitted_url = urlsplit(url)
+        if "ssh" not in splitted_url.scheme or not splitted_url.hostname:
+            continue
+
+        destination = splitted_url.hostname
+        if splitted_url.username:
+            destination = f"{splitted_url.username}@{destination}"
+
+        port = splitted_url.port or DEFAULT_RSYNC_SSH_PORT
+        if (destination, port) not in destinations:
+            destinations.append((destination, port))
+    return destinations
+
+
+def _ssh_args(
+    destination: str, port: int, ssh_key: PathLike, control_path: Path
+) -> list[str]:
+    return [
+        *shlex.split(DEFAULT_RSYNC_SSH_OPTS),
+        "-p",
+        str(port),
+        "-i",
+        str(ssh_key),
+        "-o",
+        f"ControlPath={control_path}",
+        destination,
+    ]
+
+
+async def _control(
+    operation: str,
+    destination: str,
+    port: int,
+    ssh_key: PathLike,
+    control_path: Path,
+) -> bool:
+    process = await asyncio.create_subprocess_exec(
+        "ssh",
+        "-O",
+        operation,
+        *_ssh_args(destination, port, ssh_key, control_path),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    return await process.wait() == 0
+
+
+async def _start_master(
+    destination: str,
+    port: int,
+    ssh_key: PathLike,
+    control_path: Path,
+    timeout: float,
+) -> asyncio.subprocess.Process | None:
+    process = await asyncio.create_subprocess_exec(
+        "ssh",
+        "-M",
+        "-N",
+        "-o",
+        "ControlPersist=no",
+        "-o",
+        f"ConnectTimeout={int(timeout)}",
+        *_ssh_args(destination, port, ssh_key, control_path),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        while process.returncode is None and loop.time() < deadline:
+            if await _control(
+                "check", destination, port, ssh_key, control_path
+            ):
+                return process
+            await asyncio.sleep(SSH_CHECK_INTERVAL)
+    except BaseException:
+        await _stop_master(process)
+        raise
+
+    await _stop_master(process)
+    return None
+
+
+async def _stop_master(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
+    await process.wait()
+
+
+@asynccontextmanager
+async def ssh_control_master(
+    urls: Iterable[str],
+    *,
+    ssh_key: PathLike | None,
+    console: Console | None = None,
+    timeout: float = DEFAULT_SSH_CONNECT_TIMEOUT,
+) -> AsyncGenerator[Path | None, None]:
+    """
+    Open a shared ssh master connection for each ssh destination of the URLs
+
+    The master connections are opened concurrently. All ssh clients using
+    the yielded control path reuse the master connection instead of opening
+    a new connection and doing a new key exchange. If a master connection
+    can't be established the clients connect on their own. The master
+    connections are closed and the control sockets are removed when leaving
+    the context, also on errors and cancellation.
+
+    Yields the control path to pass to ssh or None if no URL uses the ssh
+    transport.
+
+    Example:
+
+        .. code-block:: python
+
+            async with ssh_control_master(urls, ssh_key=key) as control_path:
+                rsync = Rsync(ssh_key=key, ssh_control_path=control_path)
+    """
+    destinations = ssh_destinations(urls)
+    if not destinations or not ssh_key:
+        yield None
+        return
+
+    # unix socket paths are limited to about 100 characters. therefore use a
+    # short temporary directory.
+    socket_dir = Path(tempfile.mkdtemp(prefix="gfs-ssh-"))
+    control_path = socket_dir / SSH_CONTROL_PATH_PATTERN
+    masters: list[tuple[str, int, asyncio.subprocess.Process]] = []
+    try:
+        # connect to all destinations at the same time. unreachable
+        # destinations like mirrors being down delay the syncs only once by
+        # the connect timeout.
+        tasks = [
+            asyncio.create_task(
+                _start_master(destination, port, ssh_key, control_path, timeout)
+            )
+            for destination, port in destinations
+        ]
+        try:
+            processes = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, asyncio.subprocess.Process):
+                    await _stop_master(result)
+            raise
+
+        for (destination, port), process in zip(destinations, processes):
+            if process:
+                masters.append((destination, port, process))
+            elif console:
+                console.print(
+                    f"Could not open a shared ssh connection to "
+                    f"{destination}. Using separate connections."
+                )
+
+        yield control_path
+    finally:
+        for destination, port, process in masters:
+            if process.returncode is None:
+                await _control("exit", destination, port, ssh_key, control_path)
+            await _stop_master(process)
+
+        shutil.rmtree(socket_dir, ignore_errors=True)
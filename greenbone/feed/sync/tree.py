@@ -0,0 +1,442 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from stat import S_ISLNK, S_ISREG
+from types import TracebackType
+from typing import final
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.verify import hash_files
+
+TREE_MANIFEST_FILE_NAME = "tree-manifest.bin"
+
+_MAGIC = b"GFTM"
+_VERSION = 1
+# magic, version, reserved, number of directories, number of entries and
+# size of the string table
+_HEADER = struct.Struct("<4sHHIII")
+# name offset, name length, index of the first entry and number of entries
+_DIRECTORY = struct.Struct("<IIII")
+# name offset, name length, mode, reserved, size, mtime in ns and digest
+_ENTRY = struct.Struct("<IIIIQq32s")
+
+
+def _encode(name: str) -> bytes:
+    return name.encode("utf8", errors="surrogateescape")
+
+
+def _decode(name: bytes) -> str:
+    return name.decode("utf8", errors="surrogateescape")
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    """
+    A file or symlink of a destination
+
+    Args:
+        path: Path relative to the destination
+        mode: File mode as returned by lstat
+        size: Size in bytes
+        mtime_ns: Modification time in nanoseconds
+        digest: SHA-256 digest of the content of a file or of the target of
+            a symlink
+    """
+
+    path: str
+    mode: int
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+
+@final
+class TreeManifest:
+    """
+    Read-only view of a binary tree manifest
+
+    The file is memory-mapped. Entries are looked up via binary search
+    without loading the whole manifest.
+
+    The file consists of a header, a table of the directories sorted by
+    their path, a table of fixed-width entries sorted by directory and name
+    and a string table containing each directory path and name once.
+
+    Example:
+
+        .. code-block:: python
+
+            with TreeManifest(path) as manifest:
+                entry = manifest.get("2024/foo.nasl")
+
+    Raises:
+        FileNotFoundError: If the manifest doesn't exist
+        GreenboneFeedSyncError: If the manifest is invalid
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            try:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                raise self._invalid() from None
+
+        if len(self._data) < _HEADER.size:
+            self.close()
+            raise self._invalid()
+
+        magic, version, _, directories, entries, strings_size = (
+            _HEADER.unpack_from(self._data)
+        )
+        self._directories = directories
+        self._entries = entries
+        self._entries_offset = _HEADER.size + directories * _DIRECTORY.size
+        self._strings_offset = self._entries_offset + entries * _ENTRY.size
+        if (
+            magic != _MAGIC
+            or version != _VERSION
+            or len(self._data) != self._strings_offset + strings_size
+        ):
+            self.close()
+            raise self._invalid()
+
+    def _invalid(self) -> GreenboneFeedSyncError:
+        return GreenboneFeedSyncError(f"Invalid tree manifest {self.path}.")
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> "TreeManifest":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._data[start : start + length]
+
+    def _directory(self, index: int) -> tuple[bytes, int, int]:
+        offset, length, first, count = _DIRECTORY.unpack_from(
+            self._data, _HEADER.size + index * _DIRECTORY.size
+        )
+        return self._string(offset, length), first, count
+
+    def _entry(self, index: int) -> tuple[bytes, int, int, int, bytes]:
+        offset, length, mode, _, size, mtime_ns, digest = _ENTRY.unpack_from(
+            self._data, self._entries_offset + index * _ENTRY.size
+        )
+        return self._string(offset, length), mode, size, mtime_ns, digest
+
+    def _find_directory(self, name: bytes) -> int | None:
+        low, high = 0, self._directories
+        while low < high:
+            middle = (low + high) // 2
+            if self._directory(middle)[0] < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._directories and self._directory(low)[0] == name:
+            return low
+        return None
+
+    def get(self, path: str) -> TreeEntry | None:
+        """
+        Look up the entry of a path
+        """
+        directory_name, _, name = _encode(path).rpartition(b"/")
+        directory = self._find_directory(directory_name)
+        if directory is None:
+            return None
+
+        _, first, count = self._directory(directory)
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < first + count:
+            entry_name, mode, size, mtime_ns, digest = self._entry(low)
+            if entry_name == name:
+                return TreeEntry(path, mode, size, mtime_ns, digest)
+        return None
+
+    def directory_entries(self, directory: str) -> list[TreeEntry]:
+        """
+        Get the entries located directly in a directory
+
+        Args:
+            directory: Path of the directory. An empty string for the root.
+        """
+        index = self._find_directory(_encode(directory))
+        if index is None:
+            return []
+
+        _, first, count = self._directory(index)
+        prefix = f"{directory}/" if directory else ""
+        entries = []
+        for entry_index in range(first, first + count):
+            name, mode, size, mtime_ns, digest = self._entry(entry_index)
+            entries.append(
+                TreeEntry(
+                    f"{prefix}{_decode(name)}", mode, size, mtime_ns, digest
+                )
+            )
+        return entries
+
+    def directories(self) -> list[str]:
+        """
+        Get the paths of all directories containing entries
+        """
+        return [
+            _decode(self._directory(index)[0])
+            for index in range(self._directories)
+        ]
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.get(path) is not None
+
+    def __iter__(self) -> Iterator[TreeEntry]:
+        for directory in range(self._directories):
+            directory_name, first, count = self._directory(directory)
+            prefix = f"{_decode(directory_name)}/" if directory_name else ""
+            for index in range(first, first + count):
+                name, mode, size, mtime_ns, digest = self._entry(index)
+                yield TreeEntry(
+                    f"{prefix}{_decode(name)}", mode, size, mtime_ns, digest
+                )
+
+
+def has_tree_manifest(path: str | Path) -> bool:
+    """
+    Check if a valid tree manifest exists
+    """
+    try:
+        TreeManifest(path).close()
+    except (FileNotFoundError, GreenboneFeedSyncError):
+        return False
+    return True
+
+
+def write_tree_manifest(path: str | Path, entries: Iterable[TreeEntry]) -> None:
+    """
+    Write entries into a binary tree manifest
+
+    The file is replaced atomically.
+    """
+    directories: dict[bytes, list[tuple[bytes, TreeEntry]]] = {}
+    for entry in entries:
+        directory, _, name = _encode(entry.path).rpartition(b"/")
+        directories.setdefault(directory, []).append((name, entry))
+
+    strings = bytearray()
+    interned: dict[bytes, int] = {}
+
+    def intern(value: bytes) -> tuple[int, int]:
+        offset = interned.get(value)
+        if offset is None:
+            offset = interned[value] = len(strings)
+            strings.extend(value)
+        return offset, len(value)
+
+    directory_table = bytearray()
+    entry_table = bytearray()
+    count = 0
+    for directory in sorted(directories):
+        names = sorted(directories[directory], key=lambda item: item[0])
+        directory_table += _DIRECTORY.pack(
+            *intern(directory), count, len(names)
+        )
+        for name, entry in names:
+            entry_table += _ENTRY.pack(
+                *intern(name),
+                entry.mode,
+                0,
+                entry.size,
+                entry.mtime_ns,
+                entry.digest,
+            )
+        count += len(names)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_name(f".{path.name}.tmp")
+    with temp_file.open("wb") as f:
+        f.write(
+            _HEADER.pack(
+                _MAGIC, _VERSION, 0, len(directories), count, len(strings)
+            )
+        )
+        f.write(directory_table)
+        f.write(entry_table)
+        f.write(strings)
+    temp_file.replace(path)
+
+
+def tree_entries(
+    destination: str | Path,
+    paths: Iterable[str],
+    *,
+    workers: int | None = None,
+) -> list[TreeEntry]:
+    """
+    Create the entries of files and symlinks of a destination
+
+    The files are hashed in a pool of processes. Missing paths and
+    directories are skipped.
+    """
+    destination = Path(destination)
+    entries: list[TreeEntry] = []
+    files: list[tuple[str, os.stat_result]] = []
+    for path in paths:
+        try:
+            stat = (destination / path).lstat()
+        except OSError:
+            continue
+        if S_ISREG(stat.st_mode):
+            files.append((path, stat))
+        elif S_ISLNK(stat.st_mode):
+            target = os.fspath((destination / path).readlink())
+            entries.append(
+                TreeEntry(
+                    path,
+                    stat.st_mode,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    hashlib.sha256(_encode(target)).digest(),
+                )
+            )
+
+    digests = hash_files(
+        destination, [path for path, _ in files], workers=workers
+    )
+    for (path, stat), digest in zip(files, digests):
+        if digest is not None:
+            entries.append(
+                TreeEntry(
+                    path,
+                    stat.st_mode,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    bytes.fromhex(digest),
+                )
+            )
+    return entries
+
+
+def _walk(destination: Path, excluded: set[str]) -> Iterator[str]:
+    pending = [(os.fspath(destination), "")]
+    while pending:
+        path, prefix = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name in excluded:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, f"{prefix}{entry.name}/"))
+                else:
+                    yield f"{prefix}{entry.name}"
+
+
+def build_tree_manifest(
+    manifest_file: str | Path,
+    destination: str | Path,
+    *,
+    exclude: Iterable[str] = (),
+    workers: int | None = None,
+) -> int:
+    """
+    Create the tree manifest of a destination from scratch
+
+    Args:
+        manifest_file: The manifest file to write
+        destination: Directory to create the manifest for
+        exclude: Names of files and directories to skip on all levels
+        workers: Number of processes for hashing the files
+
+    Returns:
+        The number of entries
+    """
+    destination = Path(destination)
+    excluded = {os.fspath(name).strip("/") for name in exclude}
+    paths = list(_walk(destination, excluded)) if destination.is_dir() else []
+    entries = tree_entries(destination, paths, workers=workers)
+    write_tree_manifest(manifest_file, entries)
+    return len(entries)
+
+
+def update_tree_manifest(
+    manifest_file: str | Path,
+    destination: str | Path,
+    changes: ChangeSet,
+    *,
+    exclude: Iterable[str] = (),
+    workers: int | None = None,
+) -> int:
+    """
+    Apply the changes of a sync to the tree manifest of a destination
+
+    Only the added and updated paths are hashed. If the manifest doesn't
+    exist or is invalid it is created from scratch.
+
+    Args:
+        manifest_file: The manifest file to update
+        destination: Directory of the manifest
+        changes: The changes reported by rsync
+        exclude: Names of files and directories to skip on all levels
+        workers: Number of processes for hashing the files
+
+    Returns:
+        The number of entries
+    """
+    try:
+        with TreeManifest(manifest_file) as manifest:
+            if not changes:
+                return len(manifest)
+            entries = {entry.path: entry for entry in manifest}
+    except (FileNotFoundError, GreenboneFeedSyncError):
+        return build_tree_manifest(
+            manifest_file, destination, exclude=exclude, workers=workers
+        )
+
+    deleted_directories = tuple(
+        f"{path.rstrip('/')}/" for path in changes.deleted
+    )
+    for path in changes.deleted:
+        entries.pop(path.rstrip("/"), None)
+    if deleted_directories:
+        for path in [
+            path for path in entries if path.startswith(deleted_directories)
+        ]:
+            del entries[path]
+
+    changed = {*changes.added, *changes.updated}
+    for path in changed:
+        entries.pop(path, None)
+    for entry in tree_entries(destination, sorted(changed), workers=workers):
+        entries[entry.path] = entry
+
+    write_tree_manifest(manifest_file, entries.values())
+    return len(entries)
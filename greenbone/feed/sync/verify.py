@@ -0,0 +1,353 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import posixpath
+import re
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from stat import S_ISREG
+from typing import Any
+
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+
+CHECKSUMS_FILE_NAME = "sha256sums"
+VERIFY_CACHE_FILE_NAME = "verify-cache.json"
+VERIFY_CACHE_VERSION = 1
+
+# number of files hashed per task of the process pool. keeps the overhead of
+# passing the work between the processes low for many small files.
+DEFAULT_VERIFY_CHUNK_SIZE = 512
+
+# larger files are mapped into memory instead of being read
+_MMAP_THRESHOLD = 1024 * 1024
+
+_CHECKSUM_LINE = re.compile(r"^([0-9a-fA-F]{64}) [ *](.+)$")
+
+
+@dataclass(frozen=True)
+class VerifyResult:
+    """
+    Result of verifying files against their checksums
+
+    Args:
+        checked: Number of verified files
+        mismatched: Paths of the files with another checksum
+        missing: Paths of the files which don't exist
+        hashed: Number of files which have been hashed because their
+            checksum wasn't cached
+    """
+
+    checked: int
+    mismatched: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    hashed: int = 0
+
+    @property
+    def success(self) -> bool:
+        return not self.mismatched and not self.missing
+
+    @property
+    def failed(self) -> list[str]:
+        """
+        Paths of all files failing the verification
+        """
+        return sorted([*self.mismatched, *self.missing])
+
+
+def parse_checksums(path: str | Path) -> dict[str, str]:
+    """
+    Parse a checksums file in the format of sha256sum
+
+    Returns:
+        A dict of the paths relative to the directory of the checksums file
+        and their checksums
+
+    Raises:
+        GreenboneFeedSyncError: If the file contains an invalid line or a path
+            outside of its directory
+    """
+    checksums: dict[str, str] = {}
+    with Path(path).open("r", encoding="utf8", errors="surrogateescape") as f:
+        for number, raw_line in enumerate(f, start=1):
+            line = raw_line.rstrip("\n")
+            if not line:
+                continue
+            match = _CHECKSUM_LINE.match(line)
+            if not match:
+                raise GreenboneFeedSyncError(
+                    f"Invalid line {number} in checksums file {path}."
+                )
+            file = posixpath.normpath(match.group(2))
+            if posixpath.isabs(file) or file == ".." or file.startswith("../"):
+                raise GreenboneFeedSyncError(
+                    f"Invalid path {match.group(2)} in checksums file {path}."
+                )
+            checksums[file] = match.group(1).lower()
+    return checksums
+
+
+def hash_file(path: str | Path) -> str | None:
+    """
+    Calculate the SHA-256 checksum of a file
+
+    Returns:
+        The checksum or None if the file doesn't exist
+    """
+    try:
+        with Path(path).open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _MMAP_THRESHOLD:
+                return hashlib.sha256(f.read()).hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return hashlib.sha256(data).hexdigest()
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return None
+
+
+def _hash_chunk(directory: str, files: list[str]) -> list[str | None]:
+    # runs in the worker processes
+    root = Path(directory)
+    return [hash_file(root / file) for file in files]
+
+
+def stat_signature(stat: os.stat_result) -> str:
+    """
+    Get the key of a file in the verify cache
+
+    rsync replaces changed files. Therefore a new file gets another inode
+    and modification time.
+    """
+    return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def scan_files(directory: str | Path) -> dict[str, os.stat_result]:
+    """
+    Get the stats of all files of a directory tree
+
+    Returns:
+        A dict of the paths relative to the directory and the stats of the
+        files. Symlinks are followed for files but not for directories.
+    """
+    files: dict[str, os.stat_result] = {}
+    pending = [(os.fspath(directory), "")]
+    while pending:
+        path, prefix = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, f"{name}/"))
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # dangling symlink
+                    continue
+                if S_ISREG(stat.st_mode):
+                    files[name] = stat
+    return files
+
+
+def read_verify_cache(path: str | Path) -> dict[str, str]:
+    """
+    Load the cached checksums
+
+    Returns:
+        A dict of the stat signatures of files and their checksums. An empty
+        dict if the cache doesn't exist or is invalid.
+    """
+    try:
+        data: dict[str, Any] = json.loads(Path(path).read_text("utf8"))
+        if data.get("version") != VERIFY_CACHE_VERSION:
+            return {}
+        return {str(key): str(value) for key, value in data["files"].items()}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def write_verify_cache(path: str | Path, cache: dict[str, str]) -> None:
+    """
+    Store the cached checksums
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_name(f".{path.name}.tmp")
+    temp_file.write_text(
+        json.dumps({"version": VERIFY_CACHE_VERSION, "files": cache}),
+        encoding="utf8",
+    )
+    temp_file.replace(path)
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # forking a process with running threads isn't safe
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def hash_files(
+    directory: str | Path,
+    files: list[str],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_VERIFY_CHUNK_SIZE,
+) -> list[str | None]:
+    """
+    Calculate the SHA-256 checksums of files in a pool of processes
+
+    Args:
+        directory: Directory containing the files
+        files: Paths of the files relative to the directory
+        workers: Number of processes to use. Defaults to the number of CPUs.
+        chunk_size: Number of files per task of the process pool
+
+    Returns:
+        The checksums in the order of the files. None for missing files.
+    """
+    chunks = [
+        files[index : index + chunk_size]
+        for index in range(0, len(files), chunk_size)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    root = os.fspath(directory)
+
+    if workers <= 1:
+        # starting processes isn't worth it
+        results = [_hash_chunk(root, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_pool_context()
+        ) as executor:
+            results = list(
+                executor.map(_hash_chunk, [root] * len(chunks), chunks)
+            )
+    return [digest for digests in results for digest in digests]
+
+
+def stat_files(
+    directory: str | Path, files: Iterable[str]
+) -> dict[str, os.stat_result]:
+    """
+    Get the stats of some files of a directory tree
+
+    Unlike scan_files only the passed files are looked at.
+
+    Returns:
+        A dict of the existing regular files and their stats. Symlinks are
+        followed.
+    """
+    directory = Path(directory)
+    stats = {}
+    for file in files:
+        try:
+            stat = (directory / file).stat()
+        except OSError:
+            continue
+        if S_ISREG(stat.st_mode):
+            stats[file] = stat
+    return stats
+
+
+def verify_checksums(
+    directory: str | Path,
+    *,
+    files: Iterable[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_VERIFY_CHUNK_SIZE,
+    cache_file: str | Path | None = None,
+) -> VerifyResult | None:
+    """
+    Verify the files of a directory against its checksums file
+
+    The files are hashed in a pool of processes to use all cores. Files not
+    listed in the checksums file are ignored.
+
+    If a cache file is passed the checksums are stored keyed by the device,
+    inode, size and modification time of the files. Only files with a
+    changed stat signature are hashed again.
+
+    Args:
+        directory: Directory containing the checksums file
+        files: Optional paths to verify only a subset of the listed files
+        workers: Number of processes to use. Defaults to the number of CPUs.
+        chunk_size: Number of files per task of the process pool
+        cache_file: Optional file to cache the checksums in
+
+    Returns:
+        The result of the verification or None if the directory has no
+        checksums file
+
+    Raises:
+        GreenboneFeedSyncError: If the checksums file is invalid
+    """
+    directory = Path(directory)
+    checksums_file = directory / CHECKSUMS_FILE_NAME
+    if not checksums_file.is_file():
+        return None
+
+    checksums = parse_checksums(checksums_file)
+    if files is None:
+        stats = scan_files(directory)
+    else:
+        selected = set(files)
+        checksums = {
+            file: checksum
+            for file, checksum in checksums.items()
+            if file in selected
+        }
+        stats = stat_files(directory, checksums)
+
+    cache = read_verify_cache(cache_file) if cache_file else {}
+    paths = sorted(checksums)
+    digests: dict[str, str] = {}
+    signatures: dict[str, str] = {}
+    for path in paths:
+        stat = stats.get(path)
+        if stat is None:
+            continue
+        signatures[path] = stat_signature(stat)
+        cached = cache.get(signatures[path])
+        if cached is not None:
+            digests[path] = cached
+
+    to_hash = [path for path in signatures if path not in digests]
+    for path, digest in zip(
+        to_hash,
+        hash_files(directory, to_hash, workers=workers, chunk_size=chunk_size),
+    ):
+        if digest is not None:
+            digests[path] = digest
+
+    mismatched = []
+    missing = []
+    for path in paths:
+        digest = digests.get(path)
+        if digest is None:
+            missing.append(path)
+        elif digest != checksums[path]:
+            mismatched.append(path)
+
+    if cache_file:
+        updated = {signatures[path]: digest for path, digest in digests.items()}
+        if files is not None:
+            # only a part of the files has been checked
+            updated = {**cache, **updated}
+        if updated != cache:
+            write_verify_cache(cache_file, updated)
+
+    return VerifyResult(
+        checked=len(paths),
+        mismatched=mismatched,
+        missing=missing,
+        hashed=len(to_hash),
+    )
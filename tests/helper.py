@@ -0,0 +1,49 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import hashlib
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+from greenbone.feed.sync.verify import CHECKSUMS_FILE_NAME
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def checksums_file(files: Mapping[str, bytes]) -> str:
+    return "".join(f"{sha256(data)}  {path}\n" for path, data in files.items())
+
+
+def create_feed(
+    path: Path,
+    files: Mapping[str, bytes | str],
+    *,
+    checksums: bool = False,
+    mtime: int | None = None,
+) -> None:
+    # create a feed directory tree. str values are the targets of symlinks.
+    for name, content in files.items():
+        file = path / name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, str):
+            file.symlink_to(content)
+            continue
+        file.write_bytes(content)
+        if mtime is not None:
+            os.utime(file, (mtime, mtime))
+
+    if checksums:
+        (path / CHECKSUMS_FILE_NAME).write_text(
+            checksums_file(
+                {
+                    name: content
+                    for name, content in files.items()
+                    if isinstance(content, bytes)
+                }
+            )
+        )
@@ -0,0 +1,201 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.batch import (
+    BatchInfo,
+    ReplayStatus,
+    batch_file,
+    batch_info_file,
+    read_batch_info,
+    record_batch,
+    replay_batch,
+    tree_fingerprint,
+    write_batch_info,
+)
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+
+
+def write_file(path: Path, content: str) -> None:
+    path.write_text(content)
+    os.utime(path, (1000, 1000))
+
+
+def create_tree(path: Path) -> None:
+    (path / "foo").mkdir(parents=True)
+    write_file(path / "foo/bar.nasl", "bar")
+    write_file(path / "baz.nasl", "baz")
+    (path / "link").symlink_to("foo")
+
+
+def update_tree(path: Path) -> None:
+    write_file(path / "baz.nasl", "updated")
+    write_file(path / "new.nasl", "new")
+
+
+class BatchFileTestCase(unittest.TestCase):
+    def test_batch_file(self):
+        self.assertEqual(
+            batch_file("/srv/batches", "CERT-Bund data"),
+            Path("/srv/batches/cert-bund-data.batch"),
+        )
+        self.assertEqual(
+            batch_info_file("/srv/batches/nasl-files.batch"),
+            Path("/srv/batches/nasl-files.batch.json"),
+        )
+
+
+class TreeFingerprintTestCase(unittest.TestCase):
+    def test_same_tree(self):
+        with temp_directory() as temp_dir:
+            create_tree(temp_dir / "a")
+            create_tree(temp_dir / "b")
+
+            self.assertEqual(
+                tree_fingerprint(temp_dir / "a"),
+                tree_fingerprint(temp_dir / "b"),
+            )
+
+    def test_changed_tree(self):
+        with temp_directory() as temp_dir:
+            create_tree(temp_dir)
+            fingerprint = tree_fingerprint(temp_dir)
+
+            os.utime(temp_dir / "baz.nasl", (2000, 2000))
+            self.assertNotEqual(tree_fingerprint(temp_dir), fingerprint)
+
+    def test_exclude(self):
+        with temp_directory() as temp_dir:
+            create_tree(temp_dir)
+            fingerprint = tree_fingerprint(temp_dir, exclude=["private"])
+
+            (temp_dir / "private").mkdir()
+            (temp_dir / "private/state").write_text("state")
+            (temp_dir / "foo/private").write_text("state")
+
+            self.assertEqual(
+                tree_fingerprint(temp_dir, exclude=["private"]), fingerprint
+            )
+            self.assertNotEqual(tree_fingerprint(temp_dir), fingerprint)
+
+    def test_missing_tree(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / "empty").mkdir()
+
+            self.assertEqual(
+                tree_fingerprint(temp_dir / "missing"),
+                tree_fingerprint(temp_dir / "empty"),
+            )
+
+
+class BatchInfoTestCase(unittest.TestCase):
+    def test_write_and_read(self):
+        with temp_directory() as temp_dir:
+            batch = temp_dir / "notus-files.batch"
+            batch.touch()
+            write_batch_info(batch, BatchInfo(base="a", result="b"))
+
+            self.assertEqual(read_batch_info(batch), BatchInfo("a", "b"))
+
+    def test_missing_batch(self):
+        with (
+            temp_directory() as temp_dir,
+            self.assertRaisesRegex(GreenboneFeedSyncError, "does not exist"),
+        ):
+            read_batch_info(temp_dir / "notus-files.batch")
+
+    def test_invalid_info(self):
+        with temp_directory() as temp_dir:
+            batch = temp_dir / "notus-files.batch"
+            batch.touch()
+            batch_info_file(batch).write_text("foo")
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "has no valid info file"
+            ):
+                read_batch_info(batch)
+
+
+class RecordAndReplayTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_record_and_replay(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(
+            side_effect=lambda url, dest, **kw: update_tree(dest)
+        )
+        rsync.read_batch = AsyncMock(
+            side_effect=lambda batch, dest: update_tree(Path(dest))
+        )
+
+        with temp_directory() as temp_dir:
+            reference = temp_dir / "reference"
+            sensor = temp_dir / "sensor"
+            create_tree(reference)
+            create_tree(sensor)
+            batch = temp_dir / "batches/nasl-files.batch"
+
+            info = await record_batch(
+                rsync, "rsync://foo.bar/nasl", reference, batch, shards=1
+            )
+            batch.touch()
+
+            rsync.sync.assert_awaited_once_with(
+                "rsync://foo.bar/nasl", reference, write_batch=batch, shards=1
+            )
+            self.assertEqual(read_batch_info(batch), info)
+            self.assertEqual(info.result, tree_fingerprint(reference))
+
+            self.assertEqual(
+                await replay_batch(rsync, batch, sensor),
+                ReplayStatus.REPLAYED,
+            )
+            rsync.read_batch.assert_awaited_once_with(batch, sensor)
+            self.assertEqual(tree_fingerprint(sensor), info.result)
+
+            self.assertEqual(
+                await replay_batch(rsync, batch, sensor),
+                ReplayStatus.UP_TO_DATE,
+            )
+            rsync.read_batch.assert_awaited_once()
+
+    async def test_replay_mismatch(self):
+        rsync = MagicMock()
+        rsync.read_batch = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            batch = temp_dir / "nasl-files.batch"
+            batch.touch()
+            write_batch_info(batch, BatchInfo(base="a", result="b"))
+            create_tree(temp_dir / "sensor")
+
+            self.assertEqual(
+                await replay_batch(rsync, batch, temp_dir / "sensor"),
+                ReplayStatus.MISMATCH,
+            )
+            rsync.read_batch.assert_not_awaited()
+
+    async def test_replay_verification_failed(self):
+        rsync = MagicMock()
+        rsync.read_batch = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            sensor = temp_dir / "sensor"
+            create_tree(sensor)
+            batch = temp_dir / "nasl-files.batch"
+            batch.touch()
+            write_batch_info(
+                batch, BatchInfo(base=tree_fingerprint(sensor), result="b")
+            )
+
+            self.assertEqual(
+                await replay_batch(rsync, batch, sensor),
+                ReplayStatus.MISMATCH,
+            )
+            rsync.read_batch.assert_awaited_once_with(batch, sensor)
@@ -0,0 +1,484 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.bundle import (
+    BUNDLE_INFO_NAME,
+    BUNDLE_MANIFEST_NAME,
+    StagedDestination,
+    discard_staged,
+    export_bundle,
+    install_staged,
+    read_bundle_manifest,
+    staging_directory,
+    unpack_bundle,
+)
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from tests.helper import create_feed
+
+requires_zstd = unittest.skipUnless(
+    shutil.which("zstd"), "zstd binary not available"
+)
+
+
+def write_file(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    os.utime(path, (1000, 1000))
+
+
+def create_feeds(prefix: Path) -> None:
+    create_feed(
+        prefix,
+        {
+            "openvas/plugins/foo/bar.nasl": b"bar",
+            "openvas/plugins/private/state": b"state",
+            "openvas/plugins/link": "foo",
+            "notus/debian.notus": b"debian",
+        },
+        mtime=1000,
+    )
+    os.link(prefix / "notus/debian.notus", prefix / "notus/ubuntu.notus")
+
+
+def write_bundle(bundle: Path, members: dict[str, bytes | str]) -> None:
+    # write a bundle with arbitrary content
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if isinstance(content, str):
+                info.type = tarfile.SYMTYPE
+                info.linkname = content
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    bundle.write_bytes(
+        subprocess.run(
+            ["zstd", "-q", "-c"],
+            input=data.getvalue(),
+            capture_output=True,
+            check=True,
+        ).stdout
+    )
+
+
+class StagingDirectoryTestCase(unittest.TestCase):
+    def test_staging_directory(self):
+        self.assertEqual(
+            staging_directory("/var/lib/openvas/plugins"),
+            Path("/var/lib/openvas/.plugins.import"),
+        )
+
+
+@requires_zstd
+class ExportAndUnpackTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        with temp_directory() as temp_dir:
+            source = temp_dir / "source"
+            target = temp_dir / "target"
+            bundle = temp_dir / "feed.tar.zst"
+            create_feeds(source)
+
+            result = export_bundle(
+                bundle,
+                [source / "openvas/plugins", source / "notus"],
+                prefix=source,
+                exclude=["private"],
+            )
+
+            self.assertEqual(
+                result.changed, [entry.path for entry in result.manifest]
+            )
+            self.assertEqual(result.deleted, [])
+            self.assertEqual(
+                sorted(entry.path for entry in result.manifest),
+                [
+                    "notus/debian.notus",
+                    "notus/ubuntu.notus",
+                    "openvas/plugins/foo/bar.nasl",
+                ],
+            )
+            self.assertFalse((temp_dir / ".feed.tar.zst.tmp").exists())
+
+            write_file(target / "openvas/plugins/old.nasl", "old")
+            write_file(target / "openvas/plugins/private/state", "old state")
+
+            staged = unpack_bundle(bundle, prefix=target)
+
+            self.assertEqual(
+                staged,
+                [
+                    StagedDestination(
+                        target / "openvas/plugins",
+                        target / "openvas/.plugins.import",
+                    ),
+                    StagedDestination(
+                        target / "notus", target / ".notus.import"
+                    ),
+                ],
+            )
+            # nothing is installed yet
+            self.assertTrue((target / "openvas/plugins/old.nasl").exists())
+
+            install_staged(staged, keep=["private"])
+
+            plugins = target / "openvas/plugins"
+            self.assertFalse((plugins / "old.nasl").exists())
+            self.assertEqual((plugins / "foo/bar.nasl").read_text(), "bar")
+            self.assertEqual((plugins / "foo/bar.nasl").stat().st_mtime, 1000)
+            self.assertEqual((plugins / "link").readlink(), Path("foo"))
+            self.assertEqual(
+                (plugins / "private/state").read_text(), "old state"
+            )
+            self.assertEqual(
+                (target / "notus/ubuntu.notus").read_text(), "debian"
+            )
+            self.assertFalse((target / "openvas/.plugins.import").exists())
+            self.assertFalse((target / "openvas/.plugins.old").exists())
+
+    def test_unexpected_destination(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            create_feeds(temp_dir / "source")
+            export_bundle(
+                bundle,
+                [temp_dir / "source/notus"],
+                prefix=temp_dir / "source",
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "notus which is not a destination"
+            ):
+                unpack_bundle(
+                    bundle,
+                    prefix=temp_dir / "target",
+                    destinations=[temp_dir / "target/openvas/plugins"],
+                )
+
+    def test_manifest_mismatch(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            write_bundle(
+                bundle,
+                {
+                    BUNDLE_INFO_NAME: json.dumps(
+                        {"version": 1, "destinations": ["notus"]}
+                    ).encode(),
+                    "data/notus/debian.notus": b"modified",
+                    BUNDLE_MANIFEST_NAME: json.dumps(
+                        {
+                            "path": "notus/debian.notus",
+                            "size": 6,
+                            "mtime": 0,
+                            "sha256": "0" * 64,
+                        }
+                    ).encode(),
+                },
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError,
+                "doesn't match its manifest: notus/debian.notus",
+            ):
+                unpack_bundle(bundle, prefix=temp_dir)
+
+            self.assertFalse((temp_dir / ".notus.import").exists())
+
+    def test_missing_manifest(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            write_bundle(
+                bundle,
+                {
+                    BUNDLE_INFO_NAME: json.dumps(
+                        {"version": 1, "destinations": ["notus"]}
+                    ).encode(),
+                },
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "has no manifest"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir)
+
+    def test_invalid_path(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            write_bundle(
+                bundle,
+                {
+                    BUNDLE_INFO_NAME: json.dumps(
+                        {"version": 1, "destinations": ["notus"]}
+                    ).encode(),
+                    "data/notus/../../evil": b"evil",
+                },
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid path data/notus/../../evil"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir / "prefix")
+
+            self.assertFalse((temp_dir / "evil").exists())
+            self.assertFalse((temp_dir / "prefix/.notus.import").exists())
+
+    def test_symlink_outside_of_destination(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            write_bundle(
+                bundle,
+                {
+                    BUNDLE_INFO_NAME: json.dumps(
+                        {"version": 1, "destinations": ["notus"]}
+                    ).encode(),
+                    "data/notus/link": "../openvas",
+                },
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "points outside of its destination"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir)
+
+    def test_nested_symlinks_outside_of_destination(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            (temp_dir / "prefix/notus").mkdir(parents=True)
+            write_bundle(
+                bundle,
+                {
+                    BUNDLE_INFO_NAME: json.dumps(
+                        {"version": 1, "destinations": ["notus"]}
+                    ).encode(),
+                    # each link on its own stays inside of the destination
+                    "data/notus/link": ".",
+                    "data/notus/link/parent": "..",
+                    "data/notus/link/parent/evil": b"evil",
+                },
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "points outside of its destination"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir / "prefix")
+
+            self.assertFalse((temp_dir / "prefix/evil").exists())
+            self.assertFalse((temp_dir / "prefix/.notus.import").exists())
+
+    def test_unsupported_version(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            write_bundle(
+                bundle,
+                {BUNDLE_INFO_NAME: json.dumps({"version": 2}).encode()},
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Unsupported bundle version 2"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir)
+
+    def test_invalid_bundle(self):
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            bundle.write_text("foo")
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid bundle"
+            ):
+                unpack_bundle(bundle, prefix=temp_dir)
+
+
+@requires_zstd
+class DeltaBundleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir_context = temp_directory()
+        temp_dir = self.temp_dir_context.__enter__()
+        self.source = temp_dir / "source"
+        self.target = temp_dir / "target"
+        self.base = temp_dir / "base.tar.zst"
+        self.delta = temp_dir / "delta.tar.zst"
+        self.destinations = ["openvas/plugins", "notus"]
+
+        create_feeds(self.source)
+        export_bundle(
+            self.base,
+            [self.source / path for path in self.destinations],
+            prefix=self.source,
+            exclude=["private"],
+        )
+        install_staged(unpack_bundle(self.base, prefix=self.target))
+
+    def tearDown(self):
+        self.temp_dir_context.__exit__(None, None, None)
+
+    def export_delta(self):
+        return export_bundle(
+            self.delta,
+            [self.source / path for path in self.destinations],
+            prefix=self.source,
+            exclude=["private"],
+            base=read_bundle_manifest(self.base),
+        )
+
+    def test_delta(self):
+        write_file(self.source / "notus/debian.notus", "updated")
+        write_file(self.source / "notus/new.notus", "new")
+        (self.source / "openvas/plugins/foo/bar.nasl").unlink()
+        write_file(self.target / "openvas/plugins/private/state", "target")
+
+        result = self.export_delta()
+
+        self.assertEqual(
+            result.changed,
+            ["notus/debian.notus", "notus/new.notus", "notus/ubuntu.notus"],
+        )
+        self.assertEqual(result.deleted, ["openvas/plugins/foo/bar.nasl"])
+        self.assertEqual(
+            sorted(entry.path for entry in result.manifest),
+            sorted(read_bundle_manifest(self.delta)),
+        )
+
+        install_staged(
+            unpack_bundle(self.delta, prefix=self.target, exclude=["private"]),
+            keep=["private"],
+        )
+
+        self.assertEqual(
+            sorted(
+                path.relative_to(self.target).as_posix()
+                for path in self.target.rglob("*")
+            ),
+            [
+                "notus",
+                "notus/debian.notus",
+                "notus/new.notus",
+                "notus/ubuntu.notus",
+                "openvas",
+                "openvas/plugins",
+                "openvas/plugins/foo",
+                "openvas/plugins/link",
+                "openvas/plugins/private",
+                "openvas/plugins/private/state",
+            ],
+        )
+        self.assertEqual(
+            (self.target / "notus/debian.notus").read_text(), "updated"
+        )
+        self.assertEqual(
+            (self.target / "openvas/plugins/private/state").read_text(),
+            "target",
+        )
+
+    def test_unchanged(self):
+        result = self.export_delta()
+
+        self.assertEqual(result.changed, [])
+        self.assertEqual(result.deleted, [])
+
+        install_staged(unpack_bundle(self.delta, prefix=self.target))
+
+        self.assertEqual(
+            (self.target / "openvas/plugins/foo/bar.nasl").read_text(), "bar"
+        )
+
+    def test_base_mismatch(self):
+        write_file(self.source / "notus/new.notus", "new")
+        self.export_delta()
+        write_file(self.target / "notus/debian.notus", "local")
+
+        with self.assertRaisesRegex(
+            GreenboneFeedSyncError,
+            "notus doesn't match the base version of the delta bundle",
+        ):
+            unpack_bundle(self.delta, prefix=self.target)
+
+        self.assertFalse((self.target / ".notus.import").exists())
+        self.assertEqual(
+            (self.target / "notus/debian.notus").read_text(), "local"
+        )
+
+
+class UnpackBundleTestCase(unittest.TestCase):
+    def test_missing_bundle(self):
+        with (
+            temp_directory() as temp_dir,
+            self.assertRaisesRegex(GreenboneFeedSyncError, "does not exist"),
+        ):
+            unpack_bundle(temp_dir / "feed.tar.zst", prefix=temp_dir)
+
+    def test_read_missing_manifest(self):
+        with (
+            temp_directory() as temp_dir,
+            self.assertRaisesRegex(GreenboneFeedSyncError, "does not exist"),
+        ):
+            read_bundle_manifest(temp_dir / "feed.tar.zst")
+
+
+class DiscardStagedTestCase(unittest.TestCase):
+    def test_discard_staged(self):
+        with temp_directory() as temp_dir:
+            write_file(temp_dir / ".notus.import/debian.notus", "debian")
+
+            discard_staged(
+                [
+                    StagedDestination(
+                        temp_dir / "notus", temp_dir / ".notus.import"
+                    )
+                ]
+            )
+
+            self.assertFalse((temp_dir / ".notus.import").exists())
+
+
+class InstallStagedTestCase(unittest.TestCase):
+    def install(self, temp_dir: Path) -> None:
+        write_file(temp_dir / ".notus.import/debian.notus", "new")
+        write_file(temp_dir / "snapshot/debian.notus", "old")
+        write_file(temp_dir / "snapshot/private/state", "state")
+        (temp_dir / "notus").symlink_to("snapshot")
+
+        install_staged(
+            [StagedDestination(temp_dir / "notus", temp_dir / ".notus.import")],
+            keep=["private"],
+        )
+
+        self.assertFalse((temp_dir / "notus").is_symlink())
+        self.assertEqual((temp_dir / "notus/debian.notus").read_text(), "new")
+        self.assertEqual(
+            (temp_dir / "notus/private/state").read_text(), "state"
+        )
+        self.assertEqual(
+            sorted(path.name for path in temp_dir.iterdir()),
+            ["notus", "snapshot"],
+        )
+
+    def test_exchange(self):
+        with temp_directory() as temp_dir:
+            self.install(temp_dir)
+
+    def test_without_exchange(self):
+        with (
+            temp_directory() as temp_dir,
+            patch(
+                "greenbone.feed.sync.bundle._exchange",
+                autospec=True,
+                return_value=False,
+            ),
+        ):
+            self.install(temp_dir)
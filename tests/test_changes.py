@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.progress import FileTransfer, TransferProgress
+
+
+class ChangeSetTestCase(unittest.TestCase):
+    def test_add(self):
+        change_set = ChangeSet()
+        self.assertFalse(change_set)
+
+        change_set.add(FileTransfer("a.nasl", 1, ">f+++++++++"))
+        change_set.add(FileTransfer("b.nasl", 1, ">f..t......"))
+        change_set.add(FileTransfer("c/", 0, "cd+++++++++"))
+        change_set.add(FileTransfer("d/", 0, "*deleting"))
+        change_set.add(FileTransfer("e.nasl", 0, "*deleting"))
+        change_set.add(TransferProgress(1, 100, 1.0, 0))
+
+        self.assertTrue(change_set)
+        self.assertEqual(len(change_set), 4)
+        self.assertEqual(change_set.added, ["a.nasl"])
+        self.assertEqual(change_set.updated, ["b.nasl"])
+        self.assertEqual(change_set.deleted, ["d/", "e.nasl"])
+
+    def test_write_and_read(self):
+        change_set = ChangeSet(
+            added=["a.nasl"], updated=["b c.nasl"], deleted=["d.nasl"]
+        )
+
+        with temp_directory() as temp_dir:
+            path = temp_dir / ".feed-sync" / "plugins" / "last-changes.jsonl"
+            change_set.write(path)
+
+            self.assertEqual(
+                path.read_text(encoding="utf8").splitlines(),
+                [
+                    '{"change": "added", "path": "a.nasl"}',
+                    '{"change": "updated", "path": "b c.nasl"}',
+                    '{"change": "deleted", "path": "d.nasl"}',
+                ],
+            )
+            self.assertEqual(ChangeSet.read(path), change_set)
+            self.assertEqual(list(path.parent.iterdir()), [path])
+
+    def test_write_empty(self):
+        with temp_directory() as temp_dir:
+            path = temp_dir / "last-changes.jsonl"
+            ChangeSet().write(path)
+
+            self.assertEqual(path.read_text(encoding="utf8"), "")
+            self.assertFalse(ChangeSet.read(path))
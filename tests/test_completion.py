@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.completion import (
+    completion_marker_file,
+    feed_lock_file,
+    run_completion_hook,
+    write_completion_marker,
+)
+from greenbone.feed.sync.errors import CompletionHookError
+
+
+class FeedLockFileTestCase(unittest.TestCase):
+    def test_feed_lock_file(self):
+        self.assertEqual(
+            feed_lock_file("/var/lib/gvm/scap-data"),
+            Path("/var/lib/gvm/.feed-sync/scap-data/feed.lock"),
+        )
+
+
+class WriteCompletionMarkerTestCase(unittest.TestCase):
+    def test_write_completion_marker(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            time = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+            write_completion_marker(destination, time)
+
+            marker = completion_marker_file(destination)
+            self.assertEqual(
+                marker, temp_dir / ".feed-sync" / "scap-data" / "completed"
+            )
+            self.assertEqual(marker.read_text(), "2026-01-02T03:04:05+00:00\n")
+            self.assertEqual(
+                [path.name for path in marker.parent.iterdir()], ["completed"]
+            )
+
+
+class RunCompletionHookTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_run_completion_hook(self):
+        with temp_directory() as temp_dir:
+            output = temp_dir / "output"
+            script = (
+                "import os, sys; "
+                f"open({str(output)!r}, 'w').write("
+                "os.environ['GREENBONE_FEED_SYNC_FEED_NAME'] + '|' + "
+                "os.environ['GREENBONE_FEED_SYNC_FEED_DESTINATION'] + '|' + "
+                "sys.argv[1])"
+            )
+            await run_completion_hook(
+                f'{sys.executable} -c "{script}"', "SCAP data", "/tmp/scap"
+            )
+
+            self.assertEqual(
+                output.read_text(), "SCAP data|/tmp/scap|/tmp/scap"
+            )
+
+    async def test_failure(self):
+        with self.assertRaises(CompletionHookError) as cm:
+            await run_completion_hook(
+                f"{sys.executable} -c 'import sys; sys.exit(3)'",
+                "SCAP data",
+                "/tmp/scap",
+            )
+
+        self.assertEqual(cm.exception.returncode, 3)
+
+    async def test_missing_command(self):
+        with self.assertRaises(CompletionHookError) as cm:
+            await run_completion_hook(
+                "/does/not/exist", "SCAP data", "/tmp/scap"
+            )
+
+        self.assertEqual(cm.exception.returncode, 127)
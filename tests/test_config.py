@@ -17,13 +17,28 @@ from greenbone.feed.sync.config import (
     DEFAULT_FEED_RELEASE,
     DEFAULT_GROUP,
     DEFAULT_GVMD_LOCK_FILE_PATH,
+    DEFAULT_NASL_SHARDS,
     DEFAULT_OPENVAS_LOCK_FILE_PATH,
+    DEFAULT_PARALLEL_SYNCS,
     DEFAULT_USER,
     Config,
     EnterpriseSettings,
 )
+from greenbone.feed.sync.daemon import (
+    DEFAULT_DAEMON_INTERVAL,
+    DEFAULT_DAEMON_JITTER,
+)
 from greenbone.feed.sync.errors import ConfigError, ConfigFileError
 from greenbone.feed.sync.helper import DEFAULT_FLOCK_WAIT_INTERVAL
+from greenbone.feed.sync.leader import (
+    DEFAULT_LEADER_PORT,
+    DEFAULT_SERVE_ADDRESS,
+)
+from greenbone.feed.sync.mirror import DEFAULT_MIRROR_CACHE_TTL
+from greenbone.feed.sync.push import (
+    DEFAULT_PUSH_CONCURRENCY,
+    DEFAULT_PUSH_RETRIES,
+)
 from greenbone.feed.sync.rsync import (
     DEFAULT_RSYNC_COMPRESSION_LEVEL,
     DEFAULT_RSYNC_URL,
@@ -34,7 +49,7 @@ class ConfigTestCase(unittest.TestCase):
     def test_defaults(self):
         values = Config.load()
 
-        self.assertEqual(len(values), 32)
+        self.assertEqual(len(values), 65)
         self.assertEqual(
             values["destination-prefix"], Path(DEFAULT_DESTINATION_PREFIX)
         )
@@ -125,6 +140,8 @@ class ConfigTestCase(unittest.TestCase):
         )
         self.assertEqual(values["wait-interval"], DEFAULT_FLOCK_WAIT_INTERVAL)
         self.assertFalse(values["no-wait"])
+        self.assertFalse(values["blocking-lock"])
+        self.assertIsNone(values["lock-timeout"])
         self.assertFalse(values["no-permission-change"])
         self.assertEqual(
             values["compression-level"], DEFAULT_RSYNC_COMPRESSION_LEVEL
@@ -133,6 +150,37 @@ class ConfigTestCase(unittest.TestCase):
         self.assertIsNone(values["verbose"])
         self.assertFalse(values["fail-fast"])
         self.assertIsNone(values["rsync-timeout"])
+        self.assertIsNone(values["leader-url"])
+        self.assertFalse(values["serve"])
+        self.assertEqual(values["serve-address"], DEFAULT_SERVE_ADDRESS)
+        self.assertEqual(values["serve-port"], DEFAULT_LEADER_PORT)
+        self.assertIsNone(values["serve-hosts-allow"])
+        self.assertIsNone(values["fan-out-prefixes"])
+        self.assertIsNone(values["feed-mirrors"])
+        self.assertEqual(values["mirror-cache-ttl"], DEFAULT_MIRROR_CACHE_TTL)
+        self.assertEqual(values["retries"], 0)
+        self.assertIsNone(values["retry-deadline"])
+        self.assertFalse(values["pre-check"])
+        self.assertFalse(values["record-changes"])
+        self.assertEqual(values["parallel"], DEFAULT_PARALLEL_SYNCS)
+        self.assertEqual(values["snapshots"], 0)
+        self.assertFalse(values["staged"])
+        self.assertFalse(values["feed-locks"])
+        self.assertIsNone(values["completion-hook"])
+        self.assertEqual(values["nasl-shards"], DEFAULT_NASL_SHARDS)
+        self.assertIsNone(values["write-batch"])
+        self.assertIsNone(values["read-batch"])
+        self.assertFalse(values["verify"])
+        self.assertIsNone(values["verify-workers"])
+        self.assertFalse(values["tree-manifest"])
+        self.assertFalse(values["incremental"])
+        self.assertFalse(values["merkle-digest"])
+        self.assertIsNone(values["push"])
+        self.assertEqual(values["push-concurrency"], DEFAULT_PUSH_CONCURRENCY)
+        self.assertEqual(values["push-retries"], DEFAULT_PUSH_RETRIES)
+        self.assertEqual(values["daemon-interval"], DEFAULT_DAEMON_INTERVAL)
+        self.assertEqual(values["daemon-jitter"], DEFAULT_DAEMON_JITTER)
+        self.assertIsNone(values["daemon-schedule"])
         self.assertEqual(values["group"], DEFAULT_GROUP)
         self.assertEqual(values["user"], DEFAULT_USER)
         self.assertEqual(
@@ -288,6 +336,52 @@ destination-prefix = "/opt/lib/"
             values["gvmd-lock-file"], Path("/opt/lib/gvm/feed-update.lock")
         )
 
+    def test_leader_url(self):
+        content = """[greenbone-feed-sync]
+leader-url = "leader.example:1873"
+"""
+        path_mock = MagicMock(spec=Path)
+        path_mock.read_text.return_value = content
+
+        values = Config.load(path_mock)
+
+        self.assertEqual(values["leader-url"], "rsync://leader.example:1873")
+        for module in (
+            "notus",
+            "nasl",
+            "scap-data",
+            "cert-data",
+            "gvmd-data",
+            "report-formats",
+            "scan-configs",
+            "port-lists",
+        ):
+            self.assertEqual(
+                values[f"{module}-url"],
+                f"rsync://leader.example:1873/{module}/",
+            )
+
+    def test_feed_mirrors(self):
+        content = """[greenbone-feed-sync]
+feed-mirrors = ["rsync://foo.bar", "rsync://lorem.ipsum"]
+"""
+        path_mock = MagicMock(spec=Path)
+        path_mock.read_text.return_value = content
+
+        values = Config.load(path_mock)
+
+        self.assertEqual(
+            values["feed-mirrors"], ["rsync://foo.bar", "rsync://lorem.ipsum"]
+        )
+
+        with patch.dict(
+            "os.environ",
+            {"GREENBONE_FEED_SYNC_MIRRORS": "rsync://a.b, rsync://c.d"},
+        ):
+            values = Config.load()
+
+        self.assertEqual(values["feed-mirrors"], ["rsync://a.b", "rsync://c.d"])
+
     def test_feed_url(self):
         content = """[greenbone-feed-sync]
 feed-url = "rsync://foo.bar"
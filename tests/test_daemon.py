@@ -0,0 +1,245 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import unittest
+from argparse import Namespace
+from unittest.mock import AsyncMock, MagicMock
+
+from greenbone.feed.sync.daemon import (
+    Daemon,
+    parse_interval,
+    parse_jitter,
+    parse_schedule,
+)
+from greenbone.feed.sync.errors import ConfigError, GreenboneFeedSyncError
+
+
+def daemon_args(**kwargs) -> Namespace:
+    values = {
+        "type": "all",
+        "quiet": True,
+        "daemon_interval": 0,
+        "daemon_jitter": 0,
+        "daemon_schedule": None,
+    }
+    values.update(kwargs)
+    return Namespace(**values)
+
+
+class ParseIntervalTestCase(unittest.TestCase):
+    def test_parse_interval(self):
+        self.assertEqual(parse_interval("120"), 120)
+        self.assertEqual(parse_interval("30s"), 30)
+        self.assertEqual(parse_interval("15m"), 15 * 60)
+        self.assertEqual(parse_interval("6h"), 6 * 60 * 60)
+        self.assertEqual(parse_interval("1d"), 24 * 60 * 60)
+        self.assertEqual(parse_interval(42), 42)
+
+    def test_invalid_interval(self):
+        with self.assertRaisesRegex(ConfigError, "Invalid interval 'foo'"):
+            parse_interval("foo")
+
+        with self.assertRaisesRegex(ConfigError, "greater than zero"):
+            parse_interval("0h")
+
+        with self.assertRaisesRegex(ConfigError, "must not be negative"):
+            parse_interval("-1m")
+
+    def test_parse_jitter(self):
+        self.assertEqual(parse_jitter("0"), 0)
+        self.assertEqual(parse_jitter("1h"), 60 * 60)
+
+
+class ParseScheduleTestCase(unittest.TestCase):
+    def test_parse_schedule(self):
+        self.assertEqual(
+            parse_schedule("nvt=6h, scap=1d,"),
+            {"nvt": 6 * 60 * 60, "scap": 24 * 60 * 60},
+        )
+
+    def test_invalid_schedule(self):
+        with self.assertRaisesRegex(ConfigError, "Invalid schedule entry"):
+            parse_schedule("nvt")
+
+        with self.assertRaisesRegex(ConfigError, "Invalid interval"):
+            parse_schedule("nvt=foo")
+
+
+class DaemonTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_run(self):
+        console = MagicMock()
+        calls = []
+
+        async def run_sync(args, feed_type):
+            calls.append(feed_type)
+            if len(calls) == 3:
+                daemon.stop()
+            return 0
+
+        daemon = Daemon(
+            daemon_args,
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        ret = await daemon.run()
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(calls, ["all", "all", "all"])
+
+    async def test_schedule(self):
+        console = MagicMock()
+        calls = []
+
+        async def run_sync(args, feed_type):
+            calls.append(feed_type)
+            if len(calls) == 2:
+                daemon.stop()
+            return 0
+
+        daemon = Daemon(
+            lambda: daemon_args(daemon_schedule={"nvt": 0, "scap": 3600}),
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        await daemon.run()
+
+        # scap is synced only once within an hour
+        self.assertEqual(sorted(calls), ["nvt", "scap"])
+
+    async def test_stop_cancels_sync(self):
+        console = MagicMock()
+        started = asyncio.Event()
+        cancelled = False
+
+        async def run_sync(args, feed_type):
+            nonlocal cancelled
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            return 0
+
+        daemon = Daemon(
+            daemon_args,
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        task = asyncio.create_task(daemon.run())
+        await started.wait()
+        daemon.stop()
+
+        self.assertEqual(await asyncio.wait_for(task, 5), 0)
+        self.assertTrue(cancelled)
+
+    async def test_wait_awaits_cancelled_tasks(self):
+        finished = False
+
+        async def wait_forever():
+            nonlocal finished
+            try:
+                await asyncio.sleep(60)
+            finally:
+                await asyncio.sleep(0)
+                finished = True
+
+        daemon = Daemon(
+            daemon_args,
+            AsyncMock(),
+            console=MagicMock(),
+            error_console=MagicMock(),
+        )
+        await daemon._wait(wait_forever(), timeout=0)
+
+        self.assertTrue(finished)
+
+    async def test_reload(self):
+        console = MagicMock()
+        load_arguments = MagicMock(
+            side_effect=[
+                daemon_args(),
+                ConfigError("Broken config."),
+                daemon_args(type="nvt"),
+            ]
+        )
+        calls = []
+
+        async def run_sync(args, feed_type):
+            calls.append(feed_type)
+            if len(calls) < 3:
+                daemon.reload()
+            else:
+                daemon.stop()
+            return 0
+
+        daemon = Daemon(
+            load_arguments,
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        await daemon.run()
+
+        # the broken config is ignored
+        self.assertEqual(calls, ["all", "all", "nvt"])
+        self.assertEqual(load_arguments.call_count, 3)
+        console.print.assert_any_call(
+            "Error: Broken config. Keeping the previous configuration."
+        )
+
+    async def test_continue_after_error(self):
+        console = MagicMock()
+        calls = []
+
+        async def run_sync(args, feed_type):
+            calls.append(feed_type)
+            if len(calls) == 1:
+                raise GreenboneFeedSyncError("Sync failed.")
+            daemon.stop()
+            return 1
+
+        daemon = Daemon(
+            daemon_args,
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        ret = await daemon.run()
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(len(calls), 2)
+        console.print.assert_any_call("Error: Sync failed.")
+        console.print.assert_any_call("Sync of feed type all failed.")
+
+    async def test_continue_after_unexpected_error(self):
+        console = MagicMock()
+        calls = []
+
+        async def run_sync(args, feed_type):
+            calls.append(feed_type)
+            if len(calls) == 1:
+                raise OSError("Disk full")
+            daemon.stop()
+            return 0
+
+        daemon = Daemon(
+            daemon_args,
+            run_sync,
+            console=console,
+            error_console=console,
+        )
+        ret = await daemon.run()
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(len(calls), 2)
+        console.print.assert_any_call(
+            "Unexpected error during sync of feed type all: "
+            "OSError('Disk full')"
+        )
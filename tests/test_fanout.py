@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import ConfigError
+from greenbone.feed.sync.fanout import rebase_path, same_filesystem
+
+
+class RebasePathTestCase(unittest.TestCase):
+    def test_rebase_path(self):
+        self.assertEqual(
+            rebase_path("/var/lib/openvas/plugins", "/var/lib/", "/srv/a"),
+            Path("/srv/a/openvas/plugins"),
+        )
+
+    def test_outside_of_prefix(self):
+        with self.assertRaisesRegex(
+            ConfigError, "/opt/plugins is not inside of the destination prefix"
+        ):
+            rebase_path("/opt/plugins", "/var/lib", "/srv/a")
+
+
+class SameFilesystemTestCase(unittest.TestCase):
+    def test_same_filesystem(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / "a").mkdir()
+
+            self.assertTrue(same_filesystem(temp_dir / "a", temp_dir / "b/c"))
+
+    def test_other_filesystem(self):
+        with (
+            temp_directory() as temp_dir,
+            patch.object(Path, "stat", autospec=True) as stat_mock,
+        ):
+            stat_mock.side_effect = lambda path, **kwargs: MagicMock(
+                st_dev=1 if path == temp_dir else 2
+            )
+            (temp_dir / "a").mkdir()
+
+            self.assertFalse(same_filesystem(temp_dir, temp_dir / "a"))
@@ -5,18 +5,25 @@
 
 # pylint: disable=protected-access
 
+import asyncio
 import errno
 import unittest
 from io import StringIO
+from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
 from pontos.testing import temp_directory
 from rich.console import Console
 
-from greenbone.feed.sync.errors import FileLockingError, GreenboneFeedSyncError
+from greenbone.feed.sync.errors import (
+    FileLockedError,
+    FileLockingError,
+    GreenboneFeedSyncError,
+)
 from greenbone.feed.sync.helper import (
     Spinner,
     change_user_and_group,
+    feed_state_directory,
     flock_wait,
     is_root,
 )
@@ -104,7 +111,7 @@ class FlockTestCase(unittest.IsolatedAsyncioTestCase):
             lock_file = temp_dir / "file.lock"
 
             with self.assertRaisesRegex(
-                FileLockingError,
+                FileLockedError,
                 f"{lock_file.absolute()} is locked. Another process related "
                 "to the feed update may already running.",
             ):
@@ -140,6 +147,110 @@ class FlockTestCase(unittest.IsolatedAsyncioTestCase):
             ):
                 pass
 
+    async def test_blocking(self):
+        with temp_directory() as temp_dir:
+            lock_file = temp_dir / "file.lock"
+            console = MagicMock(spec=Console)
+            released = asyncio.Event()
+
+            async def hold_lock():
+                async with flock_wait(lock_file):
+                    await asyncio.sleep(0.05)
+                released.set()
+
+            holder = asyncio.create_task(hold_lock())
+            await asyncio.sleep(0)
+
+            async with flock_wait(lock_file, console=console, blocking=True):
+                self.assertTrue(released.is_set())
+
+                with self.assertRaises(FileLockedError):
+                    async with flock_wait(lock_file, wait_interval=None):
+                        pass
+
+            await holder
+
+            console.print.assert_has_calls(
+                [
+                    call(f"Trying to acquire lock on {lock_file.absolute()}"),
+                    call(
+                        f"{lock_file.absolute()} is locked by another process."
+                        " Waiting for the lock to be released."
+                    ),
+                    call(f"Acquired lock on {lock_file.absolute()}"),
+                    call(f"Releasing lock on {lock_file.absolute()}"),
+                ]
+            )
+
+            # lock must be free again
+            async with flock_wait(lock_file, wait_interval=None):
+                pass
+
+    async def test_blocking_timeout(self):
+        with temp_directory() as temp_dir:
+            lock_file = temp_dir / "file.lock"
+
+            async with flock_wait(lock_file):
+                with self.assertRaisesRegex(
+                    FileLockedError,
+                    "Timeout while waiting for the lock on "
+                    f"{lock_file.absolute()}",
+                ):
+                    async with flock_wait(
+                        lock_file, blocking=True, timeout=0.05
+                    ):
+                        pass
+
+            # the abandoned thread must free the lock directly
+            for _ in range(100):
+                try:
+                    async with flock_wait(lock_file, wait_interval=None):
+                        break
+                except FileLockedError:
+                    await asyncio.sleep(0.01)
+            else:
+                self.fail("Lock has not been released")
+
+    async def test_blocking_cancel(self):
+        with temp_directory() as temp_dir:
+            lock_file = temp_dir / "file.lock"
+
+            async def wait_for_lock():
+                async with flock_wait(lock_file, blocking=True):
+                    pass
+
+            async with flock_wait(lock_file):
+                task = asyncio.create_task(wait_for_lock())
+                await asyncio.sleep(0.01)
+                task.cancel()
+
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+            for _ in range(100):
+                try:
+                    async with flock_wait(lock_file, wait_interval=None):
+                        break
+                except FileLockedError:
+                    await asyncio.sleep(0.01)
+            else:
+                self.fail("Lock has not been released")
+
+    async def test_polling_timeout(self):
+        with temp_directory() as temp_dir:
+            lock_file = temp_dir / "file.lock"
+
+            async with flock_wait(lock_file):
+                with self.assertRaisesRegex(
+                    FileLockedError,
+                    "Timeout while waiting for the lock on "
+                    f"{lock_file.absolute()}",
+                ):
+                    async with flock_wait(
+                        lock_file, wait_interval=0.01, timeout=0.05
+                    ):
+                        pass
+
     async def test_permission_error(self):
         with temp_directory() as temp_dir:
             lock_file = temp_dir / "file.lock"
@@ -155,6 +266,18 @@ class FlockTestCase(unittest.IsolatedAsyncioTestCase):
                     pass
 
 
+class FeedStateDirectoryTestCase(unittest.TestCase):
+    def test_feed_state_directory(self):
+        self.assertEqual(
+            feed_state_directory("/var/lib/openvas/plugins"),
+            Path("/var/lib/openvas/.feed-sync/plugins"),
+        )
+        self.assertEqual(
+            feed_state_directory(Path("/var/lib/openvas/plugins/")),
+            Path("/var/lib/openvas/.feed-sync/plugins"),
+        )
+
+
 class SpinnerTestCase(unittest.TestCase):
     @patch("greenbone.feed.sync.helper.Live", autospec=True)
     def test_context_manager(self, live_mock: MagicMock):
@@ -0,0 +1,276 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.incremental import (
+    ChecksumDiff,
+    diff_checksums,
+    incremental_sync,
+)
+from greenbone.feed.sync.tree import TreeManifest, build_tree_manifest
+from greenbone.feed.sync.verify import CHECKSUMS_FILE_NAME
+from tests.helper import checksums_file, create_feed, sha256
+
+FILES = {
+    "foo/bar.nasl": b"bar",
+    "foo/baz.nasl": b"baz",
+    "lorem.nasl": b"lorem",
+}
+
+
+class DiffChecksumsTestCase(unittest.TestCase):
+    def test_no_changes(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FILES, checksums=True)
+            checksums = {path: sha256(data) for path, data in FILES.items()}
+
+            diff = diff_checksums(temp_dir, checksums, checksums)
+
+            self.assertFalse(diff)
+
+    def test_changes(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FILES, checksums=True)
+            previous = {path: sha256(data) for path, data in FILES.items()}
+            current = {
+                "foo/bar.nasl": sha256(b"changed"),
+                "lorem.nasl": sha256(b"lorem"),
+                "new.nasl": sha256(b"new"),
+            }
+
+            diff = diff_checksums(temp_dir, previous, current)
+
+            self.assertEqual(
+                diff,
+                ChecksumDiff(
+                    added=["new.nasl"],
+                    updated=["foo/bar.nasl"],
+                    deleted=["foo/baz.nasl"],
+                ),
+            )
+
+    def test_manifest(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FILES, checksums=True)
+            build_tree_manifest(temp_dir / "manifest", destination)
+            checksums = {path: sha256(data) for path, data in FILES.items()}
+            # the previous checksums don't match the local files anymore
+            previous = {**checksums, "lorem.nasl": sha256(b"ipsum")}
+
+            diff = diff_checksums(
+                destination,
+                previous,
+                checksums,
+                manifest_file=temp_dir / "manifest",
+            )
+
+            self.assertFalse(diff)
+
+            (destination / "lorem.nasl").write_bytes(b"tampered")
+
+            diff = diff_checksums(
+                destination,
+                checksums,
+                checksums,
+                manifest_file=temp_dir / "manifest",
+            )
+
+            self.assertEqual(diff, ChecksumDiff(updated=["lorem.nasl"]))
+
+    def test_manifest_is_not_loaded(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "feed", FILES, checksums=True)
+            build_tree_manifest(temp_dir / "manifest", temp_dir / "feed")
+            checksums = {path: sha256(data) for path, data in FILES.items()}
+
+            # the entries are looked up instead of iterating the manifest
+            with patch.object(
+                TreeManifest, "__iter__", side_effect=AssertionError
+            ):
+                diff = diff_checksums(
+                    temp_dir / "feed",
+                    checksums,
+                    checksums,
+                    manifest_file=temp_dir / "manifest",
+                )
+
+            self.assertFalse(diff)
+
+    def test_tree_is_not_walked(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FILES, checksums=True)
+            (temp_dir / "unlisted/foo").mkdir(parents=True)
+            checksums = {path: sha256(data) for path, data in FILES.items()}
+
+            with patch("os.scandir", side_effect=AssertionError):
+                diff = diff_checksums(temp_dir, checksums, checksums)
+
+            self.assertFalse(diff)
+
+
+class IncrementalSyncTestCase(unittest.IsolatedAsyncioTestCase):
+    def create_rsync(self, upstream: dict[str, bytes]) -> MagicMock:
+        async def fetch_directory_files(url, destination, *, compare_dest):
+            Path(destination, CHECKSUMS_FILE_NAME).write_text(
+                checksums_file(upstream)
+            )
+
+        async def fetch_files(url, destination, files):
+            for file in files:
+                (Path(destination) / file).parent.mkdir(
+                    parents=True, exist_ok=True
+                )
+                (Path(destination) / file).write_bytes(upstream[file])
+
+        rsync = MagicMock()
+        rsync.fetch_directory_files = AsyncMock(
+            side_effect=fetch_directory_files
+        )
+        rsync.fetch_files = AsyncMock(side_effect=fetch_files)
+        return rsync
+
+    async def test_changes(self):
+        upstream = {
+            "foo/bar.nasl": b"changed",
+            "lorem.nasl": b"lorem",
+            "new/new.nasl": b"new",
+        }
+        rsync = self.create_rsync(upstream)
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(
+                destination, {**FILES, "old/old.nasl": b"old"}, checksums=True
+            )
+
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                destination,
+                staging_directory=temp_dir / "state",
+                max_changes=1,
+            )
+
+            self.assertEqual(
+                changes,
+                ChangeSet(
+                    added=["new/new.nasl"],
+                    updated=["foo/bar.nasl", CHECKSUMS_FILE_NAME],
+                    deleted=["foo/baz.nasl", "old/old.nasl"],
+                ),
+            )
+            rsync.fetch_files.assert_awaited_once_with(
+                "rsync://foo.bar/feed",
+                destination,
+                ["new/new.nasl", "foo/bar.nasl"],
+            )
+            self.assertEqual(
+                (destination / "foo/bar.nasl").read_bytes(), b"changed"
+            )
+            self.assertFalse((destination / "old").exists())
+            self.assertEqual(
+                (destination / CHECKSUMS_FILE_NAME).read_text(),
+                checksums_file(upstream),
+            )
+            self.assertEqual(list((temp_dir / "state").iterdir()), [])
+
+    async def test_up_to_date(self):
+        rsync = self.create_rsync(FILES)
+        rsync.fetch_directory_files = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FILES, checksums=True)
+
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                destination,
+                staging_directory=temp_dir / "state",
+            )
+
+        self.assertEqual(changes, ChangeSet())
+        rsync.fetch_files.assert_not_awaited()
+
+    async def test_no_local_checksums(self):
+        rsync = self.create_rsync(FILES)
+
+        with temp_directory() as temp_dir:
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                temp_dir / "feed",
+                staging_directory=temp_dir / "state",
+            )
+
+        self.assertIsNone(changes)
+        rsync.fetch_directory_files.assert_not_awaited()
+
+    async def test_too_many_changes(self):
+        rsync = self.create_rsync(dict.fromkeys(FILES.keys(), b"changed"))
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FILES, checksums=True)
+
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                destination,
+                staging_directory=temp_dir / "state",
+            )
+
+        self.assertIsNone(changes)
+        rsync.fetch_files.assert_not_awaited()
+
+    async def test_mismatch(self):
+        rsync = self.create_rsync({**FILES, "lorem.nasl": b"ipsum"})
+        rsync.fetch_files = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FILES, checksums=True)
+
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                destination,
+                staging_directory=temp_dir / "state",
+            )
+
+            self.assertIsNone(changes)
+            rsync.fetch_files.assert_awaited_once()
+            # the old checksums are kept for the full sync
+            self.assertEqual(
+                (destination / CHECKSUMS_FILE_NAME).read_text(),
+                checksums_file(FILES),
+            )
+
+    async def test_rsync_error(self):
+        rsync = self.create_rsync(FILES)
+        rsync.fetch_directory_files = AsyncMock(
+            side_effect=RsyncError(10, ["rsync"])
+        )
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FILES, checksums=True)
+
+            changes = await incremental_sync(
+                rsync,
+                "rsync://foo.bar/feed",
+                destination,
+                staging_directory=temp_dir / "state",
+            )
+
+        self.assertIsNone(changes)
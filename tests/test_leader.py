@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import ConfigError, GreenboneFeedSyncError
+from greenbone.feed.sync.leader import (
+    Module,
+    leader_module_url,
+    leader_url,
+    rsync_daemon,
+    rsyncd_config,
+    write_rsyncd_config,
+)
+
+# A stand-in for the rsync daemon. It writes its arguments to a log file and
+# runs until it gets terminated.
+FAKE_RSYNC = """#!{python}
+import os
+import signal
+import sys
+import time
+
+with open(os.environ["FAKE_RSYNC_LOG"], "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+
+if os.environ.get("FAKE_RSYNC_FAIL"):
+    print("rsync: failed to bind to port", file=sys.stderr)
+    sys.exit(10)
+
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+while True:
+    time.sleep(1)
+"""
+
+
+class LeaderUrlTestCase(unittest.TestCase):
+    def test_leader_url(self):
+        self.assertEqual(leader_url("foo.bar"), "rsync://foo.bar:8873")
+        self.assertEqual(leader_url("foo.bar:873"), "rsync://foo.bar:873")
+        self.assertEqual(
+            leader_url("rsync://foo.bar:1873/"), "rsync://foo.bar:1873"
+        )
+
+    def test_invalid_leader_url(self):
+        with self.assertRaisesRegex(ConfigError, "Invalid leader"):
+            leader_url("ssh://foo.bar")
+
+    def test_leader_module_url(self):
+        self.assertEqual(
+            leader_module_url("rsync://foo.bar:8873", "nasl"),
+            "rsync://foo.bar:8873/nasl/",
+        )
+
+
+class RsyncdConfigTestCase(unittest.TestCase):
+    def test_rsyncd_config(self):
+        config = rsyncd_config(
+            [
+                Module("nasl", Path("/var/lib/openvas/plugins"), "NASL files"),
+                Module("notus", Path("/var/lib/notus")),
+            ],
+            state_directory=Path("/var/lib/.feed-sync"),
+            port=1873,
+            address="10.0.0.1",
+            hosts_allow=["10.0.0.0/24", "leader.example.com"],
+            exclude=["private", ".rsync-partial"],
+        )
+
+        self.assertEqual(
+            config,
+            """# Generated by greenbone-feed-sync. Changes get overwritten.
+pid file = /var/lib/.feed-sync/rsyncd.pid
+log file = /var/lib/.feed-sync/rsyncd.log
+port = 1873
+use chroot = no
+munge symlinks = no
+read only = yes
+list = yes
+address = 10.0.0.1
+hosts allow = 10.0.0.0/24 leader.example.com
+hosts deny = *
+
+[nasl]
+    path = /var/lib/openvas/plugins
+    comment = NASL files
+    exclude = /private/ /.rsync-partial/
+
+[notus]
+    path = /var/lib/notus
+    exclude = /private/ /.rsync-partial/
+""",
+        )
+
+    def test_rsyncd_config_without_hosts_allow(self):
+        config = rsyncd_config(
+            [Module("nasl", Path("/var/lib/openvas/plugins"))],
+            state_directory=Path("/var/lib/.feed-sync"),
+        )
+
+        self.assertNotIn("hosts allow", config)
+        self.assertNotIn("hosts deny", config)
+
+    def test_write_rsyncd_config(self):
+        with temp_directory() as temp_dir:
+            config_file = temp_dir / ".feed-sync/rsyncd.conf"
+
+            self.assertTrue(write_rsyncd_config(config_file, "foo"))
+            self.assertFalse(write_rsyncd_config(config_file, "foo"))
+            self.assertTrue(write_rsyncd_config(config_file, "bar"))
+            self.assertEqual(config_file.read_text(), "bar")
+
+
+class RsyncDaemonTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir_context = temp_directory()
+        self.temp_dir = self.temp_dir_context.__enter__()
+        bin_dir = self.temp_dir / "bin"
+        bin_dir.mkdir()
+        rsync = bin_dir / "rsync"
+        rsync.write_text(FAKE_RSYNC.format(python=sys.executable))
+        rsync.chmod(0o755)
+        self.log = self.temp_dir / "rsync.log"
+        self.log.touch()
+        self.config_file = self.temp_dir / "rsyncd.conf"
+        self.config_file.touch()
+
+        self.env_patch = patch.dict(
+            os.environ,
+            {
+                "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                "FAKE_RSYNC_LOG": str(self.log),
+            },
+        )
+        self.env_patch.start()
+
+    def tearDown(self) -> None:
+        self.env_patch.stop()
+        self.temp_dir_context.__exit__(None, None, None)
+
+    async def test_rsync_daemon(self):
+        console = MagicMock()
+
+        async with rsync_daemon(
+            self.config_file, console=console, startup_time=0.2
+        ) as process:
+            self.assertIsNone(process.returncode)
+
+        self.assertIsNotNone(process.returncode)
+        self.assertEqual(
+            self.log.read_text().splitlines(),
+            [f"--daemon --no-detach --config={self.config_file}"],
+        )
+        console.print.assert_called_once_with(
+            f"Serving the feed data via rsync daemon {process.pid}."
+        )
+
+    async def test_rsync_daemon_failure(self):
+        with (
+            patch.dict(os.environ, {"FAKE_RSYNC_FAIL": "1"}),
+            self.assertRaisesRegex(
+                GreenboneFeedSyncError,
+                "The rsync daemon exited with code 10",
+            ),
+        ):
+            async with rsync_daemon(self.config_file, startup_time=5):
+                pass
+
+        self.assertIn(
+            "failed to bind to port",
+            (self.temp_dir / "rsyncd.log").read_text(),
+        )
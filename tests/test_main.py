@@ -3,22 +3,60 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 #
 
+import asyncio
+import hashlib
+import os
+import shutil
+import signal
 import sys
 import unittest
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, call, patch
 
 from pontos.testing import temp_directory
 
+from greenbone.feed.sync.batch import (
+    BatchInfo,
+    batch_info_file,
+    tree_fingerprint,
+    write_batch_info,
+)
+from greenbone.feed.sync.changes import ChangeSet
 from greenbone.feed.sync.config import DEFAULT_FEED_RELEASE
-from greenbone.feed.sync.errors import GreenboneFeedSyncError, RsyncError
+from greenbone.feed.sync.errors import (
+    CompletionHookError,
+    ConfigError,
+    FileLockedError,
+    GreenboneFeedSyncError,
+    RsyncError,
+)
+from greenbone.feed.sync.helper import flock_wait
 from greenbone.feed.sync.main import (
     Sync,
+    SyncList,
     do_selftest,
+    fan_out_sync_list,
     feed_sync,
     filter_syncs,
+    load_arguments,
     main,
+    run_sync,
+    run_sync_lists,
+    run_syncs,
+    staging_lock_file,
+    verify_download,
+    write_leader_config,
 )
+from greenbone.feed.sync.merkle import (
+    DirectoryDigest,
+    read_merkle_digests,
+    write_merkle_digests,
+)
+from greenbone.feed.sync.parser import CliParser
+from greenbone.feed.sync.snapshot import Snapshots
+from greenbone.feed.sync.tree import TreeManifest
 
 
 class FilterSyncsTestCase(unittest.TestCase):
@@ -35,26 +73,1317 @@ class FilterSyncsTestCase(unittest.TestCase):
             sync_c,
         )
 
-        self.assertEqual(len(sync_list.syncs), 2)
-        self.assertEqual(sync_list.lock_file, "file.lock")
+        self.assertEqual(len(sync_list.syncs), 2)
+        self.assertEqual(sync_list.lock_file, "file.lock")
+
+        self.assertEqual(sync_list.syncs[0], sync_a)
+        self.assertEqual(sync_list.syncs[1], sync_b)
+
+
+class FanOutSyncListTestCase(unittest.TestCase):
+    def test_fan_out_sync_list(self):
+        with temp_directory() as temp_dir:
+            sync_list = SyncList(
+                lock_file=str(temp_dir / "cache/feed.lock"),
+                syncs=[
+                    Sync(
+                        name="a",
+                        types=["foo"],
+                        url="rsync://foo.bar/a",
+                        destination=str(temp_dir / "cache/a"),
+                        marker="timestamp",
+                        shards=4,
+                    )
+                ],
+            )
+
+            fan_out = fan_out_sync_list(
+                sync_list, temp_dir / "cache", temp_dir / "scanner"
+            )
+
+        self.assertEqual(fan_out.lock_file, str(temp_dir / "scanner/feed.lock"))
+        self.assertEqual(
+            fan_out.syncs,
+            [
+                Sync(
+                    name="a",
+                    types=["foo"],
+                    url=f"{temp_dir}/cache/a/",
+                    destination=str(temp_dir / "scanner/a"),
+                    marker="timestamp",
+                    link_dest=temp_dir / "cache/a",
+                )
+            ],
+        )
+
+    def test_outside_of_prefix(self):
+        sync_list = SyncList(
+            lock_file="/tmp/cache/feed.lock",
+            syncs=[Sync(name="a", types=["foo"], url="a", destination="/a")],
+        )
+
+        with self.assertRaisesRegex(
+            GreenboneFeedSyncError, "/a is not inside of the destination prefix"
+        ):
+            fan_out_sync_list(sync_list, "/tmp/cache", "/tmp/scanner")
+
+
+class WriteLeaderConfigTestCase(unittest.TestCase):
+    def test_write_leader_config(self):
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+            ),
+        ):
+            args = CliParser().parse_arguments(
+                ["--private-directory", "private", "--serve-port", "1873"]
+            )
+            config_file = write_leader_config(args)
+            config = config_file.read_text()
+
+        self.assertEqual(config_file, temp_dir / ".feed-sync/rsyncd.conf")
+        self.assertIn("port = 1873\n", config)
+        self.assertIn("address = 127.0.0.1\n", config)
+        self.assertIn(
+            f"[nasl]\n    path = {temp_dir}/openvas/plugins\n", config
+        )
+        self.assertIn(
+            "[report-formats]\n"
+            f"    path = {temp_dir}/gvm/data-objects/gvmd/report-formats\n",
+            config,
+        )
+        self.assertIn("exclude = /private/ /.rsync-partial/\n", config)
+
+
+class DoSelftestTestCase(unittest.TestCase):
+    @patch("greenbone.feed.sync.main.subprocess.run")
+    def test_do_selftest_success(self, mock_subprocess_run: MagicMock):
+        mock_subprocess_run.side_effect = [""]
+        do_selftest()
+
+    @patch("greenbone.feed.sync.main.subprocess.run")
+    def test_do_selftest_rsync_fail(self, mock_subprocess_run: MagicMock):
+        mock_subprocess_run.side_effect = [PermissionError]
+        with self.assertRaisesRegex(
+            GreenboneFeedSyncError, "The rsync binary could not be found."
+        ):
+            do_selftest()
+
+
+class LoadArgumentsTestCase(unittest.TestCase):
+    def test_load_arguments(self):
+        with patch.object(
+            sys, "argv", ["greenbone-feed-sync", "--daemon", "--serve"]
+        ):
+            args = load_arguments()
+
+        self.assertTrue(args.daemon)
+        self.assertTrue(args.serve)
+
+    def test_invalid_combination(self):
+        # also checked when the daemon reloads the arguments
+        with (
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--incremental", "--snapshots", "2"],
+            ),
+            self.assertRaisesRegex(
+                ConfigError, "Incremental downloads can't be used together"
+            ),
+        ):
+            load_arguments()
+
+
+class RunSyncTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_record_changes(self):
+        async def sync(url, destination, progress):
+            progress(">f+++++++++ 12 a.nasl")
+            progress("*deleting   0 b.nasl")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=sync)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=2,
+                show_spinner=False,
+                record_changes=True,
+            )
+
+            rsync.sync.assert_awaited_once_with(
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+                progress=ANY,
+            )
+            self.assertEqual(
+                ChangeSet.read(
+                    temp_dir / ".feed-sync" / "plugins" / "last-changes.jsonl"
+                ),
+                ChangeSet(added=["a.nasl"], deleted=["b.nasl"]),
+            )
+            console.print.assert_called_with(
+                "NASL files: 1 added, 0 updated, 1 deleted"
+            )
+
+    async def test_tree_manifest(self):
+        async def sync(url, destination, progress):
+            Path(destination).mkdir(parents=True, exist_ok=True)
+            (Path(destination) / "a.nasl").write_text("a")
+            progress(">f+++++++++ 1 a.nasl")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=sync)
+        rsync.private_subdir = None
+        rsync.partial_dir = None
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=MagicMock(),
+                verbose=0,
+                show_spinner=False,
+                tree_manifest=True,
+            )
+
+            with TreeManifest(
+                temp_dir / ".feed-sync" / "plugins" / "tree-manifest.bin"
+            ) as manifest:
+                self.assertEqual(
+                    manifest.get("a.nasl").digest,
+                    hashlib.sha256(b"a").digest(),
+                )
+            self.assertFalse(
+                (temp_dir / ".feed-sync/plugins/last-changes.jsonl").exists()
+            )
+
+    async def test_incremental(self):
+        checksums = "".join(
+            f"{hashlib.sha256(name.encode()).hexdigest()}  {name}.nasl\n"
+            for name in ("b", "c")
+        )
+
+        async def fetch_directory_files(url, destination, *, compare_dest):
+            (Path(destination) / "sha256sums").write_text(
+                f"{hashlib.sha256(b'a').hexdigest()}  a.nasl\n{checksums}"
+            )
+
+        async def fetch_files(url, destination, files):
+            (Path(destination) / "a.nasl").write_text("a")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.fetch_directory_files = AsyncMock(
+            side_effect=fetch_directory_files
+        )
+        rsync.fetch_files = AsyncMock(side_effect=fetch_files)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            destination.mkdir()
+            (destination / "b.nasl").write_text("b")
+            (destination / "c.nasl").write_text("c")
+            (destination / "sha256sums").write_text(checksums)
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=2,
+                show_spinner=False,
+                record_changes=True,
+                incremental=True,
+            )
+
+            rsync.sync.assert_not_awaited()
+            rsync.fetch_files.assert_awaited_once_with(
+                "rsync://foo.bar/nasl", destination, ["a.nasl"]
+            )
+            self.assertEqual(
+                ChangeSet.read(
+                    temp_dir / ".feed-sync" / "plugins" / "last-changes.jsonl"
+                ),
+                ChangeSet(added=["a.nasl"], updated=["sha256sums"]),
+            )
+            console.print.assert_any_call(
+                "Downloaded 2 changed files of NASL files incrementally."
+            )
+
+    async def test_merkle_digest(self):
+        async def sync(url, destination, progress):
+            Path(destination, "2024").mkdir(parents=True, exist_ok=True)
+            (Path(destination) / "2024/a.nasl").write_text("a")
+            progress(">f+++++++++ 1 2024/a.nasl")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=sync)
+        rsync.private_subdir = None
+        rsync.partial_dir = None
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=MagicMock(),
+                verbose=0,
+                show_spinner=False,
+                merkle_digest=True,
+            )
+
+            digests = read_merkle_digests(
+                temp_dir / ".feed-sync" / "plugins" / "merkle-digest.json"
+            )
+            self.assertEqual(sorted(digests), ["", "2024"])
+            self.assertTrue(
+                (temp_dir / ".feed-sync/plugins/tree-manifest.bin").exists()
+            )
+
+    async def test_incremental_fallback(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        console = MagicMock()
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/nasl",
+        )
+
+        with patch(
+            "greenbone.feed.sync.main.incremental_sync",
+            AsyncMock(return_value=None),
+        ):
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=1,
+                show_spinner=False,
+                incremental=True,
+            )
+
+        rsync.sync.assert_awaited_once_with(
+            url="rsync://foo.bar/nasl", destination="/tmp/nasl"
+        )
+        console.print.assert_any_call(
+            "NASL files can't be updated incrementally. Downloading all files."
+        )
+
+    async def test_shards(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(return_value=None)
+        console = MagicMock()
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/nasl",
+            shards=4,
+        )
+
+        await run_sync(sync, rsync, console=console, verbose=0)
+
+        rsync.sync.assert_awaited_once_with(
+            url="rsync://foo.bar/nasl", destination="/tmp/nasl", shards=4
+        )
+
+    async def test_snapshots(self):
+        async def sync(url, destination, progress, **kwargs):
+            (Path(destination) / "version").write_text("new")
+            progress(">f+++++++++ 3 version")
+
+        rsync = MagicMock(private_subdir="private")
+        rsync.sync = AsyncMock(side_effect=sync)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            (destination / "private").mkdir(parents=True)
+            (destination / "private" / "my.nasl").write_text("mine")
+            (destination / "version").write_text("old")
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=0,
+                record_changes=True,
+                keep_snapshots=1,
+            )
+
+            snapshots = temp_dir / ".feed-sync" / "plugins" / "snapshots"
+            self.assertTrue(destination.is_symlink())
+            self.assertEqual((destination / "version").read_text(), "new")
+            self.assertEqual(
+                (destination / "private" / "my.nasl").read_text(), "mine"
+            )
+            # only the new snapshot is kept
+            self.assertEqual(len(list(snapshots.iterdir())), 1)
+
+            kwargs = rsync.sync.await_args.kwargs
+            self.assertEqual(kwargs["destination"].parent, snapshots)
+            # the former destination directory became a snapshot
+            self.assertEqual(
+                kwargs["link_dest"], temp_dir.resolve() / "plugins"
+            )
+            self.assertEqual(
+                ChangeSet.read(
+                    temp_dir / ".feed-sync" / "plugins" / "last-changes.jsonl"
+                ),
+                ChangeSet(updated=["version"]),
+            )
+
+    async def test_snapshots_failure(self):
+        rsync = MagicMock(private_subdir=None)
+        rsync.sync = AsyncMock(side_effect=RsyncError(23, ["foo"]))
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            destination.mkdir()
+            (destination / "version").write_text("old")
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            with self.assertRaises(RsyncError):
+                await run_sync(
+                    sync, rsync, console=console, verbose=0, keep_snapshots=2
+                )
+
+            snapshots = temp_dir / ".feed-sync" / "plugins" / "snapshots"
+            # the destination is untouched and the incomplete snapshot is
+            # removed
+            self.assertFalse(destination.is_symlink())
+            self.assertEqual((destination / "version").read_text(), "old")
+            self.assertEqual(list(snapshots.iterdir()), [])
+
+    async def test_snapshots_commit_lock(self):
+        events = []
+
+        async def sync(url, destination, **kwargs):
+            events.append("download")
+            (Path(destination) / "version").write_text("new")
+
+        @asynccontextmanager
+        async def commit_lock():
+            events.append("lock")
+            yield
+            events.append("unlock")
+
+        rsync = MagicMock(private_subdir=None)
+        rsync.sync = AsyncMock(side_effect=sync)
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=MagicMock(),
+                verbose=0,
+                keep_snapshots=2,
+                commit_lock=commit_lock,
+            )
+
+            self.assertEqual((destination / "version").read_text(), "new")
+
+        self.assertEqual(events, ["download", "lock", "unlock"])
+
+    async def test_commit_lock_without_snapshots(self):
+        events = []
+
+        async def sync(url, destination, **kwargs):
+            events.append("download")
+
+        @asynccontextmanager
+        async def commit_lock():
+            events.append("lock")
+            yield
+            events.append("unlock")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=sync)
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/plugins",
+        )
+
+        await run_sync(
+            sync, rsync, console=MagicMock(), verbose=0, commit_lock=commit_lock
+        )
+
+        self.assertEqual(events, ["lock", "download", "unlock"])
+
+    async def test_retries(self):
+        async def sync(url, destination, progress):
+            if rsync.sync.await_count == 1:
+                progress(">f+++++++++ 12 a.nasl")
+                raise RsyncError(30, ["foo"])
+            progress(">f+++++++++ 12 b.nasl")
+
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=sync)
+        console = MagicMock()
+
+        with (
+            temp_directory() as temp_dir,
+            patch("greenbone.feed.sync.retry.backoff_delay", return_value=0),
+        ):
+            destination = temp_dir / "plugins"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=2,
+                show_spinner=False,
+                record_changes=True,
+                retries=2,
+            )
+
+            self.assertEqual(rsync.sync.await_count, 2)
+            # the changes of all attempts are recorded
+            self.assertEqual(
+                ChangeSet.read(
+                    temp_dir / ".feed-sync" / "plugins" / "last-changes.jsonl"
+                ),
+                ChangeSet(added=["a.nasl", "b.nasl"]),
+            )
+            console.print.assert_any_call(
+                "Downloading NASL files failed: 'rsync foo' returned non-zero "
+                "exit status 30. Retrying in 0 seconds (attempt 2 of 3)."
+            )
+            console.print.assert_any_call(
+                "Downloaded NASL files after 2 attempts in 0 seconds."
+            )
+
+    async def test_retries_fatal_error(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=RsyncError(11, ["foo"]))
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/plugins",
+        )
+
+        with self.assertRaises(RsyncError):
+            await run_sync(
+                sync, rsync, console=MagicMock(), verbose=0, retries=2
+            )
+
+        rsync.sync.assert_awaited_once()
+
+    async def test_pre_check_up_to_date(self):
+        async def fetch_file(url: str, destination: Path) -> None:
+            Path(destination).write_bytes(b"1")
+
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock(side_effect=fetch_file)
+        rsync.sync = AsyncMock(return_value=None)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            destination.mkdir()
+            (destination / "timestamp").write_bytes(b"1")
+            state_dir = temp_dir / ".feed-sync" / "scap-data"
+            state_dir.mkdir(parents=True)
+            (state_dir / "timestamp").write_bytes(b"1")
+            sync = Sync(
+                name="SCAP data",
+                types=["all"],
+                url="rsync://foo.bar/scap-data",
+                destination=str(destination),
+                marker="timestamp",
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=1,
+                show_spinner=False,
+                pre_check=True,
+            )
+
+            rsync.fetch_file.assert_awaited_once()
+            rsync.sync.assert_not_awaited()
+            console.print.assert_called_once_with("SCAP data up to date.")
+
+    async def test_pre_check_changed(self):
+        async def fetch_file(url: str, destination: Path) -> None:
+            Path(destination).write_bytes(b"2")
+
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock(side_effect=fetch_file)
+        rsync.sync = AsyncMock(return_value=None)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            destination.mkdir()
+            (destination / "timestamp").write_bytes(b"1")
+            sync = Sync(
+                name="SCAP data",
+                types=["all"],
+                url="rsync://foo.bar/scap-data",
+                destination=str(destination),
+                marker="timestamp",
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=0,
+                pre_check=True,
+            )
+
+            rsync.sync.assert_awaited_once_with(
+                url="rsync://foo.bar/scap-data", destination=str(destination)
+            )
+            self.assertEqual(
+                (
+                    temp_dir / ".feed-sync" / "scap-data" / "timestamp"
+                ).read_bytes(),
+                b"2",
+            )
+
+    async def test_pre_check_fetch_failure(self):
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock(side_effect=RsyncError(23, ["foo"]))
+        rsync.sync = AsyncMock(return_value=None)
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            sync = Sync(
+                name="SCAP data",
+                types=["all"],
+                url="rsync://foo.bar/scap-data",
+                destination=str(destination),
+                marker="timestamp",
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=0,
+                pre_check=True,
+            )
+
+            rsync.sync.assert_awaited_once()
+            self.assertFalse(
+                (temp_dir / ".feed-sync" / "scap-data" / "timestamp").exists()
+            )
+
+    async def test_pre_check_without_marker(self):
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock()
+        rsync.sync = AsyncMock(return_value=None)
+        console = MagicMock()
+        sync = Sync(
+            name="Notus files",
+            types=["all"],
+            url="rsync://foo.bar/notus",
+            destination="/tmp/notus",
+        )
+
+        await run_sync(sync, rsync, console=console, verbose=0, pre_check=True)
+
+        rsync.fetch_file.assert_not_awaited()
+        rsync.sync.assert_awaited_once()
+
+    async def test_write_batch(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.private_subdir = "private"
+        rsync.partial_dir = None
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            batch = temp_dir / "batches/nasl-files.batch"
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            await run_sync(
+                sync,
+                rsync,
+                console=console,
+                verbose=0,
+                write_batch=batch,
+            )
+
+            rsync.sync.assert_awaited_once_with(
+                "rsync://foo.bar/nasl", str(destination), write_batch=batch
+            )
+            self.assertTrue(batch_info_file(batch).exists())
+
+    async def test_read_batch(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.read_batch = AsyncMock()
+        rsync.private_subdir = None
+        rsync.partial_dir = None
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            batch = temp_dir / "nasl-files.batch"
+            batch.touch()
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+
+            def write_plugin(directory: Path) -> None:
+                directory.mkdir(parents=True, exist_ok=True)
+                (directory / "a.nasl").write_text("a")
+                os.utime(directory / "a.nasl", (1000, 1000))
+
+            write_plugin(temp_dir / "expected")
+            expected = tree_fingerprint(temp_dir / "expected")
+
+            # the destination matches the base of the batch
+            write_batch_info(
+                batch,
+                BatchInfo(base=tree_fingerprint(destination), result=expected),
+            )
+            rsync.read_batch.side_effect = lambda batch, dest: write_plugin(
+                Path(dest)
+            )
+            await run_sync(
+                sync, rsync, console=console, verbose=2, read_batch=batch
+            )
+
+            rsync.read_batch.assert_awaited_once_with(batch, str(destination))
+            rsync.sync.assert_not_awaited()
+            console.print.assert_any_call(f"Applied {batch} to {destination}.")
+
+            # the destination has another version
+            write_batch_info(batch, BatchInfo(base="a", result="b"))
+            await run_sync(
+                sync, rsync, console=console, verbose=1, read_batch=batch
+            )
+
+            rsync.read_batch.assert_awaited_once()
+            rsync.sync.assert_awaited_once_with(
+                url="rsync://foo.bar/nasl", destination=str(destination)
+            )
+            console.print.assert_any_call(
+                f"{destination} doesn't match the version of {batch}. "
+                "Downloading instead."
+            )
+
+    async def test_read_batch_error(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.read_batch = AsyncMock(
+            side_effect=RsyncError(12, ["--read-batch"], b"corrupt batch")
+        )
+        rsync.private_subdir = None
+        rsync.partial_dir = None
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            batch = temp_dir / "nasl-files.batch"
+            batch.touch()
+            sync = Sync(
+                name="NASL files",
+                types=["all"],
+                url="rsync://foo.bar/nasl",
+                destination=str(destination),
+            )
+            write_batch_info(
+                batch,
+                BatchInfo(base=tree_fingerprint(destination), result="b"),
+            )
+
+            await run_sync(
+                sync, rsync, console=console, verbose=1, read_batch=batch
+            )
+
+        rsync.read_batch.assert_awaited_once()
+        rsync.sync.assert_awaited_once_with(
+            url="rsync://foo.bar/nasl", destination=str(destination)
+        )
+        console.print.assert_any_call(
+            f"Applying {batch} to {destination} failed: 'rsync --read-batch' "
+            "returned non-zero exit status 12. Downloading instead."
+        )
+
+    async def test_read_batch_invalid_info(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.read_batch = AsyncMock()
+        rsync.private_subdir = None
+        rsync.partial_dir = None
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/plugins",
+        )
+
+        with temp_directory() as temp_dir:
+            batch = temp_dir / "nasl-files.batch"
+            batch.touch()
+            batch_info_file(batch).write_text("invalid")
+
+            await run_sync(
+                sync, rsync, console=MagicMock(), verbose=0, read_batch=batch
+            )
+
+        rsync.read_batch.assert_not_awaited()
+        rsync.sync.assert_awaited_once()
+
+    async def test_read_batch_missing(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        rsync.read_batch = AsyncMock()
+        sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/plugins",
+        )
+
+        with temp_directory() as temp_dir:
+            await run_sync(
+                sync,
+                rsync,
+                console=MagicMock(),
+                verbose=0,
+                read_batch=temp_dir / "nasl-files.batch",
+            )
+
+        rsync.read_batch.assert_not_awaited()
+        rsync.sync.assert_awaited_once()
+
+
+class VerifyDownloadTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sync = Sync(
+            name="NASL files",
+            types=["all"],
+            url="rsync://foo.bar/nasl",
+            destination="/tmp/plugins",
+        )
+
+    def create_feed(self, destination: Path) -> None:
+        destination.mkdir(parents=True, exist_ok=True)
+        (destination / "foo.nasl").write_text("corrupted")
+        (destination / "sha256sums").write_text(
+            f"{hashlib.sha256(b'foo').hexdigest()}  foo.nasl\n"
+        )
+
+    async def test_repair(self):
+        rsync = MagicMock()
+        rsync.fetch_files = AsyncMock(
+            side_effect=lambda url, dest, files: (dest / "foo.nasl").write_text(
+                "foo"
+            )
+        )
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            self.create_feed(temp_dir)
+
+            await verify_download(
+                self.sync, rsync, temp_dir, console=console, verbose=1
+            )
+
+            rsync.fetch_files.assert_awaited_once_with(
+                "rsync://foo.bar/nasl", temp_dir, ["foo.nasl"]
+            )
+            console.print.assert_called_with("Repaired 1 files of NASL files.")
+
+    async def test_repair_failed(self):
+        rsync = MagicMock()
+        rsync.fetch_files = AsyncMock()
+
+        with (
+            temp_directory() as temp_dir,
+            self.assertRaisesRegex(
+                GreenboneFeedSyncError,
+                "Verifying NASL files failed. 1 files don't match sha256sums: "
+                "foo.nasl",
+            ),
+        ):
+            self.create_feed(temp_dir)
+
+            await verify_download(
+                self.sync, rsync, temp_dir, console=MagicMock(), verbose=0
+            )
+
+    async def test_no_checksums(self):
+        rsync = MagicMock()
+        rsync.fetch_files = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            await verify_download(
+                self.sync, rsync, temp_dir, console=MagicMock(), verbose=0
+            )
+
+        rsync.fetch_files.assert_not_awaited()
+
+    async def test_run_sync(self):
+        rsync = MagicMock()
+        rsync.fetch_files = AsyncMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            rsync.sync = AsyncMock(
+                side_effect=lambda url, destination: self.create_feed(
+                    Path(destination)
+                )
+            )
+
+            with self.assertRaisesRegex(GreenboneFeedSyncError, "foo.nasl"):
+                await run_sync(
+                    replace(self.sync, destination=str(destination)),
+                    rsync,
+                    console=MagicMock(),
+                    verbose=0,
+                    verify=True,
+                )
+
+            rsync.sync.assert_awaited_once()
+            rsync.fetch_files.assert_awaited_once_with(
+                "rsync://foo.bar/nasl", str(destination), ["foo.nasl"]
+            )
+            self.assertTrue(
+                (temp_dir / ".feed-sync/plugins/verify-cache.json").exists()
+            )
+
+
+class RunSyncsTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.syncs = [
+            Sync(name=name, types=["all"], url=name, destination=name)
+            for name in ("a", "b", "c")
+        ]
+
+    async def test_parallel(self):
+        running = 0
+        max_running = 0
+
+        async def sync_mock(url, destination):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        errors = await run_syncs(
+            self.syncs,
+            lambda sync: rsync.sync(url=sync.url, destination=sync.destination),
+            error_console=console,
+            parallel=2,
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(max_running, 2)
+
+    async def test_sequential(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        console = MagicMock()
+
+        errors = await run_syncs(
+            self.syncs,
+            lambda sync: rsync.sync(url=sync.url, destination=sync.destination),
+            error_console=console,
+        )
+
+        self.assertEqual(errors, [])
+        rsync.sync.assert_has_awaits(
+            [
+                call(url="a", destination="a"),
+                call(url="b", destination="b"),
+                call(url="c", destination="c"),
+            ]
+        )
+
+    async def test_collect_errors(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(
+            side_effect=[
+                RsyncError(1, [], b"error a"),
+                None,
+                RsyncError(2, [], b"error c"),
+            ]
+        )
+        console = MagicMock()
+
+        errors = await run_syncs(
+            self.syncs,
+            lambda sync: rsync.sync(url=sync.url, destination=sync.destination),
+            error_console=console,
+            parallel=3,
+        )
+
+        self.assertEqual(
+            sorted(error.returncode for error in errors),
+            [1, 2],
+        )
+        console.print.assert_has_calls(
+            [call("error a"), call("error c")], any_order=True
+        )
+
+    async def test_collect_completion_hook_errors(self):
+        async def sync_func(sync):
+            raise CompletionHookError(1, ["hook", sync.destination])
+
+        console = MagicMock()
+
+        errors = await run_syncs(
+            self.syncs, sync_func, error_console=console, parallel=3
+        )
+
+        self.assertEqual(len(errors), 3)
+        console.print.assert_any_call(
+            "'hook a' returned non-zero exit status 1."
+        )
+
+    async def test_fail_fast_cancels_remaining(self):
+        cancelled = []
+
+        async def sync_mock(url, destination):
+            if url == "a":
+                raise RsyncError(1, [], b"error a")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        errors = await run_syncs(
+            self.syncs,
+            lambda sync: rsync.sync(url=sync.url, destination=sync.destination),
+            error_console=console,
+            parallel=3,
+            fail_fast=True,
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(sorted(cancelled), ["b", "c"])
+
+
+class StagingLockFileTestCase(unittest.TestCase):
+    def test_staging_lock_file(self):
+        self.assertEqual(
+            staging_lock_file("/var/lib/gvm/feed-update.lock"),
+            Path("/var/lib/gvm/feed-update.lock.staging"),
+        )
+
+
+class RunSyncListsTestCase(unittest.IsolatedAsyncioTestCase):
+    def create_sync_lists(self, temp_dir: Path) -> list[SyncList]:
+        return [
+            SyncList(
+                lock_file=str(temp_dir / "openvas.lock"),
+                syncs=[Sync(name="a", types=["all"], url="a", destination="a")],
+            ),
+            SyncList(
+                lock_file=str(temp_dir / "gvmd.lock"),
+                syncs=[Sync(name="b", types=["all"], url="b", destination="b")],
+            ),
+        ]
+
+    async def test_start_unlocked_group_first(self):
+        started = []
+
+        async def sync_mock(url, destination):
+            started.append(url)
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            sync_lists = self.create_sync_lists(temp_dir)
+
+            async def release_later():
+                async with flock_wait(temp_dir / "openvas.lock"):
+                    await asyncio.sleep(0.05)
+
+            holder = asyncio.create_task(release_later())
+            await asyncio.sleep(0)
+
+            has_error = await run_sync_lists(
+                sync_lists,
+                lambda sync: rsync.sync(
+                    url=sync.url, destination=sync.destination
+                ),
+                console=console,
+                error_console=console,
+                verbose=0,
+                wait_interval=0.01,
+            )
+            await holder
+
+        self.assertFalse(has_error)
+        self.assertEqual(started, ["b", "a"])
+
+    async def test_start_unlocked_group_first_blocking(self):
+        started = []
+
+        async def sync_mock(url, destination):
+            started.append(url)
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            sync_lists = self.create_sync_lists(temp_dir)
+
+            async def release_later():
+                async with flock_wait(temp_dir / "openvas.lock"):
+                    await asyncio.sleep(0.05)
+
+            holder = asyncio.create_task(release_later())
+            await asyncio.sleep(0)
+
+            has_error = await run_sync_lists(
+                sync_lists,
+                lambda sync: rsync.sync(
+                    url=sync.url, destination=sync.destination
+                ),
+                console=console,
+                error_console=console,
+                verbose=0,
+                blocking_lock=True,
+            )
+            await holder
+
+        self.assertFalse(has_error)
+        self.assertEqual(started, ["b", "a"])
+
+    async def test_staged(self):
+        states = []
+
+        async def sync_func(sync, *, commit_lock=None):
+            lock_file = sync_lists[0].lock_file
+            # the lock file is not held during the download
+            async with flock_wait(lock_file, wait_interval=None):
+                pass
+            # but the staging lock file is
+            with self.assertRaises(FileLockedError):
+                async with flock_wait(
+                    staging_lock_file(lock_file), wait_interval=None
+                ):
+                    pass
+
+            async with commit_lock():
+                with self.assertRaises(FileLockedError):
+                    async with flock_wait(lock_file, wait_interval=None):
+                        pass
+                states.append(sync.name)
+
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            sync_lists = self.create_sync_lists(temp_dir)[:1]
+            has_error = await run_sync_lists(
+                sync_lists,
+                sync_func,
+                console=console,
+                error_console=console,
+                verbose=0,
+                staged=True,
+            )
+
+        self.assertFalse(has_error)
+        self.assertEqual(states, ["a"])
+
+    async def test_run_groups_concurrently(self):
+        running = 0
+        max_running = 0
+
+        async def sync_mock(url, destination):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            has_error = await run_sync_lists(
+                self.create_sync_lists(temp_dir),
+                lambda sync: rsync.sync(
+                    url=sync.url, destination=sync.destination
+                ),
+                console=console,
+                error_console=console,
+                verbose=0,
+                parallel=2,
+            )
+
+        self.assertFalse(has_error)
+        self.assertEqual(max_running, 2)
+
+    async def test_parallel_limit_is_shared_between_groups(self):
+        running = 0
+        max_running = 0
+
+        async def sync_mock(url, destination):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        rsync = MagicMock()
+        rsync.sync = sync_mock
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            sync_lists = self.create_sync_lists(temp_dir)
+            for sync_list in sync_lists:
+                sync_list.syncs.append(
+                    Sync(name="c", types=["all"], url="c", destination="c")
+                )
+
+            has_error = await run_sync_lists(
+                sync_lists,
+                lambda sync: rsync.sync(
+                    url=sync.url, destination=sync.destination
+                ),
+                console=console,
+                error_console=console,
+                verbose=0,
+                parallel=2,
+            )
+
+        self.assertFalse(has_error)
+        self.assertEqual(max_running, 2)
+
+    async def test_no_wait(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock()
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            async with flock_wait(temp_dir / "openvas.lock"):
+                with self.assertRaises(FileLockedError):
+                    await run_sync_lists(
+                        self.create_sync_lists(temp_dir),
+                        lambda sync: rsync.sync(
+                            url=sync.url, destination=sync.destination
+                        ),
+                        console=console,
+                        error_console=console,
+                        verbose=0,
+                        wait_interval=None,
+                    )
 
-        self.assertEqual(sync_list.syncs[0], sync_a)
-        self.assertEqual(sync_list.syncs[1], sync_b)
+        rsync.sync.assert_not_awaited()
 
+    async def test_fail_fast(self):
+        rsync = MagicMock()
+        rsync.sync = AsyncMock(side_effect=RsyncError(1, [], b"error"))
+        console = MagicMock()
 
-class DoSelftestTestCase(unittest.TestCase):
-    @patch("greenbone.feed.sync.main.subprocess.run")
-    def test_do_selftest_success(self, mock_subprocess_run: MagicMock):
-        mock_subprocess_run.side_effect = [""]
-        do_selftest()
+        with temp_directory() as temp_dir:
+            has_error = await run_sync_lists(
+                self.create_sync_lists(temp_dir),
+                lambda sync: rsync.sync(
+                    url=sync.url, destination=sync.destination
+                ),
+                console=console,
+                error_console=console,
+                verbose=0,
+                fail_fast=True,
+            )
 
-    @patch("greenbone.feed.sync.main.subprocess.run")
-    def test_do_selftest_rsync_fail(self, mock_subprocess_run: MagicMock):
-        mock_subprocess_run.side_effect = [PermissionError]
-        with self.assertRaisesRegex(
-            GreenboneFeedSyncError, "The rsync binary could not be found."
-        ):
-            do_selftest()
+        self.assertTrue(has_error)
+        rsync.sync.assert_awaited_once_with(url="a", destination="a")
 
 
 class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
@@ -97,6 +1426,8 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
             compression_level=9,
             ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
             change_permissions=True,
+            ssh_control_path=None,
+            partial_dir=None,
         )
         console.print.assert_has_calls(
             [
@@ -155,8 +1486,521 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=False,
+                ssh_control_path=None,
+                partial_dir=None,
+            )
+
+    @patch("greenbone.feed.sync.main.Rsync", autospec=True)
+    async def test_daemon(self, rsync_mock: MagicMock):
+        console = MagicMock()
+        rsync_mock_instance = rsync_mock.return_value
+        calls = 0
+
+        async def sync(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                # stop the daemon like SIGTERM would do
+                signal.raise_signal(signal.SIGTERM)
+
+        rsync_mock_instance.sync.side_effect = sync
+
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+            ),
+            patch.object(
+                sys,
+                "argv",
+                [
+                    "greenbone-feed-sync",
+                    "--type",
+                    "notus",
+                    "--daemon",
+                    "--daemon-interval",
+                    "1s",
+                    "--daemon-jitter",
+                    "0",
+                ],
+            ),
+        ):
+            ret = await feed_sync(console=console, error_console=console)
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(rsync_mock_instance.sync.await_count, 2)
+        console.print.assert_any_call("Stopped.")
+
+    @patch("greenbone.feed.sync.main.Rsync", autospec=True)
+    async def test_fan_out(self, rsync_mock: MagicMock):
+        console = MagicMock()
+        rsync_mock_instance = rsync_mock.return_value
+
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {
+                    "GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(
+                        temp_dir / "cache"
+                    ),
+                    "GREENBONE_FEED_SYNC_FAN_OUT_PREFIXES": (
+                        f"{temp_dir}/scanner1,{temp_dir}/scanner2"
+                    ),
+                },
+            ),
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--type", "notus"],
+            ),
+        ):
+            ret = await feed_sync(console=console, error_console=console)
+
+        self.assertEqual(ret, 0)
+        rsync_mock_instance.sync.assert_has_awaits(
+            [
+                call(
+                    url="rsync://feed.community.greenbone.net/community/"
+                    f"vulnerability-feed/{DEFAULT_FEED_RELEASE}/vt-data/notus/",
+                    destination=temp_dir / "cache/notus",
+                ),
+                call(
+                    url=f"{temp_dir}/cache/notus/",
+                    destination=f"{temp_dir}/scanner1/notus",
+                    link_dest=temp_dir / "cache/notus",
+                ),
+                call(
+                    url=f"{temp_dir}/cache/notus/",
+                    destination=f"{temp_dir}/scanner2/notus",
+                    link_dest=temp_dir / "cache/notus",
+                ),
+            ]
+        )
+        console.print.assert_any_call(
+            f"Acquired lock on {temp_dir}/scanner1/openvas/feed-update.lock"
+        )
+
+    @patch("greenbone.feed.sync.main.Rsync", autospec=True)
+    async def test_push(self, rsync_mock: MagicMock):
+        console = MagicMock()
+        error_console = MagicMock()
+        rsync_mock_instance = rsync_mock.return_value
+
+        async def rsync_push(source, url, *, progress, connect_timeout):
+            if "sensor2" in url:
+                raise RsyncError(1, [], stderr=b"Permission denied")
+
+        rsync_mock_instance.push.side_effect = rsync_push
+
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+            ),
+            patch.object(
+                sys,
+                "argv",
+                [
+                    "greenbone-feed-sync",
+                    "--type",
+                    "notus",
+                    "--push",
+                    str(temp_dir / "sensors"),
+                    "--push-retries",
+                    "0",
+                ],
+            ),
+        ):
+            (temp_dir / "sensors").write_text("sensor1\nsensor2\n")
+            ret = await feed_sync(console=console, error_console=error_console)
+
+        self.assertEqual(ret, 1)
+        self.assertEqual(
+            [c.args for c in rsync_mock_instance.push.call_args_list],
+            [
+                (temp_dir / "notus", f"ssh://sensor1{temp_dir}/notus/"),
+                (temp_dir / "notus", f"ssh://sensor2{temp_dir}/notus/"),
+            ],
+        )
+        console.print.assert_any_call("Pushed the feed data to 1 of 2 hosts.")
+        error_console.print.assert_called_once()
+        self.assertRegex(
+            error_console.print.call_args.args[0],
+            r"^Pushing to sensor2 failed after 1 attempts in [\d.]+ seconds\. "
+            "Permission denied$",
+        )
+
+    async def test_push_invalid_inventory(self):
+        console = MagicMock()
+
+        with (
+            temp_directory() as temp_dir,
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--push", str(temp_dir / "sensors")],
+            ),
+            self.assertRaisesRegex(ConfigError, "Can't read push inventory"),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    async def test_batch_with_snapshots(self):
+        console = MagicMock()
+
+        with (
+            patch.object(
+                sys,
+                "argv",
+                [
+                    "greenbone-feed-sync",
+                    "--write-batch",
+                    "/srv/batches",
+                    "--snapshots",
+                    "2",
+                ],
+            ),
+            self.assertRaisesRegex(ConfigError, "Batch files can't be used"),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    async def test_compare_digests(self):
+        console = MagicMock()
+        digest = DirectoryDigest(digest="a", files="a")
+
+        with temp_directory() as temp_dir:
+            write_merkle_digests(
+                temp_dir / "first.json",
+                {
+                    "": DirectoryDigest(
+                        digest="b", files="a", directories=("c",)
+                    ),
+                    "c": digest,
+                },
+            )
+            write_merkle_digests(temp_dir / "second.json", {"": digest})
+
+            with patch.object(
+                sys,
+                "argv",
+                [
+                    "greenbone-feed-sync",
+                    "--compare-digests",
+                    str(temp_dir / "first.json"),
+                    str(temp_dir / "second.json"),
+                ],
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+        self.assertEqual(ret, 1)
+        console.print.assert_called_once_with(
+            f"c: only in {temp_dir / 'first.json'}"
+        )
+
+    async def test_incremental_with_snapshots(self):
+        console = MagicMock()
+
+        with (
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--incremental", "--staged"],
+            ),
+            self.assertRaisesRegex(
+                ConfigError, "Incremental downloads can't be used"
+            ),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    @unittest.skipUnless(shutil.which("zstd"), "zstd binary not available")
+    async def test_export_and_import_bundle(self):
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            bundle = temp_dir / "feed.tar.zst"
+            source = temp_dir / "source"
+            target = temp_dir / "target"
+            (source / "notus/private").mkdir(parents=True)
+            (source / "notus/debian.notus").write_text("debian")
+            (source / "notus/private/state").write_text("source")
+            (target / "notus/private").mkdir(parents=True)
+            (target / "notus/old.notus").write_text("old")
+            (target / "notus/private/state").write_text("target")
+
+            with (
+                patch.dict(
+                    "os.environ",
+                    {
+                        "GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(source),
+                        "GREENBONE_FEED_SYNC_PRIVATE_DIRECTORY": "private",
+                    },
+                ),
+                patch.object(
+                    sys,
+                    "argv",
+                    [
+                        "greenbone-feed-sync",
+                        "--type",
+                        "notus",
+                        "--export-bundle",
+                        str(bundle),
+                    ],
+                ),
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+            self.assertEqual(ret, 0)
+            console.print.assert_any_call(
+                f"Exported 1 files of 1 destinations to {bundle}."
+            )
+
+            with (
+                patch.dict(
+                    "os.environ",
+                    {
+                        "GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(target),
+                        "GREENBONE_FEED_SYNC_PRIVATE_DIRECTORY": "private",
+                    },
+                ),
+                patch.object(
+                    sys,
+                    "argv",
+                    [
+                        "greenbone-feed-sync",
+                        "--type",
+                        "notus",
+                        "--import-bundle",
+                        str(bundle),
+                    ],
+                ),
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+            self.assertEqual(ret, 0)
+            console.print.assert_any_call(
+                f"Imported 1 destinations from {bundle}."
+            )
+            self.assertEqual(
+                sorted(path.name for path in (target / "notus").iterdir()),
+                ["debian.notus", "private"],
+            )
+            self.assertEqual(
+                (target / "notus/private/state").read_text(), "target"
+            )
+
+            # a delta bundle without changes
+            delta = temp_dir / "delta.tar.zst"
+            with (
+                patch.dict(
+                    "os.environ",
+                    {
+                        "GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(source),
+                        "GREENBONE_FEED_SYNC_PRIVATE_DIRECTORY": "private",
+                    },
+                ),
+                patch.object(
+                    sys,
+                    "argv",
+                    [
+                        "greenbone-feed-sync",
+                        "--type",
+                        "notus",
+                        "--export-bundle",
+                        str(delta),
+                        "--bundle-base",
+                        str(bundle),
+                    ],
+                ),
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+            self.assertEqual(ret, 0)
+            console.print.assert_any_call(
+                f"Exported 0 changed and 0 deleted files of 1 destinations to "
+                f"{delta}."
             )
 
+    async def test_bundle_base_without_export(self):
+        console = MagicMock()
+
+        with (
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--bundle-base", "/tmp/feed.tar.zst"],
+            ),
+            self.assertRaisesRegex(ConfigError, "requires --export-bundle"),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    async def test_import_bundle_with_staged(self):
+        console = MagicMock()
+
+        with (
+            patch.object(
+                sys,
+                "argv",
+                [
+                    "greenbone-feed-sync",
+                    "--import-bundle",
+                    "/tmp/feed.tar.zst",
+                    "--staged",
+                ],
+            ),
+            self.assertRaisesRegex(
+                ConfigError, "Bundles can't be imported together"
+            ),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    async def test_rollback(self):
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "notus"
+            snapshots = Snapshots(destination)
+            older = snapshots.complete(snapshots.create())
+            (older / "debian.notus").write_text("older")
+            newer = snapshots.complete(snapshots.create())
+            (newer / "debian.notus").write_text("newer")
+            snapshots.link_destination()
+            snapshots.activate(newer)
+            state_directory = temp_dir / ".feed-sync/notus"
+            (state_directory / "tree-manifest.bin").write_bytes(b"newer")
+
+            with (
+                patch.dict(
+                    "os.environ",
+                    {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+                ),
+                patch.object(
+                    sys,
+                    "argv",
+                    [
+                        "greenbone-feed-sync",
+                        "--type",
+                        "notus",
+                        "--rollback",
+                        "--feed-locks",
+                    ],
+                ),
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+                self.assertEqual(ret, 0)
+                console.print.assert_any_call(
+                    f"Rolled back Notus files to {older.name}."
+                )
+                self.assertEqual(
+                    (destination / "debian.notus").read_text(), "older"
+                )
+                self.assertFalse(
+                    (state_directory / "tree-manifest.bin").exists()
+                )
+                self.assertTrue((state_directory / "completed").exists())
+
+                # there is no older snapshot anymore
+                with self.assertRaisesRegex(
+                    GreenboneFeedSyncError, "No snapshot of .* to roll back"
+                ):
+                    await feed_sync(console=console, error_console=console)
+
+    async def test_rollback_without_snapshots(self):
+        console = MagicMock()
+
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+            ),
+            patch.object(sys, "argv", ["greenbone-feed-sync", "--rollback"]),
+            self.assertRaisesRegex(
+                GreenboneFeedSyncError, "No snapshots to roll back to"
+            ),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    async def test_serve_without_daemon(self):
+        console = MagicMock()
+
+        with (
+            patch.object(
+                sys, "argv", ["greenbone-feed-sync", "--serve", "--quiet"]
+            ),
+            self.assertRaisesRegex(GreenboneFeedSyncError, "requires --daemon"),
+        ):
+            await feed_sync(console=console, error_console=console)
+
+    @patch("greenbone.feed.sync.main.select_mirrors", autospec=True)
+    @patch("greenbone.feed.sync.main.Rsync", autospec=True)
+    async def test_mirror_failover(
+        self, rsync_mock: MagicMock, select_mirrors_mock: AsyncMock
+    ):
+        console = MagicMock()
+        rsync_mock_instance = rsync_mock.return_value
+        select_mirrors_mock.return_value = [
+            "rsync://mirror.example",
+            "rsync://feed.community.greenbone.net/community",
+        ]
+
+        async def sync(url, destination, **kwargs):
+            if url.startswith("rsync://mirror.example"):
+                raise RsyncError(10, [], b"connection refused")
+
+        rsync_mock_instance.sync.side_effect = sync
+
+        with (
+            temp_directory() as temp_dir,
+            patch.dict(
+                "os.environ",
+                {
+                    "GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir),
+                    "GREENBONE_FEED_SYNC_MIRRORS": "rsync://mirror.example",
+                },
+            ),
+            patch.object(
+                sys,
+                "argv",
+                ["greenbone-feed-sync", "--type", "notus"],
+            ),
+        ):
+            ret = await feed_sync(console=console, error_console=console)
+
+        self.assertEqual(ret, 0)
+        select_mirrors_mock.assert_awaited_once_with(
+            rsync_mock_instance,
+            [
+                "rsync://feed.community.greenbone.net/community",
+                "rsync://mirror.example",
+            ],
+            cache_file=temp_dir / ".feed-sync/mirrors.json",
+            ttl=3600,
+            on_probe=ANY,
+        )
+        self.assertEqual(
+            [c.kwargs["url"] for c in rsync_mock_instance.sync.await_args_list],
+            [
+                (
+                    "rsync://mirror.example/vulnerability-feed/"
+                    f"{DEFAULT_FEED_RELEASE}/vt-data/notus/"
+                ),
+                (
+                    "rsync://feed.community.greenbone.net/community/"
+                    f"vulnerability-feed/{DEFAULT_FEED_RELEASE}/vt-data/notus/"
+                ),
+            ],
+        )
+        console.print.assert_any_call(
+            "Connecting to rsync://mirror.example/vulnerability-feed/"
+            f"{DEFAULT_FEED_RELEASE}/vt-data/notus/ failed. Trying "
+            "rsync://feed.community.greenbone.net/community/"
+            f"vulnerability-feed/{DEFAULT_FEED_RELEASE}/vt-data/notus/ "
+            "instead."
+        )
+
     @patch("greenbone.feed.sync.main.Rsync", autospec=True)
     async def test_sync_nvts(self, rsync_mock: MagicMock):
         console = MagicMock()
@@ -187,6 +2031,8 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console.print.assert_has_calls(
                 [
@@ -219,6 +2065,58 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 ]
             )
 
+    @patch("greenbone.feed.sync.main.Rsync", autospec=True)
+    async def test_feed_locks_and_completion_hook(self, rsync_mock: MagicMock):
+        console = MagicMock()
+
+        with temp_directory() as temp_dir:
+            hook_output = temp_dir / "hook"
+            hook = (
+                f'{sys.executable} -c "import sys; '
+                f"open({str(hook_output)!r}, 'a').write(sys.argv[1] + ' ')\""
+            )
+            with (
+                patch.dict(
+                    "os.environ",
+                    {"GREENBONE_FEED_SYNC_DESTINATION_PREFIX": str(temp_dir)},
+                ),
+                patch.object(
+                    sys,
+                    "argv",
+                    [
+                        "greenbone-feed-sync",
+                        "--type",
+                        "nvt",
+                        "--feed-locks",
+                        "--completion-hook",
+                        hook,
+                    ],
+                ),
+            ):
+                ret = await feed_sync(console=console, error_console=console)
+
+            self.assertEqual(ret, 0)
+            for destination in (
+                temp_dir / "notus",
+                temp_dir / "openvas/plugins",
+            ):
+                self.assertTrue(
+                    (
+                        destination.parent
+                        / ".feed-sync"
+                        / destination.name
+                        / "completed"
+                    ).exists()
+                )
+            console.print.assert_any_call(
+                "Acquired lock on "
+                f"{temp_dir}/openvas/.feed-sync/plugins/feed.lock"
+            )
+            self.assertEqual(
+                hook_output.read_text(),
+                f"{temp_dir}/notus {temp_dir}/openvas/plugins ",
+            )
+
     @patch("greenbone.feed.sync.main.Rsync", autospec=True)
     async def test_sync_nvts_verbose(self, rsync_mock: MagicMock):
         console = MagicMock()
@@ -245,6 +2143,8 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console.print.assert_has_calls(
                 [
@@ -317,6 +2217,8 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console.print.assert_not_called()
 
@@ -364,6 +2266,8 @@ class FeedSyncTestCase(unittest.IsolatedAsyncioTestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console.print.assert_has_calls(
                 [
@@ -426,6 +2330,8 @@ class MainFunctionTestCase(unittest.TestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console_mock_instance.print.assert_has_calls(
                 [
@@ -492,6 +2398,8 @@ class MainFunctionTestCase(unittest.TestCase):
                 compression_level=9,
                 ssh_key=Path("/etc/gvm/greenbone-enterprise-feed-key"),
                 change_permissions=True,
+                ssh_control_path=None,
+                partial_dir=None,
             )
             console_mock_instance.print.assert_has_calls(
                 [
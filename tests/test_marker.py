@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.marker import (
+    fetch_marker,
+    is_up_to_date,
+    store_marker,
+)
+
+
+class FetchMarkerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_fetch_marker(self):
+        async def fetch_file(url: str, destination: Path) -> None:
+            Path(destination).write_bytes(b"202601010000")
+
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock(side_effect=fetch_file)
+
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            content = await fetch_marker(
+                rsync, "rsync://foo.bar/scap-data/", destination, "timestamp"
+            )
+
+            self.assertEqual(content, b"202601010000")
+            rsync.fetch_file.assert_awaited_once()
+            self.assertEqual(
+                rsync.fetch_file.await_args.args[0],
+                "rsync://foo.bar/scap-data/timestamp",
+            )
+            # the temporary download is removed
+            self.assertEqual(
+                list((temp_dir / ".feed-sync" / "scap-data").iterdir()), []
+            )
+
+    async def test_fetch_marker_failure(self):
+        rsync = MagicMock()
+        rsync.fetch_file = AsyncMock(side_effect=RsyncError(23, ["foo"]))
+
+        with temp_directory() as temp_dir:
+            self.assertIsNone(
+                await fetch_marker(
+                    rsync,
+                    "rsync://foo.bar/scap-data",
+                    temp_dir / "scap-data",
+                    "timestamp",
+                )
+            )
+
+
+class IsUpToDateTestCase(unittest.TestCase):
+    def test_up_to_date(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            destination.mkdir()
+            (destination / "timestamp").write_bytes(b"1")
+            store_marker(destination, "timestamp", b"1")
+
+            self.assertTrue(is_up_to_date(destination, "timestamp", b"1"))
+
+    def test_changed(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            destination.mkdir()
+            (destination / "timestamp").write_bytes(b"1")
+            store_marker(destination, "timestamp", b"1")
+
+            self.assertFalse(is_up_to_date(destination, "timestamp", b"2"))
+
+    def test_not_stored(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            destination.mkdir()
+            (destination / "timestamp").write_bytes(b"1")
+
+            self.assertFalse(is_up_to_date(destination, "timestamp", b"1"))
+
+    def test_missing_destination(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            store_marker(destination, "timestamp", b"1")
+
+            self.assertFalse(is_up_to_date(destination, "timestamp", b"1"))
+
+
+class StoreMarkerTestCase(unittest.TestCase):
+    def test_store_marker(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "scap-data"
+            store_marker(destination, "timestamp", b"1")
+            store_marker(destination, "timestamp", b"2")
+
+            state_dir = temp_dir / ".feed-sync" / "scap-data"
+            self.assertEqual((state_dir / "timestamp").read_bytes(), b"2")
+            self.assertEqual(
+                [p.name for p in state_dir.iterdir()], ["timestamp"]
+            )
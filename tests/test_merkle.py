@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import shutil
+import unittest
+from pathlib import Path
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.merkle import (
+    Difference,
+    DifferenceKind,
+    build_merkle_digests,
+    compare_merkle_digests,
+    read_merkle_digests,
+    update_merkle_digest_file,
+    update_merkle_digests,
+    write_merkle_digests,
+)
+from greenbone.feed.sync.tree import (
+    TreeManifest,
+    build_tree_manifest,
+    update_tree_manifest,
+)
+from tests.helper import create_feed
+
+FEED = {
+    "2024/01/foo.nasl": b"foo",
+    "2024/02/bar.nasl": b"bar",
+    "2025/baz.nasl": b"baz",
+    "plugin_feed_info.inc": b"info",
+}
+
+
+def digests_of(destination: Path, manifest_file: Path) -> dict:
+    build_tree_manifest(manifest_file, destination)
+    with TreeManifest(manifest_file) as manifest:
+        return build_merkle_digests(manifest)
+
+
+class BuildMerkleDigestsTestCase(unittest.TestCase):
+    def test_build(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "feed", FEED)
+
+            digests = digests_of(temp_dir / "feed", temp_dir / "manifest")
+
+        self.assertEqual(
+            sorted(digests), ["", "2024", "2024/01", "2024/02", "2025"]
+        )
+        self.assertEqual(digests[""].directories, ("2024", "2025"))
+        self.assertEqual(digests["2024"].directories, ("01", "02"))
+        self.assertEqual(digests["2025"].directories, ())
+
+    def test_equal_trees(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "a", FEED)
+            create_feed(temp_dir / "b", FEED)
+
+            self.assertEqual(
+                digests_of(temp_dir / "a", temp_dir / "a.manifest"),
+                digests_of(temp_dir / "b", temp_dir / "b.manifest"),
+            )
+
+    def test_empty_tree(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / "feed/empty").mkdir(parents=True)
+
+            digests = digests_of(temp_dir / "feed", temp_dir / "manifest")
+
+        self.assertEqual(list(digests), [""])
+
+
+class UpdateMerkleDigestsTestCase(unittest.TestCase):
+    def test_update_matches_build(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            manifest_file = temp_dir / "manifest"
+            create_feed(destination, FEED)
+            digests = digests_of(destination, manifest_file)
+
+            (destination / "2024/01/foo.nasl").write_text("changed")
+            (destination / "2026/01").mkdir(parents=True)
+            (destination / "2026/01/new.nasl").write_text("new")
+            shutil.rmtree(destination / "2024/02")
+            shutil.rmtree(destination / "2025")
+            changes = ChangeSet(
+                added=["2026/01/new.nasl"],
+                updated=["2024/01/foo.nasl"],
+                deleted=["2024/02/bar.nasl", "2024/02/", "2025/"],
+            )
+            update_tree_manifest(manifest_file, destination, changes)
+
+            with TreeManifest(manifest_file) as manifest:
+                update_merkle_digests(digests, manifest, changes)
+                expected = build_merkle_digests(manifest)
+
+        self.assertEqual(digests, expected)
+        self.assertEqual(
+            sorted(digests), ["", "2024", "2024/01", "2026", "2026/01"]
+        )
+
+    def test_update_digest_file(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            manifest_file = temp_dir / "manifest"
+            digest_file = temp_dir / "merkle-digest.json"
+            create_feed(destination, FEED)
+            build_tree_manifest(manifest_file, destination)
+
+            root = update_merkle_digest_file(digest_file, manifest_file, None)
+
+            self.assertEqual(read_merkle_digests(digest_file)[""].digest, root)
+            self.assertEqual(
+                update_merkle_digest_file(
+                    digest_file, manifest_file, ChangeSet()
+                ),
+                root,
+            )
+
+            (destination / "2025/baz.nasl").write_text("changed")
+            changes = ChangeSet(updated=["2025/baz.nasl"])
+            update_tree_manifest(manifest_file, destination, changes)
+
+            changed_root = update_merkle_digest_file(
+                digest_file, manifest_file, changes
+            )
+
+            self.assertNotEqual(changed_root, root)
+            self.assertEqual(
+                read_merkle_digests(digest_file)[""].digest, changed_root
+            )
+
+
+class ReadMerkleDigestsTestCase(unittest.TestCase):
+    def test_write_and_read(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "feed", FEED)
+            digests = digests_of(temp_dir / "feed", temp_dir / "manifest")
+
+            write_merkle_digests(temp_dir / "digests.json", digests)
+
+            self.assertEqual(
+                read_merkle_digests(temp_dir / "digests.json"), digests
+            )
+
+    def test_invalid(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / "invalid.json").write_text("{}")
+            (temp_dir / "incomplete.json").write_text(
+                '{"version": 1, "directories": {"": {"digest": "a", '
+                '"files": "b", "directories": ["missing"]}}}'
+            )
+
+            for name in ("missing.json", "invalid.json", "incomplete.json"):
+                with self.assertRaisesRegex(
+                    GreenboneFeedSyncError, "Invalid Merkle digest file"
+                ):
+                    read_merkle_digests(temp_dir / name)
+
+
+class CompareMerkleDigestsTestCase(unittest.TestCase):
+    def test_compare(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "a", FEED)
+            create_feed(temp_dir / "b", FEED)
+            (temp_dir / "b/2024/01/foo.nasl").write_text("changed")
+            (temp_dir / "b/plugin_feed_info.inc").write_text("changed")
+            shutil.rmtree(temp_dir / "b/2025")
+            (temp_dir / "b/2026").mkdir()
+            (temp_dir / "b/2026/new.nasl").write_text("new")
+
+            differences = compare_merkle_digests(
+                digests_of(temp_dir / "a", temp_dir / "a.manifest"),
+                digests_of(temp_dir / "b", temp_dir / "b.manifest"),
+            )
+
+        self.assertEqual(
+            differences,
+            [
+                Difference("", DifferenceKind.FILES),
+                Difference("2024/01", DifferenceKind.FILES),
+                Difference("2025", DifferenceKind.ONLY_FIRST),
+                Difference("2026", DifferenceKind.ONLY_SECOND),
+            ],
+        )
+
+    def test_equal(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir / "feed", FEED)
+            digests = digests_of(temp_dir / "feed", temp_dir / "manifest")
+
+        self.assertEqual(compare_merkle_digests(digests, digests), [])
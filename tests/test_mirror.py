@@ -0,0 +1,209 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, call
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import RsyncError
+from greenbone.feed.sync.mirror import (
+    MirrorProbe,
+    failover,
+    is_connection_error,
+    load_ranking,
+    mirror_cache_file,
+    probe_mirror,
+    rank_mirrors,
+    rebase_url,
+    select_mirrors,
+    store_ranking,
+)
+
+
+class RebaseUrlTestCase(unittest.TestCase):
+    def test_rebase(self):
+        self.assertEqual(
+            rebase_url(
+                "rsync://foo.bar/community/vulnerability-feed/",
+                "rsync://foo.bar/community",
+                "rsync://lorem.ipsum/mirror/",
+            ),
+            "rsync://lorem.ipsum/mirror/vulnerability-feed/",
+        )
+
+    def test_other_url(self):
+        self.assertEqual(
+            rebase_url(
+                "rsync://foo.bar/community2/data/",
+                "rsync://foo.bar/community",
+                "rsync://lorem.ipsum",
+            ),
+            "rsync://foo.bar/community2/data/",
+        )
+
+
+class IsConnectionErrorTestCase(unittest.TestCase):
+    def test_connection_error(self):
+        for returncode in (5, 10, 35, 255):
+            self.assertTrue(is_connection_error(RsyncError(returncode, [])))
+
+        for returncode in (1, 23, 30):
+            self.assertFalse(is_connection_error(RsyncError(returncode, [])))
+
+
+class RankMirrorsTestCase(unittest.TestCase):
+    def test_rank(self):
+        self.assertEqual(
+            rank_mirrors(
+                [
+                    MirrorProbe("a", error="foo"),
+                    MirrorProbe("b", latency=0.5),
+                    MirrorProbe("c", error="bar"),
+                    MirrorProbe("d", latency=0.1),
+                ]
+            ),
+            ["d", "b", "a", "c"],
+        )
+
+
+class RankingCacheTestCase(unittest.TestCase):
+    def test_store_and_load(self):
+        with temp_directory() as temp_dir:
+            cache_file = mirror_cache_file(temp_dir)
+            store_ranking(cache_file, ["b", "a"])
+
+            self.assertEqual(cache_file, temp_dir / ".feed-sync/mirrors.json")
+            self.assertEqual(
+                load_ranking(cache_file, ["a", "b"], 60), ["b", "a"]
+            )
+            # other mirrors
+            self.assertIsNone(load_ranking(cache_file, ["a", "c"], 60))
+
+    def test_expired(self):
+        with temp_directory() as temp_dir:
+            cache_file = temp_dir / "mirrors.json"
+            cache_file.write_text(
+                json.dumps({"time": time.time() - 120, "ranking": ["a"]})
+            )
+
+            self.assertIsNone(load_ranking(cache_file, ["a"], 60))
+            self.assertEqual(load_ranking(cache_file, ["a"], 180), ["a"])
+
+    def test_invalid(self):
+        with temp_directory() as temp_dir:
+            cache_file = temp_dir / "mirrors.json"
+            self.assertIsNone(load_ranking(cache_file, ["a"], 60))
+
+            cache_file.write_text("foo")
+            self.assertIsNone(load_ranking(cache_file, ["a"], 60))
+
+
+class ProbeMirrorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_reachable(self):
+        rsync = MagicMock()
+        rsync.list_directory = AsyncMock(return_value=[])
+
+        probe = await probe_mirror(rsync, "rsync://foo.bar", timeout=5)
+
+        self.assertEqual(probe.url, "rsync://foo.bar")
+        self.assertIsNotNone(probe.latency)
+        self.assertIsNone(probe.error)
+        rsync.list_directory.assert_awaited_once_with(
+            "rsync://foo.bar", connect_timeout=5
+        )
+
+    async def test_unreachable(self):
+        rsync = MagicMock()
+        rsync.list_directory = AsyncMock(
+            side_effect=RsyncError(35, [], stderr=b"timeout")
+        )
+
+        probe = await probe_mirror(rsync, "rsync://foo.bar")
+
+        self.assertIsNone(probe.latency)
+        self.assertEqual(probe.error, "timeout")
+
+    async def test_timeout(self):
+        async def list_directory(url, connect_timeout):
+            await asyncio.sleep(10)
+
+        rsync = MagicMock()
+        rsync.list_directory = list_directory
+
+        probe = await probe_mirror(rsync, "rsync://foo.bar", timeout=0)
+
+        self.assertIsNone(probe.latency)
+        self.assertEqual(probe.error, "Timeout after 0 seconds.")
+
+
+class SelectMirrorsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_select(self):
+        async def list_directory(url, connect_timeout):
+            if url == "rsync://slow":
+                await asyncio.sleep(0.1)
+            elif url == "rsync://down":
+                raise RsyncError(10, [])
+
+        rsync = MagicMock()
+        rsync.list_directory = AsyncMock(side_effect=list_directory)
+        on_probe = MagicMock()
+        urls = ["rsync://down", "rsync://slow", "rsync://fast"]
+
+        with temp_directory() as temp_dir:
+            cache_file = temp_dir / "mirrors.json"
+            ranking = await select_mirrors(
+                rsync, urls, cache_file=cache_file, on_probe=on_probe
+            )
+
+            self.assertEqual(
+                ranking, ["rsync://fast", "rsync://slow", "rsync://down"]
+            )
+            self.assertEqual(on_probe.call_count, 3)
+
+            # the cached ranking is used
+            self.assertEqual(
+                await select_mirrors(rsync, urls, cache_file=cache_file),
+                ranking,
+            )
+            self.assertEqual(rsync.list_directory.await_count, 3)
+
+
+class FailoverTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_first(self):
+        func = AsyncMock()
+
+        await failover(["a", "b"], func)
+
+        func.assert_awaited_once_with("a")
+
+    async def test_failover(self):
+        error = RsyncError(10, [])
+        func = AsyncMock(side_effect=[error, None])
+        on_failover = MagicMock()
+
+        await failover(["a", "a", "b"], func, on_failover=on_failover)
+
+        self.assertEqual(func.await_args_list, [call("a"), call("b")])
+        on_failover.assert_called_once_with(error, "a", "b")
+
+    async def test_all_failed(self):
+        func = AsyncMock(side_effect=RsyncError(10, []))
+
+        with self.assertRaises(RsyncError):
+            await failover(["a", "b"], func)
+
+        self.assertEqual(func.await_count, 2)
+
+    async def test_other_error(self):
+        func = AsyncMock(side_effect=RsyncError(23, []))
+
+        with self.assertRaises(RsyncError):
+            await failover(["a", "b"], func)
+
+        func.assert_awaited_once_with("a")
@@ -20,12 +20,27 @@ from greenbone.feed.sync.config import (
     DEFAULT_ENTERPRISE_KEY_PATH,
     DEFAULT_FEED_RELEASE,
     DEFAULT_GVMD_LOCK_FILE_PATH,
+    DEFAULT_NASL_SHARDS,
     DEFAULT_OPENVAS_LOCK_FILE_PATH,
+    DEFAULT_PARALLEL_SYNCS,
     DEFAULT_USER_CONFIG_FILE,
 )
-from greenbone.feed.sync.errors import ConfigFileError
+from greenbone.feed.sync.daemon import (
+    DEFAULT_DAEMON_INTERVAL,
+    DEFAULT_DAEMON_JITTER,
+)
+from greenbone.feed.sync.errors import ConfigError, ConfigFileError
 from greenbone.feed.sync.helper import DEFAULT_FLOCK_WAIT_INTERVAL
+from greenbone.feed.sync.leader import (
+    DEFAULT_LEADER_PORT,
+    DEFAULT_SERVE_ADDRESS,
+)
+from greenbone.feed.sync.mirror import DEFAULT_MIRROR_CACHE_TTL
 from greenbone.feed.sync.parser import CliParser, feed_type
+from greenbone.feed.sync.push import (
+    DEFAULT_PUSH_CONCURRENCY,
+    DEFAULT_PUSH_RETRIES,
+)
 from greenbone.feed.sync.rsync import (
     DEFAULT_RSYNC_COMPRESSION_LEVEL,
     DEFAULT_RSYNC_URL,
@@ -194,6 +209,8 @@ class CliParserTestCase(unittest.TestCase):
         )
         self.assertEqual(args.wait_interval, DEFAULT_FLOCK_WAIT_INTERVAL)
         self.assertFalse(args.no_wait)
+        self.assertFalse(args.blocking_lock)
+        self.assertIsNone(args.lock_timeout)
         self.assertFalse(args.no_permission_change)
         self.assertEqual(
             args.compression_level, DEFAULT_RSYNC_COMPRESSION_LEVEL
@@ -202,6 +219,42 @@ class CliParserTestCase(unittest.TestCase):
         self.assertIsNone(args.verbose)
         self.assertFalse(args.fail_fast)
         self.assertIsNone(args.rsync_timeout)
+        self.assertIsNone(args.leader_url)
+        self.assertFalse(args.serve)
+        self.assertEqual(args.serve_address, DEFAULT_SERVE_ADDRESS)
+        self.assertEqual(args.serve_port, DEFAULT_LEADER_PORT)
+        self.assertIsNone(args.serve_hosts_allow)
+        self.assertIsNone(args.fan_out_prefixes)
+        self.assertIsNone(args.feed_mirrors)
+        self.assertEqual(args.mirror_cache_ttl, DEFAULT_MIRROR_CACHE_TTL)
+        self.assertEqual(args.retries, 0)
+        self.assertIsNone(args.retry_deadline)
+        self.assertFalse(args.pre_check)
+        self.assertFalse(args.record_changes)
+        self.assertEqual(args.parallel, DEFAULT_PARALLEL_SYNCS)
+        self.assertEqual(args.snapshots, 0)
+        self.assertFalse(args.staged)
+        self.assertFalse(args.feed_locks)
+        self.assertIsNone(args.completion_hook)
+        self.assertEqual(args.nasl_shards, DEFAULT_NASL_SHARDS)
+        self.assertIsNone(args.write_batch)
+        self.assertIsNone(args.read_batch)
+        self.assertFalse(args.verify)
+        self.assertIsNone(args.verify_workers)
+        self.assertFalse(args.tree_manifest)
+        self.assertFalse(args.incremental)
+        self.assertFalse(args.merkle_digest)
+        self.assertIsNone(args.compare_digests)
+        self.assertIsNone(args.export_bundle)
+        self.assertIsNone(args.import_bundle)
+        self.assertIsNone(args.bundle_base)
+        self.assertIsNone(args.push)
+        self.assertEqual(args.push_concurrency, DEFAULT_PUSH_CONCURRENCY)
+        self.assertEqual(args.push_retries, DEFAULT_PUSH_RETRIES)
+        self.assertFalse(args.daemon)
+        self.assertEqual(args.daemon_interval, DEFAULT_DAEMON_INTERVAL)
+        self.assertEqual(args.daemon_jitter, DEFAULT_DAEMON_JITTER)
+        self.assertIsNone(args.daemon_schedule)
         self.assertEqual(
             args.greenbone_enterprise_feed_key,
             Path(DEFAULT_ENTERPRISE_KEY_PATH),
@@ -427,6 +480,16 @@ class CliParserTestCase(unittest.TestCase):
         args = parser.parse_arguments(["--no-wait"])
         self.assertTrue(args.no_wait)
 
+    def test_blocking_lock(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--blocking-lock"])
+        self.assertTrue(args.blocking_lock)
+
+    def test_lock_timeout(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--lock-timeout", "600"])
+        self.assertEqual(args.lock_timeout, 600)
+
     def test_no_permission_change(self):
         parser = CliParser()
         args = parser.parse_arguments(["--no-permission-change"])
@@ -442,6 +505,207 @@ class CliParserTestCase(unittest.TestCase):
         args = parser.parse_arguments(["--rsync-timeout", "120"])
         self.assertEqual(args.rsync_timeout, 120)
 
+    def test_retries(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            ["--retries", "3", "--retry-deadline", "600"]
+        )
+        self.assertEqual(args.retries, 3)
+        self.assertEqual(args.retry_deadline, 600)
+
+    def test_pre_check(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--pre-check"])
+        self.assertTrue(args.pre_check)
+
+    def test_record_changes(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--record-changes"])
+        self.assertTrue(args.record_changes)
+
+    def test_parallel(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--parallel", "4"])
+        self.assertEqual(args.parallel, 4)
+
+    def test_snapshots(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--snapshots", "3"])
+        self.assertEqual(args.snapshots, 3)
+
+    def test_staged(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--staged"])
+        self.assertTrue(args.staged)
+
+    def test_feed_locks(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--feed-locks"])
+        self.assertTrue(args.feed_locks)
+
+    def test_completion_hook(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--completion-hook", "/usr/bin/foo"])
+        self.assertEqual(args.completion_hook, "/usr/bin/foo")
+
+    def test_nasl_shards(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--nasl-shards", "4"])
+        self.assertEqual(args.nasl_shards, 4)
+
+    def test_batch(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--write-batch", "/srv/batches"])
+        self.assertEqual(args.write_batch, Path("/srv/batches"))
+
+        args = parser.parse_arguments(["--read-batch", "/srv/batches"])
+        self.assertEqual(args.read_batch, Path("/srv/batches"))
+
+        with (
+            self.assertRaises(SystemExit),
+            redirect_stderr(io.StringIO()),
+        ):
+            parser.parse_arguments(
+                ["--write-batch", "/srv/a", "--read-batch", "/srv/b"]
+            )
+
+    def test_verify(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--verify", "--verify-workers", "4"])
+        self.assertTrue(args.verify)
+        self.assertEqual(args.verify_workers, 4)
+
+    def test_tree_manifest(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--tree-manifest"])
+        self.assertTrue(args.tree_manifest)
+
+    def test_incremental(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--incremental"])
+        self.assertTrue(args.incremental)
+
+    def test_merkle_digest(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            ["--merkle-digest", "--compare-digests", "a.json", "b.json"]
+        )
+        self.assertTrue(args.merkle_digest)
+        self.assertEqual(args.compare_digests, [Path("a.json"), Path("b.json")])
+
+    def test_bundle(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--export-bundle", "/tmp/feed.tar.zst"])
+        self.assertEqual(args.export_bundle, Path("/tmp/feed.tar.zst"))
+
+        args = parser.parse_arguments(["--import-bundle", "/tmp/feed.tar.zst"])
+        self.assertEqual(args.import_bundle, Path("/tmp/feed.tar.zst"))
+
+        args = parser.parse_arguments(
+            ["--export-bundle", "/tmp/delta.tar.zst", "--bundle-base", "/tmp/a"]
+        )
+        self.assertEqual(args.export_bundle, Path("/tmp/delta.tar.zst"))
+        self.assertEqual(args.bundle_base, Path("/tmp/a"))
+
+        with (
+            self.assertRaises(SystemExit),
+            redirect_stderr(io.StringIO()),
+        ):
+            parser.parse_arguments(
+                ["--export-bundle", "/tmp/a", "--import-bundle", "/tmp/b"]
+            )
+
+    def test_push(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            [
+                "--push",
+                "/etc/gvm/sensors",
+                "--push-concurrency",
+                "8",
+                "--push-retries",
+                "0",
+            ]
+        )
+        self.assertEqual(args.push, Path("/etc/gvm/sensors"))
+        self.assertEqual(args.push_concurrency, 8)
+        self.assertEqual(args.push_retries, 0)
+
+    def test_fan_out_prefixes(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            ["--fan-out-prefixes", "/srv/scanner1,/srv/scanner2"]
+        )
+        self.assertEqual(
+            args.fan_out_prefixes,
+            [Path("/srv/scanner1"), Path("/srv/scanner2")],
+        )
+
+    def test_daemon(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            [
+                "--daemon",
+                "--daemon-interval",
+                "6h",
+                "--daemon-jitter",
+                "600",
+            ]
+        )
+        self.assertTrue(args.daemon)
+        self.assertEqual(args.daemon_interval, 6 * 60 * 60)
+        self.assertEqual(args.daemon_jitter, 600)
+
+    def test_serve(self):
+        parser = CliParser()
+        args = parser.parse_arguments(
+            [
+                "--daemon",
+                "--serve",
+                "--serve-address",
+                "10.0.0.1",
+                "--serve-port",
+                "1873",
+                "--serve-hosts-allow",
+                "10.0.0.0/24, leader.example.com",
+            ]
+        )
+        self.assertTrue(args.serve)
+        self.assertEqual(args.serve_address, "10.0.0.1")
+        self.assertEqual(args.serve_port, 1873)
+        self.assertEqual(
+            args.serve_hosts_allow, ["10.0.0.0/24", "leader.example.com"]
+        )
+
+    def test_leader_url(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--leader-url", "leader.example"])
+        self.assertEqual(args.leader_url, "rsync://leader.example:8873")
+        self.assertEqual(args.nasl_url, "rsync://leader.example:8873/nasl/")
+        self.assertEqual(
+            args.gvmd_data_url, "rsync://leader.example:8873/gvmd-data/"
+        )
+
+    def test_daemon_schedule(self):
+        parser = CliParser()
+        args = parser.parse_arguments(["--daemon-schedule", "nvts=6h,scap=1d"])
+        self.assertEqual(
+            args.daemon_schedule, {"nvt": 6 * 60 * 60, "scap": 24 * 60 * 60}
+        )
+
+    def test_daemon_schedule_from_environment(self):
+        with patch.dict(
+            "os.environ", {"GREENBONE_FEED_SYNC_DAEMON_SCHEDULE": "cert=2h"}
+        ):
+            parser = CliParser()
+            args = parser.parse_arguments([])
+        self.assertEqual(args.daemon_schedule, {"cert": 2 * 60 * 60})
+
+    def test_invalid_daemon_schedule(self):
+        parser = CliParser()
+        with self.assertRaisesRegex(ConfigError, "Invalid feed type 'foo'"):
+            parser.parse_arguments(["--daemon-schedule", "foo=1h"])
+
     def test_greenbone_enterprise_feed_key(self):
         parser = CliParser()
         args = parser.parse_arguments(
@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from greenbone.feed.sync.progress import (
+    FileTransfer,
+    RsyncProgress,
+    TransferProgress,
+    parse_rsync_output,
+    read_lines,
+)
+
+
+class ParseRsyncOutputTestCase(unittest.TestCase):
+    def test_progress(self):
+        event = parse_rsync_output(
+            "    1,234,567  12%    1.50MB/s    0:00:10 "
+            "(xfr#5, ir-chk=1000/2000)"
+        )
+
+        self.assertEqual(
+            event,
+            TransferProgress(
+                bytes_transferred=1234567,
+                percent=12,
+                rate=1.5 * 1024 * 1024,
+                eta=10,
+                transferred_files=5,
+                files_to_check=1000,
+                total_files=2000,
+            ),
+        )
+
+    def test_progress_without_file_counts(self):
+        event = parse_rsync_output(
+            "         32,768   0%    0.00kB/s    0:00:00"
+        )
+
+        self.assertEqual(
+            event,
+            TransferProgress(
+                bytes_transferred=32768,
+                percent=0,
+                rate=0.0,
+                eta=0,
+            ),
+        )
+
+    def test_new_file(self):
+        event = parse_rsync_output(">f+++++++++ 1234 foo/bar baz.nasl")
+
+        self.assertEqual(
+            event,
+            FileTransfer(
+                path="foo/bar baz.nasl", size=1234, changes=">f+++++++++"
+            ),
+        )
+        self.assertTrue(event.is_new)
+        self.assertFalse(event.is_deleted)
+        self.assertFalse(event.is_directory)
+
+    def test_updated_file(self):
+        event = parse_rsync_output(">f.st...... 42 foo.nasl")
+
+        self.assertEqual(
+            event, FileTransfer(path="foo.nasl", size=42, changes=">f.st......")
+        )
+        self.assertFalse(event.is_new)
+
+    def test_directory(self):
+        event = parse_rsync_output("cd+++++++++ 4096 foo/")
+
+        self.assertEqual(
+            event, FileTransfer(path="foo/", size=4096, changes="cd+++++++++")
+        )
+        self.assertTrue(event.is_directory)
+
+    def test_deleted_file(self):
+        event = parse_rsync_output("*deleting   0 foo.nasl")
+
+        self.assertEqual(
+            event, FileTransfer(path="foo.nasl", size=0, changes="*deleting")
+        )
+        self.assertTrue(event.is_deleted)
+        self.assertFalse(event.is_directory)
+
+    def test_non_ascii_name(self):
+        self.assertEqual(
+            parse_rsync_output(">f+++++++++ 3 foo/bär.nasl"),
+            FileTransfer(path="foo/bär.nasl", size=3, changes=">f+++++++++"),
+        )
+        # without --8-bit-output or for non-printable characters
+        self.assertEqual(
+            parse_rsync_output(">f+++++++++ 3 foo/b\\#303\\#244r\\#012.nasl"),
+            FileTransfer(path="foo/bär\n.nasl", size=3, changes=">f+++++++++"),
+        )
+
+    def test_unknown(self):
+        self.assertIsNone(parse_rsync_output("receiving incremental file list"))
+        self.assertIsNone(parse_rsync_output(""))
+
+
+class ReadLinesTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_read_lines(self):
+        stream = asyncio.StreamReader()
+        stream.feed_data(b"foo\nbar\r  1%\r  2%")
+        stream.feed_data(b" done\n\nbaz")
+        stream.feed_eof()
+
+        lines = [line async for line in read_lines(stream, chunk_size=4)]
+
+        self.assertEqual(lines, ["foo", "bar", "  1%", "  2% done", "baz"])
+
+
+class RsyncProgressTestCase(unittest.TestCase):
+    def test_subscribe(self):
+        handler = MagicMock()
+        progress = RsyncProgress()
+        progress.subscribe(handler)
+
+        progress(">f+++++++++ 1 foo")
+        progress("receiving incremental file list")
+        progress("  1 100%  1.00kB/s    0:00:01 (xfr#1, to-chk=0/1)")
+
+        self.assertEqual(handler.call_count, 2)
+        self.assertEqual(progress.files, 1)
+        self.assertEqual(progress.last_progress.percent, 100)
+
+        progress.unsubscribe(handler)
+        progress(">f+++++++++ 1 bar")
+
+        self.assertEqual(handler.call_count, 2)
+        self.assertEqual(progress.files, 2)
@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import unittest
+from pathlib import Path
+from unittest.mock import ANY, MagicMock, patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import ConfigError, RsyncError
+from greenbone.feed.sync.push import (
+    PushTarget,
+    parse_target,
+    push,
+    push_target,
+    read_inventory,
+)
+
+
+def fake_push(*, fail: dict[str, list[Exception]] | None = None):
+    """
+    Create a fake Rsync.push reporting 100 transferred bytes per directory
+
+    fail maps host names to errors raised by the next calls for this host.
+    """
+    fail = fail or {}
+
+    async def rsync_push(source, url, *, progress, connect_timeout):
+        progress(" 100 100% 1.00kB/s 0:00:01 (xfr#1, to-chk=0/1)")
+        for host, errors in fail.items():
+            if errors and (f"@{host}" in url or f"//{host}" in url):
+                raise errors.pop(0)
+
+    return rsync_push
+
+
+class ParseTargetTestCase(unittest.TestCase):
+    def test_host(self):
+        self.assertEqual(
+            parse_target("sensor1"), PushTarget("sensor1", "sensor1")
+        )
+
+    def test_user_and_port(self):
+        target = parse_target("admin@sensor2:2222")
+
+        self.assertEqual(target.netloc, "admin@sensor2:2222")
+        self.assertIsNone(target.prefix)
+        self.assertEqual(
+            target.url("/var/lib/notus"),
+            "ssh://admin@sensor2:2222/var/lib/notus/",
+        )
+
+    def test_prefix(self):
+        target = parse_target("ssh://sensor3/opt/greenbone/")
+
+        self.assertEqual(target.netloc, "sensor3")
+        self.assertEqual(target.prefix, Path("/opt/greenbone"))
+
+    def test_invalid(self):
+        for value in ("rsync://sensor", "sensor:foo", "ssh://"):
+            with self.assertRaisesRegex(ConfigError, "Invalid push target"):
+                parse_target(value)
+
+
+class ReadInventoryTestCase(unittest.TestCase):
+    def test_read(self):
+        with temp_directory() as temp_dir:
+            inventory = temp_dir / "sensors"
+            inventory.write_text(
+                "# sensors of the DMZ\nsensor1\n\n  admin@sensor2:2222  \n"
+            )
+
+            self.assertEqual(
+                [target.name for target in read_inventory(inventory)],
+                ["sensor1", "admin@sensor2:2222"],
+            )
+
+    def test_missing(self):
+        with (
+            temp_directory() as temp_dir,
+            self.assertRaisesRegex(ConfigError, "Can't read push inventory"),
+        ):
+            read_inventory(temp_dir / "sensors")
+
+
+class PushTargetTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_push(self):
+        rsync = MagicMock()
+        rsync.push.side_effect = fake_push()
+
+        result = await push_target(
+            rsync,
+            parse_target("sensor1"),
+            ["/var/lib/notus", "/var/lib/openvas/plugins"],
+            prefix="/var/lib",
+        )
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(result.bytes_transferred, 200)
+        self.assertEqual(
+            [c.args for c in rsync.push.call_args_list],
+            [
+                ("/var/lib/notus", "ssh://sensor1/var/lib/notus/"),
+                (
+                    "/var/lib/openvas/plugins",
+                    "ssh://sensor1/var/lib/openvas/plugins/",
+                ),
+            ],
+        )
+
+    async def test_push_into_prefix(self):
+        rsync = MagicMock()
+        rsync.push.side_effect = fake_push()
+
+        await push_target(
+            rsync,
+            parse_target("ssh://sensor1/opt/greenbone"),
+            ["/var/lib/notus"],
+            prefix="/var/lib",
+        )
+
+        rsync.push.assert_called_once_with(
+            "/var/lib/notus",
+            "ssh://sensor1/opt/greenbone/notus/",
+            progress=ANY,
+            connect_timeout=30,
+        )
+
+    @patch("greenbone.feed.sync.retry.asyncio.sleep")
+    async def test_retry(self, sleep_mock: MagicMock):
+        rsync = MagicMock()
+        rsync.push.side_effect = fake_push(
+            fail={"sensor1": [RsyncError(255, [])]}
+        )
+        on_retry = MagicMock()
+
+        result = await push_target(
+            rsync,
+            parse_target("sensor1"),
+            ["/var/lib/notus"],
+            prefix="/var/lib",
+            on_retry=on_retry,
+        )
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(result.bytes_transferred, 200)
+        on_retry.assert_called_once()
+        sleep_mock.assert_awaited_once()
+
+    async def test_failure(self):
+        error = RsyncError(1, [])
+        rsync = MagicMock()
+        rsync.push.side_effect = fake_push(fail={"sensor1": [error]})
+
+        result = await push_target(
+            rsync,
+            parse_target("sensor1"),
+            ["/var/lib/notus"],
+            prefix="/var/lib",
+        )
+
+        self.assertFalse(result.success)
+        self.assertIs(result.error, error)
+        self.assertEqual(result.attempts, 1)
+
+
+class PushTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_push(self):
+        running = 0
+        max_running = 0
+
+        async def rsync_push(source, url, *, progress, connect_timeout):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if "sensor3" in url:
+                raise RsyncError(1, [])
+
+        rsync = MagicMock()
+        rsync.push.side_effect = rsync_push
+        on_result = MagicMock()
+        targets = [parse_target(f"sensor{i}") for i in range(1, 6)]
+
+        results = await push(
+            rsync,
+            targets,
+            ["/var/lib/notus"],
+            prefix="/var/lib",
+            concurrency=2,
+            on_result=on_result,
+        )
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual([result.target for result in results], targets)
+        self.assertEqual(
+            [result.success for result in results],
+            [True, True, False, True, True],
+        )
+        self.assertEqual(on_result.call_count, 5)
+
+    @patch("greenbone.feed.sync.retry.asyncio.sleep")
+    async def test_on_retry(self, _sleep_mock: MagicMock):
+        error = RsyncError(10, [])
+        rsync = MagicMock()
+        rsync.push.side_effect = fake_push(fail={"sensor1": [error]})
+        on_retry = MagicMock()
+        target = parse_target("sensor1")
+
+        await push(
+            rsync,
+            [target],
+            ["/var/lib/notus"],
+            prefix="/var/lib",
+            on_retry=on_retry,
+        )
+
+        on_retry.assert_called_once_with(target, error, 1, ANY)
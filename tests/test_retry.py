@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+from greenbone.feed.sync.errors import GreenboneFeedSyncError, RsyncError
+from greenbone.feed.sync.retry import backoff_delay, is_retryable, retry
+
+
+class IsRetryableTestCase(unittest.TestCase):
+    def test_retryable(self):
+        for returncode in (5, 10, 12, 23, 24, 30, 35):
+            self.assertTrue(is_retryable(RsyncError(returncode, [])))
+
+    def test_fatal(self):
+        for returncode in (1, 2, 3, 4, 11, 13, 20, 22):
+            self.assertFalse(is_retryable(RsyncError(returncode, [])))
+
+        self.assertFalse(is_retryable(GreenboneFeedSyncError("foo")))
+
+
+class BackoffDelayTestCase(unittest.TestCase):
+    def test_exponential(self):
+        for attempt, delay in ((1, 5), (2, 10), (3, 20), (4, 40)):
+            value = backoff_delay(attempt)
+            self.assertGreaterEqual(value, delay / 2)
+            self.assertLessEqual(value, delay)
+
+    def test_max_delay(self):
+        self.assertLessEqual(backoff_delay(20, max_delay=60), 60)
+        self.assertGreaterEqual(backoff_delay(20, max_delay=60), 30)
+
+
+class RetryTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_success(self):
+        func = AsyncMock(return_value="foo")
+
+        result = await retry(func, retries=3)
+
+        self.assertEqual(result.result, "foo")
+        self.assertEqual(result.attempts, 1)
+        self.assertGreaterEqual(result.duration, 0)
+
+    async def test_retry(self):
+        error = RsyncError(30, [])
+        func = AsyncMock(side_effect=[error, error, "foo"])
+        on_retry = MagicMock()
+
+        result = await retry(func, retries=3, base_delay=0, on_retry=on_retry)
+
+        self.assertEqual(result.result, "foo")
+        self.assertEqual(result.attempts, 3)
+        self.assertEqual(
+            on_retry.call_args_list, [call(error, 1, 0), call(error, 2, 0)]
+        )
+
+    async def test_retries_exhausted(self):
+        func = AsyncMock(side_effect=RsyncError(30, []))
+
+        with self.assertRaises(RsyncError):
+            await retry(func, retries=2, base_delay=0)
+
+        self.assertEqual(func.await_count, 3)
+
+    async def test_fatal_error(self):
+        func = AsyncMock(side_effect=RsyncError(1, []))
+
+        with self.assertRaises(RsyncError):
+            await retry(func, retries=2, base_delay=0)
+
+        func.assert_awaited_once()
+
+    async def test_deadline(self):
+        func = AsyncMock(side_effect=RsyncError(30, []))
+
+        with (
+            patch("greenbone.feed.sync.retry.backoff_delay", return_value=10),
+            self.assertRaises(RsyncError),
+        ):
+            await retry(func, retries=5, deadline=5)
+
+        func.assert_awaited_once()
@@ -7,10 +7,19 @@ import asyncio
 import unittest
 from asyncio.subprocess import Process
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pontos.testing import temp_directory
 
 from greenbone.feed.sync.errors import RsyncError
-from greenbone.feed.sync.rsync import Rsync, exec_rsync
+from greenbone.feed.sync.progress import RsyncProgress
+from greenbone.feed.sync.rsync import (
+    RemoteEntry,
+    Rsync,
+    exec_rsync,
+    parse_list_only_output,
+    split_shards,
+)
 
 
 class RsyncTestCase(unittest.IsolatedAsyncioTestCase):
@@ -163,6 +172,282 @@ class RsyncTestCase(unittest.IsolatedAsyncioTestCase):
             "/tmp/baz",
         )
 
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_with_progress(self, exec_mock: AsyncMock):
+        progress = RsyncProgress()
+        rsync = Rsync(verbose=True)
+        await rsync.sync("rsync://foo.bar/baz", "/tmp/baz", progress=progress)
+
+        exec_mock.assert_awaited_once_with(
+            "--links",
+            "--times",
+            "--omit-dir-times",
+            "--recursive",
+            "--partial",
+            "--info=progress2",
+            "--8-bit-output",
+            "--out-format=%i %l %n",
+            "--compress-level=9",
+            "--delete",
+            "--perms",
+            "--chmod=Fugo+r,Fug+w,Dugo-s,Dugo+rx,Dug+w",
+            "--copy-unsafe-links",
+            "--hard-links",
+            "rsync://foo.bar/baz",
+            "/tmp/baz",
+            output_handler=progress,
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_with_changes(self, exec_mock: AsyncMock):
+        async def exec_rsync_mock(*args, output_handler):
+            output_handler(">f+++++++++ 12 new.nasl")
+            output_handler(">f.st...... 34 updated.nasl")
+            output_handler("cd+++++++++ 4096 foo/")
+            output_handler("*deleting   0 deleted.nasl")
+            output_handler(">f+++++++++ 56 b\\#303\\#244r.nasl")
+            output_handler("  46 100%  1.00kB/s    0:00:01 (xfr#2, to-chk=0/3)")
+
+        exec_mock.side_effect = exec_rsync_mock
+
+        rsync = Rsync()
+        change_set = await rsync.sync(
+            "rsync://foo.bar/baz", "/tmp/baz", changes=True
+        )
+
+        self.assertEqual(change_set.added, ["new.nasl", "bär.nasl"])
+        self.assertEqual(change_set.updated, ["updated.nasl"])
+        self.assertEqual(change_set.deleted, ["deleted.nasl"])
+
+        args = exec_mock.await_args.args
+        self.assertIn("--8-bit-output", args)
+        self.assertIn("--out-format=%i %l %n", args)
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_without_changes(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        self.assertIsNone(await rsync.sync("rsync://foo.bar/baz", "/tmp/baz"))
+
+
+class ParseListOnlyOutputTestCase(unittest.TestCase):
+    def test_directory(self):
+        self.assertEqual(
+            parse_list_only_output(
+                "drwxr-xr-x          4,096 2024/01/02 03:04:05 2008"
+            ),
+            RemoteEntry(name="2008", is_directory=True),
+        )
+
+    def test_file(self):
+        self.assertEqual(
+            parse_list_only_output(
+                "-rw-r--r--          1,234 2024/01/02 03:04:05 foo bar.inc"
+            ),
+            RemoteEntry(name="foo bar.inc", is_directory=False),
+        )
+
+    def test_symlink(self):
+        self.assertEqual(
+            parse_list_only_output(
+                "lrwxrwxrwx              8 2024/01/02 03:04:05 foo -> bar.inc"
+            ),
+            RemoteEntry(name="foo", is_directory=False),
+        )
+
+    def test_ignore(self):
+        self.assertIsNone(
+            parse_list_only_output(
+                "drwxr-xr-x          4,096 2024/01/02 03:04:05 ."
+            )
+        )
+        self.assertIsNone(parse_list_only_output("Welcome to the feed"))
+        self.assertIsNone(parse_list_only_output(""))
+
+
+class SplitShardsTestCase(unittest.TestCase):
+    def test_split(self):
+        entries = [
+            RemoteEntry(name=name, is_directory=True)
+            for name in ("d", "a", "c", "b", "e")
+        ]
+        shards = split_shards(entries, 2)
+
+        self.assertEqual(
+            [[entry.name for entry in shard] for shard in shards],
+            [["a", "c", "e"], ["b", "d"]],
+        )
+
+    def test_more_shards_than_entries(self):
+        entries = [RemoteEntry(name="a", is_directory=False)]
+        self.assertEqual(split_shards(entries, 4), [entries])
+
+    def test_no_entries(self):
+        self.assertEqual(split_shards([], 4), [[]])
+
+
+class ShardedRsyncTestCase(unittest.IsolatedAsyncioTestCase):
+    LISTING = (
+        "drwxr-xr-x          4,096 2024/01/02 03:04:05 .",
+        "drwxr-xr-x          4,096 2024/01/02 03:04:05 2008",
+        "drwxr-xr-x          4,096 2024/01/02 03:04:05 2009",
+        "-rw-r--r--          1,234 2024/01/02 03:04:05 plugin_feed_info.inc",
+    )
+
+    def exec_rsync_mock(self, *args, output_handler=None):
+        if args[0] == "--list-only":
+            for line in self.LISTING:
+                output_handler(line)
+        elif output_handler:
+            output_handler(">f+++++++++ 12 2008/new.nasl")
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_list_directory(self, exec_mock: AsyncMock):
+        exec_mock.side_effect = self.exec_rsync_mock
+        rsync = Rsync(timeout=120)
+        entries = await rsync.list_directory("rsync://foo.bar/nasl")
+
+        self.assertEqual(
+            entries,
+            [
+                RemoteEntry(name="2008", is_directory=True),
+                RemoteEntry(name="2009", is_directory=True),
+                RemoteEntry(name="plugin_feed_info.inc", is_directory=False),
+            ],
+        )
+        self.assertEqual(
+            exec_mock.await_args.args,
+            ("--list-only", "--timeout=120", "rsync://foo.bar/nasl/"),
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_list_directory_connect_timeout(self, exec_mock: AsyncMock):
+        exec_mock.side_effect = self.exec_rsync_mock
+        rsync = Rsync(ssh_key="/tmp/key")
+        await rsync.list_directory("rsync://foo.bar/nasl", connect_timeout=5)
+
+        self.assertEqual(
+            exec_mock.await_args.args,
+            ("--list-only", "--contimeout=5", "rsync://foo.bar/nasl/"),
+        )
+
+        await rsync.list_directory("ssh://foo@bar/nasl", connect_timeout=5)
+
+        self.assertIn("-o ConnectTimeout=5", exec_mock.await_args.args[2])
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_sync_shards(self, exec_mock: AsyncMock):
+        exec_mock.side_effect = self.exec_rsync_mock
+
+        with temp_directory() as temp_dir:
+            rsync = Rsync(private_subdir="private")
+            await rsync.sync("rsync://foo.bar/nasl", temp_dir, shards=2)
+
+        self.assertEqual(exec_mock.await_count, 3)
+        shard_args = [
+            c.args
+            for c in exec_mock.await_args_list
+            if c.args[0] != "--list-only"
+        ]
+        filters = [
+            [arg for arg in args if arg.startswith(("--include", "--exclude="))]
+            for args in shard_args
+        ]
+        self.assertEqual(
+            filters,
+            [
+                [
+                    "--include=/2008",
+                    "--include=/2008/**",
+                    "--include=/plugin_feed_info.inc",
+                    "--exclude=/*",
+                ],
+                ["--include=/2009", "--include=/2009/**", "--exclude=/*"],
+            ],
+        )
+        for args in shard_args:
+            # the private directory is excluded before the shard filters
+            self.assertLess(args.index("private"), args.index("--exclude=/*"))
+            self.assertEqual(args[-2:], ("rsync://foo.bar/nasl", str(temp_dir)))
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_sync_shards_deletes_removed_entries(
+        self, exec_mock: AsyncMock
+    ):
+        exec_mock.side_effect = self.exec_rsync_mock
+
+        with temp_directory() as temp_dir:
+            (temp_dir / "2008").mkdir()
+            (temp_dir / "2007").mkdir()
+            (temp_dir / "2007" / "old.nasl").touch()
+            (temp_dir / "old.inc").touch()
+            (temp_dir / "private").mkdir()
+
+            rsync = Rsync(private_subdir="private")
+            change_set = await rsync.sync(
+                "rsync://foo.bar/nasl", temp_dir, shards=2, changes=True
+            )
+
+            self.assertEqual(
+                sorted(path.name for path in temp_dir.iterdir()),
+                ["2008", "private"],
+            )
+
+        self.assertEqual(change_set.added, ["2008/new.nasl", "2008/new.nasl"])
+        self.assertEqual(change_set.deleted, ["2007/", "old.inc"])
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_sync_shards_keeps_partial_dir(self, exec_mock: AsyncMock):
+        exec_mock.side_effect = self.exec_rsync_mock
+
+        with temp_directory() as temp_dir:
+            (temp_dir / ".rsync-partial").mkdir()
+            (temp_dir / ".rsync-partial" / "new.nasl").touch()
+            (temp_dir / "old.inc").touch()
+
+            rsync = Rsync(partial_dir=".rsync-partial")
+            change_set = await rsync.sync(
+                "rsync://foo.bar/nasl", temp_dir, shards=2, changes=True
+            )
+
+            self.assertTrue((temp_dir / ".rsync-partial" / "new.nasl").exists())
+
+        self.assertEqual(change_set.deleted, ["old.inc"])
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_sync_shards_error(self, exec_mock: AsyncMock):
+        async def exec_rsync_mock(*args, output_handler=None):
+            if args[0] == "--list-only":
+                for line in self.LISTING:
+                    output_handler(line)
+            else:
+                raise RsyncError(23, args)
+
+        exec_mock.side_effect = exec_rsync_mock
+
+        with temp_directory() as temp_dir:
+            (temp_dir / "2007").mkdir()
+
+            rsync = Rsync()
+            with self.assertRaises(RsyncError):
+                await rsync.sync("rsync://foo.bar/nasl", temp_dir, shards=2)
+
+            # nothing is deleted after a failed sync
+            self.assertTrue((temp_dir / "2007").exists())
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_sync_shards_empty_listing(self, exec_mock: AsyncMock):
+        async def exec_rsync_mock(*args, output_handler=None):
+            pass
+
+        exec_mock.side_effect = exec_rsync_mock
+
+        with temp_directory() as temp_dir:
+            rsync = Rsync()
+            await rsync.sync("rsync://foo.bar/nasl", temp_dir, shards=2)
+
+        self.assertEqual(exec_mock.await_count, 2)
+        self.assertNotIn("--exclude=/*", exec_mock.await_args.args)
+
 
 class ExecRsyncTestCase(unittest.IsolatedAsyncioTestCase):
     @patch(
@@ -207,6 +492,88 @@ class ExecRsyncTestCase(unittest.IsolatedAsyncioTestCase):
             "rsync", "foo", "bar", stderr=asyncio.subprocess.PIPE
         )
 
+    @patch(
+        "greenbone.feed.sync.rsync.asyncio.create_subprocess_exec",
+        autospec=True,
+    )
+    async def test_output_handler(self, exec_mock: AsyncMock):
+        stdout = asyncio.StreamReader()
+        stdout.feed_data(b"foo\nbar\r baz\n")
+        stdout.feed_eof()
+        stderr = asyncio.StreamReader()
+        stderr.feed_eof()
+
+        process_mock = AsyncMock(spec=Process)
+        process_mock.stdout = stdout
+        process_mock.stderr = stderr
+        process_mock.wait.return_value = 0
+        exec_mock.return_value = process_mock
+        output_handler = MagicMock()
+
+        await exec_rsync("foo", "bar", output_handler=output_handler)
+
+        exec_mock.assert_awaited_once_with(
+            "rsync",
+            "foo",
+            "bar",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self.assertEqual(
+            [c.args[0] for c in output_handler.call_args_list],
+            ["foo", "bar", " baz"],
+        )
+
+    @patch(
+        "greenbone.feed.sync.rsync.asyncio.create_subprocess_exec",
+        autospec=True,
+    )
+    async def test_output_handler_failure(self, exec_mock: AsyncMock):
+        stdout = asyncio.StreamReader()
+        stdout.feed_eof()
+        stderr = asyncio.StreamReader()
+        stderr.feed_data(b"An error occurred")
+        stderr.feed_eof()
+
+        process_mock = AsyncMock(spec=Process)
+        process_mock.stdout = stdout
+        process_mock.stderr = stderr
+        process_mock.wait.return_value = 23
+        exec_mock.return_value = process_mock
+
+        with self.assertRaises(RsyncError) as cm:
+            await exec_rsync("foo", output_handler=MagicMock())
+
+        self.assertEqual(cm.exception.returncode, 23)
+        self.assertEqual(cm.exception.stderr, "An error occurred")
+
+    @patch(
+        "greenbone.feed.sync.rsync.asyncio.create_subprocess_exec",
+        autospec=True,
+    )
+    async def test_kill_on_cancel(self, exec_mock: AsyncMock):
+        started = asyncio.Event()
+
+        async def communicate():
+            started.set()
+            await asyncio.sleep(10)
+
+        process_mock = AsyncMock(spec=Process)
+        process_mock.communicate.side_effect = communicate
+        process_mock.returncode = None
+        process_mock.kill = MagicMock()
+        exec_mock.return_value = process_mock
+
+        task = asyncio.create_task(exec_rsync("foo"))
+        await started.wait()
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        process_mock.kill.assert_called_once_with()
+        process_mock.wait.assert_awaited_once_with()
+
     @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
     async def test_rsync_with_timeout(self, exec_mock: AsyncMock):
         rsync = Rsync(timeout=120)
@@ -256,3 +623,197 @@ class ExecRsyncTestCase(unittest.IsolatedAsyncioTestCase):
             "user@foo.bar:/baz",
             "/tmp/baz",
         )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_fetch_file(self, exec_mock: AsyncMock):
+        rsync = Rsync(timeout=120)
+        await rsync.fetch_file("rsync://foo.bar/baz/timestamp", "/tmp/ts")
+
+        exec_mock.assert_awaited_once_with(
+            "--times",
+            "--timeout=120",
+            "-q",
+            "--compress-level=9",
+            "rsync://foo.bar/baz/timestamp",
+            "/tmp/ts",
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_fetch_file_with_ssh(self, exec_mock: AsyncMock):
+        ssh_key = Path("/tmp/ssh.key")
+        rsync = Rsync(ssh_key=ssh_key, compression_level=None)
+        await rsync.fetch_file("ssh://user@foo.bar/baz/timestamp", "/tmp/ts")
+
+        exec_mock.assert_awaited_once_with(
+            "--times",
+            "-e",
+            "ssh -o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no -p 24 -i '/tmp/ssh.key'",  # pylint: disable=line-too-long
+            "-q",
+            "user@foo.bar:/baz/timestamp",
+            "/tmp/ts",
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_fetch_file_with_ssh_control_path(self, exec_mock: AsyncMock):
+        rsync = Rsync(
+            ssh_key="/tmp/ssh.key",
+            ssh_control_path="/tmp/ssh/%C",
+            compression_level=None,
+        )
+        await rsync.fetch_file("ssh://user@foo.bar/baz/timestamp", "/tmp/ts")
+
+        exec_mock.assert_awaited_once_with(
+            "--times",
+            "-e",
+            "ssh -o UserKnownHostsFile=/dev/null -o StrictHostKeyChecking=no -p 24 -i '/tmp/ssh.key' -o ControlPath='/tmp/ssh/%C'",  # pylint: disable=line-too-long
+            "-q",
+            "user@foo.bar:/baz/timestamp",
+            "/tmp/ts",
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_with_link_dest(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        await rsync.sync(
+            "rsync://foo.bar/baz", "/tmp/baz.new", link_dest="/tmp/baz.old"
+        )
+
+        args = exec_mock.await_args.args
+        self.assertIn("--link-dest=/tmp/baz.old", args)
+        self.assertEqual(args[-1], "/tmp/baz.new")
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_with_partial_dir(self, exec_mock: AsyncMock):
+        rsync = Rsync(partial_dir=".rsync-partial")
+        await rsync.sync("rsync://foo.bar/baz", "/tmp/baz")
+
+        args = exec_mock.await_args.args
+        self.assertIn("--partial-dir=.rsync-partial", args)
+        self.assertNotIn("--partial", args)
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_push(self, exec_mock: AsyncMock):
+        rsync = Rsync(private_subdir="private")
+        progress = RsyncProgress()
+        await rsync.push(
+            "/tmp/baz",
+            "ssh://admin@sensor:2222/var/lib/baz/",
+            progress=progress,
+            connect_timeout=10,
+        )
+
+        exec_mock.assert_awaited_once_with(
+            "--links",
+            "--times",
+            "--omit-dir-times",
+            "--recursive",
+            "--partial",
+            "--info=progress2",
+            "--8-bit-output",
+            "--out-format=%i %l %n",
+            "-e",
+            "ssh -o BatchMode=yes -p 2222 -o ConnectTimeout=10",
+            "--rsync-path=mkdir -p /var/lib/baz && rsync",
+            "--compress-level=9",
+            "--delete",
+            "--exclude",
+            "private",
+            "--perms",
+            "--chmod=Fugo+r,Fug+w,Dugo-s,Dugo+rx,Dug+w",
+            "--copy-unsafe-links",
+            "--hard-links",
+            "/tmp/baz/",
+            "admin@sensor:/var/lib/baz/",
+            output_handler=progress,
+        )
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_push_quotes_path(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        await rsync.push("/tmp/baz", "ssh://sensor/var/lib/my feed")
+
+        args = exec_mock.await_args.args
+        self.assertIn("-e", args)
+        self.assertIn("ssh -o BatchMode=yes", args)
+        self.assertIn("--rsync-path=mkdir -p '/var/lib/my feed' && rsync", args)
+        self.assertEqual(args[-1], "sensor:/var/lib/my feed/")
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_rsync_with_write_batch(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        await rsync.sync(
+            "rsync://foo.bar/baz",
+            "/tmp/baz",
+            write_batch="/tmp/baz.batch",
+            shards=4,
+        )
+
+        exec_mock.assert_awaited_once()
+        args = exec_mock.await_args.args
+        self.assertIn("--write-batch=/tmp/baz.batch", args)
+        self.assertEqual(args[-2:], ("rsync://foo.bar/baz", "/tmp/baz"))
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_fetch_files(self, exec_mock: AsyncMock):
+        files_from = []
+
+        async def read_files_from(*args):
+            option = next(arg for arg in args if arg.startswith("--files-from"))
+            files_from.append(Path(option.split("=", 1)[1]).read_text())
+
+        exec_mock.side_effect = read_files_from
+        rsync = Rsync()
+        await rsync.fetch_files(
+            "rsync://foo.bar/baz", "/tmp/baz", ["foo.nasl", "bar/baz.nasl"]
+        )
+
+        exec_mock.assert_awaited_once()
+        args = exec_mock.await_args.args
+        self.assertIn("--ignore-times", args)
+        self.assertEqual(args[-2:], ("rsync://foo.bar/baz/", "/tmp/baz"))
+        self.assertEqual(files_from, ["foo.nasl\nbar/baz.nasl\n"])
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_fetch_directory_files(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        with temp_directory() as temp_dir:
+            await rsync.fetch_directory_files(
+                "rsync://foo.bar/baz",
+                temp_dir / "staging",
+                compare_dest="/tmp/baz",
+            )
+
+            exec_mock.assert_awaited_once_with(
+                "--links",
+                "--times",
+                "--dirs",
+                "--exclude=*/",
+                "-q",
+                "--compress-level=9",
+                "--compare-dest=/tmp/baz",
+                "rsync://foo.bar/baz/",
+                str(temp_dir / "staging"),
+            )
+            self.assertTrue((temp_dir / "staging").is_dir())
+
+    @patch("greenbone.feed.sync.rsync.exec_rsync", autospec=True)
+    async def test_read_batch(self, exec_mock: AsyncMock):
+        rsync = Rsync()
+        await rsync.read_batch("/tmp/baz.batch", "/tmp/baz")
+
+        exec_mock.assert_awaited_once_with(
+            "--links",
+            "--times",
+            "--omit-dir-times",
+            "--recursive",
+            "--partial",
+            "--progress",
+            "--read-batch=/tmp/baz.batch",
+            "-q",
+            "--delete",
+            "--perms",
+            "--chmod=Fugo+r,Fug+w,Dugo-s,Dugo+rx,Dug+w",
+            "--copy-unsafe-links",
+            "--hard-links",
+            "/tmp/baz",
+        )
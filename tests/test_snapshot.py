@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.snapshot import Snapshots
+
+
+class SnapshotsTestCase(unittest.TestCase):
+    def test_link_new_destination(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            snapshots = Snapshots(destination)
+            snapshots.link_destination()
+
+            self.assertTrue(destination.is_symlink())
+            self.assertEqual(
+                str(destination.readlink()), ".feed-sync/plugins/current"
+            )
+            self.assertIsNone(snapshots.current())
+            self.assertEqual(snapshots.snapshots(), [])
+
+    def test_link_existing_destination(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            destination.mkdir()
+            (destination / "foo.nasl").write_text("foo")
+
+            snapshots = Snapshots(destination)
+            snapshots.link_destination()
+
+            self.assertTrue(destination.is_symlink())
+            self.assertEqual((destination / "foo.nasl").read_text(), "foo")
+            self.assertEqual(snapshots.snapshots(), [snapshots.current()])
+
+            # linking again doesn't change anything
+            snapshots.link_destination()
+            self.assertEqual(len(snapshots.snapshots()), 1)
+
+    def test_link_file_destination(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            destination.touch()
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "is not a directory"
+            ):
+                Snapshots(destination).link_destination()
+
+    def test_create_and_activate(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            snapshots = Snapshots(destination)
+            snapshots.link_destination()
+
+            partial = snapshots.create()
+            self.assertTrue(partial.name.endswith(".partial"))
+            (partial / "foo.nasl").write_text("foo")
+            # incomplete snapshots are not listed
+            self.assertEqual(snapshots.snapshots(), [])
+
+            snapshot = snapshots.complete(partial)
+            snapshots.activate(snapshot)
+
+            self.assertEqual(snapshots.current(), snapshot)
+            self.assertEqual((destination / "foo.nasl").read_text(), "foo")
+
+    def test_rollback(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            snapshots = Snapshots(destination)
+            snapshots.link_destination()
+
+            first = snapshots.complete(snapshots.create())
+            (first / "version").write_text("1")
+            second = snapshots.complete(snapshots.create())
+            (second / "version").write_text("2")
+            snapshots.activate(second)
+
+            self.assertEqual(snapshots.rollback(), first)
+            self.assertEqual((destination / "version").read_text(), "1")
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "No snapshot of .* to roll back to."
+            ):
+                snapshots.rollback()
+
+    def test_prune(self):
+        with temp_directory() as temp_dir:
+            snapshots = Snapshots(temp_dir / "plugins")
+            created = [snapshots.complete(snapshots.create()) for _ in range(4)]
+            partial = snapshots.create()
+            snapshots.activate(created[0])
+
+            removed = snapshots.prune(2)
+
+            self.assertEqual(removed, [created[1], partial])
+            self.assertEqual(
+                snapshots.snapshots(), [created[0], created[2], created[3]]
+            )
+
+    def test_carry_over(self):
+        with temp_directory() as temp_dir:
+            previous = temp_dir / "previous"
+            (previous / "private").mkdir(parents=True)
+            (previous / "private" / "my.nasl").write_text("mine")
+            snapshot = temp_dir / "snapshot"
+            snapshot.mkdir()
+
+            Snapshots(temp_dir / "plugins").carry_over(
+                previous, snapshot, "private"
+            )
+
+            self.assertEqual(
+                (snapshot / "private" / "my.nasl").read_text(), "mine"
+            )
+            self.assertTrue(
+                (snapshot / "private" / "my.nasl").samefile(
+                    previous / "private" / "my.nasl"
+                )
+            )
+
+    def test_fix_changes(self):
+        with temp_directory() as temp_dir:
+            previous = temp_dir / "previous"
+            (previous / "2008").mkdir(parents=True)
+            (previous / "2008" / "updated.nasl").touch()
+            (previous / "deleted.nasl").touch()
+            (previous / "unchanged.nasl").touch()
+            snapshot = temp_dir / "snapshot"
+            (snapshot / "2008").mkdir(parents=True)
+            (snapshot / "2008" / "updated.nasl").touch()
+            (snapshot / "new.nasl").touch()
+            (snapshot / "unchanged.nasl").touch()
+
+            change_set = ChangeSet(added=["2008/updated.nasl", "new.nasl"])
+            Snapshots.fix_changes(change_set, previous, snapshot)
+
+            self.assertEqual(
+                change_set,
+                ChangeSet(
+                    added=["new.nasl"],
+                    updated=["2008/updated.nasl"],
+                    deleted=["deleted.nasl"],
+                ),
+            )
+
+    def test_active_data(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "plugins"
+            snapshots = Snapshots(destination)
+            self.assertIsNone(snapshots.active_data())
+
+            destination.mkdir()
+            self.assertEqual(snapshots.active_data(), destination.resolve())
+
+            snapshots.link_destination()
+            self.assertEqual(snapshots.active_data(), snapshots.current())
@@ -0,0 +1,207 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.ssh import ssh_control_master, ssh_destinations
+
+# A stand-in for the ssh client. A master connection is simulated by a
+# process creating a state file for its control path and waiting until it
+# gets terminated or told to exit.
+FAKE_SSH = """#!{python}
+import os
+import signal
+import sys
+import time
+
+args = sys.argv[1:]
+with open(os.environ["FAKE_SSH_LOG"], "a") as f:
+    f.write(" ".join(args) + "\\n")
+
+control_path = next(
+    arg.split("=", 1)[1] for arg in args if arg.startswith("ControlPath=")
+)
+state_file = control_path.replace("%C", "master")
+
+if "-O" in args:
+    operation = args[args.index("-O") + 1]
+    if not os.path.exists(state_file):
+        sys.exit(255)
+    if operation == "exit":
+        with open(state_file) as f:
+            pid = int(f.read())
+        os.unlink(state_file)
+        os.kill(pid, signal.SIGTERM)
+    sys.exit(0)
+
+if "-M" in args:
+    if os.environ.get("FAKE_SSH_FAIL"):
+        sys.exit(255)
+
+    def stop(signum, frame):
+        if os.path.exists(state_file):
+            os.unlink(state_file)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    with open(state_file, "w") as f:
+        f.write(str(os.getpid()))
+    while True:
+        time.sleep(1)
+
+sys.exit(1)
+"""
+
+
+class SshDestinationsTestCase(unittest.TestCase):
+    def test_ssh_destinations(self):
+        self.assertEqual(
+            ssh_destinations(
+                [
+                    "ssh://user@foo.bar/nasl",
+                    "ssh://user@foo.bar/scap-data",
+                    "ssh://user@foo.bar:2222/cert-data",
+                    "ssh://other@foo.bar/gvmd-data",
+                    "rsync://foo.bar/notus",
+                ]
+            ),
+            [
+                ("user@foo.bar", 24),
+                ("user@foo.bar", 2222),
+                ("other@foo.bar", 24),
+            ],
+        )
+
+    def test_no_ssh(self):
+        self.assertEqual(ssh_destinations(["rsync://foo.bar/notus"]), [])
+
+
+class SshControlMasterTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir_context = temp_directory()
+        temp_dir = self.temp_dir_context.__enter__()
+        bin_dir = temp_dir / "bin"
+        bin_dir.mkdir()
+        ssh = bin_dir / "ssh"
+        ssh.write_text(FAKE_SSH.format(python=sys.executable))
+        ssh.chmod(0o755)
+        self.log = temp_dir / "ssh.log"
+        self.log.touch()
+
+        self.env_patch = patch.dict(
+            os.environ,
+            {
+                "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                "FAKE_SSH_LOG": str(self.log),
+            },
+        )
+        self.env_patch.start()
+
+    def tearDown(self) -> None:
+        self.env_patch.stop()
+        self.temp_dir_context.__exit__(None, None, None)
+
+    def log_lines(self) -> list[str]:
+        return self.log.read_text().splitlines()
+
+    async def test_no_ssh_urls(self):
+        async with ssh_control_master(
+            ["rsync://foo.bar/notus"], ssh_key="/tmp/key"
+        ) as control_path:
+            self.assertIsNone(control_path)
+
+        self.assertEqual(self.log_lines(), [])
+
+    async def test_no_ssh_key(self):
+        async with ssh_control_master(
+            ["ssh://user@foo.bar/nasl"], ssh_key=None
+        ) as control_path:
+            self.assertIsNone(control_path)
+
+        self.assertEqual(self.log_lines(), [])
+
+    async def test_shared_connection(self):
+        async with ssh_control_master(
+            ["ssh://user@foo.bar/nasl", "ssh://user@foo.bar/scap-data"],
+            ssh_key="/tmp/key",
+        ) as control_path:
+            self.assertEqual(control_path.name, "%C")
+            socket_dir = control_path.parent
+            self.assertTrue((socket_dir / "master").exists())
+
+        self.assertFalse(socket_dir.exists())
+
+        lines = self.log_lines()
+        masters = [line for line in lines if line.startswith("-M")]
+        self.assertEqual(len(masters), 1)
+        self.assertIn("-p 24 -i /tmp/key", masters[0])
+        self.assertTrue(masters[0].endswith("user@foo.bar"))
+        self.assertTrue(lines[-1].startswith("-O exit"))
+
+    async def test_close_on_error(self):
+        with self.assertRaisesRegex(RuntimeError, "sync failed"):
+            async with ssh_control_master(
+                ["ssh://user@foo.bar/nasl"], ssh_key="/tmp/key"
+            ) as control_path:
+                socket_dir = control_path.parent
+                raise RuntimeError("sync failed")
+
+        self.assertFalse(socket_dir.exists())
+        self.assertTrue(self.log_lines()[-1].startswith("-O exit"))
+
+    async def test_connect_concurrently(self):
+        running = 0
+        max_running = 0
+
+        async def start_master(destination, port, ssh_key, path, timeout):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        with patch(
+            "greenbone.feed.sync.ssh._start_master", side_effect=start_master
+        ):
+            async with ssh_control_master(
+                [
+                    "ssh://user@foo.bar/nasl",
+                    "ssh://user@mirror1.foo.bar/nasl",
+                    "ssh://user@mirror2.foo.bar/nasl",
+                ],
+                ssh_key="/tmp/key",
+            ) as control_path:
+                self.assertIsNotNone(control_path)
+
+        self.assertEqual(max_running, 3)
+
+    async def test_master_failure(self):
+        console = MagicMock()
+        with patch.dict(os.environ, {"FAKE_SSH_FAIL": "1"}):
+            async with ssh_control_master(
+                ["ssh://user@foo.bar/nasl"],
+                ssh_key="/tmp/key",
+                console=console,
+            ) as control_path:
+                # clients fall back to separate connections
+                self.assertIsNotNone(control_path)
+                self.assertFalse(
+                    Path(control_path).parent.joinpath("master").exists()
+                )
+
+        console.print.assert_called_once_with(
+            "Could not open a shared ssh connection to user@foo.bar. Using "
+            "separate connections."
+        )
+        self.assertFalse(
+            any(line.startswith("-O exit") for line in self.log_lines())
+        )
@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import hashlib
+import unittest
+from unittest.mock import patch
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.changes import ChangeSet
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.tree import (
+    TreeEntry,
+    TreeManifest,
+    build_tree_manifest,
+    has_tree_manifest,
+    update_tree_manifest,
+    write_tree_manifest,
+)
+from tests.helper import create_feed
+
+FEED = {
+    "foo/bar/baz.nasl": b"baz",
+    "foo/lorem.nasl": b"lorem",
+    "ipsum.nasl": b"ipsum",
+    "link": "ipsum.nasl",
+    ".feed-sync/state": b"state",
+}
+
+
+class TreeManifestTestCase(unittest.TestCase):
+    def test_write_and_read(self):
+        entries = [
+            TreeEntry("foo/b.nasl", 0o100644, 2, 20, b"b" * 32),
+            TreeEntry("foo/a.nasl", 0o100644, 1, 10, b"a" * 32),
+            TreeEntry("c.nasl", 0o100600, 3, 30, b"c" * 32),
+        ]
+        with temp_directory() as temp_dir:
+            write_tree_manifest(temp_dir / "manifest", entries)
+
+            with TreeManifest(temp_dir / "manifest") as manifest:
+                self.assertEqual(len(manifest), 3)
+                self.assertEqual(
+                    list(manifest), [entries[2], entries[1], entries[0]]
+                )
+                self.assertEqual(manifest.get("foo/a.nasl"), entries[1])
+                self.assertEqual(manifest.get("c.nasl"), entries[2])
+                self.assertIsNone(manifest.get("foo/c.nasl"))
+                self.assertIsNone(manifest.get("bar/a.nasl"))
+                self.assertIn("foo/b.nasl", manifest)
+                self.assertNotIn("foo", manifest)
+
+    def test_directories(self):
+        entries = [
+            TreeEntry("foo/bar/b.nasl", 0o100644, 2, 20, b"b" * 32),
+            TreeEntry("foo/a.nasl", 0o100644, 1, 10, b"a" * 32),
+            TreeEntry("c.nasl", 0o100600, 3, 30, b"c" * 32),
+        ]
+        with temp_directory() as temp_dir:
+            write_tree_manifest(temp_dir / "manifest", entries)
+
+            with TreeManifest(temp_dir / "manifest") as manifest:
+                self.assertEqual(manifest.directories(), ["", "foo", "foo/bar"])
+                self.assertEqual(manifest.directory_entries(""), [entries[2]])
+                self.assertEqual(
+                    manifest.directory_entries("foo/bar"), [entries[0]]
+                )
+                self.assertEqual(manifest.directory_entries("bar"), [])
+
+    def test_empty(self):
+        with temp_directory() as temp_dir:
+            write_tree_manifest(temp_dir / "manifest", [])
+
+            with TreeManifest(temp_dir / "manifest") as manifest:
+                self.assertEqual(len(manifest), 0)
+                self.assertIsNone(manifest.get("foo"))
+
+    def test_invalid(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / "empty").touch()
+            (temp_dir / "invalid").write_bytes(b"invalid manifest data")
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid tree manifest"
+            ):
+                TreeManifest(temp_dir / "empty")
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid tree manifest"
+            ):
+                TreeManifest(temp_dir / "invalid")
+            with self.assertRaises(FileNotFoundError):
+                TreeManifest(temp_dir / "missing")
+
+            self.assertFalse(has_tree_manifest(temp_dir / "invalid"))
+            self.assertFalse(has_tree_manifest(temp_dir / "missing"))
+            write_tree_manifest(temp_dir / "manifest", [])
+            self.assertTrue(has_tree_manifest(temp_dir / "manifest"))
+
+
+class BuildTreeManifestTestCase(unittest.TestCase):
+    def test_build(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FEED)
+            manifest_file = temp_dir / "manifest"
+
+            count = build_tree_manifest(
+                manifest_file, destination, exclude=[".feed-sync/"]
+            )
+
+            self.assertEqual(count, 4)
+            with TreeManifest(manifest_file) as manifest:
+                self.assertEqual(
+                    [entry.path for entry in manifest],
+                    [
+                        "ipsum.nasl",
+                        "link",
+                        "foo/lorem.nasl",
+                        "foo/bar/baz.nasl",
+                    ],
+                )
+                entry = manifest.get("foo/bar/baz.nasl")
+                stat = (destination / "foo/bar/baz.nasl").stat()
+                self.assertEqual(entry.size, 3)
+                self.assertEqual(entry.mode, stat.st_mode)
+                self.assertEqual(entry.mtime_ns, stat.st_mtime_ns)
+                self.assertEqual(entry.digest, hashlib.sha256(b"baz").digest())
+                self.assertEqual(
+                    manifest.get("link").digest,
+                    hashlib.sha256(b"ipsum.nasl").digest(),
+                )
+
+    def test_missing_destination(self):
+        with temp_directory() as temp_dir:
+            self.assertEqual(
+                build_tree_manifest(temp_dir / "manifest", temp_dir / "feed"),
+                0,
+            )
+
+
+class UpdateTreeManifestTestCase(unittest.TestCase):
+    def test_creates_missing_manifest(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FEED)
+
+            count = update_tree_manifest(
+                temp_dir / "manifest", destination, ChangeSet()
+            )
+
+            self.assertEqual(count, 5)
+
+    def test_only_changes_are_hashed(self):
+        with temp_directory() as temp_dir:
+            destination = temp_dir / "feed"
+            create_feed(destination, FEED)
+            manifest_file = temp_dir / "manifest"
+            build_tree_manifest(
+                manifest_file, destination, exclude=[".feed-sync"]
+            )
+
+            (destination / "new.nasl").write_bytes(b"new")
+            (destination / "ipsum.nasl").write_bytes(b"changed")
+            (destination / "foo/bar/baz.nasl").unlink()
+            (destination / "foo/bar").rmdir()
+            (destination / "link").unlink()
+            changes = ChangeSet(
+                added=["new.nasl"],
+                updated=["ipsum.nasl"],
+                deleted=["foo/bar/", "link"],
+            )
+
+            with patch(
+                "greenbone.feed.sync.tree.hash_files",
+                return_value=[
+                    hashlib.sha256(b"changed").hexdigest(),
+                    hashlib.sha256(b"new").hexdigest(),
+                ],
+            ) as hash_files_mock:
+                count = update_tree_manifest(
+                    manifest_file, destination, changes
+                )
+
+            hash_files_mock.assert_called_once_with(
+                destination, ["ipsum.nasl", "new.nasl"], workers=None
+            )
+            self.assertEqual(count, 3)
+            with TreeManifest(manifest_file) as manifest:
+                self.assertEqual(
+                    [entry.path for entry in manifest],
+                    ["ipsum.nasl", "new.nasl", "foo/lorem.nasl"],
+                )
+                self.assertEqual(
+                    manifest.get("ipsum.nasl").digest,
+                    hashlib.sha256(b"changed").digest(),
+                )
@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2026 Greenbone AG
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import unittest
+
+from pontos.testing import temp_directory
+
+from greenbone.feed.sync.errors import GreenboneFeedSyncError
+from greenbone.feed.sync.verify import (
+    CHECKSUMS_FILE_NAME,
+    VerifyResult,
+    hash_file,
+    parse_checksums,
+    read_verify_cache,
+    scan_files,
+    stat_files,
+    verify_checksums,
+    write_verify_cache,
+)
+from tests.helper import create_feed, sha256
+
+FEED = {
+    "foo/bar.nasl": b"bar",
+    "baz.nasl": b"baz",
+    "missing.nasl": b"missing",
+    CHECKSUMS_FILE_NAME: (
+        f"{sha256(b'bar')}  foo/bar.nasl\n"
+        f"{sha256(b'baz')}  baz.nasl\n"
+        f"{sha256(b'missing')} *./missing.nasl\n"
+    ).encode(),
+}
+
+
+class ParseChecksumsTestCase(unittest.TestCase):
+    def test_parse(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+
+            self.assertEqual(
+                parse_checksums(temp_dir / CHECKSUMS_FILE_NAME),
+                {
+                    "foo/bar.nasl": sha256(b"bar"),
+                    "baz.nasl": sha256(b"baz"),
+                    "missing.nasl": sha256(b"missing"),
+                },
+            )
+
+    def test_invalid_line(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / CHECKSUMS_FILE_NAME).write_text("\nfoo  bar.nasl\n")
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid line 2 in checksums file"
+            ):
+                parse_checksums(temp_dir / CHECKSUMS_FILE_NAME)
+
+    def test_path_outside_of_directory(self):
+        with temp_directory() as temp_dir:
+            (temp_dir / CHECKSUMS_FILE_NAME).write_text(
+                f"{sha256(b'')}  foo/../../etc/passwd\n"
+            )
+
+            with self.assertRaisesRegex(
+                GreenboneFeedSyncError, "Invalid path foo/../../etc/passwd"
+            ):
+                parse_checksums(temp_dir / CHECKSUMS_FILE_NAME)
+
+
+class HashFileTestCase(unittest.TestCase):
+    def test_hash_file(self):
+        with temp_directory() as temp_dir:
+            small = temp_dir / "small"
+            small.write_bytes(b"foo")
+            large = temp_dir / "large"
+            large.write_bytes(b"x" * 3 * 1024 * 1024)
+
+            self.assertEqual(hash_file(small), sha256(b"foo"))
+            self.assertEqual(hash_file(large), sha256(b"x" * 3 * 1024 * 1024))
+            self.assertIsNone(hash_file(temp_dir / "missing"))
+
+
+class VerifyChecksumsTestCase(unittest.TestCase):
+    def test_success(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+
+            result = verify_checksums(temp_dir, workers=1)
+
+            self.assertEqual(result, VerifyResult(checked=3, hashed=3))
+            self.assertTrue(result.success)
+
+    def test_failures(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+            (temp_dir / "baz.nasl").write_bytes(b"corrupted")
+            (temp_dir / "missing.nasl").unlink()
+
+            result = verify_checksums(temp_dir, workers=1)
+
+            self.assertFalse(result.success)
+            self.assertEqual(result.mismatched, ["baz.nasl"])
+            self.assertEqual(result.missing, ["missing.nasl"])
+            self.assertEqual(result.failed, ["baz.nasl", "missing.nasl"])
+
+    def test_process_pool(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+            (temp_dir / "foo/bar.nasl").write_bytes(b"corrupted")
+
+            result = verify_checksums(temp_dir, workers=2, chunk_size=1)
+
+            self.assertEqual(
+                result,
+                VerifyResult(checked=3, mismatched=["foo/bar.nasl"], hashed=3),
+            )
+
+    def test_selected_files(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+            (temp_dir / "baz.nasl").write_bytes(b"corrupted")
+
+            result = verify_checksums(
+                temp_dir, files=["foo/bar.nasl", "unknown.nasl"], workers=1
+            )
+
+            self.assertEqual(result, VerifyResult(checked=1, hashed=1))
+
+    def test_no_checksums_file(self):
+        with temp_directory() as temp_dir:
+            self.assertIsNone(verify_checksums(temp_dir))
+
+
+class StatFilesTestCase(unittest.TestCase):
+    def test_stat_files(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+            (temp_dir / "link.nasl").symlink_to("baz.nasl")
+
+            files = stat_files(
+                temp_dir, ["foo/bar.nasl", "link.nasl", "foo", "unknown.nasl"]
+            )
+
+            self.assertEqual(sorted(files), ["foo/bar.nasl", "link.nasl"])
+            self.assertEqual(files["link.nasl"].st_size, 3)
+
+
+class ScanFilesTestCase(unittest.TestCase):
+    def test_scan_files(self):
+        with temp_directory() as temp_dir:
+            create_feed(temp_dir, FEED)
+            (temp_dir / "link.nasl").symlink_to("baz.nasl")
+            (temp_dir / "dangling.nasl").symlink_to("unknown.nasl")
+            (temp_dir / "dir").symlink_to("foo")
+
+            files = scan_files(temp_dir)
+
+            self.assertEqual(
+                sorted(files),
+                [
+                    "baz.nasl",
+                    "foo/bar.nasl",
+                    "link.nasl",
+                    "missing.nasl",
+                    CHECKSUMS_FILE_NAME,
+                ],
+            )
+            self.assertEqual(files["baz.nasl"].st_size, 3)
+
+
+class VerifyCacheTestCase(unittest.TestCase):
+    def test_write_and_read(self):
+        with temp_directory() as temp_dir:
+            cache_file = temp_dir / "state/verify-cache.json"
+            write_verify_cache(cache_file, {"1:2:3:4": "foo"})
+
+            self.assertEqual(read_verify_cache(cache_file), {"1:2:3:4": "foo"})
+
+    def test_invalid_cache(self):
+        with temp_directory() as temp_dir:
+            cache_file = temp_dir / "verify-cache.json"
+            self.assertEqual(read_verify_cache(cache_file), {})
+
+            cache_file.write_text("[]")
+            self.assertEqual(read_verify_cache(cache_file), {})
+
+            cache_file.write_text('{"version": 0, "files": {}}')
+            self.assertEqual(read_verify_cache(cache_file), {})
+
+    def test_only_changed_files_are_hashed(self):
+        with temp_directory() as temp_dir:
+            feed = temp_dir / "feed"
+            cache_file = temp_dir / "verify-cache.json"
+            create_feed(feed, FEED)
+
+            result = verify_checksums(feed, workers=1, cache_file=cache_file)
+            self.assertEqual(result, VerifyResult(checked=3, hashed=3))
+            self.assertEqual(len(read_verify_cache(cache_file)), 3)
+
+            result = verify_checksums(feed, workers=1, cache_file=cache_file)
+            self.assertEqual(result, VerifyResult(checked=3, hashed=0))
+
+            # rsync replaces a changed file
+            (feed / "new.nasl").write_bytes(b"corrupted")
+            (feed / "new.nasl").replace(feed / "baz.nasl")
+
+            result = verify_checksums(feed, workers=1, cache_file=cache_file)
+            self.assertEqual(
+                result,
+                VerifyResult(checked=3, mismatched=["baz.nasl"], hashed=1),
+            )
+            # the checksum of the replaced file isn't kept
+            self.assertEqual(len(read_verify_cache(cache_file)), 3)
+
+    def test_selected_files_keep_cache(self):
+        with temp_directory() as temp_dir:
+            feed = temp_dir / "feed"
+            cache_file = temp_dir / "verify-cache.json"
+            create_feed(feed, FEED)
+            verify_checksums(feed, workers=1, cache_file=cache_file)
+
+            (feed / "new.nasl").write_bytes(b"baz")
+            (feed / "new.nasl").replace(feed / "baz.nasl")
+            result = verify_checksums(
+                feed, files=["baz.nasl"], workers=1, cache_file=cache_file
+            )
+
+            self.assertEqual(result, VerifyResult(checked=1, hashed=1))
+            self.assertEqual(len(read_verify_cache(cache_file)), 4)
+            result = verify_checksums(feed, workers=1, cache_file=cache_file)
+            self.assertEqual(result, VerifyResult(checked=3, hashed=0))